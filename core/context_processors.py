@@ -1,51 +1,23 @@
-from django.utils.translation import gettext_lazy as _
-from django.utils import timezone
+import logging
 from datetime import timedelta
 
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+
+from core.middleware.query_budget import track_context_queries
+from core.services.template_context_cache import get_cached_payment_accounts, get_cached_settings
 
+logger = logging.getLogger(__name__)
+
+
+@track_context_queries
 def global_settings(request):
     """
     إضافة إعدادات عامة للقوالب
+    الإعدادات تُقرأ من كاش العملية ذي الإصدار (يُبطل عند حفظ SystemSetting)
     """
-    from core.models import SystemSetting
-
-    # جلب الإعدادات من قاعدة البيانات
-    settings_dict = {}
-
-    try:
-        # الحصول على جميع الإعدادات النشطة
-        all_settings = SystemSetting.objects.filter(is_active=True)
-
-        for setting in all_settings:
-            # تحويل القيمة إلى النوع المناسب
-            if setting.data_type == "boolean":
-                value = setting.value.lower() in ["true", "1", "yes", "نعم"]
-            elif setting.data_type == "integer":
-                try:
-                    value = int(setting.value)
-                except ValueError:
-                    value = 0
-            elif setting.data_type == "float":
-                try:
-                    value = float(setting.value)
-                except ValueError:
-                    value = 0.0
-            elif setting.data_type == "json":
-                try:
-                    import json
-
-                    value = json.loads(setting.value)
-                except Exception:
-                    value = {}
-            else:
-                # النص والأنواع الأخرى
-                value = setting.value
-
-            # إضافة القيمة إلى القاموس
-            settings_dict[setting.key] = value
-    except Exception:
-        # في حالة عدم وجود جدول الإعدادات أو أي استثناء
-        pass
+    settings_dict = get_cached_settings()
 
     # إعادة قاموس الإعدادات
     # تحويل maintenance_mode من string إلى boolean
@@ -76,81 +48,62 @@ def user_permissions(request):
     return {"user_permissions": permissions}
 
 
-def notifications(request):
+def _load_notifications(user):
     """
-    إضافة الإشعارات للمستخدم الحالي
+    أحدث 10 إشعارات: غير المقروءة أولاً ثم المقروءة خلال آخر 7 أيام
     """
     from core.models import Notification
 
-    # في حالة عدم تسجيل الدخول
-    if not request.user.is_authenticated:
-        return {"notifications": []}
-
-    # جلب أحدث 10 إشعارات لم يتم قراءتها للمستخدم الحالي
-    user_notifications = []
-
     try:
-        # جلب الإشعارات غير المقروءة أولاً، ثم أحدث الإشعارات المقروءة
-        unread_notifications = Notification.objects.filter(
-            user=request.user, is_read=False
-        ).order_by("-created_at")[:10]
+        user_notifications = list(
+            Notification.objects.filter(user=user, is_read=False).order_by("-created_at")[:10]
+        )
 
         # إذا كان عدد الإشعارات غير المقروءة أقل من 10، أضف بعض الإشعارات المقروءة
-        unread_count = unread_notifications.count()
-
-        if unread_count < 10:
-            # جلب الإشعارات المقروءة خلال آخر 7 أيام
+        if len(user_notifications) < 10:
             one_week_ago = timezone.now() - timedelta(days=7)
-            read_notifications = Notification.objects.filter(
-                user=request.user, is_read=True, created_at__gte=one_week_ago
-            ).order_by("-created_at")[: 10 - unread_count]
-
-            # دمج الإشعارات
-            user_notifications = list(unread_notifications) + list(read_notifications)
-        else:
-            user_notifications = list(unread_notifications)
+            user_notifications += list(
+                Notification.objects.filter(
+                    user=user, is_read=True, created_at__gte=one_week_ago
+                ).order_by("-created_at")[: 10 - len(user_notifications)]
+            )
+        return user_notifications
 
     except Exception as e:
         # في حالة حدوث أي استثناء، عد بقائمة فارغة
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Error loading notifications in context processor: {str(e)}")
-        pass
+        return []
+
+
+@track_context_queries
+def notifications(request):
+    """
+    إضافة الإشعارات للمستخدم الحالي
+    القائمة كسولة: لا تُنفذ الاستعلامات إلا إذا استخدم القالب الإشعارات
+    """
+    # في حالة عدم تسجيل الدخول
+    if not request.user.is_authenticated:
+        return {"notifications": []}
 
-    # إعادة قائمة الإشعارات (كـ objects مباشرة)
-    return {"notifications": user_notifications}
+    user = request.user
+    return {"notifications": SimpleLazyObject(lambda: _load_notifications(user))}
 
 
+@track_context_queries
 def payment_accounts(request):
     """
     إضافة حسابات الدفع (الخزينة/البنك) للقوالب
     متاح في جميع الصفحات تلقائياً لاستخدامه في المودالات والفورمات
+    الحسابات تُقرأ من كاش العملية ذي الإصدار (يُبطل عند حفظ ChartOfAccounts)
     """
     try:
-        from financial.models import ChartOfAccounts
-        from django.db import models
-        
-        # جلب حسابات الخزينة والبنك النشطة
-        accounts = ChartOfAccounts.objects.filter(
-            is_active=True
-        ).filter(
-            models.Q(is_cash_account=True) | models.Q(is_bank_account=True)
-        ).order_by('code')
-        
-        # الحساب الافتراضي (الخزينة - 10100)
-        default_account = ChartOfAccounts.objects.filter(
-            code='10100',
-            is_active=True
-        ).first()
-        
+        accounts, default_account = get_cached_payment_accounts()
         return {
             'payment_accounts': accounts,
             'default_payment_account': default_account
         }
     except Exception as e:
         # في حالة عدم وجود موديول المحاسبة أو أي خطأ
-        import logging
-        logger = logging.getLogger(__name__)
         logger.debug(f"Payment accounts context processor: {str(e)}")
         return {
             'payment_accounts': [],
@@ -158,6 +111,7 @@ def payment_accounts(request):
         }
 
 
+@track_context_queries
 def enabled_modules(request):
     """
     إضافة التطبيقات المفعلة للقوالب
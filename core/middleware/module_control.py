@@ -3,11 +3,12 @@ Middleware للتحكم في الوصول للتطبيقات المعطلة
 """
 from django.http import Http404
 from django.shortcuts import redirect
-from django.urls import resolve
 from django.contrib import messages
 from django.utils import timezone
 from django.core.cache import cache
 
+from .request_pipeline import get_request_context
+
 
 class ModuleAccessMiddleware:
     """
@@ -30,8 +31,7 @@ class ModuleAccessMiddleware:
         
         # التحقق من الوصول للتطبيق
         try:
-            resolved = resolve(request.path)
-            app_name = resolved.app_name
+            app_name = get_request_context(request).module
             
             if app_name and app_name not in self.CORE_MODULES:
                 if not self._is_module_enabled(app_name):
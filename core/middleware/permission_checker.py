@@ -11,9 +11,10 @@ import time
 from django.utils.deprecation import MiddlewareMixin
 from django.core.exceptions import PermissionDenied
 from django.http import JsonResponse
-from django.urls import resolve
 from django.contrib.auth.models import AnonymousUser
 
+from .request_pipeline import get_request_context
+
 logger = logging.getLogger('core.permission_checker')
 
 
@@ -67,9 +68,8 @@ class RealTimePermissionMiddleware(MiddlewareMixin):
             if not hasattr(request, 'user') or isinstance(request.user, AnonymousUser):
                 return None
             
-            # Get URL pattern name
-            resolver_match = resolve(request.path)
-            url_name = resolver_match.url_name
+            # Get URL pattern name (resolved once per request by the pipeline context)
+            url_name = get_request_context(request).url_name
             
             # Check if this is a protected pattern
             if any(pattern in request.path for pattern in self.PROTECTED_PATTERNS):
@@ -152,9 +152,4 @@ class RealTimePermissionMiddleware(MiddlewareMixin):
     
     def _get_client_ip(self, request):
         """Get client IP address from request."""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
\ No newline at end of file
+        return get_request_context(request).ip
\ No newline at end of file
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+تتبع ميزانية الاستعلامات لكل طلب (QueryBudgetHook ضمن RequestPipelineMiddleware)
+
+يعد استعلامات قاعدة البيانات لكل طلب (بما فيها استعلامات context processors)
+ويسجل تحذيراً عند تجاوز الميزانية المحددة في PERFORMANCE_MONITORING.
+يحتفظ أيضاً بإحصائيات مجمعة لكل مسار يمكن قراءتها عبر get_query_budget_report().
+"""
+
+import functools
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .request_pipeline import PipelineHook
+
+logger = logging.getLogger(__name__)
+
+# الميزانية الافتراضية لعدد استعلامات الصفحة الواحدة
+DEFAULT_PAGE_QUERY_BUDGET = 30
+
+# الحد الأقصى لعدد المسارات المحفوظة في التقرير المجمع
+QUERY_BUDGET_MAX_PATHS = 500
+
+
+def _monitoring_setting(name, default):
+    return getattr(settings, 'PERFORMANCE_MONITORING', {}).get(name, default)
+
+
+class QueryBudget:
+    """عداد استعلامات طلب واحد مع تفصيل استعلامات context processors"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.queries = 0
+        self.query_time = 0.0
+        self.context = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.perf_counter() - start
+
+    @property
+    def context_queries(self):
+        return sum(self.context.values())
+
+    @property
+    def exceeded(self):
+        return self.limit is not None and self.queries > self.limit
+
+
+class QueryBudgetReport:
+    """إحصائيات مجمعة لعدد الاستعلامات لكل مسار"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paths = {}
+
+    def record(self, path, budget):
+        with self._lock:
+            stats = self._paths.get(path)
+            if stats is None:
+                if len(self._paths) >= QUERY_BUDGET_MAX_PATHS:
+                    return
+                stats = self._paths[path] = {
+                    'requests': 0, 'queries': 0, 'context_queries': 0, 'max_queries': 0, 'over_budget': 0,
+                }
+            stats['requests'] += 1
+            stats['queries'] += budget.queries
+            stats['context_queries'] += budget.context_queries
+            stats['max_queries'] = max(stats['max_queries'], budget.queries)
+            if budget.exceeded:
+                stats['over_budget'] += 1
+
+    def get_report(self, limit=20):
+        with self._lock:
+            rows = [
+                dict(stats, path=path, avg_queries=round(stats['queries'] / stats['requests'], 1))
+                for path, stats in self._paths.items()
+            ]
+        rows.sort(key=lambda row: row['avg_queries'], reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._paths.clear()
+
+
+query_budget_report = QueryBudgetReport()
+
+
+def get_query_budget_report(limit=20):
+    """أكثر المسارات استهلاكاً للاستعلامات في المتوسط"""
+    return query_budget_report.get_report(limit)
+
+
+def track_context_queries(func):
+    """
+    Decorator لـ context processor يسجل عدد استعلاماته في ميزانية الطلب
+
+    القيم الكسولة (lazy) تُحسب أثناء عرض القالب فتُحتسب في إجمالي الطلب فقط.
+    """
+    @functools.wraps(func)
+    def wrapper(request):
+        budget = getattr(request, 'query_budget', None)
+        if budget is None:
+            return func(request)
+        before = budget.queries
+        try:
+            return func(request)
+        finally:
+            budget.context[func.__name__] = budget.context.get(func.__name__, 0) + budget.queries - before
+    return wrapper
+
+
+class QueryBudgetHook(PipelineHook):
+    """
+    Hook في RequestPipelineMiddleware لعد استعلامات كل طلب ومقارنتها بميزانية الصفحة
+
+    يضيف ترويسة X-Query-Count (عند تفعيل QUERY_BUDGET_HEADER) ويسجل تحذيراً
+    عند تجاوز PAGE_QUERY_BUDGET مع تفصيل استعلامات context processors.
+    """
+
+    def __init__(self):
+        self.enabled = _monitoring_setting('ENABLE_QUERY_BUDGET', True)
+        self.limit = _monitoring_setting('PAGE_QUERY_BUDGET', DEFAULT_PAGE_QUERY_BUDGET)
+        self.add_header = _monitoring_setting('QUERY_BUDGET_HEADER', settings.DEBUG)
+
+    def process_request(self, request, context):
+        if not self.enabled:
+            return None
+
+        budget = request.query_budget = QueryBudget(self.limit)
+        stack = context.state['query_budget_wrappers'] = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(budget))
+        return None
+
+    def process_response(self, request, response, context):
+        budget = getattr(request, 'query_budget', None)
+        if budget is None:
+            return response
+
+        # مفتاح التقرير من resolve الذي نفذه Django للـ view (بدون resolve إضافي للاستجابات المبكرة)
+        match = getattr(request, 'resolver_match', None)
+        query_budget_report.record(match.view_name if match and match.view_name else context.path, budget)
+
+        if self.add_header:
+            response['X-Query-Count'] = str(budget.queries)
+            response['X-Context-Query-Count'] = str(budget.context_queries)
+
+        if budget.exceeded:
+            logger.warning(
+                f"Query budget exceeded: {context.method} {context.path} ran {budget.queries} queries "
+                f"(budget {budget.limit}, {budget.query_time * 1000:.1f}ms, context processors {budget.context})"
+            )
+        return response
+
+    def teardown(self, request, context):
+        stack = context.state.pop('query_budget_wrappers', None)
+        if stack is not None:
+            stack.close()
@@ -8,6 +8,8 @@ from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 import logging
 
+from .request_pipeline import SecurityEventHook, get_request_context
+
 logger = logging.getLogger(__name__)
 
 class RateLimitingMiddleware(MiddlewareMixin):
@@ -25,12 +27,14 @@ class RateLimitingMiddleware(MiddlewareMixin):
         if not self.enabled:
             return None
             
+        context = get_request_context(request)
+        
         # Skip rate limiting for static files and admin
-        if request.path.startswith('/static/') or request.path.startswith('/admin/'):
+        if context.endpoint_class in ('static', 'admin'):
             return None
         
         # Get client IP
-        client_ip = self.get_client_ip(request)
+        client_ip = context.ip
         
         # Different rate limits for different endpoints
         rate_limit = self.get_rate_limit(request.path, request.method)
@@ -48,12 +52,7 @@ class RateLimitingMiddleware(MiddlewareMixin):
     
     def get_client_ip(self, request):
         """Get the real client IP address"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0].strip()
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        return get_request_context(request).ip
     
     def get_rate_limit(self, path, method):
         """Get rate limit configuration for specific path and method"""
@@ -105,32 +104,10 @@ class RateLimitingMiddleware(MiddlewareMixin):
 class SecurityEventMiddleware(MiddlewareMixin):
     """
     ✅ SECURITY: Log security events for monitoring
+    Runs as SecurityEventHook inside RequestPipelineMiddleware; kept for compatibility
     """
     
-    def process_request(self, request):
-        # Log suspicious patterns
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
-        
-        # Check for common attack patterns
-        suspicious_patterns = [
-            'sqlmap', 'nikto', 'nmap', 'masscan', 'zap',
-            'burp', 'w3af', 'acunetix', 'nessus'
-        ]
-        
-        if any(pattern in user_agent.lower() for pattern in suspicious_patterns):
-            logger.warning(f"Suspicious user agent detected: {user_agent} from IP {self.get_client_ip(request)}")
-        
-        # Log failed authentication attempts
-        if request.path in ['/login/', '/api/auth/login/'] and request.method == 'POST':
-            logger.info(f"Authentication attempt from IP {self.get_client_ip(request)}")
-        
-        return None
+    hook = SecurityEventHook()
     
-    def get_client_ip(self, request):
-        """Get the real client IP address"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0].strip()
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
\ No newline at end of file
+    def process_request(self, request):
+        return self.hook.process_request(request, get_request_context(request))
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+Middleware موحد لمسار الطلب (Request Pipeline)
+
+يحسب سياقاً مشتركاً لكل طلب مرة واحدة فقط: عنوان IP، المسار، نتيجة resolve للرابط،
+التطبيق (module) وتصنيف نقطة النهاية، ثم يمرر الطلب على hooks قابلة للتوصيل
+(أمان / تدقيق / مراقبة) بدلاً من سلسلة middlewares يعيد كل منها تحليل الطلب.
+
+الـ hooks تُحدد في إعداد REQUEST_PIPELINE['HOOKS'] كمسارات نقطية. بقية الـ middlewares
+تقرأ نفس السياق عبر get_request_context(request).
+"""
+
+import logging
+import time
+import weakref
+from functools import cached_property
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.urls import Resolver404, get_urlconf, resolve
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# اسم الخاصية التي يُحفظ فيها السياق على الطلب
+REQUEST_CONTEXT_ATTR = 'pipeline_context'
+
+# تصنيف نقاط النهاية حسب بادئة المسار (يُفحص بالترتيب)
+ENDPOINT_PREFIXES = (
+    ('/static/', 'static'),
+    ('/media/', 'static'),
+    ('/api/', 'api'),
+    ('/webhooks/', 'webhook'),
+    ('/admin/', 'admin'),
+)
+
+LOGIN_PATHS = ('/login/', '/api/auth/login/')
+AUTH_PATHS = LOGIN_PATHS + ('/logout/',)
+
+DEFAULT_PIPELINE_HOOKS = [
+    'core.middleware.request_pipeline.SecurityEventHook',
+    'core.middleware.request_pipeline.MonitoringHook',
+    'core.middleware.query_budget.QueryBudgetHook',
+]
+
+
+def parse_client_ip(meta):
+    """عنوان IP الحقيقي للعميل (أول عنوان في X-Forwarded-For إن وجد)"""
+    x_forwarded_for = meta.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.split(',')[0].strip()
+    return meta.get('REMOTE_ADDR')
+
+
+def classify_endpoint(path):
+    for prefix, endpoint_class in ENDPOINT_PREFIXES:
+        if path.startswith(prefix):
+            return endpoint_class
+    if path in AUTH_PATHS:
+        return 'auth'
+    return 'page'
+
+
+class RequestContext:
+    """
+    سياق الطلب المشترك بين الـ middlewares والـ hooks
+
+    القيم الرخيصة تُحسب عند الإنشاء، أما resolve للرابط فيُحسب مرة واحدة عند أول طلب له.
+    """
+
+    def __init__(self, request):
+        self._request = weakref.ref(request)
+        self.path = request.path
+        self.path_info = request.path_info
+        self.method = request.method
+        self.ip = parse_client_ip(request.META)
+        self.user_agent = request.META.get('HTTP_USER_AGENT', '')
+        self.endpoint_class = classify_endpoint(self.path)
+        self.started_at = time.time()
+        # حالة خاصة بالـ hooks (مثلاً عداد الاستعلامات)
+        self.state = {}
+
+    @cached_property
+    def resolver_match(self):
+        # بعد وصول الطلب للـ view يكون Django قد حسبه بالفعل
+        request = self._request()
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            return match
+        try:
+            return resolve(self.path_info, get_urlconf())
+        except Resolver404:
+            return None
+
+    @property
+    def module(self):
+        """اسم التطبيق (app_name) للرابط المطلوب"""
+        match = self.resolver_match
+        return match.app_name if match else None
+
+    @property
+    def url_name(self):
+        match = self.resolver_match
+        return match.url_name if match else None
+
+    @property
+    def view_name(self):
+        match = self.resolver_match
+        return match.view_name if match and match.view_name else self.path
+
+    @property
+    def user(self):
+        """المستخدم بعد AuthenticationMiddleware (None قبلها أو للزائر)"""
+        request = self._request()
+        user = getattr(request, 'user', None) if request is not None else None
+        if user is None or isinstance(user, AnonymousUser) or not user.is_authenticated:
+            return None
+        return user
+
+    @property
+    def username(self):
+        user = self.user
+        return f"user:{user.username}" if user else "anonymous"
+
+    @property
+    def elapsed(self):
+        return time.time() - self.started_at
+
+
+def get_request_context(request):
+    """سياق الطلب المشترك - يُنشأ ويُحفظ على الطلب عند أول استخدام"""
+    context = getattr(request, REQUEST_CONTEXT_ATTR, None)
+    if not isinstance(context, RequestContext):
+        context = RequestContext(request)
+        setattr(request, REQUEST_CONTEXT_ATTR, context)
+    return context
+
+
+class PipelineHook:
+    """
+    واجهة hook في مسار الطلب
+
+    process_request تعيد HttpResponse لإيقاف الطلب أو None للمتابعة.
+    process_response تُستدعى بترتيب عكسي للـ hooks التي نُفذت،
+    و teardown تُستدعى دائماً (حتى عند حدوث استثناء) لتحرير الموارد.
+    """
+
+    stage = 'monitoring'
+
+    def process_request(self, request, context):
+        return None
+
+    def process_response(self, request, response, context):
+        return response
+
+    def teardown(self, request, context):
+        pass
+
+
+class SecurityEventHook(PipelineHook):
+    """
+    تسجيل الأحداث الأمنية المشبوهة: User-Agent لأدوات الفحص، Path Traversal،
+    SQL Injection في المعاملات، ومحاولات الدخول
+    """
+
+    stage = 'security'
+
+    SUSPICIOUS_USER_AGENTS = (
+        'sqlmap', 'nikto', 'nmap', 'masscan', 'zap', 'burp', 'owasp', 'w3af',
+        'acunetix', 'nessus', 'dirbuster', 'gobuster', 'wfuzz', 'hydra',
+    )
+
+    TRAVERSAL_PATTERNS = ('../', '..\\', '%2e%2e%2f', '%2e%2e%5c', '..%2f', '..%5c')
+
+    SQL_PATTERNS = (
+        'union select', 'drop table', 'insert into', 'delete from', 'update set',
+        'exec(', 'execute(', 'sp_', 'xp_', '--', '/*', '*/', 'char(', 'ascii(',
+        'substring(', 'waitfor delay',
+    )
+
+    def process_request(self, request, context):
+        user_agent = context.user_agent.lower()
+        if any(pattern in user_agent for pattern in self.SUSPICIOUS_USER_AGENTS):
+            self._log_security_event(request, context, 'SUSPICIOUS_USER_AGENT', {'user_agent': context.user_agent})
+
+        if self.detect_path_traversal(context.path):
+            self._log_security_event(request, context, 'PATH_TRAVERSAL_ATTEMPT', {'path': context.path})
+
+        if self.detect_sql_injection(request):
+            self._log_security_event(request, context, 'SQL_INJECTION_ATTEMPT', {
+                'method': context.method,
+                'path': context.path,
+            })
+
+        if context.path in LOGIN_PATHS and context.method == 'POST':
+            logger.info(f"Authentication attempt from IP {context.ip}")
+
+        return None
+
+    def detect_path_traversal(self, path):
+        path_lower = path.lower()
+        return any(pattern in path_lower for pattern in self.TRAVERSAL_PATTERNS)
+
+    def detect_sql_injection(self, request):
+        for value in request.GET.values():
+            value_lower = str(value).lower()
+            if any(pattern in value_lower for pattern in self.SQL_PATTERNS):
+                return True
+
+        # فحص POST data (إذا كان نص)
+        if request.content_type == 'application/x-www-form-urlencoded':
+            try:
+                body_str = request.body.decode('utf-8').lower()
+                if any(pattern in body_str for pattern in self.SQL_PATTERNS):
+                    return True
+            except Exception:
+                pass
+
+        return False
+
+    def _log_security_event(self, request, context, event_type, details):
+        session = getattr(request, 'session', None)
+        logging.getLogger('security').warning(
+            f"🚨 Security Event: {event_type}",
+            extra={
+                'event_type': event_type,
+                'details': dict(details, ip=context.ip),
+                'user': getattr(request, 'user', None),
+                'session_key': getattr(session, 'session_key', None),
+                'timestamp': __import__('datetime').datetime.now().isoformat(),
+            }
+        )
+
+
+class MonitoringHook(PipelineHook):
+    """
+    تسجيل الطلبات البطيئة (> 2 ثانية) والاستجابات الخاطئة
+    """
+
+    SLOW_REQUEST_SECONDS = 2.0
+
+    def process_response(self, request, response, context):
+        elapsed = context.elapsed
+        if elapsed > self.SLOW_REQUEST_SECONDS:
+            logger.warning(f"Slow request: {context.method} {context.path} took {elapsed:.2f}s ({context.username})")
+
+        if response.status_code >= 400:
+            level = logging.ERROR if response.status_code >= 500 else logging.WARNING
+            logger.log(level, f"HTTP {response.status_code}: {context.method} {context.path} ({context.username})")
+
+        return response
+
+
+def load_pipeline_hooks(hook_paths=None):
+    if hook_paths is None:
+        hook_paths = getattr(settings, 'REQUEST_PIPELINE', {}).get('HOOKS', DEFAULT_PIPELINE_HOOKS)
+    return [import_string(path)() for path in hook_paths]
+
+
+class RequestPipelineMiddleware:
+    """
+    Middleware موحد: سياق طلب واحد ثم تمرير على hooks الأمان والتدقيق والمراقبة
+
+    يحل محل SimpleMonitoringMiddleware و SecurityEventLoggerMiddleware و
+    SecurityEventMiddleware و QueryBudgetMiddleware كـ middlewares مستقلة.
+    """
+
+    def __init__(self, get_response, hooks=None):
+        self.get_response = get_response
+        self.hooks = load_pipeline_hooks() if hooks is None else hooks
+
+    def __call__(self, request):
+        context = get_request_context(request)
+        started = []
+        response = None
+        try:
+            for hook in self.hooks:
+                started.append(hook)
+                response = self._run(hook.process_request, request, context)
+                if response is not None:
+                    break
+            else:
+                response = self.get_response(request)
+
+            for hook in reversed(started):
+                response = self._run(hook.process_response, request, response, context) or response
+            return response
+        finally:
+            for hook in reversed(started):
+                self._run(hook.teardown, request, context)
+
+    @staticmethod
+    def _run(method, *args):
+        # خطأ في hook لا يجب أن يوقف الطلب
+        try:
+            return method(*args)
+        except Exception as e:
+            logger.error(f"Error in request pipeline hook {method.__qualname__}: {e}", exc_info=True)
+            return None
@@ -9,6 +9,7 @@ import hashlib
 import secrets
 from core.csp_config import build_csp_policy
 from core.csp_config_advanced import build_csp_policy_advanced, should_use_nonce
+from .request_pipeline import SecurityEventHook, get_request_context
 
 
 class AdvancedSecurityHeadersMiddleware(MiddlewareMixin):
@@ -98,127 +99,11 @@ class AdvancedSecurityHeadersMiddleware(MiddlewareMixin):
 class SecurityEventLoggerMiddleware(MiddlewareMixin):
     """
     ✅ تسجيل الأحداث الأمنية المشبوهة
+    يُنفذ الآن كـ SecurityEventHook داخل RequestPipelineMiddleware ويبقى هنا للتوافق
     """
     
+    hook = SecurityEventHook()
+    
     def process_request(self, request):
         """فحص الطلبات للبحث عن أنشطة مشبوهة"""
-        
-        # فحص User-Agent المشبوه
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
-        if self._is_suspicious_user_agent(user_agent):
-            self._log_security_event(request, 'SUSPICIOUS_USER_AGENT', {
-                'user_agent': user_agent,
-                'ip': self._get_client_ip(request)
-            })
-        
-        # فحص محاولات Path Traversal
-        if self._detect_path_traversal(request.path):
-            self._log_security_event(request, 'PATH_TRAVERSAL_ATTEMPT', {
-                'path': request.path,
-                'ip': self._get_client_ip(request)
-            })
-        
-        # فحص محاولات SQL Injection في parameters
-        if self._detect_sql_injection(request):
-            self._log_security_event(request, 'SQL_INJECTION_ATTEMPT', {
-                'method': request.method,
-                'path': request.path,
-                'ip': self._get_client_ip(request)
-            })
-        
-        return None
-    
-    def _is_suspicious_user_agent(self, user_agent):
-        """التحقق من User-Agent مشبوه"""
-        suspicious_patterns = [
-            'sqlmap',
-            'nikto',
-            'nmap',
-            'masscan',
-            'burp',
-            'owasp',
-            'dirbuster',
-            'gobuster',
-            'wfuzz',
-            'hydra',
-        ]
-        
-        user_agent_lower = user_agent.lower()
-        return any(pattern in user_agent_lower for pattern in suspicious_patterns)
-    
-    def _detect_path_traversal(self, path):
-        """اكتشاف محاولات Path Traversal"""
-        traversal_patterns = [
-            '../',
-            '..\\',
-            '%2e%2e%2f',
-            '%2e%2e%5c',
-            '..%2f',
-            '..%5c',
-        ]
-        
-        path_lower = path.lower()
-        return any(pattern in path_lower for pattern in traversal_patterns)
-    
-    def _detect_sql_injection(self, request):
-        """اكتشاف محاولات SQL Injection"""
-        sql_patterns = [
-            'union select',
-            'drop table',
-            'insert into',
-            'delete from',
-            'update set',
-            'exec(',
-            'execute(',
-            'sp_',
-            'xp_',
-            '--',
-            '/*',
-            '*/',
-            'char(',
-            'ascii(',
-            'substring(',
-            'waitfor delay',
-        ]
-        
-        # فحص GET parameters
-        for key, value in request.GET.items():
-            value_lower = str(value).lower()
-            if any(pattern in value_lower for pattern in sql_patterns):
-                return True
-        
-        # فحص POST data (إذا كان نص)
-        if hasattr(request, 'body') and request.content_type == 'application/x-www-form-urlencoded':
-            try:
-                body_str = request.body.decode('utf-8').lower()
-                if any(pattern in body_str for pattern in sql_patterns):
-                    return True
-            except:
-                pass
-        
-        return False
-    
-    def _get_client_ip(self, request):
-        """الحصول على IP الحقيقي للعميل"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
-    
-    def _log_security_event(self, request, event_type, details):
-        """تسجيل حدث أمني"""
-        import logging
-        
-        security_logger = logging.getLogger('security')
-        security_logger.warning(
-            f"🚨 Security Event: {event_type}",
-            extra={
-                'event_type': event_type,
-                'details': details,
-                'user': getattr(request, 'user', None),
-                'session_key': getattr(request.session, 'session_key', None),
-                'timestamp': __import__('datetime').datetime.now().isoformat(),
-            }
-        )
\ No newline at end of file
+        return self.hook.process_request(request, get_request_context(request))
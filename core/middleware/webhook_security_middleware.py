@@ -9,6 +9,7 @@ from django.utils.deprecation import MiddlewareMixin
 from django.utils import timezone
 from django.conf import settings
 from core.services.api_integration_security import APIIntegrationSecurityService
+from .request_pipeline import get_request_context
 import json
 
 logger = logging.getLogger(__name__)
@@ -101,14 +102,7 @@ class WebhookSecurityMiddleware(MiddlewareMixin):
         """
         الحصول على IP العميل الحقيقي
         """
-        # فحص رؤوس proxy المختلفة
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0].strip()
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        
-        return ip
+        return get_request_context(request).ip
     
     def _extract_endpoint_name(self, path):
         """
@@ -236,13 +230,7 @@ class APIRateLimitMiddleware(MiddlewareMixin):
         """
         الحصول على IP العميل الحقيقي
         """
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0].strip()
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        
-        return ip
+        return get_request_context(request).ip
 
 
 class RequestLoggingMiddleware(MiddlewareMixin):
@@ -326,10 +314,4 @@ class RequestLoggingMiddleware(MiddlewareMixin):
         """
         الحصول على IP العميل الحقيقي
         """
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0].strip()
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        
-        return ip
\ No newline at end of file
+        return get_request_context(request).ip
@@ -18,6 +18,8 @@ from django.apps import apps
 from dataclasses import dataclass
 import json
 
+from core.services.retention_engine import RetentionEngine, RetentionResult, RetentionRule
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -154,9 +156,12 @@ class DataRetentionService:
         try:
             logger.info(f"Starting data retention cleanup (dry_run={dry_run})")
             
+            # One engine so every policy shares the same time budget
+            engine = RetentionEngine()
+            
             for policy in self.retention_policies:
                 try:
-                    policy_result = self._process_retention_policy(policy, dry_run)
+                    policy_result = self._process_retention_policy(policy, dry_run, engine)
                     cleanup_result['policy_results'].append(policy_result)
                     cleanup_result['policies_processed'] += 1
                     cleanup_result['records_deleted'] += policy_result['deleted_count']
@@ -180,9 +185,10 @@ class DataRetentionService:
         
         return cleanup_result
     
-    def _process_retention_policy(self, policy: RetentionPolicy, dry_run: bool) -> Dict[str, Any]:
+    def _process_retention_policy(self, policy: RetentionPolicy, dry_run: bool,
+                                  engine: Optional[RetentionEngine] = None) -> Dict[str, Any]:
         """
-        Process a single retention policy
+        Process a single retention policy through the batched retention engine
         """
         policy_result = {
             'policy_name': policy.model_name,
@@ -191,56 +197,30 @@ class DataRetentionService:
             'deleted_count': 0,
             'archived_count': 0,
             'anonymized_count': 0,
+            'archive_path': None,
+            'completed': True,
             'errors': []
         }
         
         try:
-            # Get model class
-            model_class = self._get_model_class(policy.model_name)
-            if not model_class:
-                raise Exception(f"Model not found: {policy.model_name}")
-            
-            # Build query for expired records
-            query_filters = self._build_query_filters(policy, policy_result['cutoff_date'])
+            rule = self._build_retention_rule(policy)
+            result = (engine or RetentionEngine()).run(rule, dry_run=dry_run)
             
-            # Get expired records
-            expired_records = model_class.objects.filter(**query_filters)
-            
-            # Apply exclude conditions if specified
-            if policy.exclude_conditions:
-                expired_records = expired_records.exclude(**policy.exclude_conditions)
-            
-            total_expired = expired_records.count()
-            logger.info(f"Found {total_expired} expired records for {policy.model_name}")
-            
-            if total_expired == 0:
+            if dry_run:
+                # Dry run - just count
+                policy_result['deleted_count'] = result.matched
                 return policy_result
             
-            # Process records in batches
-            batch_size = 100
-            processed = 0
+            policy_result['deleted_count'] = result.deleted
+            policy_result['archived_count'] = result.archived
+            if policy.anonymize_before_delete:
+                policy_result['anonymized_count'] = result.archived
+            policy_result['archive_path'] = result.archive_path
+            policy_result['completed'] = result.completed
+            policy_result['errors'].extend(result.errors)
             
-            while processed < total_expired:
-                batch = list(expired_records[processed:processed + batch_size])
-                
-                if not batch:
-                    break
-                
-                if not dry_run:
-                    with transaction.atomic():
-                        batch_result = self._process_record_batch(batch, policy)
-                        policy_result['deleted_count'] += batch_result['deleted']
-                        policy_result['archived_count'] += batch_result['archived']
-                        policy_result['anonymized_count'] += batch_result['anonymized']
-                else:
-                    # Dry run - just count
-                    policy_result['deleted_count'] += len(batch)
-                
-                processed += len(batch)
-                
-                # Log progress
-                if processed % 1000 == 0:
-                    logger.info(f"Processed {processed}/{total_expired} records for {policy.model_name}")
+            if self.audit_enabled and result.deleted:
+                self._log_policy_deletion(policy, result)
             
         except Exception as e:
             policy_result['errors'].append(str(e))
@@ -248,6 +228,31 @@ class DataRetentionService:
         
         return policy_result
     
+    def _build_retention_rule(self, policy: RetentionPolicy) -> RetentionRule:
+        """
+        Translate a retention policy into a retention engine rule
+        """
+        model_class = self._get_model_class(policy.model_name)
+        if not model_class:
+            raise Exception(f"Model not found: {policy.model_name}")
+        
+        date_field = self._get_date_field(model_class)
+        if not date_field:
+            # Without a date field every row would match, so refuse instead of purging the table
+            raise Exception(f"No date field found for {policy.model_name}")
+        
+        return RetentionRule(
+            name=model_class._meta.label_lower.replace('.', '_'),
+            model_label=model_class._meta.label,
+            date_field=date_field,
+            retention_days=policy.retention_days,
+            archive=policy.archive_before_delete and self.archive_enabled,
+            filters=policy.conditions or {},
+            exclude=policy.exclude_conditions or {},
+            transform=self._anonymize_row if policy.anonymize_before_delete else None,
+            exclude_protected=not policy.cascade_delete
+        )
+    
     def _get_model_class(self, model_name: str):
         """
         Get model class from string name
@@ -265,20 +270,9 @@ class DataRetentionService:
         """
         filters = {}
         
-        # Add date filter - try common date field names
-        date_fields = ['created_at', 'date_created', 'timestamp', 'date', 'updated_at']
-        
         model_class = self._get_model_class(policy.model_name)
         if model_class:
-            model_fields = [field.name for field in model_class._meta.fields]
-            
-            # Find the appropriate date field
-            date_field = None
-            for field_name in date_fields:
-                if field_name in model_fields:
-                    date_field = field_name
-                    break
-            
+            date_field = self._get_date_field(model_class)
             if date_field:
                 filters[f'{date_field}__lt'] = cutoff_date
             else:
@@ -290,70 +284,15 @@ class DataRetentionService:
         
         return filters
     
-    def _process_record_batch(self, records: List[models.Model], policy: RetentionPolicy) -> Dict[str, int]:
+    def _get_date_field(self, model_class) -> Optional[str]:
         """
-        Process a batch of records according to retention policy
+        Find the date field used to age records of a model
         """
-        batch_result = {
-            'deleted': 0,
-            'archived': 0,
-            'anonymized': 0
-        }
-        
-        for record in records:
-            try:
-                # Archive before deletion if enabled
-                if policy.archive_before_delete and self.archive_enabled:
-                    self._archive_record(record)
-                    batch_result['archived'] += 1
-                
-                # Anonymize before deletion if enabled
-                if policy.anonymize_before_delete:
-                    self._anonymize_record(record)
-                    batch_result['anonymized'] += 1
-                
-                # Log deletion if audit enabled
-                if self.audit_enabled:
-                    self._log_record_deletion(record, policy)
-                
-                # Delete record
-                if policy.cascade_delete:
-                    record.delete()  # This will cascade to related objects
-                else:
-                    # Check for related objects before deletion
-                    related_objects = self._get_related_objects(record)
-                    if related_objects:
-                        logger.warning(f"Skipping deletion of {record} - has related objects")
-                        continue
-                    
-                    record.delete()
-                
-                batch_result['deleted'] += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to process record {record}: {e}")
-        
-        return batch_result
-    
-    def _archive_record(self, record: models.Model):
-        """
-        Archive a record before deletion
-        """
-        try:
-            # Create archive data
-            archive_data = {
-                'model': f"{record._meta.app_label}.{record._meta.model_name}",
-                'pk': record.pk,
-                'data': self._serialize_record(record),
-                'archived_at': timezone.now().isoformat(),
-                'archived_by': 'data_retention_service'
-            }
-            
-            # Save to archive (could be file, database, or external service)
-            self._save_to_archive(archive_data)
-            
-        except Exception as e:
-            logger.error(f"Failed to archive record {record}: {e}")
+        model_fields = [field.name for field in model_class._meta.fields]
+        for field_name in ['created_at', 'date_created', 'timestamp', 'date', 'updated_at']:
+            if field_name in model_fields:
+                return field_name
+        return None
     
     def _serialize_record(self, record: models.Model) -> Dict[str, Any]:
         """
@@ -383,94 +322,45 @@ class DataRetentionService:
         
         return data
     
-    def _save_to_archive(self, archive_data: Dict[str, Any]):
+    def _anonymize_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Save archived data to storage
+        Mask sensitive values in an archived row
         """
-        # This could be implemented to save to:
-        # - Archive database table
-        # - File system
-        # - External archive service
-        # - Cloud storage
+        from core.services.data_encryption_service import DataEncryptionService
         
-        # For now, log the archive (implement actual storage as needed)
-        logger.info(f"Archived record: {archive_data['model']} ID {archive_data['pk']}")
-    
-    def _anonymize_record(self, record: models.Model):
-        """
-        Anonymize sensitive fields in a record
-        """
-        try:
-            from core.services.data_encryption_service import DataEncryptionService
-            
-            encryption_service = DataEncryptionService()
-            
-            # Get sensitive fields
-            sensitive_fields = [
-                field.name for field in record._meta.fields
-                if encryption_service.is_field_sensitive(field.name)
-            ]
-            
-            # Anonymize each sensitive field
-            for field_name in sensitive_fields:
-                try:
-                    field = record._meta.get_field(field_name)
-                    
-                    if isinstance(field, models.CharField):
-                        setattr(record, field_name, f"ANONYMIZED_{record.pk}")
-                    elif isinstance(field, models.EmailField):
-                        setattr(record, field_name, f"anonymized_{record.pk}@example.com")
-                    elif isinstance(field, models.TextField):
-                        setattr(record, field_name, "ANONYMIZED_TEXT")
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to anonymize field {field_name}: {e}")
-            
-            # Save anonymized record
-            record.save(update_fields=sensitive_fields)
-            
-        except Exception as e:
-            logger.error(f"Failed to anonymize record {record}: {e}")
-    
-    def _get_related_objects(self, record: models.Model) -> List[models.Model]:
-        """
-        Get related objects that would prevent deletion
-        """
-        related_objects = []
+        encryption_service = DataEncryptionService()
+        pk = row.get('id')
         
-        try:
-            # Check reverse foreign keys
-            for rel in record._meta.related_objects:
-                if rel.on_delete == models.PROTECT:
-                    related_manager = getattr(record, rel.get_accessor_name())
-                    if related_manager.exists():
-                        related_objects.extend(list(related_manager.all()[:5]))  # Limit for performance
-        
-        except Exception as e:
-            logger.warning(f"Failed to check related objects for {record}: {e}")
+        for field_name, value in row.items():
+            if not isinstance(value, str) or not encryption_service.is_field_sensitive(field_name):
+                continue
+            if '@' in value:
+                row[field_name] = f"anonymized_{pk}@example.com"
+            else:
+                row[field_name] = f"ANONYMIZED_{pk}"
         
-        return related_objects
+        return row
     
-    def _log_record_deletion(self, record: models.Model, policy: RetentionPolicy):
+    def _log_policy_deletion(self, policy: RetentionPolicy, result: RetentionResult):
         """
-        Log record deletion for audit trail
+        Log a policy's deletions for audit trail
         """
         try:
             audit_data = {
                 'action': 'data_retention_deletion',
-                'model': f"{record._meta.app_label}.{record._meta.model_name}",
-                'object_id': record.pk,
                 'policy': policy.model_name,
                 'retention_days': policy.retention_days,
+                'deleted': result.deleted,
+                'archived': result.archived,
+                'archive_path': result.archive_path,
                 'timestamp': timezone.now().isoformat(),
                 'user': 'system'
             }
             
-            # Log to audit system (implement as needed)
             logger.info(f"Data retention deletion: {json.dumps(audit_data)}")
             
         except Exception as e:
-            logger.error(f"Failed to log deletion for {record}: {e}")
+            logger.error(f"Failed to log deletion for {policy.model_name}: {e}")
     
     def _send_cleanup_notification(self, cleanup_result: Dict[str, Any]):
         """
@@ -0,0 +1,460 @@
+"""
+Retention Engine - batched, archived and partition-aware row expiry.
+
+One engine behind every retention job (idempotency records, audit trails,
+biometric logs and the DataRetentionService policies). Expired rows are
+removed in primary-key-range batches, each in its own short transaction,
+under a wall-clock time budget with a pause between batches so cleanup never
+holds long locks or starves foreground traffic. Rows can be archived in bulk
+to gzip-compressed JSONL files before they are deleted.
+
+For the largest tables a rule can be marked as partitioned. When the table
+has been converted to a PostgreSQL range-partitioned table on its date
+column, whole expired partitions are archived and dropped instead of being
+deleted row by row; on any other backend, or for an unpartitioned table,
+the rule falls back to batched deletes.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+# Rows deleted per transaction
+RETENTION_BATCH_SIZE = 1000
+
+# Wall-clock seconds a cleanup run may spend before stopping at a batch boundary
+RETENTION_TIME_BUDGET_SECONDS = 300
+
+# Pause between batches to give foreground writers the locks back
+RETENTION_THROTTLE_SECONDS = 0.05
+
+# Rows fetched per round trip when archiving a whole partition
+RETENTION_ARCHIVE_CHUNK_SIZE = 2000
+
+_PARTITION_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+@dataclass
+class RetentionRule:
+    """
+    Declarative retention rule for one model.
+
+    Rows whose date_field is older than retention_days are expired; `also_expired`
+    adds further rows (e.g. idempotency records past expires_at). `filters` and
+    `exclude` narrow the candidate set, `transform` rewrites archived rows
+    (anonymization) and `exclude_protected` skips rows still referenced through
+    PROTECT foreign keys instead of failing the batch.
+    """
+    name: str
+    model_label: str
+    date_field: str
+    retention_days: int
+    archive: bool = False
+    partitioned: bool = False
+    filters: Dict = field(default_factory=dict)
+    exclude: Dict = field(default_factory=dict)
+    also_expired: Optional[Callable[[datetime], Q]] = None
+    transform: Optional[Callable[[Dict], Dict]] = None
+    exclude_protected: bool = False
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def cutoff(self, now: datetime) -> datetime:
+        return now - timedelta(days=self.retention_days)
+
+    def expired_queryset(self, now: datetime):
+        """Queryset of every row this rule expires at `now`"""
+        model = self.model
+        condition = Q(**{f'{self.date_field}__lt': self.cutoff(now)})
+        if self.also_expired is not None:
+            condition |= self.also_expired(now)
+        queryset = model._base_manager.filter(condition)
+        if self.filters:
+            queryset = queryset.filter(**self.filters)
+        if self.exclude:
+            queryset = queryset.exclude(**self.exclude)
+        if self.exclude_protected:
+            for relation in model._meta.related_objects:
+                if relation.on_delete == models.PROTECT:
+                    queryset = queryset.exclude(**{f'{relation.name}__isnull': False})
+        return queryset
+
+
+@dataclass
+class RetentionResult:
+    """Outcome of running one retention rule"""
+    rule: str
+    cutoff: datetime
+    dry_run: bool = False
+    matched: int = 0
+    deleted: int = 0
+    archived: int = 0
+    batches: int = 0
+    partitions_dropped: List[str] = field(default_factory=list)
+    archive_path: Optional[str] = None
+    completed: bool = True
+    errors: List[str] = field(default_factory=list)
+    duration: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class RetentionArchive:
+    """
+    Append-only gzip JSONL archive for one retention run.
+
+    The file is created on the first write, so runs that expire nothing leave
+    no empty archives behind.
+    """
+
+    def __init__(self, directory: str, name: str, started_at: datetime):
+        self.path = os.path.join(
+            directory, name, f"{name}_{started_at.strftime('%Y%m%d_%H%M%S')}.jsonl.gz"
+        )
+        self._file = None
+        self.count = 0
+
+    def write(self, rows: List[Dict]) -> int:
+        if not rows:
+            return 0
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._file = gzip.open(self.path, 'at', encoding='utf-8')
+        self._file.writelines(
+            json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n' for row in rows
+        )
+        # Rows must be on disk before the transaction that deletes them commits
+        self._file.flush()
+        self.count += len(rows)
+        return len(rows)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class PartitionManager:
+    """
+    Monthly range partitions of a PostgreSQL table keyed on a date column.
+
+    Partitions are named <table>_pYYYYMM. Only tables that were converted to
+    partitioned tables by the DBA are affected; is_partitioned() is False for
+    every other table and backend.
+    """
+
+    def __init__(self, model, date_field: str, using: str = 'default'):
+        self.model = model
+        self.table = model._meta.db_table
+        self.date_field = date_field
+        self.using = using
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def is_partitioned(self) -> bool:
+        if self.connection.vendor != 'postgresql':
+            return False
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+                [self.table]
+            )
+            return cursor.fetchone() is not None
+
+    def partitions(self) -> List[Dict]:
+        """Range partitions of the table with their bounds (DEFAULT partition excluded)"""
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+                "FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = %s ORDER BY child.relname",
+                [self.table]
+            )
+            rows = cursor.fetchall()
+
+        partitions = []
+        for name, bound in rows:
+            match = _PARTITION_BOUND_RE.search(bound or '')
+            if not match:
+                continue
+            partitions.append({
+                'name': name,
+                'lower': parse_datetime(match.group(1)),
+                'upper': parse_datetime(match.group(2)),
+            })
+        return partitions
+
+    def expired_partitions(self, cutoff: datetime) -> List[Dict]:
+        """Partitions whose every row is older than cutoff"""
+        return [p for p in self.partitions() if p['upper'] is not None and p['upper'] <= cutoff]
+
+    def ensure_monthly_partitions(self, months_ahead: int = 2, start: Optional[datetime] = None) -> List[str]:
+        """Create the partitions for the current month and `months_ahead` months after it"""
+        month = (start or timezone.now()).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        quote = self.connection.ops.quote_name
+        created = []
+        with self.connection.cursor() as cursor:
+            for _ in range(months_ahead + 1):
+                following = (month + timedelta(days=32)).replace(day=1)
+                name = f"{self.table}_p{month.strftime('%Y%m')}"
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {quote(name)} PARTITION OF {quote(self.table)} "
+                    f"FOR VALUES FROM (%s) TO (%s)",
+                    [month, following]
+                )
+                created.append(name)
+                month = following
+        return created
+
+    def iter_partition_rows(self, partition: Dict, chunk_size: int = RETENTION_ARCHIVE_CHUNK_SIZE):
+        """Stream the rows stored in one partition through the model's parent table"""
+        queryset = self.model._base_manager.using(self.using).filter(**{
+            f'{self.date_field}__gte': partition['lower'],
+            f'{self.date_field}__lt': partition['upper'],
+        }).order_by().values()
+        return queryset.iterator(chunk_size=chunk_size)
+
+    def drop_partition(self, name: str):
+        quote = self.connection.ops.quote_name
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {quote(self.table)} DETACH PARTITION {quote(name)}")
+            cursor.execute(f"DROP TABLE {quote(name)}")
+
+
+class RetentionEngine:
+    """
+    Runs retention rules with batching, a time budget, throttling and archiving.
+
+    A single engine instance shares its time budget across every rule it runs,
+    so a nightly job stops cleanly at a batch boundary and resumes the next
+    night instead of overrunning its maintenance window.
+    """
+
+    def __init__(self, batch_size: int = RETENTION_BATCH_SIZE,
+                 time_budget: float = RETENTION_TIME_BUDGET_SECONDS,
+                 throttle: float = RETENTION_THROTTLE_SECONDS,
+                 archive_dir: Optional[str] = None,
+                 using: str = 'default'):
+        self.batch_size = batch_size
+        self.time_budget = time_budget
+        self.throttle = throttle
+        self.archive_dir = archive_dir or get_archive_dir()
+        self.using = using
+        self._deadline = None
+
+    def _start_clock(self):
+        if self._deadline is None:
+            self._deadline = time.monotonic() + self.time_budget
+
+    def _out_of_time(self) -> bool:
+        return time.monotonic() >= self._deadline
+
+    def run(self, rule: RetentionRule, dry_run: bool = False,
+            now: Optional[datetime] = None) -> RetentionResult:
+        """Apply one rule and return what it did"""
+        self._start_clock()
+        started = time.monotonic()
+        now = now or timezone.now()
+        result = RetentionResult(rule=rule.name, cutoff=rule.cutoff(now), dry_run=dry_run)
+
+        if dry_run:
+            result.matched = rule.expired_queryset(now).using(self.using).count()
+            return result
+
+        archive = RetentionArchive(self.archive_dir, rule.name, now) if rule.archive else None
+        try:
+            if rule.partitioned and not rule.filters and not rule.exclude:
+                self._drop_expired_partitions(rule, result, archive)
+            if result.completed:
+                self._delete_in_batches(rule, now, result, archive)
+        except Exception as e:
+            logger.error(f"Retention rule {rule.name} failed: {e}", exc_info=True)
+            result.errors.append(str(e))
+        finally:
+            if archive is not None:
+                archive.close()
+                if archive.count:
+                    result.archive_path = archive.path
+            result.duration = time.monotonic() - started
+
+        logger.info(
+            f"Retention {rule.name}: deleted={result.deleted} archived={result.archived} "
+            f"batches={result.batches} partitions={len(result.partitions_dropped)} "
+            f"completed={result.completed}"
+        )
+        return result
+
+    def run_all(self, rules: Optional[List[RetentionRule]] = None,
+                dry_run: bool = False) -> List[RetentionResult]:
+        """Apply several rules (default: every registered rule) under one time budget"""
+        self._start_clock()
+        results = []
+        for rule in (rules if rules is not None else get_retention_rules().values()):
+            if self._out_of_time():
+                results.append(RetentionResult(
+                    rule=rule.name, cutoff=rule.cutoff(timezone.now()),
+                    dry_run=dry_run, completed=False
+                ))
+                continue
+            results.append(self.run(rule, dry_run=dry_run))
+        return results
+
+    def _drop_expired_partitions(self, rule: RetentionRule, result: RetentionResult,
+                                 archive: Optional[RetentionArchive]):
+        manager = PartitionManager(rule.model, rule.date_field, using=self.using)
+        if not manager.is_partitioned():
+            return
+
+        for partition in manager.expired_partitions(result.cutoff):
+            if self._out_of_time():
+                result.completed = False
+                return
+            if archive is not None:
+                chunk = []
+                for row in manager.iter_partition_rows(partition):
+                    chunk.append(rule.transform(row) if rule.transform else row)
+                    if len(chunk) >= RETENTION_ARCHIVE_CHUNK_SIZE:
+                        result.archived += archive.write(chunk)
+                        chunk = []
+                result.archived += archive.write(chunk)
+            manager.drop_partition(partition['name'])
+            result.partitions_dropped.append(partition['name'])
+            logger.info(f"Retention {rule.name}: dropped partition {partition['name']}")
+
+    def _delete_in_batches(self, rule: RetentionRule, now: datetime, result: RetentionResult,
+                           archive: Optional[RetentionArchive]):
+        """
+        Walk the expired rows in ascending primary-key ranges.
+
+        Each batch is bounded by the pk of its last row, found with an indexed
+        LIMIT/OFFSET probe, so the DELETE is a range predicate rather than a
+        long IN list and the next batch resumes strictly after it.
+        """
+        model = rule.model
+        expired = rule.expired_queryset(now).using(self.using)
+        last_pk = None
+
+        while True:
+            if self._out_of_time():
+                result.completed = False
+                return
+
+            window = expired if last_pk is None else expired.filter(pk__gt=last_pk)
+            boundary = list(
+                window.order_by('pk').values_list('pk', flat=True)[self.batch_size - 1:self.batch_size]
+            )
+            batch = window.filter(pk__lte=boundary[0]) if boundary else window
+
+            with transaction.atomic(using=self.using):
+                if archive is not None:
+                    rows = list(batch.order_by('pk').values())
+                    if rule.transform:
+                        rows = [rule.transform(row) for row in rows]
+                    result.archived += archive.write(rows)
+                _, per_model = batch.delete()
+
+            deleted = per_model.get(model._meta.label, 0)
+            result.deleted += deleted
+            if deleted or boundary:
+                result.batches += 1
+
+            if not boundary:
+                return
+            last_pk = boundary[0]
+            if self.throttle:
+                time.sleep(self.throttle)
+
+
+def get_archive_dir() -> str:
+    """Directory that receives retention archives"""
+    return getattr(
+        settings, 'DATA_RETENTION_ARCHIVE_DIR',
+        os.path.join(str(settings.BASE_DIR), 'archives', 'retention')
+    )
+
+
+_registry: Dict[str, RetentionRule] = {}
+
+
+def register_retention_rule(rule: RetentionRule) -> RetentionRule:
+    """Register (or replace) a retention rule under its name"""
+    _registry[rule.name] = rule
+    return rule
+
+
+def unregister_retention_rule(name: str) -> None:
+    """Remove a registered retention rule"""
+    _registry.pop(name, None)
+
+
+def get_retention_rules() -> Dict[str, RetentionRule]:
+    """Return the registered retention rules keyed by name"""
+    return dict(_registry)
+
+
+# Built-in rules for the high-volume append-only tables
+
+def idempotency_retention_rule(max_age_days: int = 30) -> RetentionRule:
+    """Idempotency records past expires_at, or older than max_age_days regardless"""
+    return RetentionRule(
+        name='idempotency_records',
+        model_label='governance.IdempotencyRecord',
+        date_field='created_at',
+        retention_days=max_age_days,
+        partitioned=True,
+        also_expired=lambda now: Q(expires_at__lt=now),
+    )
+
+
+def biometric_log_retention_rule(months: int = 6) -> RetentionRule:
+    """Raw biometric punches older than `months` (30-day months)"""
+    return RetentionRule(
+        name='biometric_logs',
+        model_label='hr.BiometricLog',
+        date_field='timestamp',
+        retention_days=months * 30,
+        partitioned=True,
+    )
+
+
+def audit_trail_retention_rule(retention_days: Optional[int] = None) -> RetentionRule:
+    """Governance audit trail rows, archived before deletion"""
+    if retention_days is None:
+        retention_days = getattr(settings, 'AUDIT_TRAIL', {}).get('RETENTION_DAYS', 365)
+    return RetentionRule(
+        name='audit_trail',
+        model_label='governance.AuditTrail',
+        date_field='timestamp',
+        retention_days=retention_days,
+        archive=True,
+        partitioned=True,
+    )
+
+
+register_retention_rule(idempotency_retention_rule())
+register_retention_rule(biometric_log_retention_rule())
+register_retention_rule(audit_trail_retention_rule())
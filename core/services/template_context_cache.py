@@ -0,0 +1,291 @@
+"""
+طبقة سياق القوالب المخزنة مؤقتاً
+Cached template context layer
+
+تُحمَّل إعدادات النظام وحسابات الدفع مرة واحدة لكل عملية (process) وتُحفظ في ذاكرة
+العملية مع رقم إصدار. عند حفظ أو حذف السجلات يُرفع رقم الإصدار محلياً وفي الكاش
+المشترك، فتُعيد العمليات الأخرى التحميل عند أول فحص للإصدار.
+
+أعداد النماذج الرئيسية (المنتجات، العملاء، ...) تُعاد ككائنات LazyCount لا تنفذ
+الاستعلام إلا إذا استخدمها القالب فعلاً، وتُحفظ نتيجتها في الكاش المشترك.
+"""
+
+import functools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# بادئة مفاتيح الإصدارات في الكاش المشترك
+CONTEXT_VERSION_KEY_PREFIX = 'template_context:version'
+
+# أقل فترة (بالثواني) بين فحصين لإصدار الكاش المشترك لنفس المدخل
+CONTEXT_VERSION_CHECK_INTERVAL = 5
+
+# أقصى عمر للمدخل في ذاكرة العملية - يعالج التعديلات التي لا تطلق إشارات (queryset.update)
+CONTEXT_CACHE_MAX_AGE = 300
+
+# بادئة ومدة كاش أعداد النماذج الرئيسية
+CONTEXT_COUNT_KEY_PREFIX = 'template_context:count'
+CONTEXT_COUNT_TIMEOUT = 300
+
+# أعداد النماذج الرئيسية المعروضة في القوالب: الاسم -> (النموذج، الفلتر)
+MAIN_MODEL_COUNTS = {
+    'products_count': ('product.Product', {}),
+    'customers_count': ('client.Customer', {'is_active': True}),
+    'suppliers_count': ('supplier.Supplier', {}),
+    'sales_count': ('sale.Sale', {}),
+    'purchases_count': ('purchase.Purchase', {}),
+}
+
+_TRUE_VALUES = ('true', '1', 'yes', 'نعم')
+
+
+class _Entry:
+    __slots__ = ('local_version', 'shared_version', 'loaded_at', 'checked_at', 'value')
+
+    def __init__(self, local_version, shared_version, value):
+        self.local_version = local_version
+        self.shared_version = shared_version
+        self.loaded_at = self.checked_at = time.monotonic()
+        self.value = value
+
+
+class VersionedContextCache:
+    """
+    كاش داخل العملية لقيم سياق القوالب مع إبطال مبني على رقم الإصدار
+
+    كل قيمة مسجلة لها دالة تحميل. القراءة لا تلمس قاعدة البيانات ما دام الإصدار
+    المحلي والمشترك لم يتغيرا ولم ينتهِ عمر المدخل.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._entries: Dict[str, _Entry] = {}
+        self._local_versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        self._loaders[name] = loader
+
+    @staticmethod
+    def _version_key(name: str) -> str:
+        return f'{CONTEXT_VERSION_KEY_PREFIX}:{name}'
+
+    def _shared_version(self, name: str):
+        try:
+            return cache.get(self._version_key(name))
+        except Exception:
+            return None
+
+    def get(self, name: str) -> Any:
+        entry = self._entries.get(name)
+        local_version = self._local_versions.get(name, 0)
+        now = time.monotonic()
+
+        if entry is not None and entry.local_version == local_version \
+                and now - entry.loaded_at < CONTEXT_CACHE_MAX_AGE:
+            if now - entry.checked_at < CONTEXT_VERSION_CHECK_INTERVAL:
+                self.hits += 1
+                return entry.value
+            if self._shared_version(name) == entry.shared_version:
+                entry.checked_at = now
+                self.hits += 1
+                return entry.value
+
+        # قراءة الإصدار قبل التحميل حتى لا يُحفظ تحميل قديم تحت إصدار أحدث
+        shared_version = self._shared_version(name)
+        value = self._loaders[name]()
+        self.loads += 1
+        with self._lock:
+            if self._local_versions.get(name, 0) == local_version:
+                self._entries[name] = _Entry(local_version, shared_version, value)
+        return value
+
+    def invalidate(self, name: str):
+        """إبطال القيمة في هذه العملية ورفع الإصدار المشترك لبقية العمليات"""
+        with self._lock:
+            self._local_versions[name] = self._local_versions.get(name, 0) + 1
+            self._entries.pop(name, None)
+        key = self._version_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+        except Exception as e:
+            logger.debug(f"Could not bump template context version for {name}: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+context_cache = VersionedContextCache()
+
+
+def invalidate_template_context(name: str):
+    """
+    إبطال قيمة سياق مخزنة
+
+    يُبطل فوراً (لتقرأ المعاملة الحالية القيمة الجديدة) ومرة أخرى بعد الـ commit
+    حتى لا تحفظ الطلبات المتزامنة القيمة القديمة تحت الإصدار الجديد.
+    """
+    context_cache.invalidate(name)
+    transaction.on_commit(functools.partial(context_cache.invalidate, name))
+
+
+def coerce_setting_value(data_type: str, value: str) -> Any:
+    """تحويل قيمة إعداد النظام النصية إلى النوع المناسب"""
+    if data_type == 'boolean':
+        return value.lower() in _TRUE_VALUES
+    if data_type == 'integer':
+        try:
+            return int(value)
+        except ValueError:
+            return 0
+    if data_type == 'float':
+        try:
+            return float(value)
+        except ValueError:
+            return 0.0
+    if data_type == 'json':
+        try:
+            import json
+            return json.loads(value)
+        except Exception:
+            return {}
+    # النص والأنواع الأخرى
+    return value
+
+
+def _load_settings() -> Dict[str, Any]:
+    from core.models import SystemSetting
+
+    settings_dict = {}
+    try:
+        for key, value, data_type in SystemSetting.objects.filter(is_active=True).values_list(
+            'key', 'value', 'data_type'
+        ):
+            settings_dict[key] = coerce_setting_value(data_type, value)
+    except Exception:
+        # في حالة عدم وجود جدول الإعدادات أو أي استثناء
+        pass
+    return settings_dict
+
+
+def _load_payment_accounts():
+    from django.db.models import Q
+    from financial.models import ChartOfAccounts
+
+    # استعلام واحد لحسابات الخزينة والبنك والحساب الافتراضي (الخزينة - 10100)
+    accounts = list(
+        ChartOfAccounts.objects.filter(is_active=True).filter(
+            Q(is_cash_account=True) | Q(is_bank_account=True) | Q(code='10100')
+        ).order_by('code')
+    )
+    default_account = next((account for account in accounts if account.code == '10100'), None)
+    payment_accounts = [account for account in accounts if account.is_cash_account or account.is_bank_account]
+    return payment_accounts, default_account
+
+
+context_cache.register('settings', _load_settings)
+context_cache.register('payment_accounts', _load_payment_accounts)
+
+
+def get_cached_settings() -> Dict[str, Any]:
+    return context_cache.get('settings')
+
+
+def get_cached_payment_accounts():
+    return context_cache.get('payment_accounts')
+
+
+def count_cache_key(model_label: str) -> str:
+    return f'{CONTEXT_COUNT_KEY_PREFIX}:{model_label.lower()}'
+
+
+def invalidate_model_count(model_label: str):
+    cache.delete(count_cache_key(model_label))
+
+
+def get_model_count(model_label: str, filters: Optional[Dict[str, Any]] = None) -> int:
+    """عدد سجلات النموذج من الكاش المشترك، أو COUNT(*) واحد عند عدم وجوده"""
+    from django.apps import apps
+
+    key = count_cache_key(model_label)
+    count = cache.get(key)
+    if count is None:
+        count = apps.get_model(model_label).objects.filter(**(filters or {})).count()
+        cache.set(key, count, CONTEXT_COUNT_TIMEOUT)
+    return count
+
+
+@functools.total_ordering
+class LazyCount:
+    """
+    عدد لا يُحسب إلا عند استخدامه في القالب
+
+    يتصرف كرقم صحيح في العرض والمقارنة والفلاتر ({{ x }}, {% if x > 0 %}, |add).
+    """
+
+    def __init__(self, model_label: str, filters: Optional[Dict[str, Any]] = None):
+        self.model_label = model_label
+        self.filters = filters
+        self._value = None
+
+    @property
+    def value(self) -> int:
+        if self._value is None:
+            try:
+                self._value = get_model_count(self.model_label, self.filters)
+            except Exception:
+                # تجاهل أي استثناءات (مثلاً إذا لم يكن هناك جدول)
+                self._value = 0
+        return self._value
+
+    @property
+    def is_evaluated(self) -> bool:
+        return self._value is not None
+
+    def __int__(self):
+        return self.value
+
+    __index__ = __int__
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __str__(self):
+        return str(self.value)
+
+    def __repr__(self):
+        return f'<LazyCount {self.model_label}: {self._value if self.is_evaluated else "?"}>'
+
+    def __eq__(self, other):
+        return self.value == (other.value if isinstance(other, LazyCount) else other)
+
+    def __lt__(self, other):
+        return self.value < (other.value if isinstance(other, LazyCount) else other)
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __add__(self, other):
+        return self.value + other
+
+    __radd__ = __add__
+
+
+def get_main_model_counts(installed_apps) -> Dict[str, LazyCount]:
+    return {
+        name: LazyCount(model_label, filters)
+        for name, (model_label, filters) in MAIN_MODEL_COUNTS.items()
+        if model_label.split('.')[0] in installed_apps
+    }
@@ -74,3 +74,44 @@ def clear_module_cache_on_delete(sender, instance, **kwargs):
         logger.info(f"Cache cleared after deleting module: {instance.code}")
     except Exception as e:
         logger.error(f"Error clearing cache after deleting module {instance.code}: {str(e)}")
+
+
+# ============================================================
+# TEMPLATE CONTEXT CACHE SIGNALS
+# ============================================================
+
+from core.services.template_context_cache import (
+    MAIN_MODEL_COUNTS,
+    invalidate_model_count,
+    invalidate_template_context,
+)
+
+
+@receiver(post_save, sender='core.SystemSetting')
+@receiver(post_delete, sender='core.SystemSetting')
+def invalidate_settings_context(sender, instance, **kwargs):
+    """
+    إبطال كاش إعدادات النظام في سياق القوالب
+    """
+    invalidate_template_context('settings')
+
+
+@receiver(post_save, sender='financial.ChartOfAccounts')
+@receiver(post_delete, sender='financial.ChartOfAccounts')
+def invalidate_payment_accounts_context(sender, instance, **kwargs):
+    """
+    إبطال كاش حسابات الدفع في سياق القوالب
+    """
+    invalidate_template_context('payment_accounts')
+
+
+def invalidate_main_model_count(sender, instance, **kwargs):
+    """
+    إبطال العدد المخزن للنموذج عند إضافة أو حذف أو تعديل سجل
+    """
+    invalidate_model_count(sender._meta.label)
+
+
+for _model_label, _filters in MAIN_MODEL_COUNTS.values():
+    post_save.connect(invalidate_main_model_count, sender=_model_label, dispatch_uid=f'context_count_save_{_model_label}')
+    post_delete.connect(invalidate_main_model_count, sender=_model_label, dispatch_uid=f'context_count_delete_{_model_label}')
@@ -0,0 +1,124 @@
+"""
+Unit tests for the retention engine.
+
+Covers primary-key-range batching, the time budget, dry runs, compressed
+JSONL archiving and the idempotency cleanup built on top of it.
+"""
+
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from core.services.retention_engine import (
+    RetentionEngine, RetentionRule, idempotency_retention_rule
+)
+from governance.models import AuditTrail, IdempotencyRecord
+from governance.services.idempotency_service import IdempotencyService
+
+User = get_user_model()
+
+
+class RetentionEngineTests(TestCase):
+    """Tests for RetentionEngine batching, budgeting and archiving"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='retention_user', password='test')
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+        now = timezone.now()
+        for index in range(7):
+            IdempotencyRecord.objects.create(
+                operation_type='journal_entry',
+                idempotency_key=f'expired-{index}',
+                result_data={'index': index},
+                expires_at=now - timedelta(hours=1),
+                created_by=self.user
+            )
+        for index in range(2):
+            IdempotencyRecord.objects.create(
+                operation_type='journal_entry',
+                idempotency_key=f'live-{index}',
+                result_data={'index': index},
+                expires_at=now + timedelta(hours=1),
+                created_by=self.user
+            )
+
+    def _engine(self, **kwargs):
+        kwargs.setdefault('throttle', 0)
+        return RetentionEngine(archive_dir=self.archive_dir, **kwargs)
+
+    def test_expired_rows_deleted_in_pk_range_batches(self):
+        result = self._engine(batch_size=3).run(idempotency_retention_rule())
+
+        self.assertEqual(result.deleted, 7)
+        self.assertEqual(result.batches, 3)
+        self.assertTrue(result.completed)
+        self.assertEqual(
+            sorted(IdempotencyRecord.objects.values_list('idempotency_key', flat=True)),
+            ['live-0', 'live-1']
+        )
+
+    def test_dry_run_only_counts(self):
+        result = self._engine().run(idempotency_retention_rule(), dry_run=True)
+
+        self.assertEqual(result.matched, 7)
+        self.assertEqual(result.deleted, 0)
+        self.assertEqual(IdempotencyRecord.objects.count(), 9)
+
+    def test_exhausted_time_budget_stops_at_batch_boundary(self):
+        result = self._engine(time_budget=0).run(idempotency_retention_rule())
+
+        self.assertFalse(result.completed)
+        self.assertEqual(result.deleted, 0)
+        self.assertEqual(IdempotencyRecord.objects.count(), 9)
+
+    def test_archived_rows_written_as_compressed_jsonl(self):
+        old = timezone.now() - timedelta(days=400)
+        for object_id in (1, 2):
+            AuditTrail.objects.create(
+                model_name='hr.Payroll', object_id=object_id, operation='UPDATE',
+                source_service='PayrollService', timestamp=old, user_agent='secret-agent'
+            )
+        AuditTrail.objects.create(
+            model_name='hr.Payroll', object_id=3, operation='UPDATE', source_service='PayrollService'
+        )
+
+        def mask(row):
+            row['user_agent'] = None
+            return row
+
+        rule = RetentionRule(
+            name='audit_test', model_label='governance.AuditTrail', date_field='timestamp',
+            retention_days=365, archive=True, filters={'model_name': 'hr.Payroll'}, transform=mask
+        )
+        result = self._engine(batch_size=1).run(rule)
+
+        self.assertEqual(result.deleted, 2)
+        self.assertEqual(result.archived, 2)
+        with gzip.open(result.archive_path, 'rt', encoding='utf-8') as archive:
+            rows = [json.loads(line) for line in archive]
+        self.assertEqual([row['object_id'] for row in rows], [1, 2])
+        self.assertTrue(all(row['user_agent'] is None for row in rows))
+        self.assertEqual(
+            list(AuditTrail.objects.filter(model_name='hr.Payroll').values_list('object_id', flat=True)),
+            [3]
+        )
+
+    def test_idempotency_cleanup_uses_engine_statistics(self):
+        IdempotencyRecord.objects.filter(idempotency_key='live-0').update(
+            created_at=timezone.now() - timedelta(days=45)
+        )
+
+        stats = IdempotencyService.cleanup_expired_records(batch_size=5, max_age_days=30, throttle=0)
+
+        self.assertEqual(stats['total_deleted'], 8)
+        self.assertEqual(stats['batches_processed'], 2)
+        self.assertEqual(stats['errors'], [])
+        self.assertTrue(stats['completed'])
+        self.assertEqual(list(IdempotencyRecord.objects.values_list('idempotency_key', flat=True)), ['live-1'])
@@ -0,0 +1,129 @@
+"""
+اختبارات طبقة سياق القوالب المخزنة وميزانية الاستعلامات
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from core.context_processors import global_settings, notifications, payment_accounts
+from core.middleware.query_budget import QueryBudgetMiddleware, query_budget_report
+from core.models import Notification, SystemSetting
+from core.services.template_context_cache import LazyCount, context_cache, get_cached_settings
+from financial.models import AccountType, ChartOfAccounts
+from utils.context_processors import common_variables
+
+User = get_user_model()
+
+
+class TemplateContextCacheTest(TestCase):
+    """اختبارات كاش الإعدادات وحسابات الدفع والقيم الكسولة"""
+
+    def setUp(self):
+        context_cache.clear()
+        self.user = User.objects.create_user(username='context_user', password='test')
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user
+
+    def tearDown(self):
+        context_cache.clear()
+
+    def test_settings_loaded_once_and_invalidated_on_save(self):
+        setting = SystemSetting.objects.create(key='site_name', value='شركة أ', data_type='string')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(global_settings(self.request)['SITE_NAME'], 'شركة أ')
+        with self.assertNumQueries(0):
+            global_settings(self.request)
+
+        setting.value = 'شركة ب'
+        setting.save()
+        SystemSetting.objects.create(key='maintenance_mode', value='true', data_type='boolean')
+
+        context = global_settings(self.request)
+        self.assertEqual(context['SITE_NAME'], 'شركة ب')
+        self.assertIs(context['maintenance_mode'], True)
+
+    def test_payment_accounts_cached_until_account_changes(self):
+        account_type = AccountType.objects.create(
+            code='CTX100', name='أصول', category='asset', nature='debit', created_by=self.user
+        )
+        cash = ChartOfAccounts.objects.create(
+            code='10100', name='الخزينة', account_type=account_type, is_cash_account=True, created_by=self.user
+        )
+        ChartOfAccounts.objects.create(code='10200', name='أخرى', account_type=account_type, created_by=self.user)
+
+        with self.assertNumQueries(1):
+            context = payment_accounts(self.request)
+        self.assertEqual(context['payment_accounts'], [cash])
+        self.assertEqual(context['default_payment_account'], cash)
+        with self.assertNumQueries(0):
+            payment_accounts(self.request)
+
+        bank = ChartOfAccounts.objects.create(
+            code='10300', name='البنك', account_type=account_type, is_bank_account=True, created_by=self.user
+        )
+        self.assertEqual(payment_accounts(self.request)['payment_accounts'], [cash, bank])
+
+    def test_counts_and_notifications_are_lazy(self):
+        Notification.objects.create(user=self.user, title='تنبيه', message='رسالة')
+        get_cached_settings()
+
+        with self.assertNumQueries(0):
+            main_models = common_variables(self.request)['main_models']
+            user_notifications = notifications(self.request)['notifications']
+
+        self.assertIn('customers_count', main_models)
+        with self.assertNumQueries(1):
+            self.assertEqual(int(main_models['customers_count']), 0)
+            self.assertEqual(str(main_models['customers_count']), '0')
+        self.assertFalse(main_models['customers_count'])
+        self.assertEqual(len(user_notifications), 1)
+
+    def test_lazy_count_compares_like_int(self):
+        count = LazyCount(User._meta.label)
+
+        self.assertFalse(count.is_evaluated)
+        self.assertTrue(count > 0)
+        self.assertEqual(count + 1, 2)
+        self.assertEqual(count, 1)
+
+    def test_anonymous_user_gets_no_counts(self):
+        self.request.user = AnonymousUser()
+        get_cached_settings()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(common_variables(self.request)['main_models'], {})
+            self.assertEqual(notifications(self.request)['notifications'], [])
+
+
+class QueryBudgetMiddlewareTest(TestCase):
+    """اختبارات عد الاستعلامات لكل طلب"""
+
+    def setUp(self):
+        query_budget_report.reset()
+        context_cache.clear()
+
+    def _view(self, request):
+        global_settings(request)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.execute('SELECT 2')
+        return HttpResponse('ok')
+
+    def test_queries_counted_and_reported(self):
+        middleware = QueryBudgetMiddleware(self._view)
+        middleware.limit = 2
+        middleware.add_header = True
+        request = RequestFactory().get('/budget/')
+
+        with self.assertLogs('core.middleware.query_budget', level='WARNING'):
+            response = middleware(request)
+
+        self.assertEqual(response['X-Query-Count'], '3')
+        self.assertEqual(response['X-Context-Query-Count'], '1')
+        self.assertEqual(request.query_budget.context, {'global_settings': 1})
+        report = query_budget_report.get_report()
+        self.assertEqual(report[0]['path'], '/budget/')
+        self.assertEqual((report[0]['requests'], report[0]['over_budget']), (1, 1))
@@ -140,10 +140,10 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     # ✅ SECURITY: Enable security headers middleware for production
     "core.middleware.security_headers.AdvancedSecurityHeadersMiddleware",
-    "core.middleware.security_headers.SecurityEventLoggerMiddleware",
     
-    # ✅ PHASE 7: Simplified monitoring middleware
-    "core.middleware.monitoring_middleware.SimpleMonitoringMiddleware",
+    # ✅ مسار الطلب الموحد: سياق مشترك (IP، resolve، التطبيق) + hooks الأمان والمراقبة
+    # يحل محل SecurityEventLoggerMiddleware و SecurityEventMiddleware و SimpleMonitoringMiddleware
+    "core.middleware.request_pipeline.RequestPipelineMiddleware",
     
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -153,16 +153,12 @@ MIDDLEWARE = [
     "governance.middleware.security_middleware.BlockedIPMiddleware",  # Block malicious IPs
     
     "core.middleware.rate_limiting.RateLimitingMiddleware",  # ✅ SECURITY: Rate limiting
-    "core.middleware.rate_limiting.SecurityEventMiddleware",  # ✅ SECURITY: Security events
     
     # ✅ PHASE 4: Integration security middleware
     "core.middleware.webhook_security_middleware.WebhookSecurityMiddleware",
     # "core.middleware.webhook_security_middleware.APIRateLimitMiddleware",  # Temporarily disabled
     "core.middleware.webhook_security_middleware.RequestLoggingMiddleware",
     
-    # ✅ PHASE 7: Simplified monitoring middleware
-    "core.middleware.monitoring_middleware.SimpleMonitoringMiddleware",
-    
     "core.middleware.sqlite_optimization.SQLiteOptimizationMiddleware",  # ✅ تفعيل تحسين SQLite
     "core.middleware.sqlite_optimization.DatabaseConnectionMiddleware",  # ✅ إدارة الاتصالات
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -875,6 +871,7 @@ CELERY_TASK_ROUTES = {
     'hr.tasks.process_biometric_logs_task': {'queue': 'hr'},
     'hr.tasks.cleanup_old_biometric_logs': {'queue': 'maintenance'},
     'financial.tasks.generate_financial_report': {'queue': 'reports'},
+    'governance.tasks.run_scheduled_reports': {'queue': 'reports'},
 }
 
 # Queue configuration
@@ -932,6 +929,12 @@ CELERY_BEAT_SCHEDULE = {
         'options': {'queue': 'maintenance'},
         'kwargs': {'months': 6}
     },
+    # تشغيل التقارير المجدولة المستحقة
+    'run-scheduled-reports': {
+        'task': 'governance.tasks.run_scheduled_reports',
+        'schedule': 300.0,  # Every 5 minutes
+        'options': {'queue': 'reports'}
+    },
 }
 
 # Monitoring and logging
@@ -986,12 +989,25 @@ ASYNC_PROCESSING = {
     'MAX_RETRIES': 3,
 }
 
+# ✅ Hooks مسار الطلب الموحد (RequestPipelineMiddleware) - تُنفذ بالترتيب
+REQUEST_PIPELINE = {
+    'HOOKS': [
+        'core.middleware.request_pipeline.SecurityEventHook',  # أمان: أنماط الهجوم ومحاولات الدخول
+        'core.middleware.request_pipeline.MonitoringHook',  # مراقبة: الطلبات البطيئة والأخطاء
+        'core.middleware.query_budget.QueryBudgetHook',  # مراقبة: ميزانية الاستعلامات
+    ],
+}
+
 # ✅ PHASE 3: Performance monitoring
 PERFORMANCE_MONITORING = {
     'ENABLE_QUERY_LOGGING': not DEBUG,
     'SLOW_QUERY_THRESHOLD': 1.0,  # Log queries slower than 1 second
     'ENABLE_CACHE_STATS': True,
     'ENABLE_PAGINATION_STATS': True,
+    # ميزانية استعلامات الصفحة الواحدة - تحذير في السجل عند تجاوزها
+    'ENABLE_QUERY_BUDGET': env.bool("ENABLE_QUERY_BUDGET", default=True),
+    'PAGE_QUERY_BUDGET': env.int("PAGE_QUERY_BUDGET", default=30),
+    'QUERY_BUDGET_HEADER': DEBUG,  # إضافة ترويسة X-Query-Count للاستجابة
 }
 
 # ✅ SECURITY: CORS Configuration
@@ -1045,6 +1061,8 @@ ENCRYPTION_KEY_ROTATION_DAYS = env.int("ENCRYPTION_KEY_ROTATION_DAYS", default=9
 DATA_RETENTION_ARCHIVE_ENABLED = env.bool("DATA_RETENTION_ARCHIVE_ENABLED", default=True)
 DATA_RETENTION_NOTIFICATIONS_ENABLED = env.bool("DATA_RETENTION_NOTIFICATIONS_ENABLED", default=True)
 DATA_RETENTION_AUDIT_ENABLED = env.bool("DATA_RETENTION_AUDIT_ENABLED", default=True)
+# أرشيف السجلات المحذوفة بملفات JSONL مضغوطة (gzip) قبل حذفها على دفعات
+DATA_RETENTION_ARCHIVE_DIR = env("DATA_RETENTION_ARCHIVE_DIR", default=str(BASE_DIR / "archives" / "retention"))
 
 # Data Retention Notification Recipients
 DATA_RETENTION_NOTIFICATION_EMAILS = env.list("DATA_RETENTION_NOTIFICATION_EMAILS", default=[])
@@ -1268,6 +1286,21 @@ AUDIT_TRAIL = {
     'ENABLE_WEBHOOK_AUDIT': env.bool('AUDIT_ENABLE_WEBHOOK', default=True),
     'RETENTION_DAYS': env.int('AUDIT_RETENTION_DAYS', default=365),  # 1 year
     'ENABLE_REAL_TIME_ALERTS': env.bool('AUDIT_ENABLE_REAL_TIME_ALERTS', default=True),
+    # كتابة سجلات governance AuditTrail على دفعات بعد الـ commit بدلاً من INSERT لكل عملية
+    'BUFFERED_WRITES': env.bool('AUDIT_BUFFERED_WRITES', default=not TESTING),
+    'BUFFER_BATCH_SIZE': env.int('AUDIT_BUFFER_BATCH_SIZE', default=200),
+    'BUFFER_MAX_AGE_SECONDS': env.float('AUDIT_BUFFER_MAX_AGE_SECONDS', default=2.0),
+    'BUFFER_CAPACITY': env.int('AUDIT_BUFFER_CAPACITY', default=5000),
+    # ملفات احتياطية عند تعذر الوصول لقاعدة البيانات (تُعاد تلقائياً أو عبر replay_audit_spool)
+    'SPOOL_DIR': env('AUDIT_SPOOL_DIR', default=str(BASE_DIR / 'logs' / 'audit_spool')),
+}
+
+# تشغيل معالجات الإشارات غير الحرجة بعد الـ commit بدلاً من داخل معاملة الحفظ
+# MODE: inline | deferred ، DEFERRED_BACKEND: thread | celery | sync
+GOVERNANCE_SIGNAL_DISPATCH = {
+    'MODE': env('GOVERNANCE_SIGNAL_DISPATCH_MODE', default='inline'),
+    'DEFERRED_BACKEND': env('GOVERNANCE_SIGNAL_DEFERRED_BACKEND', default='sync' if TESTING else 'thread'),
+    'DEFERRED_WORKERS': env.int('GOVERNANCE_SIGNAL_DEFERRED_WORKERS', default=2),
 }
 
 # ✅ PHASE 4: Celery Configuration for Reconciliation Tasks
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.26 on 2026-10-18 22:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financial', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journalentry',
+            index=models.Index(fields=['updated_at', 'id'], name='financial_j_updated_6116c2_idx'),
+        ),
+    ]
@@ -3,6 +3,7 @@ from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator
 from django.conf import settings
 from django.utils import timezone
+from governance.field_tracking import FieldTrackingMixin
 from decimal import Decimal
 from django.core.exceptions import ValidationError
 from .chart_of_accounts import ChartOfAccounts
@@ -313,6 +314,7 @@ class JournalEntry(models.Model):
             models.Index(fields=["original_entry", "is_reversal"]),
             models.Index(fields=["is_locked", "status"]),
             models.Index(fields=["locked_at"]),
+            models.Index(fields=["updated_at", "id"]),
         ]
 
     def __str__(self):
@@ -968,7 +970,7 @@ class JournalEntry(models.Model):
         return result
 
 
-class JournalEntryLine(models.Model):
+class JournalEntryLine(FieldTrackingMixin, models.Model):
     """
     بنود القيود اليومية
     """
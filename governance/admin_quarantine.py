@@ -234,21 +234,21 @@ class QuarantineRecordAdmin(admin.ModelAdmin):
         # Get statistics
         stats = quarantine_system.get_quarantine_statistics(date_from=date_from)
         
-        # Get additional admin-specific stats
-        total_records = QuarantineRecord.objects.count()
-        recent_24h = QuarantineRecord.objects.filter(
-            quarantined_at__gte=timezone.now() - timedelta(hours=24)
-        ).count()
+        # All-time figures for the admin header, read from the daily rollups
+        overall = quarantine_system.get_quarantine_statistics()
+        total_records = overall['summary']['total_quarantined']
+        recent_24h = overall['summary']['recent_24h']
         
         # Status distribution
-        status_distribution = QuarantineRecord.objects.values('status').annotate(
-            count=Count('id')
-        ).order_by('-count')
+        status_distribution = [
+            {'status': status, 'count': count} for status, count in overall['by_status'].items()
+        ]
         
         # Corruption type distribution
-        corruption_distribution = QuarantineRecord.objects.values('corruption_type').annotate(
-            count=Count('id')
-        ).order_by('-count')
+        corruption_distribution = [
+            {'corruption_type': corruption_type, 'count': count}
+            for corruption_type, count in overall['by_corruption_type'].items()
+        ]
         
         context = {
             'title': 'Quarantine Statistics',
@@ -338,14 +338,13 @@ class QuarantineRecordAdmin(admin.ModelAdmin):
         extra_context = extra_context or {}
         
         # Add quick stats to changelist
+        stats = quarantine_system.get_quarantine_statistics()
         extra_context['quick_stats'] = {
-            'total': QuarantineRecord.objects.count(),
-            'quarantined': QuarantineRecord.objects.filter(status='QUARANTINED').count(),
-            'under_review': QuarantineRecord.objects.filter(status='UNDER_REVIEW').count(),
-            'resolved': QuarantineRecord.objects.filter(status='RESOLVED').count(),
-            'recent_24h': QuarantineRecord.objects.filter(
-                quarantined_at__gte=timezone.now() - timedelta(hours=24)
-            ).count(),
+            'total': stats['summary']['total_quarantined'],
+            'quarantined': stats['by_status'].get('QUARANTINED', 0),
+            'under_review': stats['by_status'].get('UNDER_REVIEW', 0),
+            'resolved': stats['by_status'].get('RESOLVED', 0),
+            'recent_24h': stats['summary']['recent_24h'],
         }
         
         # Add custom admin URLs
@@ -0,0 +1,58 @@
+"""
+Field tracking for governed models.
+
+Models mixing in FieldTrackingMixin remember the column values they were
+loaded with, so the governance audit middleware can build before/after diffs
+from memory instead of re-reading (and locking) the row on every save.
+"""
+
+
+class FieldTrackingMixin:
+    """
+    Record original field values when an instance is loaded from the database.
+
+    Must appear before models.Model in the bases. Only concrete columns that
+    were actually loaded are tracked; deferred fields are ignored until they
+    are fetched and the instance is saved.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def is_tracked(self):
+        """True when the instance came from the database and has a snapshot."""
+        return getattr(self, '_loaded_values', None) is not None
+
+    def get_field_changes(self):
+        """
+        Return {attname: (original, current)} for every tracked field whose
+        value differs from what was loaded.
+        """
+        loaded = getattr(self, '_loaded_values', None) or {}
+        changes = {}
+        for attname, original in loaded.items():
+            current = getattr(self, attname)
+            if current != original:
+                changes[attname] = (original, current)
+        return changes
+
+    def reset_field_tracking(self):
+        """Take a fresh snapshot of the currently loaded concrete fields."""
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred
+        }
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save handlers have already seen the diff; the saved state is the new baseline
+        self.reset_field_tracking()
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.reset_field_tracking()
@@ -0,0 +1,96 @@
+"""
+Management command to benchmark the per-operation governance overhead.
+
+Times the flag and authority checks a single business operation goes through
+(switchboard component/workflow checks, the SignalRouter control check and a
+direct-authority validation) and reports nanoseconds per check. Save a run with
+--output before a change and compare against it afterwards with --baseline.
+"""
+
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from governance.services.authority_service import AuthorityService
+from governance.services.governance_switchboard import governance_switchboard
+from governance.services.signal_router import signal_router
+
+
+# Checks performed by one journal-entry-producing business operation
+GOVERNANCE_CHECKS = {
+    'component_enabled': lambda: governance_switchboard.is_component_enabled('accounting_gateway_enforcement'),
+    'authority_component_enabled': lambda: governance_switchboard.is_component_enabled('authority_boundary_enforcement'),
+    'workflow_enabled': lambda: governance_switchboard.is_workflow_enabled('stock_movement_to_journal_entry'),
+    'emergency_override': lambda: governance_switchboard.is_emergency_flag_active('emergency_disable_all_governance'),
+    'signal_router_controls': lambda: signal_router._check_governance_controls('post_save', False),
+    'validate_authority': lambda: AuthorityService.validate_authority('AccountingGateway', 'JournalEntry', 'CREATE'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark governance flag and authority check overhead per business operation'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=100000,
+            help='Calls per check in each round (default: 100000)'
+        )
+        parser.add_argument(
+            '--rounds',
+            type=int,
+            default=5,
+            help='Timed rounds per check; the median is reported (default: 5)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results as JSON to this file'
+        )
+        parser.add_argument(
+            '--baseline',
+            help='Compare against results previously written with --output'
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        rounds = options['rounds']
+        if iterations <= 0 or rounds <= 0:
+            raise CommandError('--iterations and --rounds must be positive')
+
+        baseline = self._load_baseline(options['baseline']) if options['baseline'] else None
+
+        results = {name: self._measure(check, iterations, rounds) for name, check in GOVERNANCE_CHECKS.items()}
+        results['per_operation'] = sum(results.values())
+
+        self.stdout.write(f'Governance overhead ({iterations} calls x {rounds} rounds, median ns per call)')
+        for name, nanoseconds in results.items():
+            line = f'  {name:<30} {nanoseconds:>10.1f} ns'
+            if baseline and name in baseline:
+                before = baseline[name]
+                line += f'   baseline {before:>10.1f} ns   speedup x{before / nanoseconds:.2f}'
+            self.stdout.write(line)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def _measure(self, check, iterations, rounds):
+        check()  # warm up caches and lazy imports
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter_ns()
+            for _ in range(iterations):
+                check()
+            timings.append((time.perf_counter_ns() - started) / iterations)
+        return statistics.median(timings)
+
+    def _load_baseline(self, path):
+        try:
+            with open(path) as baseline:
+                return json.load(baseline)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read baseline {path}: {e}')
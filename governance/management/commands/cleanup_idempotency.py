@@ -4,7 +4,6 @@ This should be run periodically as a maintenance task.
 """
 
 from django.core.management.base import BaseCommand, CommandError
-from django.utils import timezone
 from governance.services import IdempotencyService
 import logging
 
@@ -27,6 +26,18 @@ class Command(BaseCommand):
             default=30,
             help='Maximum age in days for records to keep (default: 30)'
         )
+        parser.add_argument(
+            '--time-budget',
+            type=float,
+            default=None,
+            help='Seconds the cleanup may run before stopping at a batch boundary (default: 300)'
+        )
+        parser.add_argument(
+            '--throttle',
+            type=float,
+            default=None,
+            help='Pause in seconds between batches (default: 0.05)'
+        )
         parser.add_argument(
             '--dry-run',
             action='store_true',
@@ -42,6 +53,8 @@ class Command(BaseCommand):
         batch_size = options['batch_size']
         max_age_days = options['max_age_days']
         dry_run = options['dry_run']
+        time_budget = options['time_budget']
+        throttle = options['throttle']
         verbose = options['verbose']
 
         self.stdout.write(
@@ -60,27 +73,14 @@ class Command(BaseCommand):
 
             if dry_run:
                 # Show what would be deleted
-                from datetime import timedelta
-                now = timezone.now()
-                expired_cutoff = now
-                old_cutoff = now - timedelta(days=max_age_days)
-                
-                from governance.models import IdempotencyRecord
-                
-                expired_count = IdempotencyRecord.objects.filter(
-                    expires_at__lt=expired_cutoff
-                ).count()
-                
-                old_count = IdempotencyRecord.objects.filter(
-                    created_at__lt=old_cutoff
-                ).count()
-                
-                total_to_delete = expired_count + old_count
-                
+                cleanup_stats = IdempotencyService.cleanup_expired_records(
+                    max_age_days=max_age_days,
+                    dry_run=True
+                )
                 self.stdout.write(
                     self.style.WARNING(
-                        f'DRY RUN: Would delete {total_to_delete} records '
-                        f'({expired_count} expired + {old_count} old)'
+                        f"DRY RUN: Would delete {cleanup_stats.get('would_delete', 0)} records "
+                        f"(expired or older than {max_age_days} days)"
                     )
                 )
                 return
@@ -88,7 +88,9 @@ class Command(BaseCommand):
             # Perform actual cleanup
             cleanup_stats = IdempotencyService.cleanup_expired_records(
                 batch_size=batch_size,
-                max_age_days=max_age_days
+                max_age_days=max_age_days,
+                time_budget=time_budget,
+                throttle=throttle
             )
 
             # Report results
@@ -100,6 +102,14 @@ class Command(BaseCommand):
                 for error in errors:
                     self.stdout.write(self.style.ERROR(f'Error: {error}'))
 
+            for partition in cleanup_stats.get('partitions_dropped', []):
+                self.stdout.write(f'Dropped partition {partition}')
+
+            if not cleanup_stats.get('completed', True):
+                self.stdout.write(
+                    self.style.WARNING('Time budget exhausted; remaining records will be removed on the next run')
+                )
+
             self.stdout.write(
                 self.style.SUCCESS(
                     f'Cleanup completed: {total_deleted} records deleted '
@@ -1,7 +1,8 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
-from governance.models import ActiveSession, SecurityIncident
+from core.services.retention_engine import RetentionEngine, RetentionRule
+from governance.models import ActiveSession
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,12 @@ class Command(BaseCommand):
             default=90,
             help='Archive incidents older than X days (default: 90)'
         )
+        parser.add_argument(
+            '--time-budget',
+            type=float,
+            default=300,
+            help='Seconds the incident archiving may run (default: 300)'
+        )
         parser.add_argument(
             '--dry-run',
             action='store_true',
@@ -39,7 +46,13 @@ class Command(BaseCommand):
         
         # Cleanup expired sessions
         self.stdout.write('Cleaning up expired sessions...')
-        session_count = ActiveSession.cleanup_expired_sessions(hours=session_hours)
+        if dry_run:
+            session_count = ActiveSession.objects.filter(
+                last_activity__lt=timezone.now() - timedelta(hours=session_hours),
+                is_active=True
+            ).count()
+        else:
+            session_count = ActiveSession.cleanup_expired_sessions(hours=session_hours)
         
         if dry_run:
             self.stdout.write(self.style.SUCCESS(f'  Would clean up {session_count} expired sessions'))
@@ -47,25 +60,29 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(f'  ✓ Cleaned up {session_count} expired sessions'))
         
         # Archive old resolved incidents
-        self.stdout.write(f'Archiving old incidents (older than {incident_days} days)...')
-        cutoff_date = timezone.now() - timedelta(days=incident_days)
-        
-        old_incidents = SecurityIncident.objects.filter(
-            status='RESOLVED',
-            resolved_at__lt=cutoff_date
+        self.stdout.write(f'Archiving old incidents to the retention archive (older than {incident_days} days)...')
+        incident_rule = RetentionRule(
+            name='security_incidents',
+            model_label='governance.SecurityIncident',
+            date_field='resolved_at',
+            retention_days=incident_days,
+            archive=True,
+            filters={'status': 'RESOLVED'}
         )
-        
-        count = old_incidents.count()
+        result = RetentionEngine(time_budget=options['time_budget']).run(incident_rule, dry_run=dry_run)
         
         if dry_run:
+            count = result.matched
             self.stdout.write(self.style.SUCCESS(f'  Would archive {count} old incidents'))
         else:
-            # In production, you might want to move these to an archive table
-            # For now, we'll just mark them
-            old_incidents.update(
-                additional_data={'archived': True, 'archived_at': timezone.now().isoformat()}
-            )
+            count = result.archived
+            for error in result.errors:
+                self.stdout.write(self.style.ERROR(f'  Error: {error}'))
             self.stdout.write(self.style.SUCCESS(f'  ✓ Archived {count} old incidents'))
+            if result.archive_path:
+                self.stdout.write(f'    Archive: {result.archive_path}')
+            if not result.completed:
+                self.stdout.write(self.style.WARNING('  Time budget exhausted; rerun to archive the rest'))
         
         # Summary
         self.stdout.write('')
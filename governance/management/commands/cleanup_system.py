@@ -0,0 +1,116 @@
+"""
+Management command to run the registered retention rules.
+Expires idempotency records, audit trails and biometric logs in batches
+(or by dropping expired partitions) under a shared time budget.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from core.services.retention_engine import (
+    PartitionManager, RetentionEngine, get_retention_rules,
+    RETENTION_BATCH_SIZE, RETENTION_THROTTLE_SECONDS, RETENTION_TIME_BUDGET_SECONDS
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Run retention cleanup for idempotency records, audit trails and biometric logs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rule',
+            action='append',
+            dest='rules',
+            help='Run only this retention rule (repeatable, default: all registered rules)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RETENTION_BATCH_SIZE,
+            help=f'Rows deleted per transaction (default: {RETENTION_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--time-budget',
+            type=float,
+            default=RETENTION_TIME_BUDGET_SECONDS,
+            help=f'Seconds the whole run may take (default: {RETENTION_TIME_BUDGET_SECONDS})'
+        )
+        parser.add_argument(
+            '--throttle',
+            type=float,
+            default=RETENTION_THROTTLE_SECONDS,
+            help=f'Pause in seconds between batches (default: {RETENTION_THROTTLE_SECONDS})'
+        )
+        parser.add_argument(
+            '--ensure-partitions',
+            type=int,
+            metavar='MONTHS',
+            help='Create monthly partitions MONTHS ahead for partitioned tables, then exit'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be deleted without actually deleting'
+        )
+
+    def handle(self, *args, **options):
+        registered = get_retention_rules()
+        names = options['rules'] or list(registered)
+        unknown = [name for name in names if name not in registered]
+        if unknown:
+            raise CommandError(
+                f"Unknown retention rule(s): {', '.join(unknown)}. "
+                f"Available: {', '.join(registered)}"
+            )
+        rules = [registered[name] for name in names]
+
+        if options['ensure_partitions'] is not None:
+            self._ensure_partitions(rules, options['ensure_partitions'])
+            return
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No data will be deleted'))
+
+        engine = RetentionEngine(
+            batch_size=options['batch_size'],
+            time_budget=options['time_budget'],
+            throttle=options['throttle']
+        )
+
+        try:
+            results = engine.run_all(rules, dry_run=options['dry_run'])
+        except Exception as e:
+            logger.error(f"Retention cleanup failed: {e}")
+            raise CommandError(f'Cleanup failed: {e}')
+
+        for result in results:
+            if result.dry_run:
+                self.stdout.write(f'{result.rule}: would delete {result.matched} rows older than {result.cutoff:%Y-%m-%d}')
+                continue
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'{result.rule}: deleted {result.deleted} rows in {result.batches} batches '
+                    f'({result.duration:.2f}s)'
+                )
+            )
+            if result.partitions_dropped:
+                self.stdout.write(f"  Dropped partitions: {', '.join(result.partitions_dropped)}")
+            if result.archive_path:
+                self.stdout.write(f'  Archived {result.archived} rows to {result.archive_path}')
+            for error in result.errors:
+                self.stdout.write(self.style.ERROR(f'  Error: {error}'))
+            if not result.completed:
+                self.stdout.write(self.style.WARNING('  Time budget exhausted; the rest runs next time'))
+
+    def _ensure_partitions(self, rules, months_ahead):
+        for rule in rules:
+            if not rule.partitioned:
+                continue
+            manager = PartitionManager(rule.model, rule.date_field)
+            if not manager.is_partitioned():
+                self.stdout.write(f'{rule.name}: table is not partitioned, skipping')
+                continue
+            created = manager.ensure_monthly_partitions(months_ahead=months_ahead)
+            self.stdout.write(self.style.SUCCESS(f"{rule.name}: partitions ready ({', '.join(created)})"))
@@ -6,16 +6,18 @@ Provides command-line interface for:
 - Generating quarantine reports
 - Batch operations on quarantine records
 - System maintenance tasks
+- Rebuilding the daily quarantine counters
 """
 
 from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 import json
 
 from governance.services.quarantine_system import quarantine_system
-from governance.models import QuarantineRecord
+from governance.models import QuarantineRecord, QuarantineDailyCounter
 
 User = get_user_model()
 
@@ -139,6 +141,12 @@ class Command(BaseCommand):
             help='Output format'
         )
     
+        # Counter rebuild command
+        subparsers.add_parser(
+            'rebuild-counters',
+            help='Recompute the daily quarantine counters from the quarantine records'
+        )
+    
     def handle(self, *args, **options):
         """Handle command execution"""
         action = options.get('action')
@@ -162,6 +170,8 @@ class Command(BaseCommand):
                 self.handle_cleanup(options)
             elif action == 'trends':
                 self.handle_trends(options)
+            elif action == 'rebuild-counters':
+                self.handle_rebuild_counters(options)
             else:
                 raise CommandError(f"Unknown action: {action}")
                 
@@ -412,7 +422,9 @@ class Command(BaseCommand):
                     self.stdout.write(f"  ... and {count - 10} more")
         else:
             if count > 0:
-                old_records.delete()
+                with transaction.atomic():
+                    QuarantineDailyCounter.remove_records(old_records)
+                    old_records.delete()
                 self.stdout.write(self.style.SUCCESS(f"Deleted {count} old resolved quarantine records"))
             else:
                 self.stdout.write("No old resolved records to delete")
@@ -453,4 +465,9 @@ class Command(BaseCommand):
                 total = sum(item['count'] for item in trend_data)
                 self.stdout.write(f"  {corruption_type}: {total} total")
         else:
-            self.stdout.write("No corruption type trends available")
\ No newline at end of file
+            self.stdout.write("No corruption type trends available")
+    
+    def handle_rebuild_counters(self, options):
+        """Handle counter rebuild command"""
+        written = QuarantineDailyCounter.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} daily quarantine counters"))
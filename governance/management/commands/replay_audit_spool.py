@@ -0,0 +1,28 @@
+"""
+Django Management Command لإعادة سجلات التدقيق المحفوظة محلياً
+Replay spooled governance audit records into the database
+"""
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'إعادة سجلات التدقيق المحفوظة في ملفات spool إلى قاعدة البيانات'
+
+    def handle(self, *args, **options):
+        from governance.services.audit_writer import get_audit_writer
+
+        writer = get_audit_writer()
+        if not writer.spool_dir:
+            self.stdout.write(self.style.WARNING('لا يوجد مجلد spool مُعد في AUDIT_TRAIL'))
+            return
+
+        flushed = writer.flush()
+        restored = writer.replay_spool()
+        remaining = len(list(writer.spool_dir.glob('*.jsonl'))) if writer.spool_dir.is_dir() else 0
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ تمت كتابة {flushed} سجل من الذاكرة واستعادة {restored} سجل من spool'
+        ))
+        if remaining:
+            self.stdout.write(self.style.WARNING(f'⚠️ تبقى {remaining} ملف لم تتم استعادته'))
@@ -28,13 +28,11 @@ class Command(BaseCommand):
         parser.add_argument(
             '--corruption-types',
             nargs='+',
-            choices=[
-                'ORPHANED_JOURNAL_ENTRIES',
-                'NEGATIVE_STOCK',
-                'MULTIPLE_ACTIVE_ACADEMIC_YEARS',
-                'UNBALANCED_JOURNAL_ENTRIES'
-            ],
-            help='Specific corruption types to scan for (default: all types)'
+            help=(
+                'Specific corruption types to scan for (default: all types), e.g. '
+                'ORPHANED_JOURNAL_ENTRIES, NEGATIVE_STOCK, MULTIPLE_ACTIVE_ACCOUNTING_PERIODS, '
+                'UNBALANCED_JOURNAL_ENTRIES or any registered invariant scan'
+            )
         )
         
         parser.add_argument(
@@ -57,6 +55,18 @@ class Command(BaseCommand):
             help='Include detailed repair plans in the output'
         )
         
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only check journal entries created or changed since the last completed scan'
+        )
+        
+        parser.add_argument(
+            '--quarantine',
+            action='store_true',
+            help='Stream violations of the scanned invariant queries into quarantine'
+        )
+        
         parser.add_argument(
             '--quiet',
             action='store_true',
@@ -77,7 +87,7 @@ class Command(BaseCommand):
             user = self._get_scan_user(options.get('user'))
             
             # Initialize RepairService
-            repair_service = RepairService()
+            repair_service = RepairService(incremental=options['incremental'])
             repair_service.set_user(user)
             
             # Display scan header
@@ -105,6 +115,18 @@ class Command(BaseCommand):
             # Display scan results
             self._display_scan_results(corruption_report, options['quiet'])
             
+            # Stream invariant violations into quarantine if requested
+            if options['quarantine']:
+                for corruption_type in corruption_report.corruption_types:
+                    if corruption_type not in repair_service.invariant_scans:
+                        continue
+                    result = repair_service.quarantine_invariant_violations(corruption_type)
+                    if not options['quiet']:
+                        self.stdout.write(
+                            f"Quarantined {result['created_count']}/{result['requested_count']} "
+                            f"{corruption_type} violations"
+                        )
+            
             # Generate comprehensive repair report
             if options['detailed']:
                 if not options['quiet']:
@@ -42,6 +42,18 @@ class Command(BaseCommand):
             help='Show source linkage statistics'
         )
         
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only scan entries created or changed since the last completed scan'
+        )
+        
+        parser.add_argument(
+            '--reset-checkpoint',
+            action='store_true',
+            help='Forget the last scan checkpoint before scanning'
+        )
+        
         parser.add_argument(
             '--quiet',
             action='store_true',
@@ -100,7 +112,12 @@ class Command(BaseCommand):
             self.stdout.write("Scanning for orphaned journal entries...")
             
             batch_size = options['batch_size']
-            orphaned_entries = SourceLinkageService.scan_orphaned_entries(batch_size=batch_size)
+            if options['reset_checkpoint']:
+                SourceLinkageService.reset_scan_checkpoint()
+            orphaned_entries = SourceLinkageService.scan_orphaned_entries(
+                batch_size=batch_size,
+                incremental=options['incremental']
+            )
             
             if not orphaned_entries:
                 self.stdout.write(
@@ -4,17 +4,16 @@ Provides comprehensive logging for all sensitive operations across all domains.
 """
 
 import logging
-import threading
-import time
 from django.utils.deprecation import MiddlewareMixin
-from django.db import transaction
 from django.contrib.auth.models import AnonymousUser
 from django.core.serializers.json import DjangoJSONEncoder
 from django.forms.models import model_to_dict
 from django.apps import apps
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from core.middleware.request_pipeline import get_request_context
 from governance.models import AuditTrail, GovernanceContext
+from governance.field_tracking import FieldTrackingMixin
 from governance.services import AuditService
 from governance.thread_safety import monitor_operation
 import json
@@ -43,10 +42,6 @@ HIGH_RISK_MODELS = {
     'auth.Group': {'level': 'HIGH', 'capture_data': False},
 }
 
-# Thread-local storage for before data capture
-_audit_context = threading.local()
-
-
 class GovernanceAuditMiddleware(MiddlewareMixin):
     """
     Comprehensive audit middleware for governance system.
@@ -60,10 +55,10 @@ class GovernanceAuditMiddleware(MiddlewareMixin):
         
     def _connect_signals(self):
         """Connect to Django model signals for automatic audit logging"""
-        # Connect pre_save for before data capture
-        pre_save.connect(self._capture_before_data, dispatch_uid='governance_pre_save')
+        # Before-images come from FieldTrackingMixin snapshots taken at load
+        # time, so no pre_save hook (and no extra locked read) is needed
         
-        # Connect post_save for after data capture
+        # Connect post_save for before/after diff capture
         post_save.connect(self._log_model_save, dispatch_uid='governance_post_save')
         
         # Connect post_delete for deletion logging
@@ -81,24 +76,15 @@ class GovernanceAuditMiddleware(MiddlewareMixin):
             request=request
         )
         
-        # Store request start time for performance monitoring
-        request._governance_start_time = time.time()
-        
         return None
     
     def process_response(self, request, response):
         """Clean up governance context and log request completion"""
         try:
-            # Calculate request duration
-            if hasattr(request, '_governance_start_time'):
-                duration = time.time() - request._governance_start_time
-                
-                # Log slow requests (>2 seconds) for monitoring
-                if duration > 2.0:
-                    logger.warning(f"Slow request detected: {request.path} took {duration:.2f}s")
+            # Slow requests are logged once by the request pipeline's MonitoringHook
             
             # Log high-risk admin operations
-            if request.path.startswith('/admin/') and request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
+            if get_request_context(request).endpoint_class == 'admin' and request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
                 self._log_admin_operation(request, response)
             
         except Exception as e:
@@ -171,62 +157,30 @@ class GovernanceAuditMiddleware(MiddlewareMixin):
         except Exception as e:
             logger.error(f"Error logging admin operation: {e}")
     
-    def _capture_before_data(self, sender, instance, **kwargs):
-        """Capture before data for high-risk models (thread-safe)"""
-        model_key = f"{sender._meta.app_label}.{sender._meta.model_name}"
-        
-        # Only capture for high-risk models that require data capture
-        if model_key in HIGH_RISK_MODELS and HIGH_RISK_MODELS[model_key].get('capture_data', False):
-            try:
-                # Use thread-local storage to store before data
-                if not hasattr(_audit_context, 'before_data'):
-                    _audit_context.before_data = {}
-                
-                # Create a unique key for this instance
-                instance_key = f"{model_key}_{instance.pk if instance.pk else 'new'}"
-                
-                # Capture current data if instance exists in database
-                if instance.pk:
-                    try:
-                        # Get current data from database (thread-safe)
-                        with transaction.atomic():
-                            current_instance = sender.objects.select_for_update(nowait=True).get(pk=instance.pk)
-                            _audit_context.before_data[instance_key] = self._serialize_model_data(current_instance)
-                    except sender.DoesNotExist:
-                        _audit_context.before_data[instance_key] = None
-                    except Exception as e:
-                        logger.warning(f"Could not capture before data for {instance_key}: {e}")
-                        _audit_context.before_data[instance_key] = None
-                else:
-                    # New instance - no before data
-                    _audit_context.before_data[instance_key] = None
-                    
-            except Exception as e:
-                logger.error(f"Error capturing before data for {model_key}: {e}")
-    
     def _log_model_save(self, sender, instance, created, **kwargs):
         """Log model save operations for high-risk models"""
-        model_key = f"{sender._meta.app_label}.{sender._meta.model_name}"
+        model_key = sender._meta.label
         
         # Only log high-risk models
         if model_key in HIGH_RISK_MODELS:
             try:
                 with monitor_operation("audit_model_save"):
-                    # Get before data from thread-local storage
                     before_data = None
                     after_data = None
                     
                     if HIGH_RISK_MODELS[model_key].get('capture_data', False):
-                        instance_key = f"{model_key}_{instance.pk}"
-                        
-                        # Get before data
-                        if hasattr(_audit_context, 'before_data') and instance_key in _audit_context.before_data:
-                            before_data = _audit_context.before_data[instance_key]
-                            # Clean up to prevent memory leaks
-                            del _audit_context.before_data[instance_key]
-                        
-                        # Capture after data
-                        after_data = self._serialize_model_data(instance)
+                        if not created and isinstance(instance, FieldTrackingMixin) and instance.is_tracked():
+                            # Diff against the values loaded from the database (changed fields only)
+                            changes = instance.get_field_changes()
+                            before_data = self._serialize_values(
+                                instance, {name: old for name, (old, new) in changes.items()}
+                            )
+                            after_data = self._serialize_values(
+                                instance, {name: new for name, (old, new) in changes.items()}
+                            )
+                        else:
+                            # New (or untracked) instance - full after image, no before image
+                            after_data = self._serialize_model_data(instance)
                     
                     # Determine operation type
                     operation = 'CREATE' if created else 'UPDATE'
@@ -254,7 +208,7 @@ class GovernanceAuditMiddleware(MiddlewareMixin):
     
     def _log_model_delete(self, sender, instance, **kwargs):
         """Log model deletion operations for high-risk models"""
-        model_key = f"{sender._meta.app_label}.{sender._meta.model_name}"
+        model_key = sender._meta.label
         
         # Only log high-risk models
         if model_key in HIGH_RISK_MODELS:
@@ -292,24 +246,8 @@ class GovernanceAuditMiddleware(MiddlewareMixin):
         """
         try:
             # Use model_to_dict for basic serialization
-            data = model_to_dict(instance)
-            
-            # Convert to JSON-serializable format
-            serialized_data = {}
-            for key, value in data.items():
-                try:
-                    # Test JSON serialization
-                    json.dumps(value, cls=DjangoJSONEncoder)
-                    serialized_data[key] = value
-                except (TypeError, ValueError):
-                    # Convert non-serializable values to string
-                    serialized_data[key] = str(value)
-            
-            # Add metadata
-            serialized_data['_model'] = f"{instance._meta.app_label}.{instance._meta.model_name}"
-            serialized_data['_pk'] = instance.pk
+            serialized_data = self._serialize_values(instance, model_to_dict(instance))
             serialized_data['_str'] = str(instance)
-            
             return serialized_data
             
         except Exception as e:
@@ -320,6 +258,27 @@ class GovernanceAuditMiddleware(MiddlewareMixin):
                 '_str': str(instance),
                 '_serialization_error': str(e)
             }
+    
+    def _serialize_values(self, instance, data):
+        """
+        Convert a field→value mapping to JSON-safe data plus instance metadata.
+        str(instance) is left to full images since it may hit related rows.
+        """
+        serialized_data = {}
+        for key, value in data.items():
+            try:
+                # Test JSON serialization
+                json.dumps(value, cls=DjangoJSONEncoder)
+                serialized_data[key] = value
+            except (TypeError, ValueError):
+                # Convert non-serializable values to string
+                serialized_data[key] = str(value)
+        
+        # Add metadata
+        serialized_data['_model'] = f"{instance._meta.app_label}.{instance._meta.model_name}"
+        serialized_data['_pk'] = instance.pk
+        
+        return serialized_data
 
 
 class GovernanceContextMiddleware(MiddlewareMixin):
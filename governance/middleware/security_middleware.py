@@ -4,6 +4,7 @@ from django.utils.deprecation import MiddlewareMixin
 from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
 from django.dispatch import receiver
 from django.utils import timezone
+from core.middleware.request_pipeline import get_request_context
 from governance.models import BlockedIP, ActiveSession, SecurityIncident
 import logging
 
@@ -48,12 +49,7 @@ class BlockedIPMiddleware(MiddlewareMixin):
     @staticmethod
     def get_client_ip(request):
         """Extract client IP from request"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0].strip()
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        return get_request_context(request).ip
 
 
 class SessionTrackingMiddleware(MiddlewareMixin):
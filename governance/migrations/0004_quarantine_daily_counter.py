@@ -0,0 +1,62 @@
+# Generated by Django 4.2.26 on 2026-10-18 23:53
+
+from django.db import migrations, models
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_quarantine_counters(apps, schema_editor):
+    QuarantineRecord = apps.get_model('governance', 'QuarantineRecord')
+    QuarantineDailyCounter = apps.get_model('governance', 'QuarantineDailyCounter')
+
+    resolution_time = ExpressionWrapper(F('resolved_at') - F('quarantined_at'), output_field=DurationField())
+    rows = QuarantineRecord.objects.order_by().annotate(
+        day=TruncDate('quarantined_at')
+    ).values('day', 'corruption_type', 'model_name', 'status').annotate(
+        records=Count('id'),
+        resolution_time=Sum(resolution_time, filter=Q(status='RESOLVED', resolved_at__isnull=False))
+    )
+    QuarantineDailyCounter.objects.bulk_create([
+        QuarantineDailyCounter(
+            day=row['day'],
+            corruption_type=row['corruption_type'],
+            model_name=row['model_name'],
+            status=row['status'],
+            count=row['records'],
+            resolution_seconds=row['resolution_time'].total_seconds() if row['resolution_time'] else 0.0
+        )
+        for row in rows
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('governance', '0003_audittrail_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuarantineDailyCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('corruption_type', models.CharField(max_length=100)),
+                ('model_name', models.CharField(max_length=100)),
+                ('status', models.CharField(max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('resolution_seconds', models.FloatField(default=0.0, help_text='Total time to resolution of the RESOLVED records in this bucket')),
+            ],
+            options={
+                'verbose_name': 'Quarantine Daily Counter',
+                'verbose_name_plural': 'Quarantine Daily Counters',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day'], name='governance__day_f78f50_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='quarantinedailycounter',
+            constraint=models.UniqueConstraint(fields=('day', 'corruption_type', 'model_name', 'status'), name='unique_quarantine_daily_counter'),
+        ),
+        migrations.RunPython(backfill_quarantine_counters, migrations.RunPython.noop),
+    ]
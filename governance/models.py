@@ -2,11 +2,13 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from django.db import transaction
+from django.db import transaction, IntegrityError
 import threading
 import json
 import logging
 
+from .field_tracking import FieldTrackingMixin
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
@@ -61,44 +63,69 @@ class IdempotencyRecord(models.Model):
         return self.expires_at <= timezone.now()
     
     @classmethod
-    def check_and_record(cls, operation_type, idempotency_key, result_data, user, expires_in_hours=24):
+    def check_and_record(cls, operation_type, idempotency_key, result_data, user,
+                         expires_in_hours=24, lookup_first=True):
         """
         Thread-safe method to check for existing operation or record new one.
         Returns (is_duplicate, record)
+        
+        Insert-first: the unique (operation_type, idempotency_key) constraint
+        decides who records the key, so a new key costs a single INSERT.
+        Existing rows are only read (and locked) after a conflict, or up front
+        when lookup_first is True because the key has probably been seen.
+        
+        Raises IntegrityError if a conflicting row vanished before it could be
+        read (a concurrent expiry replacement); callers may retry.
         """
-        with transaction.atomic():
-            try:
-                # Try to get existing record
-                existing = cls.objects.select_for_update().get(
-                    operation_type=operation_type,
-                    idempotency_key=idempotency_key
-                )
-                
-                if existing.is_expired():
-                    # Record expired, delete it and create new one
-                    existing.delete()
-                    record = cls.objects.create(
-                        operation_type=operation_type,
-                        idempotency_key=idempotency_key,
-                        result_data=result_data,
-                        expires_at=timezone.now() + timezone.timedelta(hours=expires_in_hours),
-                        created_by=user
-                    )
-                    return False, record
-                else:
-                    # Return existing result
-                    return True, existing
-                    
-            except cls.DoesNotExist:
-                # No existing record, create new one
+        expires_at = timezone.now() + timezone.timedelta(hours=expires_in_hours)
+        
+        if lookup_first:
+            existing = cls.objects.filter(
+                operation_type=operation_type,
+                idempotency_key=idempotency_key
+            ).first()
+            if existing is not None and not existing.is_expired():
+                return True, existing
+        
+        try:
+            # Savepoint, so a conflict does not poison the caller's transaction
+            with transaction.atomic():
                 record = cls.objects.create(
                     operation_type=operation_type,
                     idempotency_key=idempotency_key,
                     result_data=result_data,
-                    expires_at=timezone.now() + timezone.timedelta(hours=expires_in_hours),
+                    expires_at=expires_at,
                     created_by=user
                 )
-                return False, record
+            return False, record
+        except IntegrityError:
+            pass
+        
+        with transaction.atomic():
+            existing = cls.objects.select_for_update().filter(
+                operation_type=operation_type,
+                idempotency_key=idempotency_key
+            ).first()
+            
+            if existing is None:
+                raise IntegrityError(
+                    f"Idempotency record {operation_type}:{idempotency_key} changed concurrently"
+                )
+            
+            if not existing.is_expired():
+                # Return existing result
+                return True, existing
+            
+            # Record expired, delete it and create new one
+            existing.delete()
+            record = cls.objects.create(
+                operation_type=operation_type,
+                idempotency_key=idempotency_key,
+                result_data=result_data,
+                expires_at=expires_at,
+                created_by=user
+            )
+            return False, record
 
 
 class AuditTrail(models.Model):
@@ -135,7 +162,8 @@ class AuditTrail(models.Model):
         related_name='governance_audit_trails',
         help_text="User who performed the operation (null for system operations)"
     )
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set by the caller (not auto_now_add) so buffered and spooled records keep their capture time
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     before_data = models.JSONField(
         null=True,
         blank=True,
@@ -250,13 +278,13 @@ class AuditTrail(models.Model):
     
     @staticmethod
     def _get_client_ip(request):
-        """Extract client IP from request"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        """Extract client IP from request, reusing the request pipeline context when present"""
+        from core.middleware.request_pipeline import RequestContext, parse_client_ip
+
+        context = getattr(request, 'pipeline_context', None)
+        if isinstance(context, RequestContext):
+            return context.ip
+        return parse_client_ip(request.META)
     
     def mark_as_resolved(self, user, notes=""):
         """Mark this audit trail as resolved"""
@@ -279,9 +307,12 @@ class AuditTrail(models.Model):
         return self.resolution_status == 'ACTIVE'
 
 
-class QuarantineRecord(models.Model):
+class QuarantineRecord(FieldTrackingMixin, models.Model):
     """
     Isolates suspicious or corrupted data for investigation.
+    
+    Every save and delete keeps QuarantineDailyCounter in step within the same
+    transaction, so dashboards read rollups instead of scanning this table.
     """
     model_name = models.CharField(
         max_length=100,
@@ -357,6 +388,47 @@ class QuarantineRecord(models.Model):
     def __str__(self):
         return f"{self.corruption_type} - {self.model_name}#{self.object_id}"
     
+    def _counter_values(self):
+        """Current values of the columns QuarantineDailyCounter buckets by"""
+        return {name: getattr(self, name) for name in QuarantineDailyCounter.BUCKET_FIELDS}
+    
+    def _stored_counter_values(self):
+        """Counter columns as stored, from the load snapshot when it has them all"""
+        loaded = self._loaded_values if self.is_tracked() else {}
+        if all(name in loaded for name in QuarantineDailyCounter.BUCKET_FIELDS):
+            return {name: loaded[name] for name in QuarantineDailyCounter.BUCKET_FIELDS}
+        return type(self)._base_manager.filter(pk=self.pk).values(*QuarantineDailyCounter.BUCKET_FIELDS).first()
+    
+    def save(self, *args, **kwargs):
+        stored = None if self._state.adding else self._stored_counter_values()
+        previous = QuarantineDailyCounter.bucket_for(stored) if stored else None
+        
+        current_values = self._counter_values()
+        update_fields = kwargs.get('update_fields')
+        if stored and update_fields is not None:
+            # Only the listed columns reach the database
+            current_values = {
+                name: current_values[name] if name in update_fields else stored[name]
+                for name in QuarantineDailyCounter.BUCKET_FIELDS
+            }
+        
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            if previous is None or update_fields is None:
+                current_values = self._counter_values()  # quarantined_at is set by the insert
+            current = QuarantineDailyCounter.bucket_for(current_values)
+            if previous != current:
+                if previous is not None:
+                    QuarantineDailyCounter.adjust(*previous, delta=-1)
+                QuarantineDailyCounter.adjust(*current, delta=1)
+    
+    def delete(self, *args, **kwargs):
+        bucket = QuarantineDailyCounter.bucket_for(self._stored_counter_values() or self._counter_values())
+        with transaction.atomic(using=kwargs.get('using')):
+            result = super().delete(*args, **kwargs)
+            QuarantineDailyCounter.adjust(*bucket, delta=-1)
+        return result
+    
     def resolve(self, user, notes=""):
         """Mark quarantine record as resolved"""
         with transaction.atomic():
@@ -379,6 +451,152 @@ class QuarantineRecord(models.Model):
             )
 
 
+class QuarantineDailyCounter(models.Model):
+    """
+    Daily rollup of quarantine records per (day, corruption_type, model_name, status).
+    
+    `day` is the local date the record was quarantined on, so the counters hold
+    the current status distribution of each day's quarantines. Maintained by
+    QuarantineRecord.save/delete and QuarantineStorage.batch_store_quarantine_records;
+    rebuild() recomputes them from QuarantineRecord after bulk changes.
+    """
+    # QuarantineRecord columns that decide a record's bucket
+    BUCKET_FIELDS = ('quarantined_at', 'corruption_type', 'model_name', 'status', 'resolved_at')
+    
+    day = models.DateField()
+    corruption_type = models.CharField(max_length=100)
+    model_name = models.CharField(max_length=100)
+    status = models.CharField(max_length=50)
+    count = models.IntegerField(default=0)
+    resolution_seconds = models.FloatField(
+        default=0.0,
+        help_text="Total time to resolution of the RESOLVED records in this bucket"
+    )
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'corruption_type', 'model_name', 'status'],
+                name='unique_quarantine_daily_counter'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day']),
+        ]
+        verbose_name = "Quarantine Daily Counter"
+        verbose_name_plural = "Quarantine Daily Counters"
+        ordering = ['-day']
+    
+    def __str__(self):
+        return f"{self.day} {self.corruption_type}/{self.status}: {self.count}"
+    
+    @staticmethod
+    def bucket_for(values):
+        """
+        Counter bucket and resolution seconds for a record's column values.
+        
+        Returns:
+            tuple: (day, corruption_type, model_name, status, resolution_seconds)
+        """
+        quarantined_at = values.get('quarantined_at')
+        resolved_at = values.get('resolved_at')
+        seconds = 0.0
+        if values.get('status') == 'RESOLVED' and resolved_at and quarantined_at:
+            seconds = (resolved_at - quarantined_at).total_seconds()
+        return (
+            timezone.localdate(quarantined_at) if quarantined_at else timezone.localdate(),
+            values.get('corruption_type'),
+            values.get('model_name'),
+            values.get('status'),
+            seconds,
+        )
+    
+    @classmethod
+    def adjust(cls, day, corruption_type, model_name, status, resolution_seconds=0.0, delta=1):
+        """
+        Atomically add `delta` records (and their resolution time) to a bucket.
+        
+        Update-first: the bucket normally exists, so the common path is a single
+        UPDATE; the first record of a bucket inserts it inside a savepoint and
+        falls back to the UPDATE if a concurrent writer created it first.
+        """
+        bucket = cls.objects.filter(
+            day=day, corruption_type=corruption_type, model_name=model_name, status=status
+        )
+        changes = {
+            'count': models.F('count') + delta,
+            'resolution_seconds': models.F('resolution_seconds') + resolution_seconds * delta,
+        }
+        if bucket.update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    day=day, corruption_type=corruption_type, model_name=model_name, status=status,
+                    count=delta, resolution_seconds=resolution_seconds * delta
+                )
+        except IntegrityError:
+            bucket.update(**changes)
+    
+    @staticmethod
+    def _grouped_buckets(queryset):
+        """Records of a QuarantineRecord queryset grouped into counter buckets (in SQL)"""
+        from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+        from django.db.models.functions import TruncDate
+        
+        resolution_time = ExpressionWrapper(F('resolved_at') - F('quarantined_at'), output_field=DurationField())
+        rows = queryset.order_by().annotate(
+            day=TruncDate('quarantined_at')
+        ).values('day', 'corruption_type', 'model_name', 'status').annotate(
+            records=Count('id'),
+            resolution_time=Sum(
+                resolution_time,
+                filter=Q(status='RESOLVED', resolved_at__isnull=False)
+            )
+        )
+        for row in rows:
+            seconds = row['resolution_time'].total_seconds() if row['resolution_time'] else 0.0
+            yield row['day'], row['corruption_type'], row['model_name'], row['status'], row['records'], seconds
+    
+    @classmethod
+    def remove_records(cls, queryset):
+        """
+        Subtract the records of a QuarantineRecord queryset from the counters.
+        
+        Call in the same transaction as queryset.delete()/update(), which bypass
+        QuarantineRecord.save and delete.
+        """
+        for day, corruption_type, model_name, status, records, seconds in cls._grouped_buckets(queryset):
+            bucket = cls.objects.filter(
+                day=day, corruption_type=corruption_type, model_name=model_name, status=status
+            )
+            bucket.update(
+                count=models.F('count') - records,
+                resolution_seconds=models.F('resolution_seconds') - seconds
+            )
+    
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute every counter from QuarantineRecord (one grouped query).
+        
+        Returns:
+            int: Number of counter rows written
+        """
+        counters = [
+            cls(
+                day=day, corruption_type=corruption_type, model_name=model_name, status=status,
+                count=records, resolution_seconds=seconds
+            )
+            for day, corruption_type, model_name, status, records, seconds
+            in cls._grouped_buckets(QuarantineRecord.objects.all())
+        ]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(counters, batch_size=500)
+        return len(counters)
+
+
 class AuthorityDelegation(models.Model):
     """
     Manages temporary authority delegation between services.
@@ -8,6 +8,7 @@ including audit services, authority management, and security controls.
 
 from .audit_service import AuditService, audit_operation
 from .repair_service import RepairService, CorruptionReport, RepairPolicy, RepairPlan
+from .invariant_scans import InvariantScan, register_invariant_scan, get_invariant_scans
 from .repair_policy_framework import (
     RepairPolicyFramework, RepairPolicyType, ConfidenceLevel, 
     DetailedRepairPlan, RepairStatus, RepairAction, VerificationInvariant, RollbackStrategy
@@ -55,6 +56,9 @@ __all__ = [
     'CorruptionReport',
     'RepairPolicy',
     'RepairPlan',
+    'InvariantScan',
+    'register_invariant_scan',
+    'get_invariant_scans',
     'RepairPolicyFramework',
     'RepairPolicyType',
     'ConfidenceLevel',
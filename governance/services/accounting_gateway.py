@@ -260,7 +260,8 @@ class AccountingGateway:
         date: Optional[datetime] = None,
         accounting_period: Optional[AccountingPeriod] = None,
         financial_category=None,
-        financial_subcategory=None
+        financial_subcategory=None,
+        bulk_insert_lines: bool = False
     ) -> JournalEntry:
         """
         Create a journal entry with full validation and thread-safety.
@@ -283,6 +284,8 @@ class AccountingGateway:
             accounting_period: Accounting period (auto-determined if not provided)
             financial_category: Optional financial category for tracking
             financial_subcategory: Optional financial subcategory for detailed tracking
+            bulk_insert_lines: Insert all lines with a single bulk_create instead of
+                one save() per line (for large consolidated entries such as payroll runs)
             
         Returns:
             JournalEntry: The created journal entry
@@ -348,7 +351,8 @@ class AccountingGateway:
                     date=date,
                     accounting_period=accounting_period,
                     financial_category=financial_category,
-                    financial_subcategory=financial_subcategory
+                    financial_subcategory=financial_subcategory,
+                    bulk_insert_lines=bulk_insert_lines
                 )
                 
                 # Update idempotency record with result
@@ -436,7 +440,8 @@ class AccountingGateway:
         date: Optional[datetime],
         accounting_period: Optional[AccountingPeriod],
         financial_category=None,
-        financial_subcategory=None
+        financial_subcategory=None,
+        bulk_insert_lines: bool = False
     ) -> JournalEntry:
         """
         Create journal entry within atomic transaction with proper locking.
@@ -485,8 +490,8 @@ class AccountingGateway:
             journal_entry.save()
             
             # Create journal entry lines
-            for line_data in validated_lines:
-                line = JournalEntryLine(
+            entry_lines = [
+                JournalEntryLine(
                     journal_entry=journal_entry,
                     account=line_data['account'],
                     debit=line_data['debit'],
@@ -495,7 +500,13 @@ class AccountingGateway:
                     cost_center=line_data.get('cost_center'),
                     project=line_data.get('project')
                 )
-                line.save()
+                for line_data in validated_lines
+            ]
+            if bulk_insert_lines:
+                JournalEntryLine.objects.bulk_create(entry_lines)
+            else:
+                for line in entry_lines:
+                    line.save()
             
             # Final validation of complete entry
             self._validate_complete_entry(journal_entry)
@@ -641,13 +652,21 @@ class AccountingGateway:
         total_debit = Decimal('0')
         total_credit = Decimal('0')
         
+        # Resolve all accounts in one query
+        accounts = {
+            account.code: account
+            for account in ChartOfAccounts.objects.filter(
+                code__in={line_data.account_code for line_data in lines},
+                is_active=True
+            )
+        }
+        
         for i, line_data in enumerate(lines):
             try:
                 # Get account
-                account = ChartOfAccounts.objects.get(
-                    code=line_data.account_code,
-                    is_active=True
-                )
+                account = accounts.get(line_data.account_code)
+                if account is None:
+                    raise ChartOfAccounts.DoesNotExist
                 
                 # Validate account can post entries
                 if not account.can_post_entries():
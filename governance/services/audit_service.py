@@ -7,6 +7,7 @@ all operations on high-risk models, especially admin panel access attempts.
 
 Key Features:
 - Thread-safe audit record creation
+- Buffered bulk writes at transaction commit (see audit_writer)
 - Comprehensive context capture
 - Admin access attempt logging
 - Authority violation tracking
@@ -25,6 +26,7 @@ from datetime import datetime
 
 from ..models import AuditTrail
 from ..thread_safety import ThreadSafeOperationMixin
+from .audit_writer import get_audit_writer, is_buffering_enabled
 
 User = get_user_model()
 logger = logging.getLogger('governance.audit_service')
@@ -39,7 +41,6 @@ class AuditService(ThreadSafeOperationMixin):
     """
     
     @classmethod
-    @transaction.atomic
     def create_audit_record(
         cls,
         model_name: str,
@@ -49,11 +50,17 @@ class AuditService(ThreadSafeOperationMixin):
         source_service: str = "Unknown",
         before_data: Optional[Dict] = None,
         after_data: Optional[Dict] = None,
-        additional_context: Optional[Dict] = None
+        additional_context: Optional[Dict] = None,
+        sync: bool = False
     ) -> AuditTrail:
         """
         Create a comprehensive audit trail record.
         
+        By default the record is handed to the buffered audit writer, which
+        queues it when the surrounding transaction commits and inserts it with
+        bulk_create. Pass ``sync=True`` (or disable AUDIT_TRAIL['BUFFERED_WRITES'])
+        for entries that must be written atomically with the business write.
+        
         Args:
             model_name: Name of the model being operated on
             object_id: ID of the specific object (if applicable)
@@ -63,9 +70,10 @@ class AuditService(ThreadSafeOperationMixin):
             before_data: Data before the operation
             after_data: Data after the operation
             additional_context: Any additional context information
+            sync: Insert immediately inside the current transaction
             
         Returns:
-            AuditTrail: The created audit record
+            AuditTrail: The audit record (unsaved until flushed when buffered)
         """
         try:
             # ✅ Skip audit if object_id is None (e.g., pre_save signals before object creation)
@@ -75,42 +83,39 @@ class AuditService(ThreadSafeOperationMixin):
                 )
                 return None
             
-            # Ensure thread-safe operation
-            with cls._get_thread_lock():
-                # Prepare audit data
-                audit_data = {
+            audit_record = AuditTrail(
+                model_name=model_name,
+                object_id=str(object_id),
+                operation=operation,
+                source_service=source_service,
+                timestamp=timezone.now(),
+                before_data=cls._sanitize_data(before_data),
+                after_data=cls._sanitize_data(after_data),
+                additional_context=cls._sanitize_data(additional_context),
+                user=user or None
+            )
+            
+            if sync or not is_buffering_enabled():
+                with transaction.atomic():
+                    audit_record.save(force_insert=True)
+            else:
+                get_audit_writer().submit(audit_record)
+            
+            # Log to application logger as well
+            logger.info(
+                f"Audit record created: {operation} on {model_name} "
+                f"by {user.username if user else 'system'} via {source_service}",
+                extra={
+                    'audit_id': audit_record.id,
                     'model_name': model_name,
-                    'object_id': str(object_id),
+                    'object_id': object_id,
                     'operation': operation,
-                    'source_service': source_service,
-                    'timestamp': timezone.now(),
-                    'before_data': cls._sanitize_data(before_data),
-                    'after_data': cls._sanitize_data(after_data),
-                    'additional_context': cls._sanitize_data(additional_context)
+                    'user_id': user.id if user else None,
+                    'source_service': source_service
                 }
-                
-                # Add user if provided
-                if user:
-                    audit_data['user'] = user
-                
-                # Create audit record
-                audit_record = AuditTrail.objects.create(**audit_data)
-                
-                # Log to application logger as well
-                logger.info(
-                    f"Audit record created: {operation} on {model_name} "
-                    f"by {user.username if user else 'system'} via {source_service}",
-                    extra={
-                        'audit_id': audit_record.id,
-                        'model_name': model_name,
-                        'object_id': object_id,
-                        'operation': operation,
-                        'user_id': user.id if user else None,
-                        'source_service': source_service
-                    }
-                )
-                
-                return audit_record
+            )
+            
+            return audit_record
                 
         except Exception as e:
             # Log the error but don't let audit failures break the application
@@ -413,12 +418,16 @@ class AuditService(ThreadSafeOperationMixin):
         Returns:
             AuditTrail: The created audit record or None if failed
         """
+        before_data = kwargs.pop('before_data', None)
+        after_data = kwargs.pop('after_data', None)
         return cls.create_audit_record(
             model_name=model_name,
             object_id=object_id,
             operation=operation,
             user=user,
             source_service=source_service,
+            before_data=before_data,
+            after_data=after_data,
             additional_context=kwargs
         )
     
@@ -597,6 +606,7 @@ class AuditService(ThreadSafeOperationMixin):
         if additional_context:
             payment_context.update(additional_context)
         
+        # Payment audit rows are written in the same transaction as the payment
         return cls.create_audit_record(
             model_name='hr.PayrollPayment',
             object_id=payment_instance.id,
@@ -605,7 +615,8 @@ class AuditService(ThreadSafeOperationMixin):
             source_service=source_service,
             before_data=before_data,
             after_data=after_data,
-            additional_context=payment_context
+            additional_context=payment_context,
+            sync=True
         )
     
     @classmethod
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Buffered Audit Writer for Code Governance System
+
+Collects AuditTrail rows in a bounded in-process queue and writes them with
+bulk_create instead of one INSERT per audited operation.
+
+Key Features:
+- Records are queued only when the surrounding transaction commits, so audit
+  rows for rolled-back business writes are dropped exactly as before
+- Flush on batch size, on buffer age (background flusher) and at process exit
+- Bounded queue: a full buffer is flushed inline by the producing thread
+- Durable local spool (JSON lines) when the database is unavailable, replayed
+  on the next successful flush or via the replay_audit_spool command
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from functools import partial
+from pathlib import Path
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils.dateparse import parse_datetime
+
+from ..models import AuditTrail
+
+logger = logging.getLogger('governance.audit_writer')
+
+# Columns written to the spool; must cover every field create_audit_record sets
+SPOOL_FIELDS = (
+    'model_name', 'object_id', 'operation', 'user_id', 'source_service',
+    'timestamp', 'before_data', 'after_data', 'additional_context',
+)
+
+
+class BufferedAuditWriter:
+    """
+    Process-wide buffer that batches AuditTrail inserts.
+
+    Producers call submit(); the record joins the queue on transaction commit
+    and is written by whichever flush trigger fires first.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 200,
+        max_age_seconds: float = 2.0,
+        capacity: int = 5000,
+        spool_dir: Optional[str] = None
+    ):
+        self.batch_size = batch_size
+        self.max_age_seconds = max_age_seconds
+        self.capacity = capacity
+        self.spool_dir = Path(spool_dir) if spool_dir else None
+        self._queue = deque()
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+        self._stopped = threading.Event()
+
+    def submit(self, record: AuditTrail) -> AuditTrail:
+        """Queue an unsaved AuditTrail once the current transaction commits."""
+        transaction.on_commit(partial(self._enqueue, record))
+        return record
+
+    def pending_count(self) -> int:
+        return len(self._queue)
+
+    def _enqueue(self, record: AuditTrail):
+        with self._lock:
+            self._queue.append(record)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            should_flush = (
+                len(self._queue) >= self.batch_size
+                or len(self._queue) >= self.capacity
+                or time.monotonic() - self._oldest >= self.max_age_seconds
+            )
+
+        if should_flush:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def _drain(self) -> List[AuditTrail]:
+        with self._lock:
+            batch = list(self._queue)
+            self._queue.clear()
+            self._oldest = None
+        return batch
+
+    def flush(self) -> int:
+        """Write every queued record; spool them if the database rejects the batch."""
+        with self._flush_lock:
+            batch = self._drain()
+            if not batch:
+                return 0
+
+            try:
+                AuditTrail.objects.bulk_create(batch, batch_size=self.batch_size)
+            except DatabaseError as e:
+                logger.error(f"Audit flush failed, spooling {len(batch)} records: {e}")
+                self._spool(batch)
+                return 0
+
+            logger.debug(f"Flushed {len(batch)} audit records")
+            self._replay_pending_spool()
+            return len(batch)
+
+    # ------------------------------------------------------------------
+    # Background flusher
+    # ------------------------------------------------------------------
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name='governance-audit-flusher', daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stopped.wait(self.max_age_seconds):
+            if not self._queue:
+                continue
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Background audit flush failed: {e}")
+            finally:
+                close_old_connections()
+
+    def shutdown(self):
+        """Stop the background flusher and write whatever is still queued."""
+        self._stopped.set()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Final audit flush failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Durable spool
+    # ------------------------------------------------------------------
+
+    def _spool(self, batch: List[AuditTrail]):
+        if not self.spool_dir:
+            logger.critical(f"No audit spool configured, {len(batch)} audit records lost")
+            return
+
+        try:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            path = self.spool_dir / f'audit-{int(time.time())}-{uuid.uuid4().hex[:8]}.jsonl'
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as spool_file:
+                for record in batch:
+                    row = {field: getattr(record, field) for field in SPOOL_FIELDS}
+                    spool_file.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False))
+                    spool_file.write('\n')
+                spool_file.flush()
+                os.fsync(spool_file.fileno())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.critical(f"Failed to spool {len(batch)} audit records: {e}")
+
+    def _replay_pending_spool(self):
+        if self.spool_dir and self.spool_dir.is_dir() and any(self.spool_dir.glob('*.jsonl')):
+            self.replay_spool()
+
+    def replay_spool(self) -> int:
+        """Insert spooled records back into the database; returns rows restored."""
+        if not self.spool_dir or not self.spool_dir.is_dir():
+            return 0
+
+        restored = 0
+        for path in sorted(self.spool_dir.glob('*.jsonl')):
+            with open(path, encoding='utf-8') as spool_file:
+                records = []
+                for line in spool_file:
+                    if not line.strip():
+                        continue
+                    row = json.loads(line)
+                    row['timestamp'] = parse_datetime(row['timestamp'])
+                    records.append(AuditTrail(**row))
+            try:
+                AuditTrail.objects.bulk_create(records, batch_size=self.batch_size)
+            except DatabaseError as e:
+                logger.warning(f"Audit spool replay stopped at {path.name}: {e}")
+                break
+            path.unlink()
+            restored += len(records)
+
+        if restored:
+            logger.info(f"Replayed {restored} spooled audit records")
+        return restored
+
+
+def _build_writer() -> BufferedAuditWriter:
+    config = getattr(settings, 'AUDIT_TRAIL', {})
+    return BufferedAuditWriter(
+        batch_size=config.get('BUFFER_BATCH_SIZE', 200),
+        max_age_seconds=config.get('BUFFER_MAX_AGE_SECONDS', 2.0),
+        capacity=config.get('BUFFER_CAPACITY', 5000),
+        spool_dir=config.get('SPOOL_DIR'),
+    )
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer() -> BufferedAuditWriter:
+    """Return the process-wide writer, creating it from settings.AUDIT_TRAIL."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = _build_writer()
+                atexit.register(_writer.shutdown)
+    return _writer
+
+
+def is_buffering_enabled() -> bool:
+    return getattr(settings, 'AUDIT_TRAIL', {}).get('BUFFERED_WRITES', False)
@@ -0,0 +1,186 @@
+"""
+Deferred Signals - post-commit execution of non-critical signal handlers.
+
+SignalRouter hands non-critical handlers to DeferredSignalDispatcher instead of
+running them inside the saving transaction. Work is queued with
+transaction.on_commit, coalesced by (signal, instance) so repeated saves of the
+same row in one transaction run the handlers once with the latest arguments,
+and executed after commit on a background thread pool or a Celery queue.
+Nothing runs for a transaction that rolls back.
+
+Backends:
+- thread: in-process ThreadPoolExecutor (default)
+- celery: governance.tasks.run_deferred_signal_handlers; instances are
+  reloaded by primary key, so deleted rows fall back to the thread pool
+- sync: run in the committing thread right after commit (tests, debugging)
+"""
+
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from django.db import connections, transaction
+
+from ..thread_safety import ThreadSafeCounter
+
+logger = logging.getLogger(__name__)
+
+# Worker threads executing deferred handlers for the thread backend
+DEFERRED_SIGNAL_WORKERS = 2
+
+DEFERRED_SIGNAL_BACKENDS = ('thread', 'celery', 'sync')
+
+# Keyword arguments that only make sense in the sending process
+_LOCAL_ONLY_KWARGS = ('signal', 'handler_func')
+
+
+@dataclass
+class DeferredSignal:
+    """One coalesced unit of deferred handler work"""
+    signal_name: str
+    sender: Any
+    instance: Any
+    kwargs: Dict[str, Any]
+    handlers: List[Dict] = field(default_factory=list)
+    user: Any = None
+
+    @property
+    def key(self):
+        instance = self.instance
+        if instance is None:
+            return (self.signal_name, id(self.sender), None)
+        identity = instance.pk if getattr(instance, 'pk', None) is not None else id(instance)
+        return (self.signal_name, getattr(getattr(instance, '_meta', None), 'label', type(instance).__name__), identity)
+
+
+class DeferredSignalDispatcher:
+    """
+    Queues deferred handler work per transaction and executes it after commit.
+
+    `execute` is the SignalRouter callback that actually runs the handlers of a
+    DeferredSignal; the dispatcher only owns queueing, coalescing and where the
+    callback runs.
+    """
+
+    def __init__(self, execute: Callable[[DeferredSignal], None], backend: str = 'thread',
+                 max_workers: int = DEFERRED_SIGNAL_WORKERS):
+        if backend not in DEFERRED_SIGNAL_BACKENDS:
+            raise ValueError(f"Unknown deferred signal backend: {backend}")
+        self._execute = execute
+        self.backend = backend
+        self.max_workers = max_workers
+        self._local = threading.local()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        self._queued = ThreadSafeCounter()
+        self._coalesced = ThreadSafeCounter()
+        self._dispatched = ThreadSafeCounter()
+
+    def _pending(self) -> Dict:
+        if not hasattr(self._local, 'pending'):
+            self._local.pending = {}
+        return self._local.pending
+
+    def enqueue(self, deferred: DeferredSignal, using: Optional[str] = None) -> bool:
+        """
+        Queue handler work until the current transaction commits.
+
+        Returns:
+            bool: True if the work was coalesced into an already queued entry
+        """
+        key = deferred.key
+        pending = self._pending()
+        if pending and not transaction.get_connection(using).run_on_commit:
+            # No commit callback is registered any more, so whatever is still
+            # pending belongs to a transaction that rolled back
+            pending.clear()
+        coalesced = key in pending
+        pending[key] = deferred
+        if coalesced:
+            self._coalesced.increment()
+        else:
+            self._queued.increment()
+
+        # Registered for every enqueue: if the savepoint that queued the first
+        # entry rolls back, a later registration still delivers the work.
+        transaction.on_commit(functools.partial(self._on_commit, key), using=using)
+        return coalesced
+
+    def _on_commit(self, key):
+        deferred = self._pending().pop(key, None)
+        if deferred is None:
+            return  # already dispatched by an earlier callback for this key
+        self._dispatched.increment()
+        try:
+            self._submit(deferred)
+        except Exception as e:
+            logger.error(f"Could not dispatch deferred signal '{deferred.signal_name}': {e}", exc_info=True)
+
+    def _submit(self, deferred: DeferredSignal):
+        if self.backend == 'sync':
+            self._execute(deferred)
+        elif self.backend == 'celery' and self._submit_celery(deferred):
+            return
+        else:
+            self._get_executor().submit(self._run_in_worker, deferred)
+
+    def _submit_celery(self, deferred: DeferredSignal) -> bool:
+        instance = deferred.instance
+        meta = getattr(instance, '_meta', None)
+        if meta is None or instance.pk is None:
+            return False  # nothing to reload in the worker (e.g. post_delete)
+
+        from ..tasks import run_deferred_signal_handlers
+        kwargs = {
+            name: value for name, value in deferred.kwargs.items()
+            if name not in _LOCAL_ONLY_KWARGS and isinstance(value, (str, int, float, bool, type(None)))
+        }
+        run_deferred_signal_handlers.delay(deferred.signal_name, meta.label, instance.pk, kwargs)
+        return True
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix='deferred-signal'
+                    )
+        return self._executor
+
+    def _run_in_worker(self, deferred: DeferredSignal):
+        """Run deferred handlers on a pool thread and release that thread's connections"""
+        try:
+            self._execute(deferred)
+        except Exception as e:
+            logger.error(f"Deferred signal '{deferred.signal_name}' failed: {e}", exc_info=True)
+        finally:
+            connections.close_all()
+
+    def pending_count(self) -> int:
+        """Entries queued by the current thread and waiting for commit"""
+        return len(self._pending())
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            'backend': self.backend,
+            'queued': self._queued.get_value(),
+            'coalesced': self._coalesced.get_value(),
+            'dispatched': self._dispatched.get_value(),
+            'pending_in_thread': self.pending_count(),
+        }
+
+    def reset_statistics(self):
+        self._queued.reset()
+        self._coalesced.reset()
+        self._dispatched.reset()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool after finishing submitted work"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
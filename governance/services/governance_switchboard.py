@@ -28,8 +28,11 @@ CRITICAL GOVERNANCE DEFAULTS UPDATE (2026-01-28):
 
 import threading
 import logging
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Set
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Any, Set
 from contextlib import contextmanager
 from django.db import transaction
 from django.utils import timezone
@@ -43,6 +46,47 @@ from .audit_service import AuditService
 
 logger = logging.getLogger(__name__)
 
+# Cache key bumped on every flag change; processes rebuild their snapshot when it moves
+FLAG_VERSION_CACHE_KEY = 'governance_flag_version'
+
+# Seconds between checks of the shared version key
+FLAG_SNAPSHOT_CHECK_INTERVAL = 1.0
+
+
+@dataclass(frozen=True)
+class GovernanceFlagSnapshot:
+    """
+    Immutable, versioned view of every governance flag.
+
+    The effective component and workflow maps already account for the global
+    emergency override, so a flag check is a single dict lookup with no lock.
+    """
+    version: int
+    components: Mapping[str, bool]
+    workflows: Mapping[str, bool]
+    emergencies: Mapping[str, bool]
+    emergency_override: bool
+    effective_components: Mapping[str, bool]
+    effective_workflows: Mapping[str, bool]
+
+    @classmethod
+    def build(cls, version: int, components: Dict[str, bool], workflows: Dict[str, bool],
+              emergencies: Dict[str, bool]) -> 'GovernanceFlagSnapshot':
+        override = emergencies.get('emergency_disable_all_governance', False)
+        return cls(
+            version=version,
+            components=MappingProxyType(dict(components)),
+            workflows=MappingProxyType(dict(workflows)),
+            emergencies=MappingProxyType(dict(emergencies)),
+            emergency_override=override,
+            effective_components=MappingProxyType(
+                {name: enabled and not override for name, enabled in components.items()}
+            ),
+            effective_workflows=MappingProxyType(
+                {name: enabled and not override for name, enabled in workflows.items()}
+            )
+        )
+
 
 class GovernanceSwitchboard:
     """
@@ -408,6 +452,10 @@ class GovernanceSwitchboard:
         self._workflow_flags: Dict[str, bool] = {}
         self._emergency_flags: Dict[str, bool] = {}
         
+        # Published immutable view read by the flag checks
+        self._snapshot: Optional[GovernanceFlagSnapshot] = None
+        self._snapshot_checked_at = 0.0
+        
         # Monitoring counters
         self._flag_changes = ThreadSafeCounter()
         self._emergency_activations = ThreadSafeCounter()
@@ -438,6 +486,12 @@ class GovernanceSwitchboard:
                 self._emergency_flags[flag_name] = self._get_cached_flag_value(
                     f"emergency_{flag_name}", config['default']
                 )
+            
+            self._snapshot = GovernanceFlagSnapshot.build(
+                self._read_flag_version() or 0,
+                self._component_flags, self._workflow_flags, self._emergency_flags
+            )
+            self._snapshot_checked_at = time.monotonic()
     
     def _get_cached_flag_value(self, cache_key: str, default_value: bool) -> bool:
         """Get flag value from cache or return default"""
@@ -448,6 +502,70 @@ class GovernanceSwitchboard:
         """Set flag value in cache"""
         cache.set(f"governance_flag_{cache_key}", value, self.cache_timeout)
     
+    # Versioned flag snapshot
+    
+    def _read_flag_version(self) -> Optional[int]:
+        """Shared flag version, or None when the cache has no version (or is unreachable)"""
+        try:
+            return cache.get(FLAG_VERSION_CACHE_KEY)
+        except Exception as e:
+            logger.warning(f"Could not read governance flag version: {e}")
+            return None
+    
+    def _publish_snapshot(self):
+        """Bump the shared version and publish a snapshot of the local flags"""
+        with self._state_lock:
+            try:
+                version = cache.incr(FLAG_VERSION_CACHE_KEY)
+            except ValueError:
+                version = (self._snapshot.version if self._snapshot else 0) + 1
+                cache.set(FLAG_VERSION_CACHE_KEY, version, None)
+            
+            self._snapshot = GovernanceFlagSnapshot.build(
+                version, self._component_flags, self._workflow_flags, self._emergency_flags
+            )
+            self._snapshot_checked_at = time.monotonic()
+    
+    def _reload_snapshot(self, version: int):
+        """Pick up flag changes published by another process"""
+        with self._state_lock:
+            groups = (
+                ('component', self._component_flags),
+                ('workflow', self._workflow_flags),
+                ('emergency', self._emergency_flags),
+            )
+            keys = {
+                f"governance_flag_{prefix}_{name}": (flags, name)
+                for prefix, flags in groups for name in flags
+            }
+            for key, value in cache.get_many(list(keys)).items():
+                flags, name = keys[key]
+                flags[name] = value
+            
+            self._snapshot = GovernanceFlagSnapshot.build(
+                version, self._component_flags, self._workflow_flags, self._emergency_flags
+            )
+            logger.info(f"Governance flags reloaded at version {version}")
+    
+    def get_flag_snapshot(self) -> GovernanceFlagSnapshot:
+        """
+        Current flag snapshot.
+        
+        The shared version key is consulted at most once per
+        FLAG_SNAPSHOT_CHECK_INTERVAL; between checks this is an attribute read.
+        """
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if now - self._snapshot_checked_at < FLAG_SNAPSHOT_CHECK_INTERVAL:
+            return snapshot
+        
+        self._snapshot_checked_at = now
+        version = self._read_flag_version()
+        if version is not None and version != snapshot.version:
+            self._reload_snapshot(version)
+            snapshot = self._snapshot
+        return snapshot
+    
     # Component-level flag management
     
     def enable_component(self, component_name: str, reason: str = "", user=None) -> bool:
@@ -520,6 +638,7 @@ class GovernanceSwitchboard:
                 # Set the flag
                 self._component_flags[component_name] = enabled
                 self._set_cached_flag_value(f"component_{component_name}", enabled)
+                self._publish_snapshot()
                 
                 # Increment counter
                 self._flag_changes.increment()
@@ -560,12 +679,8 @@ class GovernanceSwitchboard:
             logger.warning(f"Unknown component flag: {component_name}")
             return False
         
-        # Check emergency overrides first
-        if self._is_emergency_override_active():
-            return False
-        
-        with self._component_lock:
-            return self._component_flags.get(component_name, False)
+        # Lock-free: the snapshot already folds in the emergency override
+        return self.get_flag_snapshot().effective_components.get(component_name, False)
     
     def _validate_component_dependencies(self, component_name: str) -> bool:
         """Validate that component dependencies are met"""
@@ -640,6 +755,7 @@ class GovernanceSwitchboard:
                 # Set the flag
                 self._workflow_flags[workflow_name] = enabled
                 self._set_cached_flag_value(f"workflow_{workflow_name}", enabled)
+                self._publish_snapshot()
                 
                 # Increment counter
                 self._flag_changes.increment()
@@ -684,12 +800,8 @@ class GovernanceSwitchboard:
             logger.warning(f"Unknown workflow flag: {workflow_name}")
             return False
         
-        # Check emergency overrides first
-        if self._is_emergency_override_active():
-            return False
-        
-        with self._workflow_lock:
-            return self._workflow_flags.get(workflow_name, False)
+        # Lock-free: the snapshot already folds in the emergency override
+        return self.get_flag_snapshot().effective_workflows.get(workflow_name, False)
     
     def _validate_workflow_dependencies(self, workflow_name: str) -> bool:
         """Validate that workflow component dependencies are met"""
@@ -753,6 +865,8 @@ class GovernanceSwitchboard:
                 elif affects != 'ALL_COMPONENTS_AND_WORKFLOWS':
                     self._disable_affected_flags(affects, f"Emergency: {reason}", user)
                 
+                self._publish_snapshot()
+                
                 # Audit the emergency activation
                 if self.enable_audit:
                     AuditService.log_operation(
@@ -806,6 +920,7 @@ class GovernanceSwitchboard:
                 # Deactivate emergency flag
                 self._emergency_flags[emergency_name] = False
                 self._set_cached_flag_value(f"emergency_{emergency_name}", False)
+                self._publish_snapshot()
                 
                 # Log deactivation
                 logger.warning(f"EMERGENCY FLAG DEACTIVATED: {emergency_name} - {reason}")
@@ -832,13 +947,11 @@ class GovernanceSwitchboard:
         if emergency_name not in self.EMERGENCY_FLAGS:
             return False
         
-        with self._emergency_lock:
-            return self._emergency_flags.get(emergency_name, False)
+        return self.get_flag_snapshot().emergencies.get(emergency_name, False)
     
     def _is_emergency_override_active(self) -> bool:
         """Check if any emergency override is active"""
-        with self._emergency_lock:
-            return self._emergency_flags.get('emergency_disable_all_governance', False)
+        return self.get_flag_snapshot().emergency_override
     
     def _disable_all_governance(self, reason: str, user):
         """Disable all governance components and workflows"""
@@ -0,0 +1,85 @@
+"""
+In-memory probabilistic filter for idempotency keys.
+
+A Bloom filter answers "definitely never seen" or "maybe seen" for an
+(operation_type, idempotency_key) pair. IdempotencyService uses it to send
+definitely-new keys straight to the insert, skipping the existence lookup.
+The filter is process-local and only a hint: the unique constraint on
+IdempotencyRecord stays the source of truth, so a key recorded by another
+process (a false "definitely new") simply ends in a handled insert conflict.
+"""
+
+import hashlib
+import math
+import threading
+
+# Keys remembered before the filter is cleared and starts a new generation
+IDEMPOTENCY_FILTER_CAPACITY = 100_000
+
+# Target false-positive rate at full capacity
+IDEMPOTENCY_FILTER_ERROR_RATE = 0.01
+
+
+class IdempotencyKeyFilter:
+    """
+    Thread-safe Bloom filter over idempotency keys.
+
+    Uses double hashing of a single blake2b digest for the k bit positions.
+    When more than `capacity` keys have been added the filter is cleared;
+    forgetting keys only costs an extra insert conflict, never correctness.
+    """
+
+    def __init__(self, capacity=IDEMPOTENCY_FILTER_CAPACITY, error_rate=IDEMPOTENCY_FILTER_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Forget every key"""
+        with self._lock:
+            self._bits = bytearray((self.size + 7) // 8)
+            self.count = 0
+
+    def _positions(self, operation_type, idempotency_key):
+        digest = hashlib.blake2b(
+            f"{operation_type}\x00{idempotency_key}".encode('utf-8'), digest_size=16
+        ).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, operation_type, idempotency_key):
+        """Remember a key that now exists in the database"""
+        positions = self._positions(operation_type, idempotency_key)
+        with self._lock:
+            if self.count >= self.capacity:
+                self._bits = bytearray(len(self._bits))
+                self.count = 0
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def might_contain(self, operation_type, idempotency_key):
+        """False means the key was definitely not added in this generation"""
+        bits = self._bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(operation_type, idempotency_key)
+        )
+
+
+_filter = None
+_filter_lock = threading.Lock()
+
+
+def get_idempotency_filter():
+    """Return the process-wide idempotency key filter"""
+    global _filter
+    if _filter is None:
+        with _filter_lock:
+            if _filter is None:
+                _filter = IdempotencyKeyFilter()
+    return _filter
@@ -4,15 +4,57 @@ Thread-safe implementation with proper database locking.
 """
 
 import logging
+import threading
+import time
 from datetime import timedelta
 from django.utils import timezone
-from django.db import transaction
+from django.db import transaction, IntegrityError, OperationalError
 from ..models import IdempotencyRecord, GovernanceContext
 from ..exceptions import IdempotencyError, ConcurrencyError
-from ..thread_safety import IdempotencyLock, monitor_operation
+from ..thread_safety import backoff_delays, monitor_operation
+from .idempotency_filter import get_idempotency_filter
 
 logger = logging.getLogger(__name__)
 
+# Attempts at recording a key before giving up under contention
+IDEMPOTENCY_MAX_ATTEMPTS = 5
+
+
+class IdempotencyMetrics:
+    """Process-local counters for the idempotency fast path"""
+    
+    COUNTERS = (
+        'filter_skips',      # definitely-new keys sent straight to the insert
+        'lookups',           # keys the filter flagged as maybe-seen
+        'hits',              # duplicates returned from an existing record
+        'misses',            # new records inserted
+        'false_positives',   # maybe-seen keys that turned out to be new
+        'contention',        # insert conflicts or lock errors that needed a retry
+    )
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.COUNTERS, 0)
+    
+    def increment(self, counter):
+        with self._lock:
+            self._counts[counter] += 1
+    
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        checks = counts['hits'] + counts['misses']
+        counts['hit_rate'] = counts['hits'] / checks if checks else 0
+        counts['fast_path_ratio'] = counts['filter_skips'] / checks if checks else 0
+        return counts
+
+
+idempotency_metrics = IdempotencyMetrics()
+
 
 class IdempotencyService:
     """
@@ -26,6 +68,10 @@ class IdempotencyService:
         """
         Thread-safe method to check for existing operation or record new one.
         
+        Keys the in-memory filter has never seen go straight to an insert guarded
+        by the unique constraint; only maybe-seen keys are looked up first.
+        Conflicts and lock errors are retried with exponential backoff.
+        
         Args:
             operation_type: Type of operation (e.g., 'journal_entry', 'stock_movement')
             idempotency_key: Unique key for this operation
@@ -49,25 +95,48 @@ class IdempotencyService:
                     context={'error': 'No user provided and none in context'}
                 )
         
-        # Use idempotency lock for thread safety
-        with IdempotencyLock(operation_type, idempotency_key).acquire() as existing_record:
-            if existing_record:
-                # Operation already exists and is not expired
-                logger.info(f"Duplicate operation detected: {operation_type}:{idempotency_key}")
-                return True, existing_record, existing_record.result_data
-            
-            # Record new operation
-            with monitor_operation(f"idempotency_{operation_type}"):
-                is_duplicate, record = IdempotencyRecord.check_and_record(
-                    operation_type=operation_type,
-                    idempotency_key=idempotency_key,
-                    result_data=result_data,
-                    user=user,
-                    expires_in_hours=expires_in_hours
-                )
-                
-                logger.info(f"Idempotency record created: {operation_type}:{idempotency_key}")
-                return is_duplicate, record, result_data
+        key_filter = get_idempotency_filter()
+        maybe_seen = key_filter.might_contain(operation_type, idempotency_key)
+        idempotency_metrics.increment('lookups' if maybe_seen else 'filter_skips')
+        lookup_first = maybe_seen
+        
+        with monitor_operation(f"idempotency_{operation_type}"):
+            delays = backoff_delays(max_attempts=IDEMPOTENCY_MAX_ATTEMPTS - 1)
+            while True:
+                try:
+                    is_duplicate, record = IdempotencyRecord.check_and_record(
+                        operation_type=operation_type,
+                        idempotency_key=idempotency_key,
+                        result_data=result_data,
+                        user=user,
+                        expires_in_hours=expires_in_hours,
+                        lookup_first=lookup_first
+                    )
+                    break
+                except (IntegrityError, OperationalError) as e:
+                    # A concurrent writer replaced the record or held the row lock
+                    idempotency_metrics.increment('contention')
+                    delay = next(delays, None)
+                    if delay is None or transaction.get_connection().needs_rollback:
+                        raise ConcurrencyError(
+                            message=f"Idempotency record contention: {str(e)}",
+                            resource=f"{operation_type}:{idempotency_key}"
+                        )
+                    time.sleep(delay)
+                    lookup_first = True
+        
+        key_filter.add(operation_type, idempotency_key)
+        
+        if is_duplicate:
+            idempotency_metrics.increment('hits')
+            logger.info(f"Duplicate operation detected: {operation_type}:{idempotency_key}")
+            return True, record, record.result_data
+        
+        idempotency_metrics.increment('misses')
+        if maybe_seen:
+            idempotency_metrics.increment('false_positives')
+        logger.info(f"Idempotency record created: {operation_type}:{idempotency_key}")
+        return False, record, result_data
     
     @classmethod
     def check_operation_exists(cls, operation_type: str, idempotency_key: str):
@@ -94,20 +163,29 @@ class IdempotencyService:
             return False, None, None
     
     @classmethod
-    def cleanup_expired_records(cls, batch_size: int = 1000, max_age_days: int = 30):
+    def cleanup_expired_records(cls, batch_size: int = 1000, max_age_days: int = 30,
+                                time_budget: float = None, throttle: float = None,
+                                dry_run: bool = False):
         """
-        Clean up expired idempotency records with proper locking and batching.
-        Should be run periodically as a maintenance task.
+        Clean up expired idempotency records through the retention engine.
+        Deletes records past expires_at or older than max_age_days in
+        primary-key-range batches (or drops expired partitions when the table
+        is partitioned). Should be run periodically as a maintenance task.
         
         Args:
-            batch_size: Number of records to process in each batch
+            batch_size: Number of records deleted per transaction
             max_age_days: Maximum age in days for records to keep (default 30 days)
+            time_budget: Seconds the run may take before stopping at a batch boundary
+            throttle: Pause in seconds between batches
+            dry_run: Only count the records that would be deleted
             
         Returns:
             dict: Cleanup statistics including counts and any errors
         """
-        from django.db import transaction
-        from datetime import timedelta
+        from core.services.retention_engine import (
+            RetentionEngine, RETENTION_TIME_BUDGET_SECONDS, RETENTION_THROTTLE_SECONDS,
+            idempotency_retention_rule
+        )
         
         stats = {
             'total_deleted': 0,
@@ -119,20 +197,19 @@ class IdempotencyService:
         
         try:
             with monitor_operation("idempotency_cleanup"):
-                # Calculate cutoff dates
-                now = timezone.now()
-                expired_cutoff = now  # Records past their expires_at date
-                old_cutoff = now - timedelta(days=max_age_days)  # Very old records
-                
-                # First pass: Delete clearly expired records
-                expired_count = cls._cleanup_expired_batch(expired_cutoff, batch_size)
-                stats['total_deleted'] += expired_count
-                stats['batches_processed'] += 1
+                engine = RetentionEngine(
+                    batch_size=batch_size,
+                    time_budget=RETENTION_TIME_BUDGET_SECONDS if time_budget is None else time_budget,
+                    throttle=RETENTION_THROTTLE_SECONDS if throttle is None else throttle
+                )
+                result = engine.run(idempotency_retention_rule(max_age_days), dry_run=dry_run)
                 
-                # Second pass: Delete very old records regardless of expiry
-                old_count = cls._cleanup_old_batch(old_cutoff, batch_size)
-                stats['total_deleted'] += old_count
-                stats['batches_processed'] += 1
+                stats['total_deleted'] = result.deleted
+                stats['would_delete'] = result.matched
+                stats['batches_processed'] = result.batches
+                stats['partitions_dropped'] = result.partitions_dropped
+                stats['completed'] = result.completed
+                stats['errors'].extend(result.errors)
                 
                 logger.info(f"Idempotency cleanup completed: {stats['total_deleted']} records deleted")
                 
@@ -147,60 +224,6 @@ class IdempotencyService:
         
         return stats
     
-    @classmethod
-    def _cleanup_expired_batch(cls, cutoff_time, batch_size):
-        """Clean up records that have passed their expiry time"""
-        from django.db import transaction
-        
-        deleted_count = 0
-        
-        with transaction.atomic():
-            # Get expired records in batches to avoid long-running transactions
-            expired_ids = list(
-                IdempotencyRecord.objects.filter(
-                    expires_at__lt=cutoff_time
-                ).values_list('id', flat=True)[:batch_size]
-            )
-            
-            if expired_ids:
-                # Delete in smaller chunks to avoid lock contention
-                chunk_size = min(100, len(expired_ids))
-                for i in range(0, len(expired_ids), chunk_size):
-                    chunk_ids = expired_ids[i:i + chunk_size]
-                    deleted, _ = IdempotencyRecord.objects.filter(
-                        id__in=chunk_ids
-                    ).delete()
-                    deleted_count += deleted
-        
-        return deleted_count
-    
-    @classmethod
-    def _cleanup_old_batch(cls, cutoff_time, batch_size):
-        """Clean up very old records regardless of expiry"""
-        from django.db import transaction
-        
-        deleted_count = 0
-        
-        with transaction.atomic():
-            # Get very old records
-            old_ids = list(
-                IdempotencyRecord.objects.filter(
-                    created_at__lt=cutoff_time
-                ).values_list('id', flat=True)[:batch_size]
-            )
-            
-            if old_ids:
-                # Delete in smaller chunks
-                chunk_size = min(100, len(old_ids))
-                for i in range(0, len(old_ids), chunk_size):
-                    chunk_ids = old_ids[i:i + chunk_size]
-                    deleted, _ = IdempotencyRecord.objects.filter(
-                        id__in=chunk_ids
-                    ).delete()
-                    deleted_count += deleted
-        
-        return deleted_count
-    
     @classmethod
     def generate_key(cls, *components):
         """
@@ -515,10 +538,16 @@ class IdempotencyService:
             'metrics': {
                 'total_records': stats.get('total_records', 0),
                 'expired_ratio': 0,
-                'recent_activity': stats.get('recent_operations', 0)
+                'recent_activity': stats.get('recent_operations', 0),
+                'fast_path': idempotency_metrics.snapshot()
             }
         }
         
+        fast_path = health['metrics']['fast_path']
+        if fast_path['contention'] > (fast_path['hits'] + fast_path['misses']) * 0.1:
+            health['issues'].append('High idempotency contention')
+            health['recommendations'].append('Check for concurrent retries of the same operations')
+        
         total = stats.get('total_records', 0)
         expired = stats.get('expired_count', 0)
         
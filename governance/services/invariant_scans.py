@@ -0,0 +1,233 @@
+"""
+Invariant Scans - Declarative SQL-native corruption scanners
+
+Each scan is a single aggregate/filter query that returns only the violating
+rows, so detection runs in the database instead of loading every object into
+Python. Scans register themselves in a module-level registry that RepairService
+picks up, and new invariants are added with register_invariant_scan() without
+touching the service.
+
+Key Features:
+- One query per invariant (GROUP BY / HAVING, filtered joins via values())
+- Chunked streaming of violations for quarantine
+- Parallel execution on a thread pool where the database allows it
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.db import connection, connections
+from django.db.models import Count, F, Q, Sum
+from django.apps import apps
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip when streaming violations
+INVARIANT_SCAN_CHUNK_SIZE = 500
+
+# Upper bound on concurrently running invariant scans
+INVARIANT_SCAN_MAX_WORKERS = 4
+
+# Debit/credit difference tolerated before an entry counts as unbalanced
+BALANCE_TOLERANCE = Decimal('0.01')
+
+
+@dataclass
+class InvariantScan:
+    """
+    Declarative definition of a data invariant checked by a single query.
+
+    violations builds a values() queryset of the rows that break the invariant;
+    total builds the queryset counted for evidence; issue_builder turns one row
+    into the issue dict used by CorruptionReport and quarantine.
+    """
+    corruption_type: str
+    model_name: str
+    description: str
+    violations: Callable
+    total: Callable
+    issue_builder: Callable[[Dict], Dict]
+    object_id_field: str
+    confidence: str = 'HIGH'
+    evidence: Dict = field(default_factory=dict)
+
+    def iter_issue_chunks(self, chunk_size: int = INVARIANT_SCAN_CHUNK_SIZE) -> Iterator[List[Dict]]:
+        """Stream violations from the database in chunks of issue dicts"""
+        chunk = []
+        for row in self.violations().iterator(chunk_size=chunk_size):
+            chunk.append(self.issue_builder(row))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def run(self) -> Tuple[List[Dict], str, Dict]:
+        """
+        Run the scan.
+
+        Returns:
+            Tuple of (issues, confidence_level, evidence)
+        """
+        try:
+            issues = [issue for chunk in self.iter_issue_chunks() for issue in chunk]
+            total_count = self.total().count()
+            evidence = {
+                'total_records': total_count,
+                'violation_count': len(issues),
+                'violation_percentage': (len(issues) / total_count * 100) if total_count > 0 else 0,
+                'scan_method': 'SQL_native_invariant_query',
+                **self.evidence
+            }
+            logger.info(f"{self.corruption_type} scan: {len(issues)}/{total_count} violations")
+            return issues, self.confidence, evidence
+        except Exception as e:
+            logger.error(f"Error scanning {self.corruption_type}: {e}", exc_info=True)
+            return [{'error': f"Scan failed: {str(e)}"}], 'LOW', {'error': str(e)}
+
+    def to_quarantine_data(self, issue: Dict) -> Dict:
+        """Build the QuarantineSystem.batch_quarantine_data payload for one issue"""
+        return {
+            'model_name': self.model_name,
+            'object_id': issue[self.object_id_field],
+            'corruption_type': self.corruption_type,
+            'reason': self.description,
+            'original_data': issue,
+            'context': {
+                'source': 'RepairService',
+                'confidence': self.confidence,
+                'corruption_scan': True
+            }
+        }
+
+
+_registry: Dict[str, InvariantScan] = {}
+
+
+def register_invariant_scan(scan: InvariantScan) -> InvariantScan:
+    """Register (or replace) an invariant scan under its corruption type"""
+    _registry[scan.corruption_type] = scan
+    return scan
+
+
+def unregister_invariant_scan(corruption_type: str) -> None:
+    """Remove a registered invariant scan"""
+    _registry.pop(corruption_type, None)
+
+
+def get_invariant_scans() -> Dict[str, InvariantScan]:
+    """Return the registered invariant scans keyed by corruption type"""
+    return dict(_registry)
+
+
+def supports_parallel_scans() -> bool:
+    """
+    Scans can only run on separate connections when each sees committed data.
+    SQLite (in-memory test databases) and callers inside an open transaction
+    fall back to sequential execution on the current connection.
+    """
+    return connection.vendor != 'sqlite' and not connection.in_atomic_block
+
+
+def _run_in_worker(scan: InvariantScan) -> Tuple[List[Dict], str, Dict]:
+    """Run a scan on a pool thread and release that thread's connection"""
+    try:
+        return scan.run()
+    finally:
+        connections.close_all()
+
+
+def run_invariant_scans(scans: List[InvariantScan],
+                        max_workers: Optional[int] = None) -> Dict[str, Tuple[List[Dict], str, Dict]]:
+    """
+    Run several invariant scans, in parallel where the database allows it.
+
+    Args:
+        scans: Scans to run
+        max_workers: Thread pool size (default: INVARIANT_SCAN_MAX_WORKERS)
+
+    Returns:
+        Dict: corruption_type -> (issues, confidence_level, evidence)
+    """
+    if len(scans) <= 1 or not supports_parallel_scans():
+        return {scan.corruption_type: scan.run() for scan in scans}
+
+    workers = min(max_workers or INVARIANT_SCAN_MAX_WORKERS, len(scans))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='invariant-scan') as executor:
+        futures = {scan.corruption_type: executor.submit(_run_in_worker, scan) for scan in scans}
+        return {corruption_type: future.result() for corruption_type, future in futures.items()}
+
+
+# Built-in invariants
+
+def _negative_stock_violations():
+    Stock = apps.get_model('product', 'Stock')
+    return Stock.objects.filter(quantity__lt=0).values(
+        'id', 'quantity', 'updated_at',
+        'product_id', 'product__name', 'warehouse_id', 'warehouse__name'
+    ).order_by('id')
+
+
+def _negative_stock_issue(row: Dict) -> Dict:
+    return {
+        'stock_id': row['id'],
+        'product_id': row['product_id'],
+        'product_name': row['product__name'] or f"Product ID {row['product_id']} (Not Found)",
+        'warehouse_id': row['warehouse_id'],
+        'warehouse_name': row['warehouse__name'],
+        'current_quantity': str(row['quantity']),
+        'last_updated': row['updated_at']
+    }
+
+
+def _unbalanced_entry_violations():
+    JournalEntryLine = apps.get_model('financial', 'JournalEntryLine')
+    return JournalEntryLine.objects.values(
+        'journal_entry_id', 'journal_entry__number', 'journal_entry__date'
+    ).annotate(
+        debit_total=Sum('debit'),
+        credit_total=Sum('credit'),
+        line_count=Count('id')
+    ).annotate(
+        difference=F('debit_total') - F('credit_total')
+    ).filter(
+        Q(difference__gt=BALANCE_TOLERANCE) | Q(difference__lt=-BALANCE_TOLERANCE)
+    ).order_by('journal_entry_id')
+
+
+def _unbalanced_entry_issue(row: Dict) -> Dict:
+    entry_date = row['journal_entry__date']
+    return {
+        'entry_id': row['journal_entry_id'],
+        'entry_number': row['journal_entry__number'] or 'N/A',
+        'debit_total': str(row['debit_total']),
+        'credit_total': str(row['credit_total']),
+        'difference': str(row['debit_total'] - row['credit_total']),
+        'line_count': row['line_count'],
+        'created_at': entry_date.isoformat() if entry_date else None
+    }
+
+
+register_invariant_scan(InvariantScan(
+    corruption_type='NEGATIVE_STOCK',
+    model_name='Stock',
+    description='Stock quantity below zero',
+    violations=_negative_stock_violations,
+    total=lambda: apps.get_model('product', 'Stock').objects.all(),
+    issue_builder=_negative_stock_issue,
+    object_id_field='stock_id'
+))
+
+register_invariant_scan(InvariantScan(
+    corruption_type='UNBALANCED_JOURNAL_ENTRIES',
+    model_name='JournalEntry',
+    description='Journal entry debits and credits do not balance',
+    violations=_unbalanced_entry_violations,
+    total=lambda: apps.get_model('financial', 'JournalEntry').objects.all(),
+    issue_builder=_unbalanced_entry_issue,
+    object_id_field='entry_id',
+    evidence={'tolerance': str(BALANCE_TOLERANCE)}
+))
@@ -6,7 +6,7 @@ Provides safe isolation and resolution mechanisms.
 import logging
 from django.db import transaction
 from django.utils import timezone
-from ..models import QuarantineRecord, GovernanceContext
+from ..models import QuarantineRecord, QuarantineDailyCounter, GovernanceContext
 from ..thread_safety import monitor_operation
 from ..exceptions import QuarantineError
 
@@ -238,41 +238,21 @@ class QuarantineService:
         Returns:
             dict: Summary of quarantined data
         """
-        from django.db.models import Count
+        from django.db.models import Sum
         
         summary = {}
         
-        # Count by corruption type
-        corruption_counts = QuarantineRecord.objects.values('corruption_type').annotate(
-            count=Count('id')
-        ).order_by('-count')
+        # Counts come from the daily rollups instead of scanning QuarantineRecord
+        counters = QuarantineDailyCounter.objects.order_by().filter(count__gt=0)
         
-        summary['by_corruption_type'] = {
-            item['corruption_type']: item['count'] 
-            for item in corruption_counts
-        }
+        def totals_by(field):
+            rows = counters.values(field).annotate(total=Sum('count')).order_by('-total')
+            return {row[field]: row['total'] for row in rows if row['total'] > 0}
         
-        # Count by model
-        model_counts = QuarantineRecord.objects.values('model_name').annotate(
-            count=Count('id')
-        ).order_by('-count')
-        
-        summary['by_model'] = {
-            item['model_name']: item['count'] 
-            for item in model_counts
-        }
-        
-        # Count by status
-        status_counts = QuarantineRecord.objects.values('status').annotate(
-            count=Count('id')
-        )
-        
-        summary['by_status'] = {
-            item['status']: item['count'] 
-            for item in status_counts
-        }
-        
-        summary['total_quarantined'] = QuarantineRecord.objects.count()
+        summary['by_corruption_type'] = totals_by('corruption_type')
+        summary['by_model'] = totals_by('model_name')
+        summary['by_status'] = totals_by('status')
+        summary['total_quarantined'] = sum(summary['by_status'].values())
         
         # Recent quarantines (last 24 hours)
         recent_cutoff = timezone.now() - timezone.timedelta(hours=24)
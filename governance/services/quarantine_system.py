@@ -24,10 +24,11 @@ from django.apps import apps
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db.models import Q, Count, Avg, Max, Min
+from django.db.models import Q, Count, Avg, Max, Min, Sum, F, DurationField, ExpressionWrapper
 from django.core.paginator import Paginator
+from collections import Counter
 
-from ..models import QuarantineRecord, AuditTrail, GovernanceContext
+from ..models import QuarantineRecord, QuarantineDailyCounter, AuditTrail, GovernanceContext
 from ..thread_safety import (
     monitor_operation, DatabaseLockManager, ThreadSafeOperationMixin,
     retry_on_concurrency_error
@@ -150,34 +151,109 @@ class QuarantineStorage:
         """
         Thread-safe batch storage of multiple quarantine records.
         
+        Existing active quarantines are looked up with one query, new records
+        are inserted with bulk_create and the daily counters are updated once
+        per bucket. Falls back to storing records one by one if the bulk
+        insert fails.
+        
         Args:
             quarantine_data: List of quarantine data dictionaries
             user: User initiating the batch operation
             
         Returns:
-            List[QuarantineRecord]: Created quarantine records
+            List[QuarantineRecord]: Stored quarantine records (existing active ones included)
         """
-        created_records = []
-        
         with monitor_operation("batch_store_quarantine"):
+            valid = []
             for data in quarantine_data:
-                try:
-                    record = QuarantineStorage.store_quarantine_record(
-                        model_name=data['model_name'],
-                        object_id=data['object_id'],
-                        corruption_type=data['corruption_type'],
-                        reason=data['reason'],
-                        original_data=data['original_data'],
-                        user=user,
-                        **data.get('context', {})
-                    )
-                    created_records.append(record)
-                except Exception as e:
-                    logger.error(f"Failed to store quarantine record: {e}")
-                    # Continue with other records
+                if all(key in data for key in ('model_name', 'object_id', 'corruption_type', 'reason', 'original_data')):
+                    valid.append(data)
+                else:
+                    logger.error(f"Failed to store quarantine record: incomplete data {data}")
+            
+            try:
+                stored_records = QuarantineStorage._bulk_store(valid, user)
+            except Exception as e:
+                logger.warning(f"Bulk quarantine insert failed, storing records one by one: {e}")
+                stored_records = QuarantineStorage._store_individually(valid, user)
+        
+        logger.info(f"Batch quarantine completed: {len(stored_records)}/{len(quarantine_data)} records created")
+        return stored_records
+    
+    @staticmethod
+    def _bulk_store(quarantine_data: List[Dict], user) -> List[QuarantineRecord]:
+        """Insert a batch of quarantine records in one transaction"""
+        if not quarantine_data:
+            return []
+        
+        keys = [(data['model_name'], data['object_id'], data['corruption_type']) for data in quarantine_data]
+        
+        with DatabaseLockManager.atomic_operation():
+            lookup = Q()
+            for model_name, object_id, corruption_type in set(keys):
+                lookup |= Q(model_name=model_name, object_id=object_id, corruption_type=corruption_type)
+            existing_queryset = DatabaseLockManager.select_for_update_if_supported(
+                QuarantineRecord.objects.filter(lookup, status__in=['QUARANTINED', 'UNDER_REVIEW'])
+            )
+            stored = {
+                (record.model_name, record.object_id, record.corruption_type): record
+                for record in existing_queryset
+            }
+            
+            new_records = []
+            for key, data in zip(keys, quarantine_data):
+                if key in stored:
                     continue
-        
-        logger.info(f"Batch quarantine completed: {len(created_records)}/{len(quarantine_data)} records created")
+                record = QuarantineRecord(
+                    model_name=data['model_name'],
+                    object_id=data['object_id'],
+                    corruption_type=data['corruption_type'],
+                    original_data=data['original_data'],
+                    quarantine_reason=data['reason'],
+                    quarantined_by=user,
+                    status='QUARANTINED'
+                )
+                stored[key] = record
+                new_records.append(record)
+            
+            if new_records:
+                QuarantineRecord.objects.bulk_create(new_records)
+                
+                # bulk_create bypasses QuarantineRecord.save, so count the new records here
+                buckets = Counter(
+                    QuarantineDailyCounter.bucket_for(record._counter_values()) for record in new_records
+                )
+                for bucket, count in buckets.items():
+                    QuarantineDailyCounter.adjust(*bucket, delta=count)
+        
+        seen = set()
+        stored_records = []
+        for key in keys:
+            if key not in seen:
+                seen.add(key)
+                stored_records.append(stored[key])
+        return stored_records
+    
+    @staticmethod
+    def _store_individually(quarantine_data: List[Dict], user) -> List[QuarantineRecord]:
+        """Store records one at a time, skipping the ones that fail"""
+        created_records = []
+        for data in quarantine_data:
+            try:
+                record = QuarantineStorage.store_quarantine_record(
+                    model_name=data['model_name'],
+                    object_id=data['object_id'],
+                    corruption_type=data['corruption_type'],
+                    reason=data['reason'],
+                    original_data=data['original_data'],
+                    user=user,
+                    **data.get('context', {})
+                )
+                created_records.append(record)
+            except Exception as e:
+                logger.error(f"Failed to store quarantine record: {e}")
+                # Continue with other records
+                continue
         return created_records
 
 
@@ -270,61 +346,44 @@ class QuarantineManager(ThreadSafeOperationMixin):
             Dict: Comprehensive statistics
         """
         with self.thread_safe_operation("quarantine_statistics"):
-            queryset = QuarantineRecord.objects.all()
-            
-            # Apply date filters
+            # Totals come from the daily rollups (days x buckets, not records)
+            counters = QuarantineManager._counters_between(date_from, date_to)
+            buckets = list(counters.values('status', 'corruption_type', 'model_name').annotate(
+                records=Sum('count'),
+                seconds=Sum('resolution_seconds')
+            ))
+            
+            by_status = Counter()
+            by_corruption_type = Counter()
+            by_model = Counter()
+            resolution_seconds = 0.0
+            for bucket in buckets:
+                by_status[bucket['status']] += bucket['records']
+                by_corruption_type[bucket['corruption_type']] += bucket['records']
+                by_model[bucket['model_name']] += bucket['records']
+                if bucket['status'] == 'RESOLVED':
+                    resolution_seconds += bucket['seconds'] or 0.0
+            
+            total_quarantined = sum(by_status.values())
+            
+            # Last 24 hours needs sub-day precision: indexed range count on quarantined_at
+            recent_24h_queryset = QuarantineRecord.objects.filter(
+                quarantined_at__gte=timezone.now() - timedelta(hours=24)
+            )
             if date_from:
-                queryset = queryset.filter(quarantined_at__gte=date_from)
+                recent_24h_queryset = recent_24h_queryset.filter(quarantined_at__gte=date_from)
             if date_to:
-                queryset = queryset.filter(quarantined_at__lte=date_to)
+                recent_24h_queryset = recent_24h_queryset.filter(quarantined_at__lte=date_to)
+            recent_24h = recent_24h_queryset.count()
             
-            # Basic counts
-            total_quarantined = queryset.count()
-            
-            # Status breakdown
-            status_counts = queryset.values('status').annotate(
-                count=Count('id')
-            ).order_by('-count')
-            
-            # Corruption type breakdown
-            corruption_counts = queryset.values('corruption_type').annotate(
-                count=Count('id')
-            ).order_by('-count')
-            
-            # Model breakdown
-            model_counts = queryset.values('model_name').annotate(
-                count=Count('id')
-            ).order_by('-count')
-            
-            # Time-based statistics
-            recent_24h = queryset.filter(
-                quarantined_at__gte=timezone.now() - timedelta(hours=24)
-            ).count()
-            
-            recent_7d = queryset.filter(
-                quarantined_at__gte=timezone.now() - timedelta(days=7)
-            ).count()
+            recent_7d = counters.filter(
+                day__gte=timezone.localdate() - timedelta(days=6)
+            ).aggregate(total=Sum('count'))['total'] or 0
             
             # Resolution statistics
-            resolved_count = queryset.filter(status='RESOLVED').count()
+            resolved_count = by_status.get('RESOLVED', 0)
             resolution_rate = (resolved_count / total_quarantined * 100) if total_quarantined > 0 else 0
-            
-            # Average resolution time for resolved records
-            resolved_records = queryset.filter(
-                status='RESOLVED',
-                resolved_at__isnull=False
-            )
-            
-            avg_resolution_time = None
-            if resolved_records.exists():
-                resolution_times = []
-                for record in resolved_records:
-                    if record.resolved_at and record.quarantined_at:
-                        delta = record.resolved_at - record.quarantined_at
-                        resolution_times.append(delta.total_seconds())
-                
-                if resolution_times:
-                    avg_resolution_time = sum(resolution_times) / len(resolution_times)
+            avg_resolution_time = resolution_seconds / resolved_count if resolved_count else None
             
             return {
                 'summary': {
@@ -335,15 +394,36 @@ class QuarantineManager(ThreadSafeOperationMixin):
                     'resolution_rate': round(resolution_rate, 2),
                     'avg_resolution_time_seconds': avg_resolution_time
                 },
-                'by_status': {item['status']: item['count'] for item in status_counts},
-                'by_corruption_type': {item['corruption_type']: item['count'] for item in corruption_counts},
-                'by_model': {item['model_name']: item['count'] for item in model_counts},
+                'by_status': QuarantineManager._non_empty(by_status),
+                'by_corruption_type': QuarantineManager._non_empty(by_corruption_type),
+                'by_model': QuarantineManager._non_empty(by_model),
                 'date_range': {
                     'from': date_from.isoformat() if date_from else None,
                     'to': date_to.isoformat() if date_to else None
                 }
             }
     
+    @staticmethod
+    def _counters_between(date_from=None, date_to=None):
+        """Daily counters for records quarantined within the (day-granular) date range"""
+        counters = QuarantineDailyCounter.objects.order_by()
+        if date_from:
+            counters = counters.filter(day__gte=QuarantineManager._local_day(date_from))
+        if date_to:
+            counters = counters.filter(day__lte=QuarantineManager._local_day(date_to))
+        return counters
+    
+    @staticmethod
+    def _local_day(value):
+        if isinstance(value, datetime):
+            return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+        return value
+    
+    @staticmethod
+    def _non_empty(counts: Counter) -> Dict:
+        """Counts ordered by size, without buckets that have drained to zero"""
+        return {key: count for key, count in counts.most_common() if count > 0}
+    
     @monitor_operation("batch_update_quarantine")
     def batch_update_quarantine_status(self, quarantine_ids: List[int], 
                                       new_status: str, user, notes: str = "") -> Dict:
@@ -405,33 +485,26 @@ class QuarantineManager(ThreadSafeOperationMixin):
             end_date = timezone.now()
             start_date = end_date - timedelta(days=days)
             
-            # Daily quarantine counts
-            from django.db.models import Count
-            from django.db.models.functions import TruncDate
-            
-            daily_counts = QuarantineRecord.objects.filter(
-                quarantined_at__gte=start_date,
-                quarantined_at__lte=end_date
-            ).annotate(
-                date=TruncDate('quarantined_at')
-            ).values('date').annotate(
-                count=Count('id')
-            ).order_by('date')
-            
-            # Corruption type trends
-            corruption_trends = {}
-            for corruption_type in QuarantineRecord.objects.values_list('corruption_type', flat=True).distinct():
-                trend_data = QuarantineRecord.objects.filter(
-                    corruption_type=corruption_type,
-                    quarantined_at__gte=start_date,
-                    quarantined_at__lte=end_date
-                ).annotate(
-                    date=TruncDate('quarantined_at')
-                ).values('date').annotate(
-                    count=Count('id')
-                ).order_by('date')
-                
-                corruption_trends[corruption_type] = list(trend_data)
+            # Daily counts per corruption type from the rollups (O(days x types))
+            rows = QuarantineManager._counters_between(start_date, end_date).values(
+                'day', 'corruption_type'
+            ).annotate(records=Sum('count')).order_by('day')
+            
+            daily_totals = Counter()
+            corruption_trends = {
+                corruption_type: []
+                for corruption_type in QuarantineDailyCounter.objects.order_by().values_list(
+                    'corruption_type', flat=True
+                ).distinct()
+            }
+            for row in rows:
+                if not row['records']:
+                    continue
+                daily_totals[row['day']] += row['records']
+                corruption_trends.setdefault(row['corruption_type'], []).append({
+                    'date': row['day'],
+                    'count': row['records']
+                })
             
             return {
                 'period': {
@@ -439,7 +512,9 @@ class QuarantineManager(ThreadSafeOperationMixin):
                     'end_date': end_date.isoformat(),
                     'days': days
                 },
-                'daily_counts': list(daily_counts),
+                'daily_counts': [
+                    {'date': day, 'count': count} for day, count in sorted(daily_totals.items())
+                ],
                 'corruption_type_trends': corruption_trends
             }
 
@@ -473,6 +548,7 @@ class QuarantineReporter:
             'data': {}
         }
         
+        stats = None
         if report_type in ['full', 'summary']:
             # Get statistics
             stats = self.manager.get_quarantine_statistics()
@@ -496,14 +572,13 @@ class QuarantineReporter:
         if report_type == 'full':
             # Get detailed breakdown by corruption type
             corruption_details = {}
-            for corruption_type in QuarantineRecord.objects.values_list('corruption_type', flat=True).distinct():
-                type_records = self.manager.search_quarantine_records(
-                    filters={'corruption_type': corruption_type},
-                    page_size=10
-                )
+            for corruption_type, total_count in stats['by_corruption_type'].items():
+                sample_records = QuarantineRecord.objects.filter(
+                    corruption_type=corruption_type
+                ).select_related('quarantined_by', 'resolved_by').order_by('-quarantined_at')[:10]
                 corruption_details[corruption_type] = {
-                    'total_count': type_records['pagination']['total_records'],
-                    'sample_records': [self._serialize_quarantine_record(r) for r in type_records['records']]
+                    'total_count': total_count,
+                    'sample_records': [self._serialize_quarantine_record(r) for r in sample_records]
                 }
             
             report['data']['corruption_type_details'] = corruption_details
@@ -530,34 +605,33 @@ class QuarantineReporter:
     
     def _analyze_resolution_patterns(self) -> Dict:
         """Analyze resolution patterns for insights"""
-        resolved_records = QuarantineRecord.objects.filter(status='RESOLVED')
-        
-        if not resolved_records.exists():
+        resolved = QuarantineDailyCounter.objects.order_by().filter(status='RESOLVED', count__gt=0)
+        resolution_by_type = resolved.values('corruption_type').annotate(
+            records=Sum('count'),
+            seconds=Sum('resolution_seconds')
+        ).order_by('-records')
+        
+        total_resolved = sum(item['records'] for item in resolution_by_type)
+        if not total_resolved:
             return {'message': 'No resolved records for analysis'}
         
-        # Resolution time analysis
-        resolution_times = []
-        for record in resolved_records:
-            if record.resolved_at and record.quarantined_at:
-                delta = record.resolved_at - record.quarantined_at
-                resolution_times.append(delta.total_seconds())
-        
         analysis = {}
-        if resolution_times:
+        
+        # Min/max cannot be rolled up incrementally; compute them in SQL
+        resolution_time = ExpressionWrapper(F('resolved_at') - F('quarantined_at'), output_field=DurationField())
+        extremes = QuarantineRecord.objects.filter(
+            status='RESOLVED', resolved_at__isnull=False
+        ).aggregate(shortest=Min(resolution_time), longest=Max(resolution_time))
+        if extremes['shortest'] is not None:
             analysis['resolution_time_stats'] = {
-                'avg_seconds': sum(resolution_times) / len(resolution_times),
-                'min_seconds': min(resolution_times),
-                'max_seconds': max(resolution_times),
-                'total_analyzed': len(resolution_times)
+                'avg_seconds': sum(item['seconds'] or 0.0 for item in resolution_by_type) / total_resolved,
+                'min_seconds': extremes['shortest'].total_seconds(),
+                'max_seconds': extremes['longest'].total_seconds(),
+                'total_analyzed': total_resolved
             }
         
-        # Resolution by corruption type
-        resolution_by_type = resolved_records.values('corruption_type').annotate(
-            count=Count('id')
-        ).order_by('-count')
-        
         analysis['resolution_by_corruption_type'] = {
-            item['corruption_type']: item['count'] 
+            item['corruption_type']: item['records']
             for item in resolution_by_type
         }
         
@@ -28,6 +28,9 @@ from ..thread_safety import monitor_operation
 from ..exceptions import GovernanceError
 from .quarantine_service import QuarantineService
 from .source_linkage_service import SourceLinkageService
+from .invariant_scans import (
+    INVARIANT_SCAN_CHUNK_SIZE, get_invariant_scans, run_invariant_scans
+)
 from .repair_policy_framework import (
     RepairPolicyFramework, RepairPolicyType, ConfidenceLevel, 
     DetailedRepairPlan, RepairStatus
@@ -36,6 +39,9 @@ from .repair_policy_framework import (
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Journal entries validated per keyset page by the orphaned entries scanner
+ORPHAN_SCAN_BATCH_SIZE = 1000
+
 
 class CorruptionReport:
     """
@@ -223,8 +229,10 @@ class RepairService:
     - NO automatic repairs
     """
     
-    def __init__(self):
+    def __init__(self, incremental: bool = False):
         self.user = None
+        # Only check journal entries changed since the last completed orphan scan
+        self.incremental = incremental
         self.policy_framework = RepairPolicyFramework()
         self._initialize_scanners()
     
@@ -232,10 +240,13 @@ class RepairService:
         """Initialize corruption detection scanners"""
         self.scanners = {
             'ORPHANED_JOURNAL_ENTRIES': self._scan_orphaned_journal_entries,
-            'NEGATIVE_STOCK': self._scan_negative_stock,
             'MULTIPLE_ACTIVE_ACCOUNTING_PERIODS': self._scan_multiple_active_accounting_periods,
-            'UNBALANCED_JOURNAL_ENTRIES': self._scan_unbalanced_journal_entries
         }
+        
+        # Declarative SQL-native invariants (NEGATIVE_STOCK, UNBALANCED_JOURNAL_ENTRIES, ...)
+        self.invariant_scans = get_invariant_scans()
+        for corruption_type, scan in self.invariant_scans.items():
+            self.scanners.setdefault(corruption_type, scan.run)
     
     def set_user(self, user):
         """Set user context for repair operations"""
@@ -261,6 +272,13 @@ class RepairService:
         # Determine which scanners to run
         scanners_to_run = corruption_types or list(self.scanners.keys())
         
+        # Registered invariant queries are independent, so run them up front on a thread pool
+        invariant_results = run_invariant_scans([
+            self.invariant_scans[corruption_type] for corruption_type in scanners_to_run
+            if corruption_type in self.invariant_scans
+            and self.scanners.get(corruption_type) == self.invariant_scans[corruption_type].run
+        ])
+        
         for corruption_type in scanners_to_run:
             if corruption_type not in self.scanners:
                 logger.warning(f"Unknown corruption type: {corruption_type}")
@@ -268,8 +286,11 @@ class RepairService:
             
             try:
                 logger.info(f"Scanning for {corruption_type}")
-                scanner = self.scanners[corruption_type]
-                issues, confidence, evidence = scanner()
+                if corruption_type in invariant_results:
+                    issues, confidence, evidence = invariant_results[corruption_type]
+                else:
+                    scanner = self.scanners[corruption_type]
+                    issues, confidence, evidence = scanner()
                 
                 if issues:
                     report.add_corruption(
@@ -309,8 +330,12 @@ class RepairService:
     
     def _scan_orphaned_journal_entries(self) -> Tuple[List[Dict], str, Dict]:
         """
-        Scan for orphaned journal entries using ORM-based detection.
-        Focus on the 23 identified orphaned entries.
+        Scan for orphaned journal entries using batched source validation.
+        
+        Entries are keyset-paginated and validated with one existence query per
+        source model and batch (see SourceLinkageService.find_orphans_in_batch).
+        When the service runs incrementally only entries changed since the
+        last completed scan are checked.
         
         Returns:
             Tuple of (issues, confidence_level, evidence)
@@ -319,145 +344,48 @@ class RepairService:
         evidence = {}
         
         try:
-            # Get JournalEntry model
-            JournalEntry = apps.get_model('financial', 'JournalEntry')
+            since = SourceLinkageService.get_scan_checkpoint() if self.incremental else None
+            total_entries = 0
+            high_water_mark = None
             
-            with transaction.atomic():
-                # Use select_for_update for thread safety where supported
-                if connection.vendor == 'postgresql':
-                    entries = JournalEntry.objects.select_for_update().all()
-                else:
-                    # SQLite: Use atomic block for best-effort consistency
-                    entries = JournalEntry.objects.all()
-                
-                total_entries = entries.count()
-                orphaned_count = 0
-                
-                for entry in entries:
-                    # Check source linkage using SourceLinkage service
-                    if not self._validate_journal_entry_linkage(entry):
-                        issues.append({
-                            'entry_id': entry.id,
-                            'source_module': getattr(entry, 'source_module', None),
-                            'source_model': getattr(entry, 'source_model', None),
-                            'source_id': getattr(entry, 'source_id', None),
-                            'created_at': entry.date.isoformat() if hasattr(entry, 'date') else None,
-                            'amount': 'N/A',  # JournalEntry doesn't have amount field directly
-                            'description': getattr(entry, 'description', 'N/A'),
-                            'number': getattr(entry, 'number', 'N/A'),
-                            'entry_type': getattr(entry, 'entry_type', 'N/A')
-                        })
-                        orphaned_count += 1
-                
-                evidence = {
-                    'total_journal_entries': total_entries,
-                    'orphaned_entries': orphaned_count,
-                    'orphaned_percentage': (orphaned_count / total_entries * 100) if total_entries > 0 else 0,
-                    'scan_method': 'ORM_based_with_SourceLinkage_validation'
-                }
-                
-                # Determine confidence based on validation method
-                confidence = 'HIGH' if orphaned_count <= 25 else 'MEDIUM'
-                
-                logger.info(f"Orphaned journal entries scan: {orphaned_count}/{total_entries} orphaned")
-                
-        except Exception as e:
-            logger.error(f"Error scanning orphaned journal entries: {e}", exc_info=True)
-            issues = [{'error': f"Scan failed: {str(e)}"}]
-            confidence = 'LOW'
-            evidence = {'error': str(e)}
-        
-        return issues, confidence, evidence
-    
-    def _validate_journal_entry_linkage(self, entry) -> bool:
-        """
-        Validate journal entry source linkage using SourceLinkage service.
-        
-        Args:
-            entry: JournalEntry instance
-            
-        Returns:
-            bool: True if linkage is valid, False otherwise
-        """
-        try:
-            # Check if entry has source linkage fields
-            source_module = getattr(entry, 'source_module', None)
-            source_model = getattr(entry, 'source_model', None)
-            source_id = getattr(entry, 'source_id', None)
+            for batch in SourceLinkageService.iter_journal_entry_batches(
+                batch_size=ORPHAN_SCAN_BATCH_SIZE, since=since
+            ):
+                for orphan in SourceLinkageService.find_orphans_in_batch(batch):
+                    issues.append({
+                        'entry_id': orphan['entry_id'],
+                        'source_module': orphan['source_module'],
+                        'source_model': orphan['source_model'],
+                        'source_id': orphan['source_id'],
+                        'created_at': orphan['entry_date'].isoformat() if orphan['entry_date'] else None,
+                        'amount': 'N/A',  # JournalEntry doesn't have amount field directly
+                        'description': orphan['description'] or 'N/A',
+                        'number': orphan['entry_number'] or 'N/A',
+                        'entry_type': orphan['entry_type'] or 'N/A',
+                        'issue': orphan['issue']
+                    })
+                total_entries += len(batch)
+                high_water_mark = batch[-1].updated_at
             
-            if not all([source_module, source_model, source_id]):
-                return False
+            SourceLinkageService.save_scan_checkpoint(high_water_mark or since)
+            orphaned_count = len(issues)
             
-            # Use SourceLinkageService for validation
-            return SourceLinkageService.validate_linkage(source_module, source_model, source_id)
+            evidence = {
+                'total_journal_entries': total_entries,
+                'orphaned_entries': orphaned_count,
+                'orphaned_percentage': (orphaned_count / total_entries * 100) if total_entries > 0 else 0,
+                'scan_method': 'keyset_batched_SourceLinkage_validation',
+                'scan_mode': 'incremental' if self.incremental else 'full',
+                'checked_since': since.isoformat() if since else None
+            }
             
-        except Exception as e:
-            logger.error(f"Error validating linkage for entry {entry.id}: {e}")
-            return False
-    
-    def _scan_negative_stock(self) -> Tuple[List[Dict], str, Dict]:
-        """
-        Scan for negative stock quantities using ORM-based detection.
-        
-        Returns:
-            Tuple of (issues, confidence_level, evidence)
-        """
-        issues = []
-        evidence = {}
-        
-        try:
-            # Get Stock model
-            Stock = apps.get_model('product', 'Stock')
+            # Determine confidence based on validation method
+            confidence = 'HIGH' if orphaned_count <= 25 else 'MEDIUM'
             
-            with transaction.atomic():
-                # Use select_for_update for thread safety where supported
-                if connection.vendor == 'postgresql':
-                    negative_stocks = Stock.objects.select_for_update().filter(quantity__lt=0)
-                else:
-                    # SQLite: Use atomic block
-                    negative_stocks = Stock.objects.filter(quantity__lt=0)
-                
-                total_stocks = Stock.objects.count()
-                negative_count = negative_stocks.count()
-                
-                for stock in negative_stocks:
-                    product_name = 'N/A'
-                    try:
-                        if hasattr(stock, 'product') and stock.product:
-                            product_name = str(stock.product)
-                        elif hasattr(stock, 'product_id'):
-                            # Try to get product name from product_id
-                            Product = apps.get_model('product', 'Product')
-                            try:
-                                product = Product.objects.get(id=stock.product_id)
-                                product_name = str(product)
-                            except Product.DoesNotExist:
-                                product_name = f'Product ID {stock.product_id} (Not Found)'
-                    except Exception:
-                        product_name = 'Error getting product name'
-                    
-                    issues.append({
-                        'stock_id': stock.id,
-                        'product_id': getattr(stock, 'product_id', None),
-                        'product_name': product_name,
-                        'current_quantity': str(stock.quantity),
-                        'last_updated': getattr(stock, 'updated_at', None)
-                    })
-                
-                evidence = {
-                    'total_stock_records': total_stocks,
-                    'negative_stock_count': negative_count,
-                    'negative_percentage': (negative_count / total_stocks * 100) if total_stocks > 0 else 0,
-                    'scan_method': 'ORM_based_quantity_filter'
-                }
-                
-                # High confidence for negative stock detection
-                confidence = 'HIGH'
-                
-                logger.info(f"Negative stock scan: {negative_count}/{total_stocks} negative")
+            logger.info(f"Orphaned journal entries scan: {orphaned_count}/{total_entries} orphaned")
                 
         except Exception as e:
-            logger.error(f"Error scanning negative stock: {e}", exc_info=True)
+            logger.error(f"Error scanning orphaned journal entries: {e}", exc_info=True)
             issues = [{'error': f"Scan failed: {str(e)}"}]
             confidence = 'LOW'
             evidence = {'error': str(e)}
@@ -515,71 +443,6 @@ class RepairService:
         
         return issues, confidence, evidence
     
-    def _scan_unbalanced_journal_entries(self) -> Tuple[List[Dict], str, Dict]:
-        """
-        Scan for unbalanced journal entries (debits != credits).
-        
-        Returns:
-            Tuple of (issues, confidence_level, evidence)
-        """
-        issues = []
-        evidence = {}
-        
-        try:
-            # Get models
-            JournalEntry = apps.get_model('financial', 'JournalEntry')
-            JournalEntryLine = apps.get_model('financial', 'JournalEntryLine')
-            
-            with transaction.atomic():
-                # Use select_for_update for thread safety where supported
-                if connection.vendor == 'postgresql':
-                    entries = JournalEntry.objects.select_for_update().all()
-                else:
-                    # SQLite: Use atomic block
-                    entries = JournalEntry.objects.all()
-                
-                total_entries = entries.count()
-                unbalanced_count = 0
-                
-                for entry in entries:
-                    # Calculate debit and credit totals
-                    lines = JournalEntryLine.objects.filter(journal_entry=entry)
-                    debit_total = sum(line.debit_amount for line in lines if line.debit_amount)
-                    credit_total = sum(line.credit_amount for line in lines if line.credit_amount)
-                    
-                    if abs(debit_total - credit_total) > Decimal('0.01'):  # Allow for rounding
-                        issues.append({
-                            'entry_id': entry.id,
-                            'entry_number': getattr(entry, 'number', 'N/A'),
-                            'debit_total': str(debit_total),
-                            'credit_total': str(credit_total),
-                            'difference': str(debit_total - credit_total),
-                            'line_count': lines.count(),
-                            'created_at': entry.date.isoformat() if hasattr(entry, 'date') else None
-                        })
-                        unbalanced_count += 1
-                
-                evidence = {
-                    'total_journal_entries': total_entries,
-                    'unbalanced_entries': unbalanced_count,
-                    'unbalanced_percentage': (unbalanced_count / total_entries * 100) if total_entries > 0 else 0,
-                    'tolerance': '0.01',
-                    'scan_method': 'ORM_based_debit_credit_calculation'
-                }
-                
-                # High confidence for balance calculation
-                confidence = 'HIGH'
-                
-                logger.info(f"Unbalanced entries scan: {unbalanced_count}/{total_entries} unbalanced")
-                
-        except Exception as e:
-            logger.error(f"Error scanning unbalanced entries: {e}", exc_info=True)
-            issues = [{'error': f"Scan failed: {str(e)}"}]
-            confidence = 'LOW'
-            evidence = {'error': str(e)}
-        
-        return issues, confidence, evidence
-    
     def generate_comprehensive_repair_plan(self, corruption_report: CorruptionReport) -> Dict:
         """
         Generate comprehensive repair plan using policy framework.
@@ -770,6 +633,49 @@ class RepairService:
         
         return risks
     
+    def quarantine_invariant_violations(self, corruption_type: str,
+                                        chunk_size: int = INVARIANT_SCAN_CHUNK_SIZE) -> Dict:
+        """
+        Stream the violations of a registered invariant scan into quarantine.
+        Violations are fetched and quarantined chunk by chunk, so the full
+        result set is never held in memory.
+        
+        Args:
+            corruption_type: Corruption type of a registered invariant scan
+            chunk_size: Violations fetched and quarantined per batch
+            
+        Returns:
+            Dict: Requested/created counts and the created quarantine IDs
+        """
+        from .quarantine_system import QuarantineSystem
+        
+        scan = self.invariant_scans.get(corruption_type)
+        if scan is None:
+            raise GovernanceError(f"No invariant scan registered for {corruption_type}")
+        
+        quarantine_system = QuarantineSystem()
+        results = {
+            'corruption_type': corruption_type,
+            'requested_count': 0,
+            'created_count': 0,
+            'quarantine_ids': []
+        }
+        
+        for chunk in scan.iter_issue_chunks(chunk_size=chunk_size):
+            batch_result = quarantine_system.batch_quarantine_data(
+                [scan.to_quarantine_data(issue) for issue in chunk],
+                user=self.user
+            )
+            results['requested_count'] += batch_result['requested_count']
+            results['created_count'] += batch_result['created_count']
+            results['quarantine_ids'].extend(batch_result['quarantine_ids'])
+        
+        logger.info(
+            f"Quarantined {results['created_count']}/{results['requested_count']} "
+            f"{corruption_type} violations"
+        )
+        return results
+    
     def quarantine_suspicious_data(self, corruption_report: CorruptionReport, 
                                  auto_quarantine: bool = False) -> Dict:
         """
@@ -3,14 +3,68 @@ Reports Builder Service
 خدمة بناء وتنفيذ التقارير المخصصة
 """
 
-from django.db.models import Count, Sum, Avg, Q
+from django.db.models import Count, Sum, Avg, Min, Max, Q, F
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from django.apps import apps
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Tuple
+import base64
+import csv
+import hashlib
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Default and maximum rows returned per report page
+REPORT_PAGE_SIZE = 1000
+REPORT_MAX_PAGE_SIZE = 5000
+
+# Rows fetched per database round trip while exporting
+REPORT_EXPORT_CHUNK_SIZE = 2000
+
+# Cached report results (keyed by a hash of the report configuration)
+REPORT_CACHE_PREFIX = 'governance_report:'
+REPORT_RESULT_CACHE_TIMEOUT = 900
+REPORT_CONFIG_KEYS = (
+    'data_source', 'selected_fields', 'filters', 'group_by', 'aggregations', 'sort_by', 'sort_order'
+)
+
+AGGREGATE_FUNCTIONS = {
+    'sum': Sum,
+    'avg': Avg,
+    'min': Min,
+    'max': Max,
+    'count': Count,
+}
+NUMERIC_AGGREGATES = ('sum', 'avg')
+
+
+class ReportConfigError(ValueError):
+    """إعدادات تقرير غير صالحة (مصدر بيانات، تجميع، أو مؤشر صفحات)"""
+
+
+@dataclass
+class ReportQuery:
+    """الـ queryset المبني لتقرير مع بيانات الأعمدة وترتيب الصفحات"""
+    queryset: object
+    base_queryset: object
+    fields_config: Dict
+    columns: List[str]
+    keys: List[Tuple[str, bool]]
+    aggregates: Dict = field(default_factory=dict)
+
+
+class _EchoBuffer:
+    """كائن شبيه بالملف يعيد ما يُكتب فيه (لـ csv.writer مع البث)"""
+    
+    def write(self, value):
+        return value
+
 
 class ReportsBuilderService:
     """
@@ -141,98 +195,374 @@ class ReportsBuilderService:
         ]
     
     @classmethod
-    def execute_report(cls, report_config, user=None):
+    def execute_report(cls, report_config, user=None, cursor=None, page_size=None):
         """
-        تنفيذ تقرير
+        تنفيذ تقرير وإرجاع صفحة واحدة من النتائج
         
         Args:
-            report_config: dict with keys: data_source, selected_fields, filters, group_by, sort_by, sort_order
+            report_config: dict with keys: data_source, selected_fields, filters, group_by,
+                aggregations, sort_by, sort_order
             user: User object (for permission checks)
+            cursor: next_cursor returned by the previous page (None for the first page)
+            page_size: Rows per page (default REPORT_PAGE_SIZE, capped at REPORT_MAX_PAGE_SIZE)
         
         Returns:
-            dict with keys: success, data, rows_count, error
+            dict with keys: success, data, rows_count, next_cursor, has_more, totals, error
         """
-        from governance.models import ReportExecution
-        
         try:
-            data_source = report_config.get('data_source')
-            selected_fields = report_config.get('selected_fields', [])
-            filters = report_config.get('filters', [])  # Can be list or dict
-            group_by = report_config.get('group_by', '')
-            sort_by = report_config.get('sort_by', '')
-            sort_order = report_config.get('sort_order', 'asc')
-            
-            # Get model
-            config = cls.DATA_SOURCE_CONFIG.get(data_source)
-            if not config:
-                return {
-                    'success': False,
-                    'error': f'مصدر البيانات غير معروف: {data_source}',
-                    'data': [],
-                    'rows_count': 0
-                }
-            
-            try:
-                Model = apps.get_model(config['model'])
-            except LookupError:
-                return {
-                    'success': False,
-                    'error': f'النموذج غير موجود: {config["model"]}',
-                    'data': [],
-                    'rows_count': 0
-                }
-            
-            # Build queryset
-            queryset = Model.objects.all()
-            
-            # Apply filters
-            if filters:
-                queryset = cls._apply_filters(queryset, filters)
+            plan = cls.build_query(report_config)
+            page_size = min(max(int(page_size or REPORT_PAGE_SIZE), 1), REPORT_MAX_PAGE_SIZE)
             
-            # Select only needed fields
-            if selected_fields:
-                # Make sure we have valid field names
-                valid_fields = [f for f in selected_fields if f in config['fields']]
-                if valid_fields:
-                    queryset = queryset.values(*valid_fields)
-                else:
-                    # No valid fields selected, use all available fields
-                    queryset = queryset.values(*list(config['fields'].keys()))
-            else:
-                # No fields selected, use all available fields
-                queryset = queryset.values(*list(config['fields'].keys()))
-            
-            # Apply grouping
-            if group_by and group_by in config['fields']:
-                queryset = queryset.values(group_by).annotate(count=Count('id'))
+            queryset = plan.queryset
+            if cursor:
+                queryset = queryset.filter(cls._keyset_filter(plan.keys, cls._decode_cursor(cursor)))
             
-            # Apply sorting
-            if sort_by and sort_by in config['fields']:
-                order_field = f"-{sort_by}" if sort_order == 'desc' else sort_by
-                queryset = queryset.order_by(order_field)
+            # Fetch one extra row to know whether another page exists
+            rows = list(queryset[:page_size + 1])
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
             
-            # Execute query
-            data = list(queryset[:1000])  # Limit to 1000 rows for performance
-            rows_count = len(data)
-            
-            # Format data
-            formatted_data = cls._format_data(data, config['fields'])
+            next_cursor = None
+            if has_more:
+                next_cursor = cls._encode_cursor([rows[-1][field] for field, _ in plan.keys])
             
             return {
                 'success': True,
-                'data': formatted_data,
-                'rows_count': rows_count,
+                'data': cls._format_data(rows, plan.fields_config, plan.columns),
+                'rows_count': len(rows),
+                'next_cursor': next_cursor,
+                'has_more': has_more,
+                'totals': cls._calculate_totals(plan),
                 'error': None
             }
             
+        except ReportConfigError as e:
+            return cls._error_result(str(e))
         except Exception as e:
             logger.error(f"Error executing report: {e}", exc_info=True)
-            return {
-                'success': False,
-                'error': str(e),
-                'data': [],
-                'rows_count': 0
-            }
+            return cls._error_result(str(e))
+    
+    @classmethod
+    def execute_report_cached(cls, report_config, timeout=None):
+        """
+        تنفيذ الصفحة الأولى من التقرير مع تخزين النتيجة مؤقتاً حسب بصمة الإعدادات
+        
+        التقارير ذات الإعدادات المتطابقة (مثل عدة جدولات لنفس التقرير) تشترك في نفس النتيجة.
+        """
+        cache_key = cls.get_cache_key(report_config)
+        result = cache.get(cache_key)
+        if result is not None:
+            return {**result, 'cached': True}
+        
+        result = cls.execute_report(report_config)
+        if result['success']:
+            cache.set(cache_key, result, REPORT_RESULT_CACHE_TIMEOUT if timeout is None else timeout)
+        return {**result, 'cached': False}
+    
+    @classmethod
+    def get_cache_key(cls, report_config):
+        """مفتاح التخزين المؤقت لنتيجة تقرير (SHA-256 لإعدادات التقرير)"""
+        config = {key: report_config.get(key) for key in REPORT_CONFIG_KEYS}
+        digest = hashlib.sha256(
+            json.dumps(config, sort_keys=True, cls=DjangoJSONEncoder).encode('utf-8')
+        ).hexdigest()
+        return f"{REPORT_CACHE_PREFIX}{digest}"
+    
+    @classmethod
+    def build_query(cls, report_config):
+        """
+        بناء الـ queryset الخاص بالتقرير (المرشحات، الحقول، التجميع، الترتيب)
+        
+        Raises:
+            ReportConfigError: مصدر بيانات أو نموذج أو تجميع غير صالح
+        
+        Returns:
+            ReportQuery
+        """
+        data_source = report_config.get('data_source')
+        filters = report_config.get('filters', [])  # Can be list or dict
+        group_by = report_config.get('group_by', '') or ''
+        sort_by = report_config.get('sort_by', '') or ''
+        descending = report_config.get('sort_order', 'asc') == 'desc'
+        
+        config = cls.DATA_SOURCE_CONFIG.get(data_source)
+        if not config:
+            raise ReportConfigError(f'مصدر البيانات غير معروف: {data_source}')
+        
+        try:
+            Model = apps.get_model(config['model'])
+        except LookupError:
+            raise ReportConfigError(f'النموذج غير موجود: {config["model"]}')
+        
+        fields_config = config['fields']
+        queryset = Model.objects.all()
+        
+        # Apply filters
+        if filters:
+            queryset = cls._apply_filters(queryset, filters)
+        
+        aggregates = cls._build_aggregates(report_config.get('aggregations') or [], fields_config)
+        base_queryset = queryset
+        
+        if group_by and group_by in fields_config:
+            # Server-side grouping: one row per group value with the requested aggregates
+            if not aggregates:
+                aggregates = {'count': Count('pk')}
+            queryset = queryset.values(group_by).annotate(**aggregates)
+            columns = [group_by, *aggregates]
+            keys = [(group_by, descending)]
+        else:
+            # Select only needed fields
+            selected_fields = [f for f in report_config.get('selected_fields', []) if f in fields_config]
+            columns = selected_fields or list(fields_config.keys())
+            sort_field = sort_by if sort_by in fields_config else None
+            keys = [(sort_field, descending), ('pk', descending)] if sort_field else [('pk', False)]
+            queryset = queryset.values('pk', *[column for column in columns if column != 'pk'])
+        
+        # Stable keyset order; NULLs sort as the smallest value in both directions
+        queryset = queryset.order_by(*[
+            F(field).desc(nulls_last=True) if desc else F(field).asc(nulls_first=True)
+            for field, desc in keys
+        ])
+        
+        return ReportQuery(
+            queryset=queryset,
+            base_queryset=base_queryset,
+            fields_config=fields_config,
+            columns=columns,
+            keys=keys,
+            aggregates=aggregates if not group_by else {},
+        )
+    
+    @classmethod
+    def iter_report_rows(cls, report_config, chunk_size=None):
+        """
+        توليد كل صفوف التقرير منسقة بذاكرة ثابتة (للتصدير)
+        
+        يتم جلب الصفوف على دفعات عبر iterator() (server-side cursor في PostgreSQL)
+        بدلاً من تحميل النتيجة كاملة.
+        """
+        plan = cls.build_query(report_config)
+        yield from cls._iter_formatted(
+            plan.queryset.iterator(chunk_size=chunk_size or REPORT_EXPORT_CHUNK_SIZE),
+            plan.fields_config, plan.columns
+        )
+    
+    @classmethod
+    def get_report_columns(cls, report_config):
+        """أعمدة التقرير بالترتيب مع عناوينها: [(field_name, label), ...]"""
+        plan = cls.build_query(report_config)
+        return [
+            (column, plan.fields_config.get(column, {}).get('label', column))
+            for column in plan.columns
+        ]
+    
+    @classmethod
+    def stream_csv(cls, report_config):
+        """
+        تصدير التقرير كاملاً بصيغة CSV كسطور متتالية (لـ StreamingHttpResponse)
+        """
+        columns = [column for column, _ in cls.get_report_columns(report_config)]
+        buffer = _EchoBuffer()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+        
+        # BOM so spreadsheet programs detect UTF-8 (Arabic text)
+        yield '\ufeff' + writer.writeheader()
+        for row in cls.iter_report_rows(report_config):
+            yield writer.writerow(row)
+    
+    @classmethod
+    def write_xlsx(cls, report_config, output, title=''):
+        """
+        كتابة التقرير كاملاً في ملف Excel بوضع write-only (ذاكرة ثابتة)
+        
+        Args:
+            output: مسار أو ملف مفتوح للكتابة
+            title: عنوان يكتب في الصف الأول
+        
+        Returns:
+            int: عدد صفوف البيانات المكتوبة
+        """
+        import openpyxl
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font, PatternFill
+        from openpyxl.utils import get_column_letter
+        
+        columns = cls.get_report_columns(report_config)
+        
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet(title=(title or 'Report')[:31])  # Excel sheet name limit
+        
+        # Column widths must be set before the first row in write-only mode
+        for index, (column, label) in enumerate(columns, start=1):
+            sheet.column_dimensions[get_column_letter(index)].width = min(max(len(str(label)), 12) + 2, 50)
+        
+        if title:
+            title_cell = WriteOnlyCell(sheet, value=title)
+            title_cell.font = Font(size=16, bold=True)
+            sheet.append([title_cell])
+            sheet.append([])
+        
+        header = []
+        for column, label in columns:
+            cell = WriteOnlyCell(sheet, value=label)
+            cell.font = Font(bold=True)
+            cell.fill = PatternFill(start_color='CCCCCC', end_color='CCCCCC', fill_type='solid')
+            header.append(cell)
+        sheet.append(header)
+        
+        rows_written = 0
+        for row in cls.iter_report_rows(report_config):
+            sheet.append([row.get(column, '') for column, _ in columns])
+            rows_written += 1
+        
+        workbook.save(output)
+        return rows_written
+    
+    @classmethod
+    def run_due_schedules(cls, now=None):
+        """
+        تشغيل التقارير المجدولة المستحقة (يُستدعى من مهمة Celery دورية)
+        
+        كل جدولة تُحجز بتحديث شرطي لـ next_run_at حتى لا يشغلها عاملان معاً،
+        والنتيجة تؤخذ من الـ cache إن كان لنفس الإعدادات نتيجة حديثة.
+        
+        Returns:
+            dict: executed, failed, skipped
+        """
+        from governance.models import ReportSchedule, ReportExecution
+        
+        now = now or timezone.now()
+        stats = {'executed': 0, 'failed': 0, 'skipped': 0}
+        
+        due = ReportSchedule.objects.select_related('report').filter(
+            status='ACTIVE', report__status='ACTIVE', next_run_at__lte=now
+        ).order_by('next_run_at')
+        
+        for schedule in due:
+            claimed = ReportSchedule.objects.filter(
+                pk=schedule.pk, next_run_at=schedule.next_run_at
+            ).update(next_run_at=None, last_run_at=now)
+            if not claimed:
+                stats['skipped'] += 1
+                continue
+            
+            execution = ReportExecution.objects.create(
+                report=schedule.report,
+                schedule=schedule,
+                status='RUNNING',
+                triggered_by=schedule.created_by
+            )
+            result = cls.execute_report_cached(cls.get_report_config(schedule.report))
+            if result['success']:
+                execution.mark_as_success(result['rows_count'], result['data'])
+                schedule.report.increment_run_count()
+                stats['executed'] += 1
+            else:
+                execution.mark_as_failed(result['error'])
+                stats['failed'] += 1
+            
+            schedule.last_run_at = now
+            schedule.calculate_next_run()
+        
+        return stats
+    
+    @classmethod
+    def get_report_config(cls, report):
+        """إعدادات التنفيذ لتقرير محفوظ"""
+        return {
+            'data_source': report.data_source,
+            'selected_fields': report.selected_fields or [],
+            'filters': report.filters or [],
+            'group_by': report.group_by or '',
+            'sort_by': report.sort_by or '',
+            'sort_order': report.sort_order or 'asc',
+            'report_type': report.report_type,
+        }
+    
+    @classmethod
+    def _build_aggregates(cls, aggregations, fields_config):
+        """
+        تحويل [{'field': 'total', 'function': 'sum'}, ...] إلى تعبيرات تجميع
+        بأسماء أعمدة على نمط Django (total__sum)
+        """
+        aggregates = {}
+        for aggregation in aggregations:
+            field = aggregation.get('field')
+            function = (aggregation.get('function') or '').lower()
+            if function not in AGGREGATE_FUNCTIONS:
+                raise ReportConfigError(f'دالة تجميع غير مدعومة: {function}')
+            if function == 'count' and field in (None, '', '*'):
+                aggregates['count'] = Count('pk')
+                continue
+            if field not in fields_config:
+                raise ReportConfigError(f'حقل غير معروف للتجميع: {field}')
+            if function in NUMERIC_AGGREGATES and fields_config[field]['type'] != 'number':
+                raise ReportConfigError(f'لا يمكن تطبيق {function} على الحقل غير الرقمي: {field}')
+            aggregates[f'{field}__{function}'] = AGGREGATE_FUNCTIONS[function](field)
+        return aggregates
+    
+    @classmethod
+    def _calculate_totals(cls, plan):
+        """إجماليات التقرير كاملاً (بدون تجميع) للتجميعات المطلوبة"""
+        if not plan.aggregates:
+            return {}
+        totals = plan.base_queryset.aggregate(**plan.aggregates)
+        return {
+            name: float(value) if isinstance(value, Decimal) else value
+            for name, value in totals.items()
+        }
+    
+    @classmethod
+    def _keyset_filter(cls, keys, values):
+        """
+        شرط "بعد آخر صف" لترتيب متعدد الأعمدة، مع معاملة NULL كأصغر قيمة
+        """
+        if len(values) != len(keys):
+            raise ReportConfigError('مؤشر الصفحات غير صالح')
+        
+        condition = Q(pk__in=[])
+        prefix = Q()
+        for (field, descending), value in zip(keys, values):
+            if descending:
+                after = Q() if value is None else Q(**{f'{field}__lt': value}) | Q(**{f'{field}__isnull': True})
+            else:
+                after = Q(**{f'{field}__isnull': False}) if value is None else Q(**{f'{field}__gt': value})
+            if after:
+                condition |= prefix & after
+            prefix &= Q(**{f'{field}__isnull': True}) if value is None else Q(**{field: value})
+        return condition
+    
+    @classmethod
+    def _encode_cursor(cls, values):
+        # Full-precision isoformat: DjangoJSONEncoder truncates microseconds,
+        # which would repeat rows across pages
+        payload = json.dumps(
+            values, default=lambda value: value.isoformat() if hasattr(value, 'isoformat') else str(value)
+        ).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+    
+    @classmethod
+    def _decode_cursor(cls, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except (ValueError, TypeError, UnicodeError):
+            raise ReportConfigError('مؤشر الصفحات غير صالح')
+        if not isinstance(values, list):
+            raise ReportConfigError('مؤشر الصفحات غير صالح')
+        return values
+    
+    @staticmethod
+    def _error_result(error):
+        return {
+            'success': False,
+            'error': error,
+            'data': [],
+            'rows_count': 0,
+            'next_cursor': None,
+            'has_more': False,
+            'totals': {}
+        }
     
     @classmethod
     def _apply_filters(cls, queryset, filters):
@@ -268,27 +598,31 @@ class ReportsBuilderService:
         return queryset.filter(q_objects)
     
     @classmethod
-    def _format_data(cls, data, fields_config):
+    def _format_data(cls, data, fields_config, columns=None):
         """
         تنسيق البيانات للعرض
         """
-        formatted = []
-        
-        for row in data:
+        return list(cls._iter_formatted(data, fields_config, columns))
+    
+    @classmethod
+    def _iter_formatted(cls, rows, fields_config, columns=None):
+        """تنسيق الصفوف واحداً تلو الآخر (يحتفظ فقط بالأعمدة المطلوبة إن حُددت)"""
+        for row in rows:
             formatted_row = {}
-            for field_name, value in row.items():
-                field_config = fields_config.get(field_name, {})
-                field_type = field_config.get('type', 'text')
+            for field_name in (columns or row.keys()):
+                value = row.get(field_name)
+                if field_name not in fields_config:
+                    # Aggregate columns (count, total__sum, ...)
+                    formatted_row[field_name] = float(value) if isinstance(value, Decimal) else value
+                    continue
+                field_type = fields_config[field_name].get('type', 'text')
                 
                 # Format based on type
                 if field_type == 'date' and value:
-                    try:
-                        if isinstance(value, datetime):
-                            formatted_row[field_name] = value.strftime('%Y-%m-%d')
-                        else:
-                            formatted_row[field_name] = str(value)
-                    except Exception:
-                        formatted_row[field_name] = str(value) if value is not None else ''
+                    if isinstance(value, datetime):
+                        formatted_row[field_name] = value.strftime('%Y-%m-%d')
+                    else:
+                        formatted_row[field_name] = str(value)
                 elif field_type == 'number' and value is not None:
                     try:
                         formatted_row[field_name] = float(value)
@@ -299,9 +633,7 @@ class ReportsBuilderService:
                 else:
                     formatted_row[field_name] = str(value) if value is not None else ''
             
-            formatted.append(formatted_row)
-        
-        return formatted
+            yield formatted_row
     
     @classmethod
     def get_report_statistics(cls):
@@ -5,6 +5,7 @@ Provides thread-safe signal routing with kill switches and depth limiting.
 
 import threading
 import logging
+import time
 from contextlib import contextmanager
 from typing import Dict, List, Optional, Callable, Any
 from django.db import transaction
@@ -15,9 +16,51 @@ from ..models import GovernanceContext, AuditTrail
 from ..exceptions import SignalError, ConfigurationError
 from ..thread_safety import monitor_operation, ThreadSafeCounter
 from .audit_service import AuditService
+from .deferred_signals import DeferredSignal, DeferredSignalDispatcher, DEFERRED_SIGNAL_WORKERS
 
 logger = logging.getLogger(__name__)
 
+SIGNAL_DISPATCH_MODES = ('inline', 'deferred')
+
+
+class HandlerLatencyStats:
+    """Per-handler call counts and latency, keyed by handler description"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+    
+    def record(self, description: str, seconds: float, success: bool, deferred: bool):
+        with self._lock:
+            entry = self._stats.get(description)
+            if entry is None:
+                entry = self._stats[description] = {
+                    'calls': 0, 'failures': 0, 'total_seconds': 0.0, 'max_seconds': 0.0,
+                    'deferred': deferred
+                }
+            entry['calls'] += 1
+            entry['total_seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            if not success:
+                entry['failures'] += 1
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                description: {
+                    'calls': entry['calls'],
+                    'failures': entry['failures'],
+                    'avg_ms': round(entry['total_seconds'] / entry['calls'] * 1000, 3),
+                    'max_ms': round(entry['max_seconds'] * 1000, 3),
+                    'deferred': entry['deferred'],
+                }
+                for description, entry in self._stats.items()
+            }
+    
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
 
 class SignalRouter:
     """
@@ -36,22 +79,39 @@ class SignalRouter:
     DEFAULT_DEPTH_LIMIT = 5
     DEFAULT_TIMEOUT = 30  # seconds
     
-    def __init__(self, depth_limit: int = None, enable_audit: bool = True):
+    def __init__(self, depth_limit: int = None, enable_audit: bool = True,
+                 dispatch_mode: str = None, deferred_backend: str = None):
         """
         Initialize SignalRouter with governance controls.
         
         Args:
             depth_limit: Maximum signal chain depth (default: 5)
             enable_audit: Whether to enable audit logging (default: True)
+            dispatch_mode: 'inline' runs every handler inside the saving transaction,
+                'deferred' runs non-critical handlers after commit
+                (default: GOVERNANCE_SIGNAL_DISPATCH['MODE'])
+            deferred_backend: Where deferred handlers run: 'thread', 'celery' or 'sync'
+                (default: GOVERNANCE_SIGNAL_DISPATCH['DEFERRED_BACKEND'])
         """
         self.depth_limit = depth_limit or self.DEFAULT_DEPTH_LIMIT
         self.enable_audit = enable_audit
         
+        dispatch_settings = getattr(settings, 'GOVERNANCE_SIGNAL_DISPATCH', {})
+        self.dispatch_mode = dispatch_mode or dispatch_settings.get('MODE', 'inline')
+        if self.dispatch_mode not in SIGNAL_DISPATCH_MODES:
+            raise ConfigurationError('SignalRouter', f"Invalid signal dispatch mode: {self.dispatch_mode}")
+        self._deferred = DeferredSignalDispatcher(
+            self._run_deferred_signal,
+            backend=deferred_backend or dispatch_settings.get('DEFERRED_BACKEND', 'thread'),
+            max_workers=dispatch_settings.get('DEFERRED_WORKERS', DEFERRED_SIGNAL_WORKERS)
+        )
+        self._handler_stats = HandlerLatencyStats()
+        
         # Global kill switch
         self._global_enabled = True
         self._global_lock = threading.RLock()
         
-        # Per-signal kill switches
+        # Per-signal kill switches (copy-on-write so readers never take the lock)
         self._signal_switches: Dict[str, bool] = {}
         self._switches_lock = threading.RLock()
         
@@ -82,15 +142,13 @@ class SignalRouter:
     
     @property
     def global_enabled(self) -> bool:
-        """Check if global kill switch is enabled"""
-        with self._global_lock:
-            return self._global_enabled
+        """Check if global kill switch is enabled (lock-free; writers serialize on _global_lock)"""
+        return self._global_enabled
     
     @property
     def maintenance_mode(self) -> bool:
-        """Check if maintenance mode is active"""
-        with self._maintenance_lock:
-            return self._maintenance_mode
+        """Check if maintenance mode is active (lock-free; writers serialize on _maintenance_lock)"""
+        return self._maintenance_mode
     
     def enable_global_signals(self) -> None:
         """Enable global signal processing"""
@@ -129,7 +187,7 @@ class SignalRouter:
     def enable_signal(self, signal_name: str) -> None:
         """Enable specific signal"""
         with self._switches_lock:
-            self._signal_switches[signal_name] = True
+            self._signal_switches = {**self._signal_switches, signal_name: True}
             logger.info(f"Signal '{signal_name}' enabled")
             
             if self.enable_audit:
@@ -145,7 +203,7 @@ class SignalRouter:
     def disable_signal(self, signal_name: str, reason: str = "Manual disable") -> None:
         """Disable specific signal"""
         with self._switches_lock:
-            self._signal_switches[signal_name] = False
+            self._signal_switches = {**self._signal_switches, signal_name: False}
             logger.warning(f"Signal '{signal_name}' disabled: {reason}")
             
             if self.enable_audit:
@@ -161,8 +219,7 @@ class SignalRouter:
     
     def is_signal_enabled(self, signal_name: str) -> bool:
         """Check if specific signal is enabled"""
-        with self._switches_lock:
-            return self._signal_switches.get(signal_name, True)
+        return self._signal_switches.get(signal_name, True)
     
     def enter_maintenance_mode(self, reason: str = "Maintenance") -> None:
         """
@@ -199,7 +256,8 @@ class SignalRouter:
                 )
     
     def register_handler(self, signal_name: str, handler: Callable, 
-                        critical: bool = False, description: str = "") -> None:
+                        critical: bool = False, description: str = "",
+                        defer: Optional[bool] = None) -> None:
         """
         Register a signal handler.
         
@@ -208,7 +266,13 @@ class SignalRouter:
             handler: Handler function
             critical: Whether this handler is critical (executes even in maintenance mode)
             description: Description of what the handler does
+            defer: Run after commit (True), always inline (False, e.g. pre_save
+                handlers that modify the instance), or follow the router's
+                dispatch mode (None). Critical handlers always run inline.
         """
+        if critical and defer:
+            raise ConfigurationError('SignalRouter', f"Critical handler for '{signal_name}' cannot be deferred")
+        
         with self._handlers_lock:
             if signal_name not in self._handlers:
                 self._handlers[signal_name] = []
@@ -217,6 +281,7 @@ class SignalRouter:
                 'handler': handler,
                 'critical': critical,
                 'description': description,
+                'defer': defer,
                 'registered_at': timezone.now()
             }
             
@@ -371,64 +436,59 @@ class SignalRouter:
         
         return None
     
+    def _should_defer(self, handler_info: Dict) -> bool:
+        """Whether a handler runs after commit instead of inside the transaction"""
+        if handler_info['critical']:
+            return False
+        defer = handler_info.get('defer')
+        return self.dispatch_mode == 'deferred' if defer is None else defer
+    
     def _execute_signal_handlers(self, signal_name: str, sender, instance, **kwargs) -> Dict[str, Any]:
         """
         Execute registered handlers for the signal.
         
+        Critical and inline handlers run now; deferred handlers are queued
+        until the surrounding transaction commits.
+        
         Returns:
             dict: Execution results
         """
         result = {
             'handlers_executed': 0,
             'handlers_failed': 0,
+            'handlers_deferred': 0,
             'handler_results': []
         }
         
+        with self._handlers_lock:
+            handlers = list(self._handlers.get(signal_name, []))
+        
+        # Check if handlers should run in maintenance mode
+        if self.maintenance_mode:
+            for handler_info in handlers:
+                if not handler_info['critical']:
+                    logger.debug(f"Skipping non-critical handler in maintenance mode: {handler_info['description']}")
+            handlers = [h for h in handlers if h['critical']]
+        
+        inline = [h for h in handlers if not self._should_defer(h)]
+        deferred = [h for h in handlers if self._should_defer(h)]
+        
+        if deferred:
+            self._deferred.enqueue(DeferredSignal(
+                signal_name=signal_name,
+                sender=sender,
+                instance=instance,
+                kwargs=kwargs,
+                handlers=deferred,
+                user=GovernanceContext.get_current_user()
+            ), using=kwargs.get('using'))
+            result['handlers_deferred'] = len(deferred)
+        
         # Add signal to call stack
         self.call_stack.append(signal_name)
         
         try:
-            with self._handlers_lock:
-                handlers = self._handlers.get(signal_name, [])
-            
-            for handler_info in handlers:
-                handler = handler_info['handler']
-                critical = handler_info['critical']
-                description = handler_info['description']
-                
-                try:
-                    # Check if handler should run in maintenance mode
-                    if self.maintenance_mode and not critical:
-                        logger.debug(f"Skipping non-critical handler in maintenance mode: {description}")
-                        continue
-                    
-                    # Execute handler
-                    logger.debug(f"Executing signal handler: {description}")
-                    handler_result = handler(sender=sender, instance=instance, **kwargs)
-                    
-                    result['handlers_executed'] += 1
-                    result['handler_results'].append({
-                        'handler': description,
-                        'success': True,
-                        'result': handler_result
-                    })
-                    
-                except Exception as e:
-                    result['handlers_failed'] += 1
-                    result['handler_results'].append({
-                        'handler': description,
-                        'success': False,
-                        'error': str(e)
-                    })
-                    
-                    logger.error(f"Signal handler failed ({description}): {e}", exc_info=True)
-                    
-                    # For critical handlers, we might want to propagate the error
-                    if critical:
-                        logger.error(f"Critical signal handler failed: {description}")
-                        # Note: We don't raise here to allow other handlers to run
-                        # The calling code can check handler_results for critical failures
-            
+            self._run_handlers(inline, sender, instance, kwargs, result, deferred=False)
             return result
             
         finally:
@@ -436,6 +496,103 @@ class SignalRouter:
             if self.call_stack and self.call_stack[-1] == signal_name:
                 self.call_stack.pop()
     
+    def _run_handlers(self, handlers: List[Dict], sender, instance, kwargs: Dict,
+                      result: Dict[str, Any], deferred: bool) -> None:
+        """Run handlers in order, recording outcome and latency for each"""
+        for handler_info in handlers:
+            handler = handler_info['handler']
+            critical = handler_info['critical']
+            description = handler_info['description']
+            started = time.perf_counter()
+            
+            try:
+                # Execute handler
+                logger.debug(f"Executing signal handler: {description}")
+                handler_result = handler(sender=sender, instance=instance, **kwargs)
+                
+                self._handler_stats.record(description, time.perf_counter() - started, True, deferred)
+                result['handlers_executed'] += 1
+                result['handler_results'].append({
+                    'handler': description,
+                    'success': True,
+                    'result': handler_result
+                })
+                
+            except Exception as e:
+                self._handler_stats.record(description, time.perf_counter() - started, False, deferred)
+                result['handlers_failed'] += 1
+                result['handler_results'].append({
+                    'handler': description,
+                    'success': False,
+                    'error': str(e)
+                })
+                
+                logger.error(f"Signal handler failed ({description}): {e}", exc_info=True)
+                
+                # For critical handlers, we might want to propagate the error
+                if critical:
+                    logger.error(f"Critical signal handler failed: {description}")
+                    # Note: We don't raise here to allow other handlers to run
+                    # The calling code can check handler_results for critical failures
+    
+    def _run_deferred_signal(self, deferred: DeferredSignal) -> Dict[str, Any]:
+        """
+        Execute queued handlers after commit.
+        
+        Governance controls are re-checked at execution time, so a kill switch
+        or maintenance mode entered after the save still blocks the work.
+        """
+        result = {
+            'handlers_executed': 0,
+            'handlers_failed': 0,
+            'handler_results': []
+        }
+        
+        block_reason = self._check_governance_controls(deferred.signal_name, False)
+        if block_reason:
+            self._blocked_counter.increment()
+            logger.info(f"Deferred signal '{deferred.signal_name}' blocked: {block_reason}")
+            return result
+        
+        self.call_stack.append(deferred.signal_name)
+        try:
+            self._run_handlers(deferred.handlers, deferred.sender, deferred.instance,
+                               deferred.kwargs, result, deferred=True)
+        finally:
+            if self.call_stack and self.call_stack[-1] == deferred.signal_name:
+                self.call_stack.pop()
+        
+        if self.enable_audit and result['handlers_executed'] > 0:
+            sender = deferred.sender
+            AuditService.log_signal_operation(
+                signal_name=deferred.signal_name,
+                sender_model=sender.__name__ if hasattr(sender, '__name__') else str(sender),
+                sender_id=getattr(deferred.instance, 'id', 0) if deferred.instance else 0,
+                operation='EXECUTED',
+                user=deferred.user,
+                handlers_executed=result['handlers_executed'],
+                handlers_failed=result['handlers_failed'],
+                critical=False,
+                deferred=True
+            )
+        
+        return result
+    
+    def run_deferred_handlers(self, signal_name: str, sender, instance, **kwargs) -> Dict[str, Any]:
+        """
+        Run the deferred handlers registered for a signal (Celery worker entry point).
+        """
+        with self._handlers_lock:
+            handlers = [h for h in self._handlers.get(signal_name, []) if self._should_defer(h)]
+        
+        return self._run_deferred_signal(DeferredSignal(
+            signal_name=signal_name,
+            sender=sender,
+            instance=instance,
+            kwargs=kwargs,
+            handlers=handlers
+        ))
+    
     @contextmanager
     def signal_context(self, signal_name: str, critical: bool = False):
         """
@@ -487,6 +644,9 @@ class SignalRouter:
             'current_call_stack': self.call_stack.copy(),
             'disabled_signals': disabled_signals,
             'registered_handlers': handler_counts,
+            'dispatch_mode': self.dispatch_mode,
+            'deferred': self._deferred.get_statistics(),
+            'handler_latency': self._handler_stats.snapshot(),
             'counters': {
                 'signals_processed': self._signal_counter.get_value(),
                 'signals_blocked': self._blocked_counter.get_value(),
@@ -499,6 +659,8 @@ class SignalRouter:
         self._signal_counter.reset()
         self._blocked_counter.reset()
         self._error_counter.reset()
+        self._deferred.reset_statistics()
+        self._handler_stats.reset()
         logger.info("Signal router statistics reset")
     
     def validate_configuration(self) -> List[str]:
@@ -585,9 +747,10 @@ def maintenance_mode(reason: str = "Maintenance"):
 
 
 def register_signal_handler(signal_name: str, handler: Callable, 
-                          critical: bool = False, description: str = ""):
+                          critical: bool = False, description: str = "",
+                          defer: Optional[bool] = None):
     """Register a signal handler with the global router"""
-    signal_router.register_handler(signal_name, handler, critical, description)
+    signal_router.register_handler(signal_name, handler, critical, description, defer)
 
 
 def get_signal_statistics():
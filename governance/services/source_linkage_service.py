@@ -3,17 +3,36 @@ Source Linkage service for validating and managing journal entry source referenc
 Implements the SourceLinkage contract system with allowlist validation and thread-safe operations.
 """
 
+import json
 import logging
-from typing import Dict, Optional, Tuple, List
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterator, Optional, Tuple, List
 from django.apps import apps
 from django.db import transaction
+from django.db.models import Q
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from ..models import GovernanceContext, QuarantineRecord
 from ..exceptions import ValidationError as GovernanceValidationError
 from ..thread_safety import monitor_operation
 
 logger = logging.getLogger(__name__)
 
+# SystemSetting key holding the high-water mark of the last completed orphan scan
+ORPHAN_SCAN_CHECKPOINT_KEY = 'governance_orphan_scan_checkpoint'
+
+# Re-check entries updated this long before the checkpoint, so rows committed
+# by transactions still open when the previous scan ran are not skipped
+ORPHAN_SCAN_OVERLAP = timedelta(minutes=5)
+
+# Only these columns are needed to validate linkage and describe an orphan
+ORPHAN_SCAN_FIELDS = (
+    'id', 'number', 'date', 'description', 'entry_type',
+    'source_module', 'source_model', 'source_id', 'updated_at',
+)
+
 
 class SourceLinkageService:
     """
@@ -139,71 +158,191 @@ class SourceLinkageService:
             return None
     
     @classmethod
-    def scan_orphaned_entries(cls, batch_size: int = 1000) -> List[Dict]:
+    def scan_orphaned_entries(cls, batch_size: int = 1000, incremental: bool = False) -> List[Dict]:
         """
         Scan for journal entries with invalid or missing source linkage.
-        Thread-safe implementation with batching.
+        
+        Entries are read with keyset pagination on (updated_at, id) and each
+        batch is validated with one id__in query per (source_module, source_model)
+        group. In incremental mode only entries created or changed since the
+        last completed scan are checked; every completed scan advances the
+        persisted checkpoint.
         
         Args:
             batch_size: Number of entries to process in each batch
+            incremental: Only scan entries changed since the last checkpoint
             
         Returns:
             list: List of orphaned entry information
         """
-        from financial.models import JournalEntry
-        
         orphaned_entries = []
         
         with monitor_operation("orphaned_entries_scan"):
             try:
-                # Process entries in batches to avoid memory issues
-                total_entries = JournalEntry.objects.count()
+                since = cls.get_scan_checkpoint() if incremental else None
                 processed = 0
+                high_water_mark = None
                 
-                while processed < total_entries:
-                    entries_batch = JournalEntry.objects.all()[processed:processed + batch_size]
-                    
-                    for entry in entries_batch:
-                        # Check if entry has source linkage fields
-                        if not all([entry.source_module, entry.source_model, entry.source_id]):
-                            orphaned_entries.append({
-                                'entry_id': entry.id,
-                                'entry_number': entry.number,
-                                'entry_date': entry.date,
-                                'description': entry.description,
-                                'issue': 'missing_source_fields',
-                                'source_module': entry.source_module,
-                                'source_model': entry.source_model,
-                                'source_id': entry.source_id
-                            })
-                            continue
-                        
-                        # Check if source linkage is valid
-                        if not cls.validate_linkage(entry.source_module, entry.source_model, entry.source_id):
-                            orphaned_entries.append({
-                                'entry_id': entry.id,
-                                'entry_number': entry.number,
-                                'entry_date': entry.date,
-                                'description': entry.description,
-                                'issue': 'invalid_source_linkage',
-                                'source_module': entry.source_module,
-                                'source_model': entry.source_model,
-                                'source_id': entry.source_id
-                            })
-                    
+                for entries_batch in cls.iter_journal_entry_batches(batch_size=batch_size, since=since):
+                    orphaned_entries.extend(cls.find_orphans_in_batch(entries_batch))
                     processed += len(entries_batch)
+                    high_water_mark = entries_batch[-1].updated_at
                     
                     # Log progress
                     if processed % (batch_size * 10) == 0:
-                        logger.info(f"Processed {processed}/{total_entries} journal entries for orphan detection")
+                        logger.info(f"Processed {processed} journal entries for orphan detection")
                 
-                logger.info(f"Orphaned entries scan completed. Found {len(orphaned_entries)} orphaned entries")
+                cls.save_scan_checkpoint(high_water_mark or since)
+                
+                logger.info(
+                    f"Orphaned entries scan completed ({'incremental' if incremental else 'full'}). "
+                    f"Checked {processed} entries, found {len(orphaned_entries)} orphaned entries"
+                )
                 return orphaned_entries
                 
             except Exception as e:
                 logger.error(f"Error during orphaned entries scan: {e}", exc_info=True)
                 raise
     
+    @classmethod
+    def iter_journal_entry_batches(cls, batch_size: int = 1000, since=None) -> Iterator[List]:
+        """
+        Yield journal entries in (updated_at, id) order using keyset pagination.
+        
+        Args:
+            batch_size: Number of entries per batch
+            since: Only yield entries updated after this datetime (minus the overlap window)
+            
+        Yields:
+            list: A batch of JournalEntry instances with only ORPHAN_SCAN_FIELDS loaded
+        """
+        from financial.models import JournalEntry
+        
+        queryset = JournalEntry.objects.only(*ORPHAN_SCAN_FIELDS).order_by('updated_at', 'id')
+        if since is not None:
+            queryset = queryset.filter(updated_at__gt=since - ORPHAN_SCAN_OVERLAP)
+        
+        last_key = None
+        while True:
+            page = queryset
+            if last_key is not None:
+                last_updated_at, last_id = last_key
+                page = page.filter(
+                    Q(updated_at__gt=last_updated_at) |
+                    Q(updated_at=last_updated_at, id__gt=last_id)
+                )
+            batch = list(page[:batch_size])
+            if not batch:
+                return
+            yield batch
+            last_key = (batch[-1].updated_at, batch[-1].id)
+    
+    @classmethod
+    def find_orphans_in_batch(cls, entries) -> List[Dict]:
+        """
+        Validate source linkage for a batch of journal entries.
+        Existence is checked with one query per (source_module, source_model) group.
+        
+        Args:
+            entries: Iterable of JournalEntry instances
+            
+        Returns:
+            list: Orphaned entry information, in the order the entries were given
+        """
+        issues_by_entry = {}
+        groups = defaultdict(list)
+        
+        for entry in entries:
+            if not all([entry.source_module, entry.source_model, entry.source_id]):
+                issues_by_entry[entry.id] = cls._orphan_issue(entry, 'missing_source_fields')
+            else:
+                groups[(entry.source_module, entry.source_model)].append(entry)
+        
+        for (source_module, source_model), group in groups.items():
+            existing_ids = cls._existing_source_ids(
+                source_module, source_model, {entry.source_id for entry in group}
+            )
+            for entry in group:
+                if entry.source_id not in existing_ids:
+                    issues_by_entry[entry.id] = cls._orphan_issue(entry, 'invalid_source_linkage')
+        
+        return [issues_by_entry[entry.id] for entry in entries if entry.id in issues_by_entry]
+    
+    @classmethod
+    def _existing_source_ids(cls, source_module: str, source_model: str, source_ids) -> set:
+        """Return the subset of source_ids that exist in an allowlisted source model"""
+        source_key = f"{source_module}.{source_model}"
+        if source_key not in cls.ALLOWED_SOURCES:
+            logger.warning(f"Invalid source model not in allowlist: {source_key}")
+            return set()
+        
+        try:
+            model_class = apps.get_model(source_module, source_model)
+        except (LookupError, ValueError) as e:
+            logger.error(f"Error accessing model {source_key}: {e}")
+            return set()
+        
+        return set(model_class.objects.filter(id__in=source_ids).values_list('id', flat=True))
+    
+    @staticmethod
+    def _orphan_issue(entry, issue: str) -> Dict:
+        """Describe an orphaned journal entry"""
+        return {
+            'entry_id': entry.id,
+            'entry_number': entry.number,
+            'entry_date': entry.date,
+            'description': entry.description,
+            'entry_type': entry.entry_type,
+            'issue': issue,
+            'source_module': entry.source_module,
+            'source_model': entry.source_model,
+            'source_id': entry.source_id
+        }
+    
+    @classmethod
+    def get_scan_checkpoint(cls):
+        """
+        Get the high-water mark (updated_at) of the last completed orphan scan.
+        
+        Returns:
+            datetime or None: None when no scan has completed yet
+        """
+        from core.models import SystemSetting
+        
+        checkpoint = SystemSetting.get_setting(ORPHAN_SCAN_CHECKPOINT_KEY) or {}
+        value = checkpoint.get('updated_at')
+        return parse_datetime(value) if value else None
+    
+    @classmethod
+    def save_scan_checkpoint(cls, updated_at) -> None:
+        """
+        Persist the high-water mark of a completed orphan scan.
+        
+        Args:
+            updated_at: updated_at of the last entry checked (None leaves no mark)
+        """
+        from core.models import SystemSetting
+        
+        SystemSetting.objects.update_or_create(
+            key=ORPHAN_SCAN_CHECKPOINT_KEY,
+            defaults={
+                'value': json.dumps({
+                    'updated_at': updated_at.isoformat() if updated_at else None,
+                    'scanned_at': timezone.now().isoformat(),
+                }),
+                'data_type': 'json',
+                'group': 'system',
+                'description': 'High-water mark of the last completed orphaned journal entry scan',
+            }
+        )
+    
+    @classmethod
+    def reset_scan_checkpoint(cls) -> None:
+        """Forget the checkpoint so the next incremental scan covers every entry"""
+        from core.models import SystemSetting
+        
+        SystemSetting.objects.filter(key=ORPHAN_SCAN_CHECKPOINT_KEY).delete()
+    
     @classmethod
     def backfill_source_linkage(cls, entry_id: int, source_module: str, source_model: str, 
                               source_id: int, user=None, dry_run: bool = False) -> Tuple[bool, str, Dict]:
@@ -17,7 +17,8 @@ logger = logging.getLogger(__name__)
 
 
 def governed_signal_handler(signal_name: str = None, critical: bool = False, 
-                          description: str = "", auto_register: bool = True):
+                          description: str = "", auto_register: bool = True,
+                          defer: bool = None):
     """
     Decorator to create a governed signal handler.
     
@@ -26,6 +27,8 @@ def governed_signal_handler(signal_name: str = None, critical: bool = False,
         critical: Whether this handler is critical for data integrity
         description: Description of what the handler does
         auto_register: Whether to automatically register with SignalRouter
+        defer: Run after commit (True), always inline (False) or follow the
+            router's dispatch mode (None)
         
     Usage:
         @governed_signal_handler("user_created", critical=False, description="Send welcome email")
@@ -96,7 +99,8 @@ def governed_signal_handler(signal_name: str = None, critical: bool = False,
                 signal_name=signal_name,
                 handler=handler_func,  # Register original function, not wrapper
                 critical=critical,
-                description=description
+                description=description,
+                defer=defer
             )
         
         return wrapper
@@ -106,7 +110,7 @@ def governed_signal_handler(signal_name: str = None, critical: bool = False,
 
 def connect_governed_signal(signal: Signal, handler: Callable, sender=None, 
                           signal_name: str = None, critical: bool = False,
-                          description: str = ""):
+                          description: str = "", defer: bool = None):
     """
     Connect a Django signal with SignalRouter governance.
     
@@ -117,6 +121,7 @@ def connect_governed_signal(signal: Signal, handler: Callable, sender=None,
         signal_name: Name for SignalRouter (defaults to handler name)
         critical: Whether handler is critical
         description: Handler description
+        defer: Run the handler after commit (None follows the router's dispatch mode)
         
     Usage:
         def my_handler(sender, instance, **kwargs):
@@ -143,7 +148,8 @@ def connect_governed_signal(signal: Signal, handler: Callable, sender=None,
         signal_name=signal_name,
         critical=critical,
         description=description,
-        auto_register=True
+        auto_register=True,
+        defer=defer
     )(handler)
     
     # Connect to Django signal
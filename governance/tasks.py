@@ -0,0 +1,48 @@
+"""
+Celery tasks for the governance app.
+"""
+
+import logging
+
+from celery import shared_task
+from django.apps import apps
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def run_deferred_signal_handlers(signal_name, model_label, pk, kwargs=None):
+    """
+    Run deferred SignalRouter handlers for a committed instance.
+
+    Queued by DeferredSignalDispatcher (celery backend) after the saving
+    transaction commits; the instance is reloaded here by primary key.
+    """
+    from .services.signal_router import signal_router
+
+    model = apps.get_model(model_label)
+    instance = model._base_manager.filter(pk=pk).first()
+    if instance is None:
+        logger.info(f"Skipping deferred signal '{signal_name}': {model_label} #{pk} no longer exists")
+        return None
+
+    return signal_router.run_deferred_handlers(signal_name, model, instance, **(kwargs or {}))
+
+
+@shared_task(ignore_result=True)
+def run_scheduled_reports():
+    """
+    Execute every report schedule that is due.
+
+    Results are shared through the report cache, so schedules with identical
+    report configurations run the query once per cache period.
+    """
+    from .services.reports_builder_service import ReportsBuilderService
+
+    stats = ReportsBuilderService.run_due_schedules()
+    if stats['executed'] or stats['failed']:
+        logger.info(
+            f"Scheduled reports: {stats['executed']} executed, {stats['failed']} failed, "
+            f"{stats['skipped']} skipped"
+        )
+    return stats
@@ -0,0 +1,111 @@
+"""
+Unit tests for the buffered governance audit writer.
+
+Covers commit-time queueing, batch flushing, rollback behaviour,
+the strict synchronous mode and the durable spool fallback.
+"""
+
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.utils import DatabaseError
+
+from governance.models import AuditTrail
+from governance.services.audit_service import AuditService
+from governance.services.audit_writer import BufferedAuditWriter
+
+User = get_user_model()
+
+
+class BufferedAuditWriterTests(TestCase):
+    """Unit tests for BufferedAuditWriter and its use by AuditService"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='audit_writer_user', password='test')
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir, ignore_errors=True)
+        self.writer = BufferedAuditWriter(
+            batch_size=3, max_age_seconds=60, capacity=10, spool_dir=self.spool_dir
+        )
+        patcher = patch(
+            'governance.services.audit_service.get_audit_writer', return_value=self.writer
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.writer.shutdown)
+
+    def _log(self, object_id, **kwargs):
+        return AuditService.create_audit_record(
+            model_name='hr.Payroll',
+            object_id=object_id,
+            operation='update',
+            user=self.user,
+            source_service='PayrollService',
+            **kwargs
+        )
+
+    def _buffered(self):
+        return self.settings(AUDIT_TRAIL={'BUFFERED_WRITES': True})
+
+    def test_records_flushed_in_one_batch_after_commit(self):
+        """Records are queued at commit and written together once the batch fills"""
+        with self._buffered(), self.captureOnCommitCallbacks(execute=True):
+            for object_id in (1, 2):
+                self._log(object_id)
+            self.assertFalse(AuditTrail.objects.filter(model_name='hr.Payroll').exists())
+
+        self.assertEqual(self.writer.pending_count(), 2)
+        self.assertFalse(AuditTrail.objects.filter(model_name='hr.Payroll').exists())
+
+        with self._buffered(), self.captureOnCommitCallbacks(execute=True):
+            self._log(3)
+
+        self.assertEqual(self.writer.pending_count(), 0)
+        self.assertEqual(AuditTrail.objects.filter(model_name='hr.Payroll').count(), 3)
+
+    def test_rolled_back_records_are_dropped(self):
+        """A record logged inside a rolled-back block never reaches the queue"""
+        with self._buffered(), self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self._log(1)
+                    raise ValueError('business failure')
+            except ValueError:
+                pass
+            self._log(2)
+
+        self.writer.flush()
+        self.assertEqual(
+            list(AuditTrail.objects.filter(model_name='hr.Payroll').values_list('object_id', flat=True)),
+            [2]
+        )
+
+    def test_sync_mode_writes_immediately(self):
+        """sync=True inserts inside the current transaction, bypassing the buffer"""
+        with self._buffered():
+            record = self._log(7, sync=True)
+
+        self.assertIsNotNone(record.pk)
+        self.assertEqual(self.writer.pending_count(), 0)
+
+    def test_failed_flush_is_spooled_and_replayed(self):
+        """A database failure spools the batch, and replay restores it"""
+        with self._buffered(), self.captureOnCommitCallbacks(execute=True):
+            self._log(1)
+            self._log(2)
+
+        with patch.object(AuditTrail.objects, 'bulk_create', side_effect=DatabaseError('down')):
+            self.assertEqual(self.writer.flush(), 0)
+
+        self.assertEqual(self.writer.pending_count(), 0)
+        self.assertFalse(AuditTrail.objects.filter(model_name='hr.Payroll').exists())
+
+        self.assertEqual(self.writer.replay_spool(), 2)
+        restored = AuditTrail.objects.filter(model_name='hr.Payroll')
+        self.assertEqual(restored.count(), 2)
+        self.assertTrue(all(record.user_id == self.user.id for record in restored))
+        self.assertEqual(self.writer.replay_spool(), 0)
@@ -0,0 +1,94 @@
+"""
+Unit tests for deferred (post-commit) signal handler dispatch.
+
+Covers running non-critical handlers only after commit, coalescing repeated
+saves of one row, keeping critical handlers inline, dropping work for
+rolled-back transactions and the per-handler latency statistics.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+
+from governance.exceptions import ConfigurationError
+from governance.services.signal_router import SignalRouter
+
+User = get_user_model()
+
+
+class DeferredSignalDispatchTests(TestCase):
+    """Tests for SignalRouter in 'deferred' dispatch mode"""
+
+    def setUp(self):
+        self.router = SignalRouter(enable_audit=False, dispatch_mode='deferred', deferred_backend='sync')
+        self.user = User.objects.create_user(username='deferred_signal_user', password='test')
+        self.calls = []
+
+    def _record(self, label):
+        def handler(sender, instance, **kwargs):
+            self.calls.append((label, instance.pk, kwargs.get('created')))
+        return handler
+
+    def test_non_critical_handler_runs_after_commit(self):
+        self.router.register_handler('user_saved', self._record('notify'), description='notify')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.router.route_signal('user_saved', User, self.user, created=True)
+            self.assertEqual(result['handlers_deferred'], 1)
+            self.assertEqual(result['handlers_executed'], 0)
+            self.assertEqual(self.calls, [])
+
+        self.assertEqual(self.calls, [('notify', self.user.pk, True)])
+
+    def test_repeated_saves_coalesce_to_latest_arguments(self):
+        self.router.register_handler('user_saved', self._record('notify'), description='notify')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.router.route_signal('user_saved', User, self.user, created=True)
+            self.router.route_signal('user_saved', User, self.user, created=False)
+
+        self.assertEqual(self.calls, [('notify', self.user.pk, False)])
+        stats = self.router.get_signal_statistics()['deferred']
+        self.assertEqual((stats['queued'], stats['coalesced'], stats['dispatched']), (1, 1, 1))
+
+    def test_critical_and_opted_out_handlers_stay_inline(self):
+        self.router.register_handler('user_saved', self._record('ledger'), critical=True, description='ledger')
+        self.router.register_handler('user_saved', self._record('cache'), defer=False, description='cache')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            result = self.router.route_signal('user_saved', User, self.user, created=True)
+
+        self.assertEqual(result['handlers_executed'], 2)
+        self.assertEqual(result['handlers_deferred'], 0)
+        self.assertEqual([call[0] for call in self.calls], ['ledger', 'cache'])
+        self.assertEqual(callbacks, [])
+
+    def test_critical_handler_cannot_be_deferred(self):
+        with self.assertRaises(ConfigurationError):
+            self.router.register_handler('user_saved', self._record('ledger'), critical=True, defer=True)
+
+    def test_rolled_back_transaction_drops_deferred_work(self):
+        self.router.register_handler('user_saved', self._record('notify'), description='notify')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.router.route_signal('user_saved', User, self.user, created=True)
+                    raise RuntimeError('rollback')
+            except RuntimeError:
+                pass
+
+        self.assertEqual(self.calls, [])
+
+    def test_handler_latency_recorded(self):
+        self.router.register_handler('user_saved', self._record('notify'), description='notify')
+        self.router.register_handler('user_saved', self._record('ledger'), critical=True, description='ledger')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.router.route_signal('user_saved', User, self.user, created=True)
+
+        latency = self.router.get_signal_statistics()['handler_latency']
+        self.assertEqual(latency['ledger']['calls'], 1)
+        self.assertFalse(latency['ledger']['deferred'])
+        self.assertEqual(latency['notify']['calls'], 1)
+        self.assertTrue(latency['notify']['deferred'])
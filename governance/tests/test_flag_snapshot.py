@@ -0,0 +1,71 @@
+"""
+Unit tests for the versioned governance flag snapshot.
+
+Covers publishing on flag changes, the folded-in emergency override,
+cross-process refresh through the shared version key and lock-free reads.
+"""
+
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from governance.services.governance_switchboard import GovernanceSwitchboard
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'governance-flag-snapshot-tests',
+    }
+}
+
+
+class GovernanceFlagSnapshotTests(TestCase):
+    """Tests for GovernanceSwitchboard.get_flag_snapshot and the flag checks built on it"""
+
+    def setUp(self):
+        self.switchboard = GovernanceSwitchboard(enable_audit=False)
+
+    def test_flag_change_publishes_new_snapshot(self):
+        before = self.switchboard.get_flag_snapshot()
+        self.assertTrue(self.switchboard.is_workflow_enabled('stock_movement_to_journal_entry'))
+
+        self.switchboard.disable_workflow('stock_movement_to_journal_entry', 'test')
+
+        after = self.switchboard.get_flag_snapshot()
+        self.assertGreater(after.version, before.version)
+        self.assertFalse(self.switchboard.is_workflow_enabled('stock_movement_to_journal_entry'))
+        self.assertTrue(before.workflows['stock_movement_to_journal_entry'])
+
+    def test_emergency_override_folded_into_snapshot(self):
+        self.switchboard.activate_emergency_flag('emergency_disable_all_governance', 'test')
+
+        snapshot = self.switchboard.get_flag_snapshot()
+        self.assertTrue(snapshot.emergency_override)
+        self.assertFalse(any(snapshot.effective_components.values()))
+        self.assertFalse(self.switchboard.is_component_enabled('accounting_gateway_enforcement'))
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_other_process_picks_up_change_through_version_key(self):
+        writer = GovernanceSwitchboard(enable_audit=False)
+        reader = GovernanceSwitchboard(enable_audit=False)
+        self.assertTrue(reader.is_component_enabled('idempotency_enforcement'))
+
+        writer.disable_component('idempotency_enforcement', 'test')
+
+        # Within the check interval the reader keeps serving its snapshot
+        self.assertTrue(reader.is_component_enabled('idempotency_enforcement'))
+
+        reader._snapshot_checked_at = 0.0
+        self.assertFalse(reader.is_component_enabled('idempotency_enforcement'))
+        self.assertEqual(reader.get_flag_snapshot().version, writer.get_flag_snapshot().version)
+
+    def test_checks_between_intervals_do_not_touch_cache_or_locks(self):
+        self.switchboard.get_flag_snapshot()
+
+        with patch('governance.services.governance_switchboard.cache') as mock_cache, \
+                patch.object(self.switchboard, '_component_lock') as mock_lock:
+            for _ in range(100):
+                self.switchboard.is_component_enabled('accounting_gateway_enforcement')
+
+        mock_cache.get.assert_not_called()
+        mock_lock.__enter__.assert_not_called()
@@ -0,0 +1,149 @@
+"""
+Unit tests for the idempotency fast path.
+
+Covers the key filter, insert-first recording, duplicate detection,
+expired record replacement and the metrics reported by get_health_status.
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from governance.exceptions import ConcurrencyError
+from governance.models import IdempotencyRecord
+from governance.services.idempotency_filter import IdempotencyKeyFilter
+from governance.services.idempotency_service import IdempotencyService, idempotency_metrics
+
+User = get_user_model()
+
+
+class IdempotencyKeyFilterTests(TestCase):
+    """Tests for the in-memory idempotency key filter"""
+
+    def test_added_keys_are_reported_and_unknown_keys_are_not(self):
+        key_filter = IdempotencyKeyFilter(capacity=1000, error_rate=0.001)
+        for index in range(200):
+            key_filter.add('journal_entry', f'key-{index}')
+
+        self.assertTrue(all(key_filter.might_contain('journal_entry', f'key-{i}') for i in range(200)))
+        false_positives = sum(
+            key_filter.might_contain('journal_entry', f'other-{i}') for i in range(1000)
+        )
+        self.assertLess(false_positives, 20)
+
+    def test_filter_starts_new_generation_at_capacity(self):
+        key_filter = IdempotencyKeyFilter(capacity=2)
+        key_filter.add('op', 'a')
+        key_filter.add('op', 'b')
+        key_filter.add('op', 'c')
+
+        self.assertEqual(key_filter.count, 1)
+        self.assertTrue(key_filter.might_contain('op', 'c'))
+
+
+class IdempotencyServiceFastPathTests(TestCase):
+    """Tests for IdempotencyService.check_and_record_operation"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='idempotency_user', password='test')
+        self.key_filter = IdempotencyKeyFilter(capacity=1000)
+        patcher = patch(
+            'governance.services.idempotency_service.get_idempotency_filter',
+            return_value=self.key_filter
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        idempotency_metrics.reset()
+        self.addCleanup(idempotency_metrics.reset)
+
+    def _record(self, key, **kwargs):
+        return IdempotencyService.check_and_record_operation(
+            operation_type='journal_entry',
+            idempotency_key=key,
+            result_data={'key': key},
+            user=self.user,
+            **kwargs
+        )
+
+    def test_new_key_is_inserted_without_lookup(self):
+        """A definitely-new key costs one INSERT and no SELECT"""
+        with CaptureQueriesContext(connection) as queries:
+            is_duplicate, record, result_data = self._record('new-key')
+
+        self.assertFalse(is_duplicate)
+        self.assertEqual(result_data, {'key': 'new-key'})
+        statements = [q['sql'].split()[0] for q in queries]
+        self.assertNotIn('SELECT', statements)
+        self.assertEqual(statements.count('INSERT'), 1)
+
+    def test_duplicate_key_returns_existing_result(self):
+        self._record('dup-key')
+
+        is_duplicate, record, result_data = IdempotencyService.check_and_record_operation(
+            operation_type='journal_entry',
+            idempotency_key='dup-key',
+            result_data={'key': 'second'},
+            user=self.user
+        )
+
+        self.assertTrue(is_duplicate)
+        self.assertEqual(result_data, {'key': 'dup-key'})
+        self.assertEqual(IdempotencyRecord.objects.filter(idempotency_key='dup-key').count(), 1)
+
+    def test_key_unknown_to_filter_resolves_through_constraint(self):
+        """A key recorded elsewhere is still detected via the unique constraint"""
+        IdempotencyRecord.objects.create(
+            operation_type='journal_entry',
+            idempotency_key='other-process',
+            result_data={'key': 'original'},
+            expires_at=timezone.now() + timedelta(hours=1),
+            created_by=self.user
+        )
+
+        is_duplicate, record, result_data = self._record('other-process')
+
+        self.assertTrue(is_duplicate)
+        self.assertEqual(result_data, {'key': 'original'})
+        self.assertTrue(self.key_filter.might_contain('journal_entry', 'other-process'))
+
+    def test_expired_record_is_replaced(self):
+        expired = IdempotencyRecord.objects.create(
+            operation_type='journal_entry',
+            idempotency_key='expired-key',
+            result_data={'key': 'old'},
+            expires_at=timezone.now() - timedelta(hours=1),
+            created_by=self.user
+        )
+
+        is_duplicate, record, result_data = self._record('expired-key')
+
+        self.assertFalse(is_duplicate)
+        self.assertNotEqual(record.id, expired.id)
+        self.assertFalse(IdempotencyRecord.objects.filter(id=expired.id).exists())
+
+    def test_contention_is_retried_then_reported(self):
+        with patch.object(
+            IdempotencyRecord, 'check_and_record', side_effect=IntegrityError('conflict')
+        ) as mock_record, patch('governance.services.idempotency_service.time.sleep'):
+            with self.assertRaises(ConcurrencyError):
+                self._record('contended-key')
+
+        self.assertEqual(mock_record.call_count, 5)
+        self.assertEqual(idempotency_metrics.snapshot()['contention'], 5)
+
+    def test_health_status_reports_fast_path_metrics(self):
+        self._record('metrics-key')
+        self._record('metrics-key')
+
+        fast_path = IdempotencyService.get_health_status()['metrics']['fast_path']
+
+        self.assertEqual(fast_path['filter_skips'], 1)
+        self.assertEqual(fast_path['lookups'], 1)
+        self.assertEqual(fast_path['hits'], 1)
+        self.assertEqual(fast_path['misses'], 1)
+        self.assertEqual(fast_path['hit_rate'], 0.5)
@@ -20,7 +20,7 @@ from django.db import transaction
 import threading
 import time
 
-from governance.models import QuarantineRecord, AuditTrail, GovernanceContext
+from governance.models import QuarantineRecord, QuarantineDailyCounter, AuditTrail, GovernanceContext
 from governance.services.quarantine_system import (
     QuarantineSystem, QuarantineStorage, QuarantineManager, 
     QuarantineReporter, quarantine_system
@@ -595,6 +595,95 @@ class QuarantineStorageTestCase(TransactionTestCase):
         self.assertEqual(record.status, 'UNDER_REVIEW')
 
 
+class QuarantineDailyCounterTestCase(TestCase):
+    """Test cases for the daily quarantine counter rollups"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='counter_user',
+            email='counter@example.com',
+            password='testpass123'
+        )
+        self.system = QuarantineSystem()
+    
+    def _counts(self):
+        return {
+            (counter.corruption_type, counter.status): counter.count
+            for counter in QuarantineDailyCounter.objects.filter(count__gt=0)
+        }
+    
+    def _quarantine(self, object_id, corruption_type='ORPHANED_ENTRY'):
+        return QuarantineStorage.store_quarantine_record(
+            model_name='JournalEntry', object_id=object_id, corruption_type=corruption_type,
+            reason='Counter test', original_data={'entry_id': object_id}, user=self.user
+        )
+    
+    def test_store_and_status_updates_move_counts_between_buckets(self):
+        first = self._quarantine(1)
+        self._quarantine(2)
+        self._quarantine(3, corruption_type='NEGATIVE_STOCK')
+        self.assertEqual(self._counts(), {
+            ('ORPHANED_ENTRY', 'QUARANTINED'): 2,
+            ('NEGATIVE_STOCK', 'QUARANTINED'): 1,
+        })
+        
+        QuarantineStorage.update_quarantine_status(first.id, 'UNDER_REVIEW', self.user)
+        self.system.resolve_quarantine(first.id, 'fixed', user=self.user)
+        
+        self.assertEqual(self._counts(), {
+            ('ORPHANED_ENTRY', 'QUARANTINED'): 1,
+            ('ORPHANED_ENTRY', 'RESOLVED'): 1,
+            ('NEGATIVE_STOCK', 'QUARANTINED'): 1,
+        })
+        resolved = QuarantineDailyCounter.objects.get(status='RESOLVED')
+        self.assertGreaterEqual(resolved.resolution_seconds, 0.0)
+    
+    def test_batch_store_counts_new_records_once(self):
+        self._quarantine(1)
+        data = [
+            {'model_name': 'JournalEntry', 'object_id': object_id, 'corruption_type': 'ORPHANED_ENTRY',
+             'reason': 'batch', 'original_data': {}}
+            for object_id in (1, 2, 3, 3)
+        ]
+        
+        records = QuarantineStorage.batch_store_quarantine_records(data, self.user)
+        
+        self.assertEqual([record.object_id for record in records], [1, 2, 3])
+        self.assertEqual(QuarantineRecord.objects.count(), 3)
+        self.assertEqual(self._counts(), {('ORPHANED_ENTRY', 'QUARANTINED'): 3})
+    
+    def test_statistics_and_trends_read_counters(self):
+        self._quarantine(1)
+        self._quarantine(2, corruption_type='NEGATIVE_STOCK')
+        
+        with self.assertNumQueries(3):
+            stats = self.system.manager.get_quarantine_statistics()
+        self.assertEqual(stats['summary']['total_quarantined'], 2)
+        self.assertEqual(stats['summary']['recent_7d'], 2)
+        self.assertEqual(stats['by_corruption_type'], {'ORPHANED_ENTRY': 1, 'NEGATIVE_STOCK': 1})
+        
+        trends = self.system.manager.get_quarantine_trends(days=7)
+        self.assertEqual(trends['daily_counts'], [{'date': timezone.localdate(), 'count': 2}])
+        self.assertEqual(len(trends['corruption_type_trends']['NEGATIVE_STOCK']), 1)
+    
+    def test_rebuild_matches_incremental_counters(self):
+        for object_id in range(4):
+            record = self._quarantine(object_id)
+            if object_id % 2:
+                record.resolve(self.user, 'fixed')
+        incremental = self._counts()
+        
+        QuarantineDailyCounter.objects.all().delete()
+        QuarantineDailyCounter.rebuild()
+        
+        self.assertEqual(self._counts(), incremental)
+        self.assertEqual(incremental, {
+            ('ORPHANED_ENTRY', 'QUARANTINED'): 2,
+            ('ORPHANED_ENTRY', 'RESOLVED'): 2,
+        })
+
+
 class QuarantineSystemIntegrationTestCase(TestCase):
     """Integration tests for QuarantineSystem with RepairService"""
     
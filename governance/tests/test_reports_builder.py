@@ -0,0 +1,148 @@
+"""
+Unit tests for the reports builder service.
+
+Covers keyset pagination across pages, server-side group aggregates,
+streamed CSV/XLSX export of the full result and the scheduled report runner
+with its configuration-hash result cache.
+"""
+
+import io
+from datetime import time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+import openpyxl
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from governance.models import ReportExecution, ReportSchedule, SavedReport
+from governance.services.reports_builder_service import ReportsBuilderService
+from supplier.models import Supplier, SupplierType
+
+User = get_user_model()
+
+
+class ReportsBuilderServiceTests(TestCase):
+    """Tests for ReportsBuilderService paging, aggregation, export and scheduling"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='reports_user', password='test')
+        supplier_type = SupplierType.objects.create(name='مورد عام', code='general')
+        # Two suppliers share a balance so the keyset has to break ties on pk
+        # (in the same direction as the sort)
+        for index, balance in enumerate(['100.00', '250.00', '250.00', '75.50', '0.00']):
+            Supplier.objects.create(
+                name=f'مورد {index}',
+                code=f'RPT{index:03d}',
+                primary_type=supplier_type,
+                balance=Decimal(balance),
+                is_active=index != 4
+            )
+
+    def _config(self, **overrides):
+        config = {
+            'data_source': 'suppliers',
+            'selected_fields': ['code', 'balance'],
+            'filters': [],
+            'sort_by': 'balance',
+            'sort_order': 'desc',
+        }
+        config.update(overrides)
+        return config
+
+    def test_cursor_pages_cover_result_once_in_order(self):
+        codes = []
+        cursor = None
+        pages = 0
+        while True:
+            result = ReportsBuilderService.execute_report(self._config(), cursor=cursor, page_size=2)
+            self.assertTrue(result['success'], result['error'])
+            codes.extend(row['code'] for row in result['data'])
+            pages += 1
+            if not result['has_more']:
+                break
+            cursor = result['next_cursor']
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(codes, ['RPT002', 'RPT001', 'RPT000', 'RPT003', 'RPT004'])
+        self.assertNotIn('pk', result['data'][0])
+
+    def test_group_by_with_server_side_aggregates(self):
+        result = ReportsBuilderService.execute_report(self._config(
+            group_by='is_active',
+            aggregations=[
+                {'field': 'balance', 'function': 'sum'},
+                {'field': 'balance', 'function': 'avg'},
+                {'function': 'count'},
+            ],
+            sort_order='asc',
+        ))
+
+        self.assertTrue(result['success'], result['error'])
+        self.assertEqual(result['data'], [
+            {'is_active': False, 'balance__sum': 0.0, 'balance__avg': 0.0, 'count': 1},
+            {'is_active': True, 'balance__sum': 675.5, 'balance__avg': 168.875, 'count': 4},
+        ])
+
+    def test_invalid_aggregation_reported_as_error(self):
+        result = ReportsBuilderService.execute_report(self._config(
+            aggregations=[{'field': 'name', 'function': 'sum'}]
+        ))
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['data'], [])
+
+    def test_exports_stream_full_result(self):
+        with patch('governance.services.reports_builder_service.REPORT_EXPORT_CHUNK_SIZE', 2):
+            lines = list(ReportsBuilderService.stream_csv(self._config()))
+
+            output = io.BytesIO()
+            written = ReportsBuilderService.write_xlsx(self._config(), output, title='الموردين')
+
+        self.assertEqual(lines[0], '﻿code,balance\r\n')
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(lines[1], 'RPT002,250.0\r\n')
+
+        self.assertEqual(written, 5)
+        output.seek(0)
+        sheet = openpyxl.load_workbook(output).active
+        rows = list(sheet.values)
+        self.assertEqual(rows[0][0], 'الموردين')
+        self.assertEqual(rows[2], ('الكود', 'الرصيد'))
+        self.assertEqual(len(rows), 8)
+
+    def test_due_schedules_run_once_and_share_cached_result(self):
+        report = SavedReport.objects.create(
+            name='أرصدة الموردين', report_type='table', data_source='suppliers',
+            selected_fields=['code', 'balance'], filters=[], created_by=self.user
+        )
+        due = timezone.now() - timedelta(minutes=1)
+        schedules = [
+            ReportSchedule.objects.create(
+                report=report, frequency='daily', schedule_time=time(6, 0),
+                email_recipients='a@example.com', created_by=self.user, next_run_at=due
+            )
+            for _ in range(2)
+        ]
+
+        with patch.object(ReportsBuilderService, 'execute_report',
+                          wraps=ReportsBuilderService.execute_report) as execute, \
+                patch('governance.services.reports_builder_service.cache') as mock_cache:
+            cached = {}
+            mock_cache.get.side_effect = cached.get
+            mock_cache.set.side_effect = lambda key, value, timeout: cached.__setitem__(key, value)
+
+            stats = ReportsBuilderService.run_due_schedules()
+            again = ReportsBuilderService.run_due_schedules()
+
+        self.assertEqual(stats, {'executed': 2, 'failed': 0, 'skipped': 0})
+        self.assertEqual(again['executed'], 0)
+        self.assertEqual(execute.call_count, 1)
+        self.assertEqual(
+            list(ReportExecution.objects.filter(report=report).values_list('status', 'rows_count')),
+            [('SUCCESS', 5), ('SUCCESS', 5)]
+        )
+        for schedule in schedules:
+            schedule.refresh_from_db()
+            self.assertGreater(schedule.next_run_at, timezone.now())
@@ -3,6 +3,7 @@ Thread-safety mechanisms for concurrent governance operations.
 Provides database-appropriate locking and concurrency control.
 """
 
+import random
 import threading
 import time
 import logging
@@ -14,6 +15,25 @@ from .exceptions import ConcurrencyError
 logger = logging.getLogger(__name__)
 
 
+def backoff_delays(base=0.01, factor=2.0, max_delay=1.0, timeout=None, max_attempts=None):
+    """
+    Yield sleep intervals for retrying under contention.
+    
+    Delays grow exponentially from `base` up to `max_delay` with full jitter,
+    and stop once `max_attempts` delays were produced or `timeout` seconds
+    have passed since the first call.
+    """
+    start_time = time.time()
+    delay = base
+    attempt = 0
+    while max_attempts is None or attempt < max_attempts:
+        if timeout is not None and time.time() - start_time >= timeout:
+            return
+        attempt += 1
+        yield random.uniform(0, delay)
+        delay = min(delay * factor, max_delay)
+
+
 class DatabaseLockManager:
     """
     Database-appropriate locking mechanism.
@@ -98,9 +118,7 @@ class IdempotencyLock:
         Acquire idempotency lock with timeout.
         Uses database-appropriate locking mechanism.
         """
-        start_time = time.time()
-        
-        while time.time() - start_time < timeout:
+        for delay in backoff_delays(timeout=timeout):
             try:
                 with DatabaseLockManager.atomic_operation():
                     # Try to create or get existing idempotency record
@@ -132,8 +150,8 @@ class IdempotencyLock:
                         
             except Exception as e:
                 if "locked" in str(e).lower() or "timeout" in str(e).lower():
-                    # Lock contention, wait and retry
-                    time.sleep(0.1)
+                    # Lock contention, back off and retry
+                    time.sleep(delay)
                     continue
                 else:
                     # Other error, re-raise
@@ -187,8 +205,8 @@ class StockLockManager:
                         
             except Exception as e:
                 if "locked" in str(e).lower() or "timeout" in str(e).lower():
-                    # Lock contention, wait and retry
-                    time.sleep(0.1)
+                    # Lock contention, back off and retry
+                    time.sleep(delay)
                     continue
                 else:
                     # Other error, re-raise
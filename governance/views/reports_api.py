@@ -2,7 +2,7 @@
 Reports Builder API Views
 """
 
-from django.http import JsonResponse
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
 from django.views import View
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.decorators.csrf import csrf_exempt
@@ -10,8 +10,9 @@ from django.utils.decorators import method_decorator
 from django.utils import timezone
 import json
 import logging
+import tempfile
 
-from governance.services.reports_builder_service import ReportsBuilderService
+from governance.services.reports_builder_service import ReportConfigError, ReportsBuilderService
 from governance.models import SavedReport, ReportSchedule, ReportExecution
 
 logger = logging.getLogger(__name__)
@@ -67,8 +68,13 @@ class GenerateReportAPI(LoginRequiredMixin, View):
                         'error': f'الحقل {field} مطلوب'
                     }, status=400)
             
-            # Execute report
-            result = ReportsBuilderService.execute_report(data, user=request.user)
+            # Execute report (one page; pass next_cursor back for the following page)
+            result = ReportsBuilderService.execute_report(
+                data,
+                user=request.user,
+                cursor=data.get('cursor'),
+                page_size=data.get('page_size')
+            )
             
             return JsonResponse(result)
             
@@ -155,18 +161,19 @@ class RunSavedReportAPI(LoginRequiredMixin, View):
                 triggered_by=request.user
             )
             
+            # Optional paging parameters
+            try:
+                options = json.loads(request.body) if request.body else {}
+            except json.JSONDecodeError:
+                options = {}
+            
             # Execute report
-            report_config = {
-                'data_source': report.data_source,
-                'selected_fields': report.selected_fields,
-                'filters': report.filters,
-                'group_by': report.group_by,
-                'sort_by': report.sort_by,
-                'sort_order': report.sort_order,
-                'report_type': report.report_type,
-            }
-            
-            result = ReportsBuilderService.execute_report(report_config, user=request.user)
+            result = ReportsBuilderService.execute_report(
+                ReportsBuilderService.get_report_config(report),
+                user=request.user,
+                cursor=options.get('cursor'),
+                page_size=options.get('page_size')
+            )
             
             # Update execution record
             if result['success']:
@@ -364,13 +371,10 @@ class ResumeScheduleAPI(LoginRequiredMixin, View):
 
 
 class DownloadReportAPI(LoginRequiredMixin, View):
-    """API لتحميل تقرير"""
+    """API لتحميل تقرير (يُصدّر كامل النتيجة بالبث دون حد للصفوف)"""
     
     def get(self, request, report_id):
         try:
-            from django.http import HttpResponse
-            import io
-            
             # Get report
             try:
                 report = SavedReport.objects.get(id=report_id)
@@ -393,37 +397,26 @@ class DownloadReportAPI(LoginRequiredMixin, View):
             format_type = request.GET.get('format', 'excel')
             logger.info(f"Downloading report {report_id} in {format_type} format")
             
-            # Execute report to get data
-            report_config = {
-                'data_source': report.data_source,
-                'selected_fields': report.selected_fields if report.selected_fields else [],
-                'filters': report.filters if report.filters else {},
-                'group_by': report.group_by or '',
-                'sort_by': report.sort_by or '',
-                'sort_order': report.sort_order or 'asc',
-            }
-            
+            report_config = ReportsBuilderService.get_report_config(report)
             logger.debug(f"Report config: {report_config}")
             
-            result = ReportsBuilderService.execute_report(report_config, user=request.user)
-            
-            if not result['success']:
-                logger.error(f"Report execution failed: {result.get('error')}")
+            # Validate the configuration before starting a streamed response
+            try:
+                ReportsBuilderService.build_query(report_config)
+            except ReportConfigError as e:
+                logger.error(f"Report execution failed: {e}")
                 return JsonResponse({
                     'success': False,
-                    'error': result['error']
+                    'error': str(e)
                 }, status=500)
             
-            data = result['data']
-            logger.info(f"Report executed successfully with {len(data)} rows")
-            
             # Generate file based on format
             if format_type == 'excel':
-                return self._generate_excel(report, data)
+                return self._generate_excel(report, report_config)
             elif format_type == 'csv':
-                return self._generate_csv(report, data)
+                return self._generate_csv(report, report_config)
             elif format_type == 'pdf':
-                return self._generate_pdf(report, data)
+                return self._generate_pdf(report, report_config)
             else:
                 return JsonResponse({
                     'success': False,
@@ -437,126 +430,54 @@ class DownloadReportAPI(LoginRequiredMixin, View):
                 'error': f'حدث خطأ أثناء تحميل التقرير: {str(e)}'
             }, status=500)
     
-    def _generate_excel(self, report, data):
-        """توليد ملف Excel"""
+    def _generate_excel(self, report, report_config):
+        """توليد ملف Excel (write-only إلى ملف مؤقت ثم بثه)"""
         try:
-            import openpyxl
-            from openpyxl.styles import Font, Alignment, PatternFill
-            from openpyxl.utils import get_column_letter
-            from django.http import HttpResponse
-            import io
-            
-            # Create workbook
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = report.name[:31]  # Excel sheet name limit
-            
-            # Add headers and data
-            if data:
-                headers = list(data[0].keys())
-                num_cols = len(headers)
-                
-                # Add title (merge cells based on actual column count)
-                if num_cols > 0:
-                    last_col = get_column_letter(num_cols)
-                    ws.merge_cells(f'A1:{last_col}1')
-                    title_cell = ws['A1']
-                    title_cell.value = report.name
-                    title_cell.font = Font(size=16, bold=True)
-                    title_cell.alignment = Alignment(horizontal='center')
-                
-                # Add headers
-                for col_idx, header in enumerate(headers, start=1):
-                    cell = ws.cell(row=3, column=col_idx)
-                    cell.value = header
-                    cell.font = Font(bold=True)
-                    cell.fill = PatternFill(start_color='CCCCCC', end_color='CCCCCC', fill_type='solid')
-                    cell.alignment = Alignment(horizontal='center')
-                
-                # Add data
-                for row_idx, row_data in enumerate(data, start=4):
-                    for col_idx, header in enumerate(headers, start=1):
-                        cell = ws.cell(row=row_idx, column=col_idx)
-                        value = row_data.get(header, '')
-                        # Handle different data types
-                        try:
-                            cell.value = value
-                        except Exception:
-                            cell.value = str(value) if value is not None else ''
-                
-                # Auto-adjust column widths
-                for col_idx in range(1, num_cols + 1):
-                    column_letter = get_column_letter(col_idx)
-                    max_length = 0
-                    for row in ws.iter_rows(min_col=col_idx, max_col=col_idx):
-                        for cell in row:
-                            try:
-                                if cell.value:
-                                    max_length = max(max_length, len(str(cell.value)))
-                            except:
-                                pass
-                    adjusted_width = min(max_length + 2, 50)
-                    ws.column_dimensions[column_letter].width = adjusted_width
-            else:
-                # No data - add title only
-                ws['A1'] = report.name
-                ws['A1'].font = Font(size=16, bold=True)
-                ws['A3'] = 'لا توجد بيانات'
-            
-            # Save to bytes
-            output = io.BytesIO()
-            wb.save(output)
-            output.seek(0)
-            
-            # Create response
-            response = HttpResponse(
-                output.read(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            response['Content-Disposition'] = f'attachment; filename="{report.name}.xlsx"'
-            
-            return response
-            
+            import openpyxl  # noqa: F401
         except ImportError as e:
             logger.error(f"openpyxl not installed: {e}")
             return JsonResponse({
                 'success': False,
                 'error': 'مكتبة openpyxl غير مثبتة'
             }, status=500)
+        
+        output = tempfile.TemporaryFile(suffix='.xlsx')
+        try:
+            rows = ReportsBuilderService.write_xlsx(report_config, output, title=report.name)
+            output.seek(0)
         except Exception as e:
+            output.close()
             logger.error(f"Error generating Excel: {e}", exc_info=True)
             return JsonResponse({
                 'success': False,
                 'error': f'خطأ في توليد ملف Excel: {str(e)}'
             }, status=500)
-    
-    def _generate_csv(self, report, data):
-        """توليد ملف CSV"""
-        import csv
-        from django.http import HttpResponse
-        import io
-        
-        output = io.StringIO()
         
-        if data:
-            headers = list(data[0].keys())
-            writer = csv.DictWriter(output, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(data)
+        logger.info(f"Report {report.id} exported to Excel with {rows} rows")
         
-        response = HttpResponse(output.getvalue(), content_type='text/csv; charset=utf-8-sig')
+        # FileResponse streams the file in blocks and closes it when done
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=f'{report.name}.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+    
+    def _generate_csv(self, report, report_config):
+        """توليد ملف CSV بالبث"""
+        response = StreamingHttpResponse(
+            ReportsBuilderService.stream_csv(report_config),
+            content_type='text/csv; charset=utf-8-sig'
+        )
         response['Content-Disposition'] = f'attachment; filename="{report.name}.csv"'
         
         return response
     
-    def _generate_pdf(self, report, data):
+    def _generate_pdf(self, report, report_config):
         """توليد ملف PDF"""
-        from django.http import HttpResponse
-        
         # For now, return a simple message
         # You can implement full PDF generation using reportlab or weasyprint
         return JsonResponse({
             'success': False,
             'error': 'تصدير PDF قيد التطوير. استخدم Excel أو CSV'
         }, status=501)
-
@@ -3,7 +3,6 @@
 يُشغل يومياً عبر Cron Job أو Task Scheduler
 """
 from django.core.management.base import BaseCommand
-from django.db import transaction
 from datetime import date
 from hr.models import Employee, LeaveBalance
 from hr.services.leave_accrual_service import LeaveAccrualService
@@ -27,6 +26,11 @@ class Command(BaseCommand):
             action='store_true',
             help='تحديث جميع الموظفين حتى لو لم يتغير شيء'
         )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='عرض الفروقات فقط بدون حفظ'
+        )
         parser.add_argument(
             '--check-milestones',
             action='store_true',
@@ -37,6 +41,7 @@ class Command(BaseCommand):
         year = options['year']
         force = options['force']
         check_milestones = options['check_milestones']
+        dry_run = options['dry_run']
         
         self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
         self.stdout.write(self.style.SUCCESS(f'تحديث أرصدة الإجازات - السنة: {year}'))
@@ -45,7 +50,7 @@ class Command(BaseCommand):
         if check_milestones:
             self._check_milestones(year)
         else:
-            self._update_all_accruals(year, force)
+            self._update_all_accruals(year, force, dry_run)
     
     def _check_milestones(self, year):
         """
@@ -100,46 +105,32 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f'  - عدد الموظفين الذين وصلوا لـ milestone: {updated_count}'))
         self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
     
-    def _update_all_accruals(self, year, force):
-        """تحديث جميع الأرصدة"""
-        employees = Employee.objects.filter(status='active')
-        total_employees = employees.count()
-        
+    def _update_all_accruals(self, year, force, dry_run=False):
+        """تحديث جميع الأرصدة عبر محرك الاستحقاق المجمّع"""
+        result = LeaveAccrualService.update_all_accruals(year, dry_run=dry_run)
+        total_employees = result['total_employees']
+
         self.stdout.write(f'عدد الموظفين النشطين: {total_employees}\n')
-        
-        updated_count = 0
-        employees_with_changes = []
-        
-        with transaction.atomic():
-            for employee in employees:
-                months_worked = LeaveAccrualService.calculate_months_worked(employee.hire_date)
-                old_percentage = LeaveAccrualService.get_accrual_percentage(months_worked)
-                
-                # تحديث الأرصدة
-                result = LeaveAccrualService.update_employee_accrual(employee, year)
-                
-                if result['updated_count'] > 0 or force:
-                    updated_count += 1
-                    employees_with_changes.append({
-                        'name': result['employee'],
-                        'months_worked': months_worked,
-                        'percentage': f"{int(old_percentage * 100)}%",
-                        'updates': result['updated_count']
-                    })
-                    
+        if dry_run:
+            self.stdout.write(self.style.WARNING('وضع المعاينة (dry-run) — لن يتم حفظ أي تغيير\n'))
+
+        for entry in result['details']:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'✓ {entry["employee"]} - {entry["updated_count"]} رصيد محدث'
+                )
+            )
+            if dry_run or force:
+                for diff in entry['summary']:
                     self.stdout.write(
-                        self.style.SUCCESS(
-                            f'✓ {result["employee"]} - '
-                            f'{months_worked} شهر - '
-                            f'{int(old_percentage * 100)}% - '
-                            f'{result["updated_count"]} رصيد محدث'
-                        )
+                        f'    {diff["leave_type"]}: {diff["old_total"]} → {diff["new_total"]} '
+                        f'({diff["old_phase"]} → {diff["new_phase"]})'
                     )
-        
+
         # الملخص النهائي
         self.stdout.write(self.style.SUCCESS(f'\n{"="*60}'))
         self.stdout.write(self.style.SUCCESS(f'الملخص النهائي:'))
         self.stdout.write(self.style.SUCCESS(f'  - إجمالي الموظفين: {total_employees}'))
-        self.stdout.write(self.style.SUCCESS(f'  - الموظفين المحدثين: {updated_count}'))
+        self.stdout.write(self.style.SUCCESS(f'  - الموظفين المحدثين: {result["employees_with_updates"]}'))
+        self.stdout.write(self.style.SUCCESS(f'  - الأرصدة المحدثة: {result["total_balances_updated"]}'))
         self.stdout.write(self.style.SUCCESS(f'{"="*60}\n'))
-        
@@ -66,7 +66,6 @@ class Command(BaseCommand):
         old_methods = [
             '_create_journal_entry',
             '_create_individual_journal_entry',
-            'create_monthly_payroll_journal_entry',
             'create_secure_journal_entry',
         ]
         all_deprecated = True
@@ -2,10 +2,13 @@
 خدمة إدارة الحضور والانصراف
 """
 from datetime import datetime, timedelta
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from ..models import Attendance, Shift
 
+# حجم دفعة الإدخال/الفحص عند توليد سجلات الغياب
+MISSING_ATTENDANCE_BATCH_SIZE = 500
+
 
 class AttendanceService:
     """خدمة إدارة الحضور والانصراف"""
@@ -280,113 +283,167 @@ class AttendanceService:
         return result
 
     @staticmethod
-    @transaction.atomic
-    def generate_missing_attendances(date_from, date_to):
-        """
-        إنشاء سجلات غياب للأيام التي لم يتم تسجيل حضور فيها
-        وتجاهل أيام الإجازة الأسبوعية
-        """
-        from ..models import Employee, Attendance
+    def get_weekly_off_days():
+        """أيام الإجازة الأسبوعية من الإعدادات (weekday numbers)"""
         from core.models import SystemSetting
         import json
-        
-        # Get weekly off days
+
         off_days = SystemSetting.get_setting('hr_weekly_off_days', [4])
         if isinstance(off_days, str):
             try:
                 off_days = json.loads(off_days)
             except json.JSONDecodeError:
                 off_days = [4]
+        return set(off_days)
 
-        # Get official holiday dates once before the loop
-        official_holiday_dates = AttendanceService.get_official_holiday_dates(date_from, date_to)
+    @staticmethod
+    def get_expected_workdays(date_from, date_to, off_days=None, holiday_dates=None):
+        """
+        قائمة أيام العمل المتوقعة في الفترة بعد استبعاد الإجازات الأسبوعية والرسمية.
+        """
+        if off_days is None:
+            off_days = AttendanceService.get_weekly_off_days()
+        if holiday_dates is None:
+            holiday_dates = AttendanceService.get_official_holiday_dates(date_from, date_to)
 
-        # Get active employees who are not exempt from attendance
-        employees = Employee.objects.filter(status='active', attendance_exempt=False)
-        
-        if not employees.exists():
+        workdays = []
+        current = date_from
+        while current <= date_to:
+            if current.weekday() not in off_days and current not in holiday_dates:
+                workdays.append(current)
+            current += timedelta(days=1)
+        return workdays
+
+    @staticmethod
+    def generate_missing_attendances(date_from, date_to, batch_size=MISSING_ATTENDANCE_BATCH_SIZE):
+        """
+        إنشاء سجلات غياب للأيام التي لم يتم تسجيل حضور فيها
+        وتجاهل أيام الإجازة الأسبوعية والرسمية
+
+        يبني التقويم المتوقع (موظف، يوم عمل) من تاريخ التعيين والوردية،
+        ثم يطرح منه أزواج (موظف، تاريخ) الموجودة باستعلام حضور واحد لكل دفعة
+        موظفين، مع استعلام للإجازات وآخر للأذونات المعتمدة لتحديد الحالة
+        (ثلاثة استعلامات لكل دفعة). تُدخل الفجوات فقط عبر bulk_create على دفعات،
+        كل دفعة في transaction مستقلة حتى لا يُحجز قفل قاعدة البيانات طوال فترة الملء.
+
+        Returns:
+            int: عدد السجلات المنشأة
+        """
+        from ..models import Employee, Leave, PermissionRequest
+
+        workdays = AttendanceService.get_expected_workdays(date_from, date_to)
+        if not workdays:
+            return 0
+
+        # الموظفون النشطون غير المعفيين ولديهم وردية
+        employees = list(
+            Employee.objects.filter(
+                status='active',
+                attendance_exempt=False,
+                shift__isnull=False,
+                hire_date__lte=date_to,
+            ).values_list('id', 'shift_id', 'hire_date').order_by('id')
+        )
+        if not employees:
             return 0
-            
+
         created_count = 0
-        current_date = date_from
-        
-        while current_date <= date_to:
-            # Skip weekly off days
-            if current_date.weekday() in off_days:
-                current_date += timedelta(days=1)
-                continue
-
-            # Skip official holidays
-            if current_date in official_holiday_dates:
-                current_date += timedelta(days=1)
-                continue
-                
-            # For each employee, check if they have an attendance record on this date
-            # We can optimize this by doing a bulk check and bulk create
-            existing_attendances = set(
+        for offset in range(0, len(employees), batch_size):
+            chunk = employees[offset:offset + batch_size]
+            employee_ids = [emp_id for emp_id, _, _ in chunk]
+
+            # Anti-join: كل أزواج (موظف، تاريخ) الموجودة للدفعة في استعلام واحد
+            existing = set(
                 Attendance.objects.filter(
-                    date=current_date
-                ).values_list('employee_id', flat=True)
+                    employee_id__in=employee_ids,
+                    date__gte=date_from,
+                    date__lte=date_to,
+                ).values_list('employee_id', 'date')
             )
-            
-            # Check approved leaves for this date
-            from ..models import Leave
-            employees_on_leave = set(
-                Leave.objects.filter(
-                    status='approved',
-                    start_date__lte=current_date,
-                    end_date__gte=current_date
-                ).values_list('employee_id', flat=True)
-            )
-            
-            # Check approved permissions for this date
-            from ..models import PermissionRequest
-            employees_on_permission = set(
+
+            leave_ranges = {}
+            for emp_id, start, end in Leave.objects.filter(
+                employee_id__in=employee_ids,
+                status='approved',
+                start_date__lte=date_to,
+                end_date__gte=date_from,
+            ).values_list('employee_id', 'start_date', 'end_date'):
+                leave_ranges.setdefault(emp_id, []).append((start, end))
+
+            permission_days = set(
                 PermissionRequest.objects.filter(
+                    employee_id__in=employee_ids,
                     status='approved',
-                    date=current_date
-                ).values_list('employee_id', flat=True)
+                    date__gte=date_from,
+                    date__lte=date_to,
+                ).values_list('employee_id', 'date')
             )
-            
-            missing_employees = [emp for emp in employees if emp.id not in existing_attendances]
-            
+
             new_records = []
-            for emp in missing_employees:
-                shift = AttendanceService._get_employee_shift(emp)
-                if not shift:
-                    continue
-                
-                # Determine status based on leave or permission
-                if emp.id in employees_on_leave:
-                    status = 'on_leave'
-                    notes = 'تم التسجيل كإجازة تلقائياً'
-                elif emp.id in employees_on_permission:
-                    status = 'permission'
-                    notes = 'تم التسجيل كإذن تلقائياً'
-                else:
-                    status = 'absent'
-                    notes = 'تم التسجيل كغياب تلقائياً (بدون بصمة)'
-                    
-                new_records.append(
-                    Attendance(
-                        employee=emp,
-                        date=current_date,
-                        shift=shift,
-                        check_in=None,  # Allowed after migration
-                        check_out=None,
-                        status=status,
-                        work_hours=0,
-                        late_minutes=0,
-                        early_leave_minutes=0,
-                        overtime_hours=0,
-                        notes=notes
+            for emp_id, shift_id, hire_date in chunk:
+                ranges = leave_ranges.get(emp_id, ())
+                for day in workdays:
+                    if day < hire_date or (emp_id, day) in existing:
+                        continue
+
+                    # Determine status based on leave or permission
+                    if any(start <= day <= end for start, end in ranges):
+                        status = 'on_leave'
+                        notes = 'تم التسجيل كإجازة تلقائياً'
+                    elif (emp_id, day) in permission_days:
+                        status = 'permission'
+                        notes = 'تم التسجيل كإذن تلقائياً'
+                    else:
+                        status = 'absent'
+                        notes = 'تم التسجيل كغياب تلقائياً (بدون بصمة)'
+
+                    new_records.append(
+                        Attendance(
+                            employee_id=emp_id,
+                            date=day,
+                            shift_id=shift_id,
+                            check_in=None,
+                            check_out=None,
+                            status=status,
+                            work_hours=0,
+                            late_minutes=0,
+                            early_leave_minutes=0,
+                            overtime_hours=0,
+                            notes=notes
+                        )
                     )
+
+            for start in range(0, len(new_records), batch_size):
+                created_count += AttendanceService._insert_missing_batch(
+                    new_records[start:start + batch_size]
                 )
-            
-            if new_records:
-                Attendance.objects.bulk_create(new_records)
-                created_count += len(new_records)
-                
-            current_date += timedelta(days=1)
-            
+
         return created_count
+
+    @staticmethod
+    def _insert_missing_batch(batch):
+        """
+        إدخال دفعة سجلات غياب وإرجاع عدد ما أُدخل فعلاً.
+        لو وصلت بصمة بالتوازي لنفس (موظف، تاريخ) تُستبعد الأزواج المحجوزة
+        ويُعاد إدخال الباقي مرة واحدة.
+        """
+        try:
+            with transaction.atomic():
+                Attendance.objects.bulk_create(batch)
+            return len(batch)
+        except IntegrityError:
+            taken = set(
+                Attendance.objects.filter(
+                    employee_id__in={record.employee_id for record in batch},
+                    date__in={record.date for record in batch},
+                ).values_list('employee_id', 'date')
+            )
+            remaining = [
+                record for record in batch
+                if (record.employee_id, record.date) not in taken
+            ]
+            if not remaining:
+                return 0
+            with transaction.atomic():
+                Attendance.objects.bulk_create(remaining)
+            return len(remaining)
@@ -9,6 +9,39 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+# قواعد النقل التلقائي - ثابتة ومشتركة بين كل النسخ
+TRANSFER_RULES = {
+    'personal': {
+        'auto_transfer': True,
+        'transfer_type': 'copy',  # نسخ البند
+        'preserve_dates': True,   # الحفاظ على التواريخ
+        'priority': 1            # أولوية عالية
+    },
+    'temporary': {
+        'auto_transfer': True,
+        'transfer_type': 'move',  # نقل البند
+        'check_validity': True,   # فحص الصلاحية
+        'priority': 2
+    },
+    'exceptional': {
+        'auto_transfer': False,   # يحتاج موافقة يدوية
+        'transfer_type': 'copy',
+        'age_limit_days': 90,     # فقط البنود الحديثة
+        'priority': 3
+    },
+    'adjustment': {
+        'auto_transfer': False,   # لا ينقل تلقائياً
+        'transfer_type': 'archive', # أرشفة
+        'priority': 4
+    },
+    'contract': {
+        'auto_transfer': False,   # بنود العقد لا تنقل
+        'transfer_type': 'replace', # استبدال بالعقد الجديد
+        'priority': 5
+    }
+}
+
+
 class AutoTransferEngine:
     """محرك النقل التلقائي للبنود بين العقود"""
     
@@ -18,36 +51,7 @@ class AutoTransferEngine:
     
     def _load_transfer_rules(self):
         """تحميل قواعد النقل التلقائي"""
-        return {
-            'personal': {
-                'auto_transfer': True,
-                'transfer_type': 'copy',  # نسخ البند
-                'preserve_dates': True,   # الحفاظ على التواريخ
-                'priority': 1            # أولوية عالية
-            },
-            'temporary': {
-                'auto_transfer': True,
-                'transfer_type': 'move',  # نقل البند
-                'check_validity': True,   # فحص الصلاحية
-                'priority': 2
-            },
-            'exceptional': {
-                'auto_transfer': False,   # يحتاج موافقة يدوية
-                'transfer_type': 'copy',
-                'age_limit_days': 90,     # فقط البنود الحديثة
-                'priority': 3
-            },
-            'adjustment': {
-                'auto_transfer': False,   # لا ينقل تلقائياً
-                'transfer_type': 'archive', # أرشفة
-                'priority': 4
-            },
-            'contract': {
-                'auto_transfer': False,   # بنود العقد لا تنقل
-                'transfer_type': 'replace', # استبدال بالعقد الجديد
-                'priority': 5
-            }
-        }
+        return TRANSFER_RULES
     
     @transaction.atomic
     def execute_smart_transfer(self, old_contract, new_contract, user_selections=None):
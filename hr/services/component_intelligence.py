@@ -1,46 +1,122 @@
 from django.db.models import Q, Count, Avg
 from django.utils import timezone
 from datetime import timedelta
+from functools import lru_cache
 from hr.models import SalaryComponent, Employee
 from decimal import Decimal
 import re
 
 
+# قواعد التصنيف الذكي - تُترجم مرة واحدة لكل عملية (انظر _compiled_classification_rules)
+CLASSIFICATION_RULES = {
+    'personal': {
+        'keywords': ['قرض', 'مقدم', 'سلفة', 'دين', 'استقطاع شخصي'],
+        'patterns': [r'قرض.*', r'مقدم.*', r'سلفة.*'],
+        'amount_range': (100, 50000),  # نطاق المبالغ المتوقع
+        'duration_months': (1, 60)     # مدة القرض المتوقعة
+    },
+    'temporary': {
+        'keywords': ['مؤقت', 'بدل مؤقت', 'حافز مؤقت', 'علاوة مؤقتة'],
+        'patterns': [r'.*مؤقت.*', r'بدل.*مؤقت', r'حافز.*شهر'],
+        'has_end_date': True,
+        'max_duration_months': 12
+    },
+    'exceptional': {
+        'keywords': ['مكافأة', 'حافز', 'بونص', 'عمولة', 'تعويض'],
+        'patterns': [r'مكافأة.*', r'حافز.*', r'بونص.*', r'عمولة.*'],
+        'frequency': 'irregular',
+        'amount_variance': 'high'
+    },
+    'adjustment': {
+        'keywords': ['تعديل', 'تجريبي', 'اختبار', 'مراجعة'],
+        'patterns': [r'تعديل.*', r'تجريبي.*', r'اختبار.*'],
+        'temporary_nature': True,
+        'requires_review': True
+    }
+}
+
+# عدد الأحرف الأولى من اسم البند المستخدمة للبحث عن البنود المشابهة
+HISTORY_NAME_PREFIX_LENGTH = 10
+
+
+@lru_cache(maxsize=None)
+def _compiled_classification_rules():
+    """ترجمة أنماط التصنيف مرة واحدة ومشاركتها بين كل النسخ"""
+    return {
+        source: {
+            'keywords': tuple(rules['keywords']),
+            'patterns': tuple(re.compile(pattern) for pattern in rules.get('patterns', [])),
+        }
+        for source, rules in CLASSIFICATION_RULES.items()
+    }
+
+
+def clear_rule_cache():
+    """مسح القواعد المترجمة بعد تعديل CLASSIFICATION_RULES"""
+    _compiled_classification_rules.cache_clear()
+
+
 class ComponentIntelligence:
     """خدمة الذكاء الاصطناعي لتصنيف ومعالجة بنود الراتب"""
     
     def __init__(self):
         self.classification_rules = self._load_classification_rules()
+        # (بادئة الاسم، النوع) -> [(id, source)] للبنود المشابهة
         self.pattern_cache = {}
+        # employee_id -> {(الاسم، النوع): [بيانات البنود السابقة]}
+        self.renewal_cache = {}
     
     def _load_classification_rules(self):
         """تحميل قواعد التصنيف الذكي"""
-        return {
-            'personal': {
-                'keywords': ['قرض', 'مقدم', 'سلفة', 'دين', 'استقطاع شخصي'],
-                'patterns': [r'قرض.*', r'مقدم.*', r'سلفة.*'],
-                'amount_range': (100, 50000),  # نطاق المبالغ المتوقع
-                'duration_months': (1, 60)     # مدة القرض المتوقعة
-            },
-            'temporary': {
-                'keywords': ['مؤقت', 'بدل مؤقت', 'حافز مؤقت', 'علاوة مؤقتة'],
-                'patterns': [r'.*مؤقت.*', r'بدل.*مؤقت', r'حافز.*شهر'],
-                'has_end_date': True,
-                'max_duration_months': 12
-            },
-            'exceptional': {
-                'keywords': ['مكافأة', 'حافز', 'بونص', 'عمولة', 'تعويض'],
-                'patterns': [r'مكافأة.*', r'حافز.*', r'بونص.*', r'عمولة.*'],
-                'frequency': 'irregular',
-                'amount_variance': 'high'
-            },
-            'adjustment': {
-                'keywords': ['تعديل', 'تجريبي', 'اختبار', 'مراجعة'],
-                'patterns': [r'تعديل.*', r'تجريبي.*', r'اختبار.*'],
-                'temporary_nature': True,
-                'requires_review': True
-            }
-        }
+        return CLASSIFICATION_RULES
+    
+    def load_history(self, components):
+        """
+        تحميل البيانات التاريخية لمجموعة بنود دفعة واحدة.
+        
+        استعلام واحد للبنود المشابهة واستعلام واحد لتاريخ التجديد لكل الموظفين،
+        بدلاً من استعلامين لكل بند في suggest_component_source و predict_component_renewal.
+        """
+        components = list(components)
+        keys = {
+            (component.name[:HISTORY_NAME_PREFIX_LENGTH], component.component_type)
+            for component in components
+        } - set(self.pattern_cache)
+        if keys:
+            self._load_similar_components(keys)
+        
+        employee_ids = {component.employee_id for component in components} - set(self.renewal_cache)
+        if employee_ids:
+            self._load_renewal_history(employee_ids)
+    
+    def _load_similar_components(self, keys):
+        """تحميل البنود المشابهة لمجموعة (بادئة، نوع) في استعلام واحد"""
+        query = Q()
+        for prefix, component_type in keys:
+            query |= Q(name__icontains=prefix, component_type=component_type)
+        rows = SalaryComponent.objects.filter(query).values_list(
+            'id', 'name', 'component_type', 'source'
+        )
+        
+        for key in keys:
+            self.pattern_cache[key] = []
+        for pk, name, component_type, source in rows:
+            name_lower = name.lower()
+            for prefix, key_type in keys:
+                if key_type == component_type and prefix.lower() in name_lower:
+                    self.pattern_cache[(prefix, key_type)].append((pk, source))
+    
+    def _load_renewal_history(self, employee_ids):
+        """تحميل كل بنود الموظفين مجمّعة حسب (الاسم، النوع) في استعلام واحد"""
+        for employee_id in employee_ids:
+            self.renewal_cache[employee_id] = {}
+        rows = SalaryComponent.objects.filter(employee_id__in=employee_ids).values(
+            'id', 'employee_id', 'name', 'component_type', 'effective_from', 'effective_to'
+        ).order_by('-created_at')
+        for row in rows:
+            self.renewal_cache[row['employee_id']].setdefault(
+                (row['name'], row['component_type']), []
+            ).append(row)
     
     def suggest_component_source(self, component):
         """اقتراح مصدر البند بناءً على التحليل الذكي"""
@@ -77,18 +153,18 @@ class ComponentIntelligence:
         analysis = {}
         name_lower = name.lower()
         
-        for source, rules in self.classification_rules.items():
-            score = 0
+        for source, rules in _compiled_classification_rules().items():
+            score = Decimal('0')
             
             # فحص الكلمات المفتاحية
             for keyword in rules['keywords']:
                 if keyword in name_lower:
-                    score += 2
+                    score += Decimal('2')
             
             # فحص الأنماط
-            for pattern in rules.get('patterns', []):
-                if re.search(pattern, name_lower):
-                    score += 1.5
+            for pattern in rules['patterns']:
+                if pattern.search(name_lower):
+                    score += Decimal('1.5')
             
             analysis[source] = score
         
@@ -136,23 +212,22 @@ class ComponentIntelligence:
         """تحليل الأنماط التاريخية للبنود المشابهة"""
         analysis = {}
         
-        # البحث عن بنود مشابهة
-        similar_components = SalaryComponent.objects.filter(
-            name__icontains=component.name[:10],  # أول 10 أحرف
-            component_type=component.component_type
-        ).exclude(id=component.id)
+        # البحث عن بنود مشابهة (من الذاكرة إن سبق تحميلها عبر load_history)
+        key = (component.name[:HISTORY_NAME_PREFIX_LENGTH], component.component_type)
+        if key not in self.pattern_cache:
+            self._load_similar_components({key})
+        similar_sources = [
+            source for pk, source in self.pattern_cache[key] if pk != component.id
+        ]
         
-        if similar_components.exists():
+        if similar_sources:
             # تحليل التصنيفات الشائعة
-            source_counts = similar_components.values('source').annotate(
-                count=Count('source')
-            ).order_by('-count')
+            total_similar = len(similar_sources)
+            source_counts = {}
+            for source in similar_sources:
+                source_counts[source] = source_counts.get(source, 0) + 1
             
-            total_similar = similar_components.count()
-            
-            for source_data in source_counts:
-                source = source_data['source']
-                count = source_data['count']
+            for source, count in source_counts.items():
                 percentage = Decimal(count) / Decimal(total_similar)
                 
                 analysis[source] = percentage * Decimal('2')  # وزن الأنماط التاريخية
@@ -357,26 +432,29 @@ class ComponentIntelligence:
     
     def _analyze_renewal_history(self, component):
         """تحليل تاريخ تجديد البند"""
-        # البحث عن بنود مشابهة سابقة
-        similar_components = SalaryComponent.objects.filter(
-            employee=component.employee,
-            name=component.name,
-            component_type=component.component_type
-        ).exclude(id=component.id).order_by('-created_at')
+        # البحث عن بنود مشابهة سابقة (من الذاكرة إن سبق تحميلها عبر load_history)
+        if component.employee_id not in self.renewal_cache:
+            self._load_renewal_history({component.employee_id})
+        similar_components = [
+            row for row in self.renewal_cache[component.employee_id].get(
+                (component.name, component.component_type), []
+            )
+            if row['id'] != component.id
+        ]
         
         history = {
-            'previous_renewals': similar_components.count(),
+            'previous_renewals': len(similar_components),
             'average_duration': 0,
             'renewal_pattern': 'irregular'
         }
         
-        if similar_components.exists():
+        if similar_components:
             # حساب متوسط مدة التجديد
             durations = []
             for comp in similar_components:
-                if comp.effective_from and comp.effective_to:
+                if comp['effective_from'] and comp['effective_to']:
                     duration = self._calculate_duration_months(
-                        comp.effective_from, comp.effective_to
+                        comp['effective_from'], comp['effective_to']
                     )
                     durations.append(duration)
             
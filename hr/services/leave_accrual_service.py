@@ -7,15 +7,60 @@ from dateutil.relativedelta import relativedelta
 from ..models import Employee, LeaveBalance, LeaveType
 
 
+# إعدادات الاستحقاق وقيمها الافتراضية — تُقرأ كلها باستعلام واحد
+ACCRUAL_SETTING_DEFAULTS = {
+    'leave_partial_after_months':   6,
+    'leave_senior_age_threshold':   50,
+    'leave_senior_service_years':   10,
+    'leave_senior_annual_days':     30,
+    'leave_senior_emergency_days':  10,
+    'leave_annual_full_days':       21,
+    'leave_emergency_full_days':    7,
+    'leave_annual_partial_days':    7,
+    'leave_emergency_partial_days': 3,
+}
+
+# حجم دفعة bulk_update في محرك الاستحقاق المجمّع
+ACCRUAL_BULK_BATCH_SIZE = 500
+
+# الحقول التي يكتبها محرك الاستحقاق
+ACCRUAL_UPDATE_FIELDS = [
+    'total_days', 'accrued_days', 'remaining_days', 'accrual_phase',
+    'last_accrual_date', 'adjustment_reason', 'is_manually_adjusted',
+]
+
+
 class LeaveAccrualService:
     """خدمة حساب وتحديث الاستحقاق التدريجي للإجازات"""
 
+    @staticmethod
+    def load_accrual_settings():
+        """
+        يقرأ كل إعدادات الاستحقاق باستعلام واحد.
+        يُمرَّر الناتج لدوال الحساب بدل قراءة SystemSetting لكل موظف ولكل نوع.
+
+        Returns:
+            dict: مفتاح الإعداد → قيمة صحيحة
+        """
+        from core.models import SystemSetting
+
+        settings = dict(ACCRUAL_SETTING_DEFAULTS)
+        rows = SystemSetting.objects.filter(
+            key__in=list(ACCRUAL_SETTING_DEFAULTS), is_active=True
+        ).values_list('key', 'value')
+        for key, value in rows:
+            try:
+                settings[key] = int(float(value))
+            except (TypeError, ValueError):
+                continue
+        return settings
+
     # =========================================================
     # الـ Single Source of Truth لحساب total_days
     # =========================================================
 
     @staticmethod
-    def get_entitlement_for_employee(employee, leave_type):
+    def get_entitlement_for_employee(employee, leave_type, settings=None):
         """
         يرجع عدد أيام الإجازة المستحقة لموظف محدد ونوع إجازة محدد.
         هذه هي الـ single source of truth — كل الأماكن تستدعيها.
@@ -30,45 +75,47 @@ class LeaveAccrualService:
         Args:
             employee: نموذج الموظف
             leave_type: نموذج نوع الإجازة
+            settings: إعدادات الاستحقاق من load_accrual_settings (اختياري)
 
         Returns:
             int: عدد الأيام المستحقة
         """
-        from core.models import SystemSetting
-
         # الإجازات الاستثنائية والمرضية والغير مدفوعة: لا رصيد لها — تُمنح بدون حد مسبق
         if not leave_type.requires_balance:
             return 0
 
+        if settings is None:
+            settings = LeaveAccrualService.load_accrual_settings()
+
         months_worked = LeaveAccrualService.calculate_months_worked(employee.hire_date)
-        partial_after = int(SystemSetting.get_setting('leave_partial_after_months', 6))
+        partial_after = settings['leave_partial_after_months']
 
         # كبار الموظفين — الأولوية الأعلى بعد الاستثنائية
-        if LeaveAccrualService.is_senior_employee(employee):
+        if LeaveAccrualService.is_senior_employee(employee, settings):
             if leave_type.category == 'annual':
-                return int(SystemSetting.get_setting('leave_senior_annual_days', 30))
+                return settings['leave_senior_annual_days']
             if leave_type.category == 'emergency':
-                return int(SystemSetting.get_setting('leave_senior_emergency_days', 10))
+                return settings['leave_senior_emergency_days']
 
         # إتمام السنة الكاملة (12 شهر)
         if months_worked >= 12:
             if leave_type.category == 'annual':
-                return int(SystemSetting.get_setting('leave_annual_full_days', 21))
+                return settings['leave_annual_full_days']
             if leave_type.category == 'emergency':
-                return int(SystemSetting.get_setting('leave_emergency_full_days', 7))
+                return settings['leave_emergency_full_days']
 
         # المرحلة الجزئية
         if months_worked >= partial_after:
             if leave_type.category == 'annual':
-                return int(SystemSetting.get_setting('leave_annual_partial_days', 7))
+                return settings['leave_annual_partial_days']
             if leave_type.category == 'emergency':
-                return int(SystemSetting.get_setting('leave_emergency_partial_days', 3))
+                return settings['leave_emergency_partial_days']
 
         # لم يستحق بعد
         return 0
 
     @staticmethod
-    def is_senior_employee(employee):
+    def is_senior_employee(employee, settings=None):
         """
         الموظف كبير إذا:
         - أتم leave_senior_age_threshold سنة (افتراضي 50)، أو
@@ -78,14 +125,16 @@ class LeaveAccrualService:
 
         Args:
             employee: نموذج الموظف
+            settings: إعدادات الاستحقاق من load_accrual_settings (اختياري)
 
         Returns:
             bool
         """
-        from core.models import SystemSetting
+        if settings is None:
+            settings = LeaveAccrualService.load_accrual_settings()
 
-        age_threshold     = int(SystemSetting.get_setting('leave_senior_age_threshold', 50))
-        service_threshold = int(SystemSetting.get_setting('leave_senior_service_years', 10))
+        age_threshold     = settings['leave_senior_age_threshold']
+        service_threshold = settings['leave_senior_service_years']
 
         return employee.age >= age_threshold or employee.years_of_service >= service_threshold
 
@@ -204,7 +253,7 @@ class LeaveAccrualService:
         return delta.months + (delta.years * 12)
 
     @staticmethod
-    def get_accrual_phase(employee, leave_type):
+    def get_accrual_phase(employee, leave_type, settings=None):
         """
         يرجع مرحلة الاستحقاق الحالية للموظف.
         يُستخدم لاكتشاف الترقي لمرحلة أعلى وتحديث الرصيد تلقائياً.
@@ -212,16 +261,17 @@ class LeaveAccrualService:
         Returns:
             str: 'none' | 'partial' | 'full' | 'senior'
         """
-        from core.models import SystemSetting
-
         if not leave_type.requires_balance:
             return 'none'
 
-        if LeaveAccrualService.is_senior_employee(employee):
+        if settings is None:
+            settings = LeaveAccrualService.load_accrual_settings()
+
+        if LeaveAccrualService.is_senior_employee(employee, settings):
             return 'senior'
 
         months_worked = LeaveAccrualService.calculate_months_worked(employee.hire_date)
-        partial_after = int(SystemSetting.get_setting('leave_partial_after_months', 6))
+        partial_after = settings['leave_partial_after_months']
 
         if months_worked >= 12:
             return 'full'
@@ -229,6 +279,62 @@ class LeaveAccrualService:
             return 'partial'
         return 'none'
 
+    @staticmethod
+    def _apply_accrual(employee, balance, settings, today=None):
+        """
+        يحسب الاستحقاق الجديد لرصيد واحد ويطبقه على الكائن في الذاكرة بدون حفظ.
+
+        Returns:
+            dict | None: None لو الرصيد معدل يدوياً ولم تتغير مرحلته،
+            وإلا {'changed': bool, 'diff': dict}
+        """
+        if today is None:
+            today = date.today()
+
+        new_phase = LeaveAccrualService.get_accrual_phase(employee, balance.leave_type, settings)
+        phase_changed = new_phase != balance.accrual_phase
+
+        # لو الرصيد معدل يدوياً ولم تتغير المرحلة — لا تلمسه
+        if balance.is_manually_adjusted and not phase_changed:
+            return None
+
+        old_total   = balance.total_days
+        old_accrued = balance.accrued_days
+        old_phase   = balance.accrual_phase
+
+        new_total = LeaveAccrualService.get_entitlement_for_employee(
+            employee, balance.leave_type, settings
+        )
+
+        balance.total_days     = new_total
+        balance.accrued_days   = new_total
+        balance.remaining_days = max(0, new_total - balance.used_days)
+        balance.accrual_phase  = new_phase
+        balance.last_accrual_date = today
+
+        # لو كان معدل يدوياً وتغيرت المرحلة — نرفع الرصيد ونسجل السبب
+        if balance.is_manually_adjusted and phase_changed:
+            balance.adjustment_reason = (
+                f'[تحديث تلقائي] ترقي من مرحلة "{old_phase}" إلى "{new_phase}" — '
+                f'تم رفع الرصيد من {old_total} إلى {new_total} يوم'
+            )
+            balance.is_manually_adjusted = False  # أصبح محدثاً تلقائياً
+
+        return {
+            'changed': new_total != old_total or new_total != old_accrued or phase_changed,
+            'diff': {
+                'leave_type':  balance.leave_type.name_ar,
+                'old_total':   old_total,
+                'new_total':   new_total,
+                'old_accrued': old_accrued,
+                'new_accrued': balance.accrued_days,
+                'remaining':   balance.remaining_days,
+                'old_phase':   old_phase,
+                'new_phase':   new_phase,
+                'phase_changed': phase_changed,
+            },
+        }
+
     @staticmethod
     @transaction.atomic
     def update_employee_accrual(employee, year=None):
@@ -253,54 +359,20 @@ class LeaveAccrualService:
             leave_type__category__in=['annual', 'emergency']
         ).select_related('leave_type')
 
+        settings = LeaveAccrualService.load_accrual_settings()
         updated_count = 0
         summary = []
 
         for balance in balances:
-            new_phase = LeaveAccrualService.get_accrual_phase(employee, balance.leave_type)
-            phase_changed = new_phase != balance.accrual_phase
-
-            # لو الرصيد معدل يدوياً ولم تتغير المرحلة — لا تلمسه
-            if balance.is_manually_adjusted and not phase_changed:
+            change = LeaveAccrualService._apply_accrual(employee, balance, settings)
+            if change is None:
                 continue
 
-            old_total   = balance.total_days
-            old_accrued = balance.accrued_days
-            old_phase   = balance.accrual_phase
-
-            new_total = LeaveAccrualService.get_entitlement_for_employee(
-                employee, balance.leave_type
-            )
-
-            balance.total_days     = new_total
-            balance.accrued_days   = new_total
-            balance.remaining_days = max(0, new_total - balance.used_days)
-            balance.accrual_phase  = new_phase
-            balance.last_accrual_date = date.today()
-
-            # لو كان معدل يدوياً وتغيرت المرحلة — نرفع الرصيد ونسجل السبب
-            if balance.is_manually_adjusted and phase_changed:
-                balance.adjustment_reason = (
-                    f'[تحديث تلقائي] ترقي من مرحلة "{old_phase}" إلى "{new_phase}" — '
-                    f'تم رفع الرصيد من {old_total} إلى {new_total} يوم'
-                )
-                balance.is_manually_adjusted = False  # أصبح محدثاً تلقائياً
-
             balance.save()
 
-            if new_total != old_total or balance.accrued_days != old_accrued or phase_changed:
+            if change['changed']:
                 updated_count += 1
-                summary.append({
-                    'leave_type':  balance.leave_type.name_ar,
-                    'old_total':   old_total,
-                    'new_total':   new_total,
-                    'old_accrued': old_accrued,
-                    'new_accrued': balance.accrued_days,
-                    'remaining':   balance.remaining_days,
-                    'old_phase':   old_phase,
-                    'new_phase':   new_phase,
-                    'phase_changed': phase_changed,
-                })
+                summary.append(change['diff'])
 
         return {
             'employee':      employee.get_full_name_ar(),
@@ -309,13 +381,18 @@ class LeaveAccrualService:
         }
 
     @staticmethod
-    @transaction.atomic
-    def update_all_accruals(year=None):
+    def update_all_accruals(year=None, dry_run=False, batch_size=ACCRUAL_BULK_BATCH_SIZE):
         """
-        تحديث استحقاق جميع الموظفين النشطين.
+        تحديث استحقاق جميع الموظفين النشطين دفعة واحدة.
+
+        يقرأ الإعدادات والموظفين والأرصدة مرة واحدة، ويحسب المراحل والأرصدة
+        في الذاكرة، ثم يكتب الأرصدة المتغيرة فقط عبر bulk_update.
+        نفس منطق update_employee_accrual (عبر _apply_accrual).
 
         Args:
             year: السنة (افتراضي: السنة الحالية)
+            dry_run: لو True يرجع الفروقات فقط بدون كتابة
+            batch_size: حجم دفعة bulk_update
 
         Returns:
             dict: ملخص شامل للتحديثات
@@ -323,21 +400,58 @@ class LeaveAccrualService:
         if year is None:
             year = date.today().year
 
-        employees = Employee.objects.filter(status='active')
-        total_updated    = 0
-        employees_updated = []
+        today = date.today()
+        settings = LeaveAccrualService.load_accrual_settings()
 
-        for employee in employees:
-            result = LeaveAccrualService.update_employee_accrual(employee, year)
-            if result['updated_count'] > 0:
-                total_updated += result['updated_count']
-                employees_updated.append(result)
+        employees = {
+            employee.pk: employee
+            for employee in Employee.objects.filter(status='active').only(
+                'id', 'name', 'hire_date', 'birth_date', 'status'
+            )
+        }
+
+        balances = LeaveBalance.objects.filter(
+            employee_id__in=list(employees),
+            year=year,
+            leave_type__category__in=['annual', 'emergency']
+        ).select_related('leave_type').order_by('employee_id', 'pk')
+
+        to_update = []
+        details = {}
+
+        for balance in balances:
+            employee = employees[balance.employee_id]
+            change = LeaveAccrualService._apply_accrual(employee, balance, settings, today)
+            if change is None:
+                continue
+
+            # bulk_update لا يطلق post_save (auto_update_remaining_days)
+            # فنكتب نفس القيمة النهائية التي يضعها الـ signal بعد save()
+            balance.remaining_days = balance.accrued_days - balance.used_days
+            to_update.append(balance)
+
+            if change['changed']:
+                entry = details.setdefault(employee.pk, {
+                    'employee':      employee.get_full_name_ar(),
+                    'updated_count': 0,
+                    'summary':       [],
+                })
+                entry['updated_count'] += 1
+                entry['summary'].append(change['diff'])
+
+        if not dry_run and to_update:
+            with transaction.atomic():
+                LeaveBalance.objects.bulk_update(
+                    to_update, ACCRUAL_UPDATE_FIELDS, batch_size=batch_size
+                )
 
+        employees_updated = list(details.values())
         return {
             'year':                    year,
-            'total_employees':         employees.count(),
+            'dry_run':                 dry_run,
+            'total_employees':         len(employees),
             'employees_with_updates':  len(employees_updated),
-            'total_balances_updated':  total_updated,
+            'total_balances_updated':  sum(e['updated_count'] for e in employees_updated),
             'details':                 employees_updated,
         }
 
@@ -53,6 +53,34 @@ class PayrollAuditService:
             # لا نوقف العملية الأصلية لو فشل التسجيل
             logger.error(f"فشل تسجيل audit للقسيمة {payroll.pk}: {e}")
 
+    @classmethod
+    def log_bulk(cls, payrolls, action, performed_by, notes_builder=None, include_snapshot=True):
+        """
+        تسجيل نفس العملية على مجموعة قسائم في استعلام واحد (bulk_create).
+
+        Args:
+            payrolls: قائمة كائنات Payroll
+            action: نوع العملية (من ACTION_CHOICES)
+            performed_by: المستخدم الذي نفذ العملية
+            notes_builder: دالة ترجع ملاحظات كل قسيمة (اختياري)
+            include_snapshot: هل نحفظ snapshot للبيانات
+        """
+        try:
+            from hr.models import PayrollAuditLog
+            PayrollAuditLog.objects.bulk_create([
+                PayrollAuditLog(
+                    payroll=payroll,
+                    action=action,
+                    performed_by=performed_by,
+                    notes=notes_builder(payroll) if notes_builder else '',
+                    snapshot=cls._build_snapshot(payroll) if include_snapshot else None,
+                )
+                for payroll in payrolls
+            ])
+        except Exception as e:
+            # لا نوقف العملية الأصلية لو فشل التسجيل
+            logger.error(f"فشل تسجيل audit لـ {len(payrolls)} قسيمة: {e}")
+
     @classmethod
     def log_calculated(cls, payroll, performed_by):
         cls.log(payroll, 'calculated', performed_by,
@@ -703,6 +703,143 @@ class PayrollService:
 
         return payroll
 
+    @staticmethod
+    def _lock_payrolls(payroll_ids):
+        """
+        Lock the requested payrolls together (ordered by pk to avoid deadlocks).
+
+        Returns:
+            tuple: (list of locked Payroll records, list of failure dicts for ids not found)
+        """
+        payrolls = list(
+            Payroll.objects.select_for_update(of=('self',))
+            .filter(pk__in=payroll_ids)
+            .select_related('employee')
+            .order_by('pk')
+        )
+        found = {payroll.pk for payroll in payrolls}
+        missing = [
+            {'payroll_id': int(pk), 'employee': '', 'error': 'قسيمة الراتب غير موجودة'}
+            for pk in {int(pk) for pk in payroll_ids} - found
+        ]
+        return payrolls, missing
+
+    @staticmethod
+    def _bulk_failure(payroll, error):
+        return {
+            'payroll_id': payroll.pk,
+            'employee': payroll.employee.get_full_name_ar(),
+            'error': str(error),
+        }
+
+    @staticmethod
+    def bulk_approve_payrolls(payroll_ids, approved_by):
+        """
+        Approve a set of calculated payrolls in one transaction.
+
+        The payrolls are locked together, the status, attendance-summary and
+        pending penalty/reward gates are checked with one query each for the
+        whole set, and the approved rows are written with a single bulk_update.
+        A payroll failing a gate is reported back instead of aborting the batch.
+
+        Args:
+            payroll_ids (iterable): IDs of the payrolls to approve
+            approved_by (User): The user approving the payrolls
+
+        Returns:
+            dict: {'succeeded': [payroll ids], 'failed': [{'payroll_id', 'employee', 'error'}]}
+        """
+        from django.utils import timezone
+        from ..models import AttendanceSummary, PenaltyReward
+        from .payroll_audit_service import PayrollAuditService
+
+        with transaction.atomic():
+            payrolls, failed = PayrollService._lock_payrolls(payroll_ids)
+            employee_ids = {payroll.employee_id for payroll in payrolls}
+            months = {payroll.month for payroll in payrolls}
+
+            approved_summaries = set(
+                AttendanceSummary.objects.filter(
+                    employee_id__in=employee_ids, month__in=months, is_approved=True
+                ).values_list('employee_id', 'month')
+            )
+            pending_counts = {}
+            for key in PenaltyReward.objects.filter(
+                employee_id__in=employee_ids, month__in=months, status='pending'
+            ).values_list('employee_id', 'month'):
+                pending_counts[key] = pending_counts.get(key, 0) + 1
+
+            now = timezone.now()
+            approved = []
+            for payroll in payrolls:
+                key = (payroll.employee_id, payroll.month)
+                if payroll.status != 'calculated':
+                    failed.append(PayrollService._bulk_failure(
+                        payroll, 'يجب أن تكون قسيمة الراتب محسوبة للاعتماد'
+                    ))
+                elif key not in approved_summaries:
+                    failed.append(PayrollService._bulk_failure(
+                        payroll,
+                        f'ملخص الحضور لشهر {payroll.month.strftime("%Y-%m")} غير معتمد'
+                    ))
+                elif pending_counts.get(key):
+                    failed.append(PayrollService._bulk_failure(
+                        payroll,
+                        f'يوجد {pending_counts[key]} جزاء/مكافأة معلق في نفس الشهر'
+                    ))
+                else:
+                    payroll.status = 'approved'
+                    payroll.approved_by = approved_by
+                    payroll.approved_at = now
+                    approved.append(payroll)
+
+            if approved:
+                Payroll.objects.bulk_update(approved, ['status', 'approved_by', 'approved_at'])
+                PayrollAuditService.log_bulk(
+                    approved, 'approved', approved_by,
+                    notes_builder=lambda p: f'تم الاعتماد - صافي: {p.net_salary} ج.م'
+                )
+
+        logger.info(f"Bulk payroll approval: {len(approved)} approved, {len(failed)} failed")
+        return {'succeeded': [payroll.pk for payroll in approved], 'failed': failed}
+
+    @staticmethod
+    def bulk_unapprove_payrolls(payroll_ids, unapproved_by):
+        """
+        Revert a set of approved (unpaid) payrolls back to 'calculated'.
+
+        Returns:
+            dict: {'succeeded': [payroll ids], 'failed': [{'payroll_id', 'employee', 'error'}]}
+        """
+        from .payroll_audit_service import PayrollAuditService
+
+        with transaction.atomic():
+            payrolls, failed = PayrollService._lock_payrolls(payroll_ids)
+            reverted = []
+            for payroll in payrolls:
+                if payroll.status != 'approved':
+                    failed.append(PayrollService._bulk_failure(
+                        payroll, 'يمكن إلغاء الاعتماد فقط للقسائم المعتمدة وغير المدفوعة'
+                    ))
+                    continue
+                payroll.status = 'calculated'
+                payroll.approved_by = None
+                payroll.approved_at = None
+                reverted.append(payroll)
+
+            if reverted:
+                Payroll.objects.bulk_update(reverted, ['status', 'approved_by', 'approved_at'])
+                PayrollAuditService.log_bulk(
+                    reverted, 'unapproved', unapproved_by,
+                    notes_builder=lambda p: 'تم إلغاء الاعتماد بواسطة المدير العام'
+                )
+
+        logger.info(
+            f"Bulk payroll unapproval by {unapproved_by.username}: "
+            f"{len(reverted)} reverted, {len(failed)} failed"
+        )
+        return {'succeeded': [payroll.pk for payroll in reverted], 'failed': failed}
+
     @staticmethod
     def _create_journal_entry(payroll):
         """
@@ -928,7 +1065,7 @@ class PayrollService:
                     )
     
     @staticmethod
-    def _get_safe_account_only(account_code):
+    def _get_safe_account_only(account_code, accounts=None):
         """
         Safely retrieve an existing account without creating new ones.
         
@@ -938,6 +1075,8 @@ class PayrollService:
         
         Args:
             account_code (str): The account code to look up
+            accounts (dict, optional): Preloaded {code: ChartOfAccounts} map from
+                _load_component_accounts; avoids a query per lookup
             
         Returns:
             ChartOfAccounts: The account if found and allowed, None otherwise
@@ -957,7 +1096,10 @@ class PayrollService:
             return None
         
         # البحث عن الحساب الموجود فقط
-        account = ChartOfAccounts.objects.filter(code=account_code).first()
+        if accounts is not None:
+            account = accounts.get(account_code)
+        else:
+            account = ChartOfAccounts.objects.filter(code=account_code).first()
         
         if not account:
             logger.error(f"❌ الحساب المطلوب غير موجود في النظام: {account_code}")
@@ -989,23 +1131,30 @@ class PayrollService:
         logger = logging.getLogger(__name__)
         
         # الحصول على جميع خطوط المستحقات في قسيمة الراتب
-        earning_lines = payroll.lines.filter(component_type='earning')
+        earning_lines = list(
+            payroll.lines.filter(component_type='earning').select_related('salary_component')
+        )
+        accounts = PayrollService._load_component_accounts(earning_lines)
+        employee_name = payroll.employee.get_full_name_ar()
         
+        entry_lines = []
         for line in earning_lines:
             if line.amount and line.amount > 0:
                 # تحديد الحساب المحاسبي بناءً على SalaryComponent
-                account = PayrollService._determine_account_for_component(line)
+                account = PayrollService._determine_account_for_component(line, accounts)
                 
                 if account:
-                    JournalEntryLine.objects.create(
+                    entry_lines.append(JournalEntryLine(
                         journal_entry=journal_entry,
                         account=account,
                         debit=line.amount,
                         credit=Decimal('0'),
-                        description=f"{line.name} - {payroll.employee.get_full_name_ar()}"
-                    )
+                        description=f"{line.name} - {employee_name}"
+                    ))
                 else:
                     logger.warning(f"لم يتم العثور على حساب محاسبي للمستحق: {line.name}")
+        
+        JournalEntryLine.objects.bulk_create(entry_lines)
 
     @staticmethod
     def _process_dynamic_deductions(journal_entry, payroll):
@@ -1030,26 +1179,65 @@ class PayrollService:
         logger = logging.getLogger(__name__)
         
         # الحصول على جميع خطوط الخصومات في قسيمة الراتب
-        deduction_lines = payroll.lines.filter(component_type='deduction')
+        deduction_lines = list(
+            payroll.lines.filter(component_type='deduction').select_related('salary_component')
+        )
+        accounts = PayrollService._load_component_accounts(deduction_lines)
+        employee_name = payroll.employee.get_full_name_ar()
         
+        entry_lines = []
         for line in deduction_lines:
             if line.amount and line.amount > 0:
                 # تحديد الحساب المحاسبي بناءً على SalaryComponent
-                account = PayrollService._determine_account_for_component(line)
+                account = PayrollService._determine_account_for_component(line, accounts)
                 
                 if account:
-                    JournalEntryLine.objects.create(
+                    entry_lines.append(JournalEntryLine(
                         journal_entry=journal_entry,
                         account=account,
                         debit=Decimal('0'),
                         credit=line.amount,
-                        description=f"{line.name} - {payroll.employee.get_full_name_ar()}"
-                    )
+                        description=f"{line.name} - {employee_name}"
+                    ))
                 else:
                     logger.warning(f"لم يتم العثور على حساب محاسبي للخصم: {line.name}")
+        
+        JournalEntryLine.objects.bulk_create(entry_lines)
     
     @staticmethod
-    def _determine_account_for_component(payroll_line):
+    def _load_component_accounts(payroll_lines, extra_codes=()):
+        """
+        Load every account a set of payroll lines can resolve to in one query.
+        
+        Collects explicit SalaryComponent account codes, all smart-mapping
+        targets and the default liability account (20200).
+        
+        Args:
+            payroll_lines (iterable): PayrollLine records (salary_component preloaded)
+            extra_codes (iterable, optional): Additional account codes to include
+            
+        Returns:
+            dict: {account_code: ChartOfAccounts}
+        """
+        from financial.models import ChartOfAccounts
+        
+        codes = {'20200', *extra_codes}
+        codes.update(
+            info['account_code']
+            for info in PayrollService._get_smart_account_mapping().values()
+        )
+        for line in payroll_lines:
+            component = line.salary_component
+            if component and component.account_code:
+                codes.add(component.account_code)
+        
+        accounts = {}
+        for account in ChartOfAccounts.objects.filter(code__in=codes).order_by('pk'):
+            accounts.setdefault(account.code, account)
+        return accounts
+    
+    @staticmethod
+    def _determine_account_for_component(payroll_line, accounts=None):
         """
         Determine the appropriate accounting account for a salary component.
         
@@ -1060,6 +1248,8 @@ class PayrollService:
         
         Args:
             payroll_line (PayrollLine): The payroll line to determine account for
+            accounts (dict, optional): Preloaded map from _load_component_accounts;
+                when given, resolution is done in memory without queries
             
         Returns:
             ChartOfAccounts: The determined account, or None if not found
@@ -1074,9 +1264,11 @@ class PayrollService:
         
         # 1. إذا كان مرتبط بـ SalaryComponent وله account_code
         if payroll_line.salary_component and payroll_line.salary_component.account_code:
-            account = ChartOfAccounts.objects.filter(
-                code=payroll_line.salary_component.account_code
-            ).first()
+            explicit_code = payroll_line.salary_component.account_code
+            if accounts is not None:
+                account = accounts.get(explicit_code)
+            else:
+                account = ChartOfAccounts.objects.filter(code=explicit_code).first()
             if account:
                 return account
         
@@ -1087,12 +1279,12 @@ class PayrollService:
         for pattern, account_info in account_mapping.items():
             if pattern in component_code:
                 account = PayrollService._get_safe_account_only(
-                    account_info['account_code']
+                    account_info['account_code'], accounts
                 )
                 return account
         
         # 3. الافتراضي: حساب مستحقات الرواتب
-        return PayrollService._get_safe_account_only('20200')
+        return PayrollService._get_safe_account_only('20200', accounts)
     
     @staticmethod
     def _get_smart_account_mapping():
@@ -1200,124 +1392,6 @@ class PayrollService:
             },
         }
     
-    @staticmethod
-    def _calculate_monthly_totals(paid_payrolls):
-        """
-        Calculate totals for all deduction types across monthly payrolls.
-        
-        This method aggregates all salary and deduction amounts from a set
-        of paid payroll records to prepare for consolidated journal entry creation.
-        
-        Args:
-            paid_payrolls (QuerySet): QuerySet of paid Payroll records
-            
-        Returns:
-            dict: Dictionary containing totals for:
-                - total_gross: Total gross salary
-                - total_net: Total net salary
-                - total_social_insurance: Total social insurance deductions
-                - total_tax: Total tax deductions
-                - total_absence_deduction: Total absence deductions
-                - total_late_deduction: Total late deductions
-                - total_advance_deduction: Total advance deductions
-                - total_other_deductions: Total other deductions
-        """
-        from decimal import Decimal
-        
-        totals = {
-            'total_gross': Decimal('0'),
-            'total_net': Decimal('0'),
-            'total_social_insurance': Decimal('0'),
-            'total_tax': Decimal('0'),
-            'total_absence_deduction': Decimal('0'),
-            'total_late_deduction': Decimal('0'),
-            'total_advance_deduction': Decimal('0'),
-            'total_other_deductions': Decimal('0')
-        }
-        
-        for payroll in paid_payrolls:
-            totals['total_gross'] += payroll.correct_gross_salary
-            totals['total_net'] += payroll.correct_net_salary
-            totals['total_social_insurance'] += payroll.social_insurance or Decimal('0')
-            totals['total_tax'] += payroll.tax or Decimal('0')
-            totals['total_absence_deduction'] += payroll.absence_deduction or Decimal('0')
-            totals['total_late_deduction'] += payroll.late_deduction or Decimal('0')
-            totals['total_advance_deduction'] += payroll.advance_deduction or Decimal('0')
-            totals['total_other_deductions'] += payroll.other_deductions or Decimal('0')
-        
-        return totals
-    
-    @staticmethod
-    def _process_monthly_deductions(journal_entry, totals):
-        """
-        Process all deduction types for monthly consolidated journal entry.
-        
-        This method creates journal entry lines for aggregated deductions
-        from multiple payroll records, routing each deduction type to its
-        appropriate liability account.
-        
-        Args:
-            journal_entry (JournalEntry): The journal entry to add lines to
-            totals (dict): Dictionary of aggregated totals from _calculate_monthly_totals
-            
-        Raises:
-            Exception: If account lookup fails (logged but not raised)
-        """
-        from financial.models import JournalEntryLine
-        from decimal import Decimal
-        
-        # خريطة الخصومات الشهرية
-        monthly_deductions = {
-            'total_social_insurance': {
-                'account_code': '2103',
-                'account_name': 'التأمينات الاجتماعية',
-                'description': 'إجمالي التأمينات الاجتماعية للشهر'
-            },
-            'total_tax': {
-                'account_code': '2104',
-                'account_name': 'ضرائب الدخل',
-                'description': 'إجمالي ضرائب الدخل للشهر'
-            },
-            'total_absence_deduction': {
-                'account_code': '20200',
-                'account_name': 'مستحقات الرواتب',
-                'description': 'إجمالي خصومات الغياب للشهر'
-            },
-            'total_late_deduction': {
-                'account_code': '20200',
-                'account_name': 'مستحقات الرواتب',
-                'description': 'إجمالي خصومات التأخير للشهر'
-            },
-            'total_advance_deduction': {
-                'account_code': '10350',
-                'account_name': 'سلف الموظفين',
-                'description': 'إجمالي خصومات السلف للشهر'
-            },
-            'total_other_deductions': {
-                'account_code': '20200',
-                'account_name': 'مستحقات الرواتب',
-                'description': 'إجمالي الخصومات الأخرى للشهر'
-            }
-        }
-        
-        # معالجة كل نوع خصم
-        for total_key, mapping in monthly_deductions.items():
-            total_amount = totals.get(total_key, Decimal('0'))
-            
-            if total_amount and total_amount > 0:
-                account = PayrollService._get_safe_account_only(
-                    mapping['account_code']
-                )
-                
-                if account:
-                    JournalEntryLine.objects.create(
-                        journal_entry=journal_entry,
-                        account=account,
-                        debit=Decimal('0'),
-                        credit=total_amount,
-                        description=mapping['description']
-                    )
-    
     @staticmethod
     @transaction.atomic
     def pay_payroll(payroll, paid_by, payment_account, payment_reference=None):
@@ -1411,19 +1485,109 @@ class PayrollService:
 
         return payroll
     
+    @staticmethod
+    def _build_monthly_journal_lines(payrolls):
+        """
+        Build the aggregated journal lines for a consolidated payroll posting.
+        
+        Resolves the component→account map once for the whole run and sums
+        amounts per account in memory:
+        - Debit 50200 with the total gross salary
+        - Credit each payment account with the net salaries paid from it
+        - Credit each liability account with its deduction PayrollLines
+        - Rounding difference to 59000 so the entry always balances
+        
+        Args:
+            payrolls (list): Payroll records with ``deduction_lines`` prefetched
+            
+        Returns:
+            list: JournalEntryLineData items, one per account and side
+            
+        Raises:
+            ValueError: If salary account (50200) is not found
+        """
+        from collections import defaultdict
+        from governance.services.accounting_gateway import JournalEntryLineData
+        
+        all_deduction_lines = [
+            line for payroll in payrolls for line in payroll.deduction_lines
+        ]
+        accounts = PayrollService._load_component_accounts(
+            all_deduction_lines, extra_codes=('50200', '59000')
+        )
+        
+        salary_account = accounts.get('50200')
+        if not salary_account:
+            raise ValueError('حساب الرواتب والأجور (50200) غير موجود في دليل الحسابات')
+        
+        total_gross = Decimal('0')
+        net_by_account = defaultdict(Decimal)
+        deductions_by_account = defaultdict(Decimal)
+        
+        for payroll in payrolls:
+            total_gross += payroll.correct_gross_salary
+            if payroll.payment_account:
+                net_by_account[payroll.payment_account.code] += payroll.correct_net_salary
+            else:
+                logger.warning(f'Payroll {payroll.id} has no payment account — net credit skipped')
+            
+            for line in payroll.deduction_lines:
+                if not line.amount or line.amount <= 0:
+                    continue
+                account = PayrollService._determine_account_for_component(line, accounts)
+                if account:
+                    deductions_by_account[account.code] += line.amount
+                else:
+                    logger.warning(f"لم يتم العثور على حساب محاسبي للخصم: {line.name}")
+        
+        lines = [JournalEntryLineData(
+            account_code=salary_account.code,
+            debit=total_gross,
+            credit=Decimal('0'),
+            description='إجمالي مرتبات الشهر'
+        )]
+        for account_code, amount in net_by_account.items():
+            if amount > 0:
+                lines.append(JournalEntryLineData(
+                    account_code=account_code,
+                    debit=Decimal('0'),
+                    credit=amount,
+                    description='صافي المرتبات المدفوعة'
+                ))
+        for account_code, amount in deductions_by_account.items():
+            lines.append(JournalEntryLineData(
+                account_code=account_code,
+                debit=Decimal('0'),
+                credit=amount,
+                description=f'إجمالي خصومات الشهر - {accounts[account_code].name}'
+            ))
+        
+        # فرق التقريب → 59000
+        total_credit = sum(line.credit for line in lines)
+        diff = (total_gross - total_credit).quantize(Decimal('0.01'))
+        if diff != 0:
+            if '59000' in accounts:
+                lines.append(JournalEntryLineData(
+                    account_code='59000',
+                    debit=abs(diff) if diff < 0 else Decimal('0'),
+                    credit=diff if diff > 0 else Decimal('0'),
+                    description='فرق تقريب رواتب'
+                ))
+            else:
+                logger.warning(f'Monthly payroll rounding diff {diff} but 59000 not found')
+        
+        return lines
+    
     @staticmethod
     @transaction.atomic
     def create_monthly_payroll_journal_entry(month, paid_payrolls, created_by):
         """
         Create a consolidated journal entry for all paid payrolls in a month.
         
-        DEPRECATED: Use PayrollAccountingService for individual payroll journal entries.
-        
-        This method creates a single journal entry that consolidates all
-        individual payroll payments for a month, including:
-        - Total salary expenses (debit)
-        - Total net payments (credit to payment account)
-        - All deduction types (credit to liability accounts)
+        The component→account map is resolved once for the whole run, amounts
+        are aggregated per account in memory, and one balanced entry is created
+        through AccountingGateway with its lines inserted in bulk. Query count
+        stays constant regardless of the number of payrolls and PayrollLines.
         
         Args:
             month (date): The payroll month as a date object
@@ -1431,23 +1595,31 @@ class PayrollService:
             created_by (User): The user creating the journal entry
         
         Returns:
-            JournalEntry: The created and posted journal entry
+            JournalEntry: The created (posted) journal entry
             
         Raises:
             ValueError: If no paid payrolls exist or salary account (50200) not found
-            Exception: Journal posting errors are logged but not raised
+            GovernanceError: If the gateway rejects the entry (period, balance, authority)
         """
-        from financial.models import JournalEntry, JournalEntryLine, ChartOfAccounts
-        from decimal import Decimal
-        import logging
-        
-        logger = logging.getLogger(__name__)
+        from django.db.models import Prefetch
+        from governance.services.accounting_gateway import AccountingGateway
+        from ..models import PayrollLine
         
-        if not paid_payrolls.exists():
+        payrolls = list(
+            paid_payrolls.select_related('payment_account').prefetch_related(
+                Prefetch(
+                    'lines',
+                    queryset=PayrollLine.objects.filter(
+                        component_type='deduction'
+                    ).select_related('salary_component'),
+                    to_attr='deduction_lines'
+                )
+            )
+        )
+        if not payrolls:
             raise ValueError('لا توجد رواتب مدفوعة لإنشاء قيد محاسبي')
         
-        # حساب الإجماليات لجميع أنواع الخصومات
-        totals = PayrollService._calculate_monthly_totals(paid_payrolls)
+        lines = PayrollService._build_monthly_journal_lines(payrolls)
         
         # الحصول على التصنيف المالي للرواتب
         try:
@@ -1455,56 +1627,164 @@ class PayrollService:
             financial_category = FinancialCategory.objects.filter(
                 code='salaries', is_active=True
             ).first()
-        except:
+        except Exception:
             financial_category = None
         
-        # إنشاء القيد
-        entry = JournalEntry.objects.create(
+        # القيد مربوط بأول قسيمة في الدفعة كمصدر، والمفتاح يمنع تكرار ترحيل نفس الشهر
+        anchor_id = min(payroll.id for payroll in payrolls)
+        entry = AccountingGateway().create_journal_entry(
+            source_module='hr',
+            source_model='Payroll',
+            source_id=anchor_id,
+            lines=lines,
+            idempotency_key=f'JE:hr:Payroll:{anchor_id}:monthly-{month.strftime("%Y%m")}',
+            user=created_by,
+            entry_type='automatic',
+            description=f'مرتبات شهر {month.strftime("%Y-%m")} - {len(payrolls)} موظف',
+            reference=f'PAYM-{month.strftime("%Y-%m")}',
             date=month,
-            description=f'مرتبات شهر {month.strftime("%Y-%m")} - {paid_payrolls.count()} موظف',
-            created_by=created_by,
-            financial_category=financial_category
-        )
-        
-        # من حـ/ مصروف الرواتب والأجور
-        salary_account = ChartOfAccounts.objects.filter(code='50200').first()
-        if not salary_account:
-            raise ValueError('حساب الرواتب والأجور (50200) غير موجود في دليل الحسابات')
-        
-        JournalEntryLine.objects.create(
-            journal_entry=entry,
-            account=salary_account,
-            debit=totals['total_gross'],
-            credit=Decimal('0'),
-            description='إجمالي مرتبات الشهر'
+            financial_category=financial_category,
+            bulk_insert_lines=True
         )
         
-        # إلى حـ/ الصندوق/البنك (الصافي)
-        payment_account = paid_payrolls.first().payment_account
-        if payment_account:
-            JournalEntryLine.objects.create(
-                journal_entry=entry,
-                account=payment_account,
-                debit=Decimal('0'),
-                credit=totals['total_net'],
-                description='صافي المرتبات المدفوعة'
-            )
-        
-        # معالجة جميع أنواع الخصومات الشهرية
-        PayrollService._process_monthly_deductions(entry, totals)
-        
         # ربط القيد بالرواتب
-        paid_payrolls.update(journal_entry=entry)
-        
-        # ✅ ترحيل القيد تلقائياً
-        try:
-            from financial.services.expense_income_service import ExpenseIncomeService
-            ExpenseIncomeService.post_journal_entry(entry, created_by)
-            
-        except Exception as post_error:
-            logger.warning(
-                f"تم إنشاء القيد المحاسبي رقم {entry.id} لكن فشل ترحيله: {str(post_error)}"
-            )
-            # لا نرفع الخطأ لأن القيد تم إنشاؤه بنجاح
-        
+        Payroll.objects.filter(
+            pk__in=[payroll.pk for payroll in payrolls]
+        ).update(journal_entry=entry)
+
         return entry
+
+    @staticmethod
+    def bulk_pay_payrolls(payroll_ids, paid_by, payment_account, payment_reference=None):
+        """
+        Pay a set of approved payrolls from one payment account.
+
+        The payrolls are locked together and the salary_payment financial
+        validation (accounting period) runs once per distinct payroll month
+        rather than once per payroll. Payrolls that pass are posted as one
+        consolidated journal entry for the payment account, then written with
+        a single bulk_update and audited with a single bulk_create.
+
+        Args:
+            payroll_ids (iterable): IDs of the payrolls to pay
+            paid_by (User): The user processing the payment
+            payment_account (ChartOfAccounts): The account to pay from (cash/bank)
+            payment_reference (str, optional): Payment reference number
+
+        Returns:
+            dict: {
+                'succeeded': [payroll ids],
+                'failed': [{'payroll_id', 'employee', 'error'}],
+                'journal_entry': JournalEntry or None
+            }
+
+        Raises:
+            ValueError: If payment account is missing
+        """
+        from django.db.models import Prefetch
+        from django.utils import timezone
+        from financial.services.validation_service import FinancialValidationService
+        from governance.services.accounting_gateway import AccountingGateway
+        from ..models import PayrollLine
+        from .payroll_audit_service import PayrollAuditService
+
+        if not payment_account:
+            raise ValueError('يجب تحديد حساب الدفع (صندوق أو بنك)')
+
+        journal_entry = None
+        with transaction.atomic():
+            payrolls, failed = PayrollService._lock_payrolls(payroll_ids)
+
+            payable = []
+            for payroll in payrolls:
+                if payroll.status != 'approved':
+                    failed.append(PayrollService._bulk_failure(
+                        payroll, 'يجب اعتماد قسيمة الراتب أولاً قبل الدفع'
+                    ))
+                else:
+                    payable.append(payroll)
+
+            # ✅ التحقق من الفترة المحاسبية مرة واحدة لكل شهر
+            by_month = {}
+            for payroll in payable:
+                by_month.setdefault(payroll.month, []).append(payroll)
+            payable = []
+            for month, month_payrolls in by_month.items():
+                validation_result = FinancialValidationService.validate_transaction(
+                    entity=month_payrolls[0].employee,
+                    transaction_date=month,
+                    entity_type='employee',
+                    transaction_type='salary_payment',
+                    transaction_amount=sum(p.correct_net_salary for p in month_payrolls),
+                    user=paid_by,
+                    module='hr',
+                    view_name='bulk_pay_payrolls',
+                    raise_exception=False,
+                    log_failures=True
+                )
+                if validation_result['is_valid']:
+                    payable.extend(month_payrolls)
+                else:
+                    error = '; '.join(validation_result['errors'])
+                    failed.extend(PayrollService._bulk_failure(p, error) for p in month_payrolls)
+
+            if payable:
+                now = timezone.now()
+                for payroll in payable:
+                    payroll.status = 'paid'
+                    payroll.paid_by = paid_by
+                    payroll.paid_at = now
+                    payroll.payment_date = now.date()  # تاريخ الدفع = تاريخ اليوم الفعلي
+                    payroll.payment_account = payment_account
+                    payroll.payment_reference = payment_reference or ''
+
+                # ✅ قيد محاسبي واحد مجمّع لحساب الدفع
+                try:
+                    with transaction.atomic():
+                        deduction_lines = {}
+                        for line in PayrollLine.objects.filter(
+                            payroll__in=payable, component_type='deduction'
+                        ).select_related('salary_component'):
+                            deduction_lines.setdefault(line.payroll_id, []).append(line)
+                        for payroll in payable:
+                            payroll.deduction_lines = deduction_lines.get(payroll.pk, [])
+
+                        lines = PayrollService._build_monthly_journal_lines(payable)
+                        anchor_id = min(payroll.pk for payroll in payable)
+                        journal_entry = AccountingGateway().create_journal_entry(
+                            source_module='hr',
+                            source_model='Payroll',
+                            source_id=anchor_id,
+                            lines=lines,
+                            idempotency_key=f'JE:hr:Payroll:{anchor_id}:bulk-pay-{payment_account.code}',
+                            user=paid_by,
+                            entry_type='automatic',
+                            description=f'دفع مرتبات - {len(payable)} موظف - {payment_account.name}',
+                            reference=payment_reference or f'PAYB-{anchor_id}',
+                            date=now.date(),
+                            bulk_insert_lines=True
+                        )
+                except Exception as e:
+                    logger.error(
+                        f"تم دفع الرواتب بنجاح لكن فشل إنشاء القيد المحاسبي المجمّع: {str(e)}"
+                    )
+
+                for payroll in payable:
+                    payroll.journal_entry = journal_entry
+                Payroll.objects.bulk_update(payable, [
+                    'status', 'paid_by', 'paid_at', 'payment_date',
+                    'payment_account', 'payment_reference', 'journal_entry',
+                ])
+                PayrollAuditService.log_bulk(
+                    payable, 'paid', paid_by,
+                    notes_builder=lambda p: (
+                        f'تم الدفع - المبلغ: {p.net_salary} ج.م - الحساب: {payment_account.name}'
+                    )
+                )
+
+        logger.info(f"Bulk payroll payment: {len(payable)} paid, {len(failed)} failed")
+        return {
+            'succeeded': [payroll.pk for payroll in payable],
+            'failed': failed,
+            'journal_entry': journal_entry,
+        }
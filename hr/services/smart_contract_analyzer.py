@@ -15,8 +15,8 @@ class SmartContractAnalyzer:
     def analyze_employee_for_contract(self, employee, new_contract=None):
         """تحليل شامل لبنود الموظف مع العقد الجديد"""
         
-        # جلب بنود الموظف الحالية
-        current_components = self.get_active_components(employee)
+        # جلب بنود الموظف الحالية (استعلام واحد يُعاد استخدامه في كل خطوات التحليل)
+        current_components = list(self.get_active_components(employee))
         
         # تصنيف البنود
         classified_components = self.classify_components(current_components)
@@ -140,23 +140,23 @@ class SmartContractAnalyzer:
                     })
         
         # التحقق من البنود المكررة (فقط للعقود المحفوظة)
-        contract_components = []
+        contract_component_keys = set()
         if new_contract and new_contract.id:
             contract_components_manager = getattr(new_contract, 'salary_components', None)
             if contract_components_manager is not None:
-                contract_components = contract_components_manager.all()
+                contract_component_keys = set(
+                    contract_components_manager.values_list('name', 'component_type')
+                )
         # للعقود المؤقتة (بدون id)، لا توجد بنود مكررة للفحص
             
         for current_comp in current_components:
-            for contract_comp in contract_components:
-                if (current_comp.name == contract_comp.name and 
-                    current_comp.component_type == contract_comp.component_type):
-                    conflicts.append({
-                        'type': 'duplicate_component',
-                        'component': current_comp,
-                        'message': f'بند مكرر: {current_comp.name}',
-                        'severity': 'medium'
-                    })
+            if (current_comp.name, current_comp.component_type) in contract_component_keys:
+                conflicts.append({
+                    'type': 'duplicate_component',
+                    'component': current_comp,
+                    'message': f'بند مكرر: {current_comp.name}',
+                    'severity': 'medium'
+                })
         
         return conflicts
     
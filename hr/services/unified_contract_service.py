@@ -187,10 +187,11 @@ class UnifiedContractService:
     def _analyze_renewal_needs(self, employee):
         """تحليل احتياجات التجديد للموظف"""
         
-        components = SalaryComponent.objects.filter(
+        components = list(SalaryComponent.objects.filter(
             employee=employee,
             is_active=True
-        )
+        ))
+        self.intelligence.load_history(components)
         
         renewal_analysis = {
             'needs_renewal': [],
@@ -307,6 +308,7 @@ class UnifiedContractService:
             comp for comp in analysis['basic_analysis']['classified_components'].get('contract', [])
             if not comp.is_from_contract
         ]
+        self.intelligence.load_history(unclassified)
         
         for component in unclassified:
             suggested_source = self.intelligence.suggest_component_source(component)
@@ -62,18 +62,19 @@ def cleanup_old_biometric_logs(months=6):
         months: عدد الشهور (الافتراضي 6)
     """
     try:
-        from .models import BiometricLog
-        
-        cutoff_date = timezone.now() - timedelta(days=months * 30)
+        from core.services.retention_engine import RetentionEngine, biometric_log_retention_rule
         
-        old_logs = BiometricLog.objects.filter(timestamp__lt=cutoff_date)
-        count = old_logs.count()
+        # حذف على دفعات حسب نطاق المفتاح الأساسي (أو إسقاط الأقسام المنتهية إن كان الجدول مقسماً)
+        result = RetentionEngine().run(biometric_log_retention_rule(months))
         
-        if count > 0:
-            old_logs.delete()
-            return {'success': True, 'deleted': count}
-        else:
-            return {'success': True, 'deleted': 0}
+        if result.errors:
+            return {'success': False, 'deleted': result.deleted, 'error': '; '.join(result.errors)}
+        return {
+            'success': True,
+            'deleted': result.deleted,
+            'partitions_dropped': result.partitions_dropped,
+            'completed': result.completed
+        }
             
     except Exception as e:
         logger.error(f"خطأ في حذف السجلات القديمة: {str(e)}")
@@ -719,5 +719,135 @@ class AttendanceIntegrationTest(TransactionTestCase):
         self.assertGreater(total_records, 0)
 
 
+class MissingAttendanceGenerationTest(TestCase):
+    """اختبارات توليد سجلات الغياب المجمّع"""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username='admin_missing_att',
+            password='admin123'
+        )
+        self.department = Department.objects.create(code='OPS', name_ar='العمليات')
+        self.job_title = JobTitle.objects.create(
+            code='OPR', title_ar='مشغل', department=self.department
+        )
+        self.shift = Shift.objects.create(
+            name='وردية العمليات',
+            shift_type='annual',
+            start_time=time(8, 0),
+            end_time=time(16, 0),
+        )
+
+        # الأسبوع من السبت 6 يناير حتى الجمعة 12 يناير 2024
+        self.date_from = date(2024, 1, 6)
+        self.date_to = date(2024, 1, 12)
+
+        self.veteran = self._create_employee(1, hire_date=date(2023, 1, 1))
+        self.newcomer = self._create_employee(2, hire_date=date(2024, 1, 10))
+        self.exempt = self._create_employee(3, hire_date=date(2023, 1, 1), attendance_exempt=True)
+
+    def _create_employee(self, index, hire_date, attendance_exempt=False):
+        user = User.objects.create_user(
+            username=f'missing_att_{index}',
+            password='pass123',
+            email=f'missing{index}@test.com'
+        )
+        return Employee.objects.create(
+            user=user,
+            employee_number=f'EMP20257{index:02d}',
+            name=f'موظف {index}',
+            national_id=f'2900101123470{index}',
+            birth_date=date(1990, 1, 1),
+            gender='male',
+            marital_status='single',
+            work_email=f'missing{index}@company.com',
+            mobile_phone=f'0123456780{index}',
+            department=self.department,
+            job_title=self.job_title,
+            shift=self.shift,
+            hire_date=hire_date,
+            attendance_exempt=attendance_exempt,
+            status='active',
+            created_by=self.admin_user
+        )
+
+    def test_generates_only_gaps_in_expected_calendar(self):
+        """الفجوات فقط: بعد التعيين، خارج الإجازات الأسبوعية والرسمية والسجلات الموجودة"""
+        from hr.models import OfficialHoliday
+        from hr.services.attendance_service import AttendanceService
+
+        OfficialHoliday.objects.create(
+            name='إجازة رسمية', start_date=date(2024, 1, 8), end_date=date(2024, 1, 8)
+        )
+        Attendance.objects.create(
+            employee=self.veteran,
+            date=date(2024, 1, 7),
+            shift=self.shift,
+            check_in=timezone.make_aware(datetime(2024, 1, 7, 8, 0)),
+            status='present'
+        )
+
+        created = AttendanceService.generate_missing_attendances(
+            self.date_from, self.date_to, batch_size=2
+        )
+
+        self.assertEqual(created, 6)
+        veteran_days = set(
+            Attendance.objects.filter(employee=self.veteran, status='absent')
+            .values_list('date', flat=True)
+        )
+        self.assertEqual(veteran_days, {
+            date(2024, 1, 6), date(2024, 1, 9), date(2024, 1, 10), date(2024, 1, 11)
+        })
+        newcomer_days = set(
+            Attendance.objects.filter(employee=self.newcomer).values_list('date', flat=True)
+        )
+        self.assertEqual(newcomer_days, {date(2024, 1, 10), date(2024, 1, 11)})
+        self.assertFalse(Attendance.objects.filter(employee=self.exempt).exists())
+
+    def test_concurrent_conflict_not_counted(self):
+        """سجل يصل بالتوازي قبل الإدخال لا يُحسب ضمن السجلات المنشأة"""
+        from unittest.mock import patch
+        from hr.services.attendance_service import AttendanceService
+
+        original_insert = AttendanceService._insert_missing_batch
+        calls = []
+
+        def insert_after_concurrent_punch(batch):
+            if not calls:
+                # بصمة تصل بعد بناء التقويم وقبل إدخال الدفعة
+                Attendance.objects.create(
+                    employee=self.veteran,
+                    date=date(2024, 1, 9),
+                    shift=self.shift,
+                    check_in=timezone.make_aware(datetime(2024, 1, 9, 8, 0)),
+                    status='present'
+                )
+            calls.append(len(batch))
+            return original_insert(batch)
+
+        with patch.object(AttendanceService, '_insert_missing_batch', side_effect=insert_after_concurrent_punch):
+            created = AttendanceService.generate_missing_attendances(self.date_from, self.date_to)
+
+        # 6 أيام عمل للموظف القديم + يومان للجديد، ناقص اليوم الذي سُجّل بالتوازي
+        self.assertEqual(created, 7)
+        self.assertEqual(
+            Attendance.objects.filter(employee__in=[self.veteran, self.newcomer]).count(), 8
+        )
+        self.assertEqual(
+            Attendance.objects.get(employee=self.veteran, date=date(2024, 1, 9)).status,
+            'present'
+        )
+
+    def test_rerun_is_idempotent(self):
+        """إعادة التشغيل لا تنشئ سجلات مكررة"""
+        from hr.services.attendance_service import AttendanceService
+
+        AttendanceService.generate_missing_attendances(self.date_from, self.date_to)
+        self.assertEqual(
+            AttendanceService.generate_missing_attendances(self.date_from, self.date_to), 0
+        )
+
+
 if __name__ == '__main__':
-    pytest.main([__file__])
\ No newline at end of file
+    pytest.main([__file__])
@@ -914,5 +914,114 @@ class LeaveIntegrationTest(TransactionTestCase):
         self.assertEqual(balance_info['remaining_days'], expected_remaining)
 
 
+class BatchLeaveAccrualTest(TestCase):
+    """اختبارات محرك الاستحقاق المجمّع update_all_accruals"""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username='admin_batch_accrual',
+            password='admin123'
+        )
+        self.department = Department.objects.create(code='ACC_DEPT', name_ar='قسم الاستحقاق')
+        self.job_title = JobTitle.objects.create(
+            code='ACC_JOB', title_ar='وظيفة', department=self.department
+        )
+        today = date.today()
+        self.veteran = self._create_employee(1, hire_date=today - timedelta(days=800))
+        self.junior = self._create_employee(2, hire_date=today - timedelta(days=250))
+        self.senior = self._create_employee(
+            3, hire_date=today - timedelta(days=800), birth_date=date(1950, 1, 1)
+        )
+
+        # أنواع الإجازات تُنشأ بعد الموظفين حتى لا تُنشأ أرصدة تلقائياً
+        self.annual = LeaveType.objects.create(
+            code='BATCH_ANNUAL', name_ar='اعتيادي', category='annual', max_days_per_year=21
+        )
+
+    def _create_employee(self, index, hire_date, birth_date=date(1990, 1, 1)):
+        user = User.objects.create_user(
+            username=f'batch_accrual_{index}',
+            password='pass123',
+            email=f'batch_accrual{index}@test.com'
+        )
+        return Employee.objects.create(
+            user=user,
+            employee_number=f'EMP20258{index:02d}',
+            name=f'موظف استحقاق {index}',
+            national_id=f'2900101123480{index}',
+            birth_date=birth_date,
+            gender='male',
+            marital_status='single',
+            work_email=f'batch_accrual{index}@company.com',
+            mobile_phone=f'0123457800{index}',
+            department=self.department,
+            job_title=self.job_title,
+            hire_date=hire_date,
+            status='active',
+            created_by=self.admin_user
+        )
+
+    def _create_balance(self, employee, **overrides):
+        values = {
+            'total_days': 0, 'accrued_days': 0, 'used_days': 2,
+            'remaining_days': 0, 'accrual_phase': 'none',
+        }
+        values.update(overrides)
+        return LeaveBalance.objects.create(
+            employee=employee, leave_type=self.annual, year=date.today().year, **values
+        )
+
+    def test_batch_update_matches_entitlements(self):
+        """الأرصدة تُحدَّث حسب المرحلة في دفعة واحدة"""
+        from hr.services.leave_accrual_service import LeaveAccrualService
+
+        for employee in (self.veteran, self.junior, self.senior):
+            self._create_balance(employee)
+
+        result = LeaveAccrualService.update_all_accruals(batch_size=2)
+
+        self.assertEqual(result['total_balances_updated'], 3)
+        expected = {self.veteran: (21, 'full'), self.junior: (7, 'partial'), self.senior: (30, 'senior')}
+        for employee, (days, phase) in expected.items():
+            balance = LeaveBalance.objects.get(employee=employee, leave_type=self.annual)
+            self.assertEqual(balance.total_days, days)
+            self.assertEqual(balance.accrued_days, days)
+            self.assertEqual(balance.remaining_days, days - 2)
+            self.assertEqual(balance.accrual_phase, phase)
+            self.assertEqual(balance.last_accrual_date, date.today())
+
+    def test_dry_run_reports_diff_without_writing(self):
+        """وضع المعاينة يرجع الفروقات ولا يكتب شيئاً"""
+        from hr.services.leave_accrual_service import LeaveAccrualService
+
+        balance = self._create_balance(self.veteran)
+
+        result = LeaveAccrualService.update_all_accruals(dry_run=True)
+
+        self.assertTrue(result['dry_run'])
+        self.assertEqual(result['employees_with_updates'], 1)
+        diff = result['details'][0]['summary'][0]
+        self.assertEqual((diff['old_total'], diff['new_total']), (0, 21))
+        balance.refresh_from_db()
+        self.assertEqual(balance.total_days, 0)
+        self.assertEqual(balance.accrual_phase, 'none')
+
+    def test_manual_adjustment_kept_when_phase_unchanged(self):
+        """الرصيد المعدل يدوياً لا يُلمس طالما لم تتغير المرحلة"""
+        from hr.services.leave_accrual_service import LeaveAccrualService
+
+        balance = self._create_balance(
+            self.veteran, total_days=25, accrued_days=25, accrual_phase='full',
+            is_manually_adjusted=True
+        )
+
+        result = LeaveAccrualService.update_all_accruals()
+
+        self.assertEqual(result['total_balances_updated'], 0)
+        balance.refresh_from_db()
+        self.assertEqual(balance.total_days, 25)
+        self.assertTrue(balance.is_manually_adjusted)
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
\ No newline at end of file
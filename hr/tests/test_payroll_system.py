@@ -999,6 +999,50 @@ class AttendanceApprovalGateTest(TestCase):
         approved = PayrollService.approve_payroll(payroll, self.admin_user)
         self.assertEqual(approved.status, 'approved')
 
+    # ── bulk approval ───────────────────────────────────────────────────────
+
+    def test_bulk_approve_reports_per_item_failures(self):
+        """Bulk approval approves passing payrolls and reports the rest per item."""
+        from hr.services.payroll_service import PayrollService
+        from hr.models import AttendanceSummary, PayrollAuditLog
+        self._make_summary(self.employee, approved=True)
+        self._make_summary(self.exempt_employee, approved=True)
+        ok = PayrollService.calculate_payroll(self.employee, self.payroll_month, self.admin_user)
+        blocked = PayrollService.calculate_payroll(self.exempt_employee, self.payroll_month, self.admin_user)
+        AttendanceSummary.objects.filter(
+            employee=self.exempt_employee, month=self.payroll_month
+        ).update(is_approved=False)
+
+        result = PayrollService.bulk_approve_payrolls([ok.pk, blocked.pk, 999999], self.admin_user)
+
+        self.assertEqual(result['succeeded'], [ok.pk])
+        errors = {item['payroll_id']: item['error'] for item in result['failed']}
+        self.assertIn('غير معتمد', errors[blocked.pk])
+        self.assertIn(999999, errors)
+        ok.refresh_from_db()
+        blocked.refresh_from_db()
+        self.assertEqual(ok.status, 'approved')
+        self.assertEqual(ok.approved_by, self.admin_user)
+        self.assertEqual(blocked.status, 'calculated')
+        self.assertTrue(PayrollAuditLog.objects.filter(payroll=ok, action='approved').exists())
+
+    def test_bulk_unapprove_skips_unapproved(self):
+        """Bulk unapproval reverts approved payrolls only."""
+        from hr.services.payroll_service import PayrollService
+        self._make_summary(self.employee, approved=True)
+        self._make_summary(self.exempt_employee, approved=True)
+        approved = PayrollService.calculate_payroll(self.employee, self.payroll_month, self.admin_user)
+        calculated = PayrollService.calculate_payroll(self.exempt_employee, self.payroll_month, self.admin_user)
+        PayrollService.approve_payroll(approved, self.admin_user)
+
+        result = PayrollService.bulk_unapprove_payrolls([approved.pk, calculated.pk], self.admin_user)
+
+        self.assertEqual(result['succeeded'], [approved.pk])
+        self.assertEqual([item['payroll_id'] for item in result['failed']], [calculated.pk])
+        approved.refresh_from_db()
+        self.assertEqual(approved.status, 'calculated')
+        self.assertIsNone(approved.approved_by)
+
     # ── exempt employee ─────────────────────────────────────────────────────
 
     def test_exempt_employee_blocked_without_approved_summary(self):
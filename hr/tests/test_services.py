@@ -1354,3 +1354,126 @@ class AbsenceMultiplierTest(TestCase):
         summary._calculate_financial_amounts()
         
         self.assertEqual(summary.absence_deduction_amount, Decimal('0'))
+
+
+class MonthlyPayrollPostingTest(TestCase):
+    """اختبارات تجميع قيد الرواتب الشهري المجمّع"""
+
+    def setUp(self):
+        from financial.models import ChartOfAccounts, AccountType
+
+        expense_type, _ = AccountType.objects.get_or_create(code='expense', defaults={'name': 'مصروفات'})
+        cash_type, _ = AccountType.objects.get_or_create(code='cash', defaults={'name': 'نقدية'})
+        liability_type, _ = AccountType.objects.get_or_create(code='liability', defaults={'name': 'خصوم'})
+
+        def account(code, name, account_type):
+            return ChartOfAccounts.objects.get_or_create(
+                code=code,
+                defaults={'name': name, 'account_type': account_type, 'is_active': True}
+            )[0]
+
+        self.salary_account = account('50200', 'الرواتب والأجور', expense_type)
+        self.cash_account = account('10100', 'الخزينة', cash_type)
+        self.bank_account = account('10200', 'البنك', cash_type)
+        self.insurance_account = account('20210', 'التأمينات الاجتماعية', liability_type)
+        self.payroll_liability = account('20200', 'مستحقات الرواتب', liability_type)
+        self.advance_account = account('10350', 'سلف الموظفين', cash_type)
+
+    def _payroll(self, pk, gross, net, payment_account, deductions):
+        from hr.models import Payroll, PayrollLine
+
+        payroll = Payroll(
+            pk=pk, gross_salary=Decimal(gross), net_salary=Decimal(net),
+            payment_account=payment_account
+        )
+        payroll.deduction_lines = [
+            PayrollLine(code=code, name=code, component_type='deduction', amount=Decimal(amount))
+            for code, amount in deductions
+        ]
+        return payroll
+
+    def test_lines_aggregated_per_account_and_balanced(self):
+        """بند واحد لكل حساب، والقيد متوازن، واستعلام واحد لكل الحسابات"""
+        payrolls = [
+            self._payroll(1, '5000', '4300', self.cash_account,
+                          [('SOCIAL_INSURANCE', '500'), ('ADVANCE_1', '200')]),
+            self._payroll(2, '7000', '6100', self.cash_account,
+                          [('SOCIAL_INSURANCE', '700'), ('ABSENCE', '200')]),
+            self._payroll(3, '3000', '2700', self.bank_account,
+                          [('SOCIAL_INSURANCE', '300')]),
+        ]
+
+        with self.assertNumQueries(1):
+            lines = PayrollService._build_monthly_journal_lines(payrolls)
+
+        debits = {l.account_code: l.debit for l in lines if l.debit}
+        credits = {l.account_code: l.credit for l in lines if l.credit}
+        self.assertEqual(debits, {'50200': Decimal('15000')})
+        self.assertEqual(credits, {
+            '10100': Decimal('10400'),
+            '10200': Decimal('2700'),
+            '20210': Decimal('1500'),
+            '10350': Decimal('200'),
+            '20200': Decimal('200'),
+        })
+        self.assertEqual(sum(l.debit for l in lines), sum(l.credit for l in lines))
+
+    def test_missing_salary_account_raises(self):
+        """بدون حساب 50200 يُرفض إنشاء القيد"""
+        self.salary_account.delete()
+        payrolls = [self._payroll(1, '1000', '1000', self.cash_account, [])]
+
+        with self.assertRaises(ValueError):
+            PayrollService._build_monthly_journal_lines(payrolls)
+
+
+class ComponentIntelligenceHistoryTest(TestCase):
+    """اختبارات التحميل المجمّع لتاريخ البنود في ComponentIntelligence"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='intel_user', password='test')
+        self.department = Department.objects.create(code='INTEL', name_ar='قسم')
+        self.job_title = JobTitle.objects.create(
+            code='INTEL_JOB', title_ar='وظيفة', department=self.department
+        )
+        self.employee = create_unique_employee(self.user, self.department, self.job_title, 'INTEL')
+
+    def _component(self, name, source, effective_from, effective_to, is_active=True):
+        return SalaryComponent.objects.create(
+            employee=self.employee, code=f'C{SalaryComponent.objects.count()}',
+            name=name, component_type='deduction', calculation_method='fixed',
+            amount=Decimal('500'), source=source, is_active=is_active,
+            effective_from=effective_from, effective_to=effective_to
+        )
+
+    def test_load_history_serves_analysis_without_queries(self):
+        """بعد load_history لا يحتاج التصنيف ولا التنبؤ بالتجديد لأي استعلام"""
+        from hr.services.component_intelligence import ComponentIntelligence
+
+        today = date.today()
+        self._component('قرض سيارة', 'personal', date(2023, 1, 1), date(2023, 7, 1), is_active=False)
+        self._component('قرض سيارة', 'personal', date(2023, 7, 1), date(2024, 1, 1), is_active=False)
+        current = self._component('قرض سيارة', 'contract', today - timedelta(days=170), today + timedelta(days=10))
+
+        intelligence = ComponentIntelligence()
+        intelligence.load_history([current])
+
+        with self.assertNumQueries(0):
+            intelligence.suggest_component_source(current)
+            historical = intelligence._analyze_historical_patterns(current)
+            prediction = intelligence.predict_component_renewal(current)
+
+        self.assertEqual(historical, {'personal': Decimal('2')})
+        self.assertEqual(prediction['history']['previous_renewals'], 2)
+        self.assertEqual(prediction['history']['renewal_pattern'], 'regular')
+        self.assertEqual(prediction['suggested_duration'], 6)
+
+    def test_rules_compiled_once(self):
+        """القواعد المترجمة مشتركة بين كل النسخ"""
+        from hr.services.component_intelligence import (
+            ComponentIntelligence, _compiled_classification_rules
+        )
+
+        ComponentIntelligence()._analyze_component_name('سلفة')
+        ComponentIntelligence()._analyze_component_name('حافز')
+        self.assertEqual(_compiled_classification_rules.cache_info().currsize, 1)
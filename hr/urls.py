@@ -200,6 +200,7 @@ urlpatterns = [
     path('payroll/<int:pk>/', views.payroll_detail, name='payroll_detail'),
     path('payroll/<int:pk>/approve/', views.payroll_approve, name='payroll_approve'),
     path('payroll/<int:pk>/unapprove/', views.payroll_unapprove, name='payroll_unapprove'),
+    path('payroll/bulk-approve/', views.payroll_bulk_approve, name='payroll_bulk_approve'),
     path('payroll/<int:pk>/delete/', views.payroll_delete, name='payroll_delete'),
     path('payroll/<int:pk>/recalculate/', views.payroll_recalculate, name='payroll_recalculate'),
     # AJAX endpoints for inline line editing
@@ -158,6 +158,7 @@ from .payroll_advance_views import (
     payroll_detail,
     payroll_approve,
     payroll_unapprove,
+    payroll_bulk_approve,
     payroll_delete,
     payroll_export,
     advance_list,
@@ -377,6 +378,7 @@ __all__ = [
     'payroll_list',
     'payroll_detail',
     'payroll_approve',
+    'payroll_bulk_approve',
     'payroll_pay',
     'payroll_print',
     'payroll_line_update',
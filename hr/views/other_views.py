@@ -5,6 +5,7 @@ from .base_imports import *
 from ..models import Employee, Department, JobTitle, LeaveType, LeaveBalance, Shift, BiometricDevice
 from ..models import SalaryComponentTemplate
 from core.models import SystemSetting
+from core.services.template_context_cache import invalidate_template_context
 from datetime import date, timedelta
 
 __all__ = [
@@ -100,6 +101,8 @@ def hr_settings(request):
                     defaults={'value': start_day, 'data_type': 'integer', 'group': 'hr', 'is_active': True}
                 )
 
+            # queryset.update لا يطلق إشارات الحفظ
+            invalidate_template_context('settings')
             messages.success(request, 'تم حفظ إعدادات الحضور بنجاح')
             return redirect('hr:hr_settings')
             
@@ -115,6 +118,8 @@ def hr_settings(request):
                     value = request.POST.get(setting_key)
                     SystemSetting.objects.filter(key=setting_key).update(value=value)
                     
+            # queryset.update لا يطلق إشارات الحفظ
+            invalidate_template_context('settings')
             messages.success(request, 'تم حفظ إعدادات الأذونات بنجاح')
             return redirect('hr:hr_settings')
 
@@ -158,6 +163,8 @@ def hr_settings(request):
                 value=request.POST.get('leave_year_reference')
             )
 
+        # queryset.update لا يطلق إشارات الحفظ
+        invalidate_template_context('settings')
         messages.success(request, 'تم حفظ إعدادات الإجازات بنجاح')
         return redirect('hr:hr_settings')    
     # جلب إعدادات التأمينات
@@ -292,6 +299,8 @@ def leave_policy_settings(request):
                 value=request.POST.get('leave_year_reference')
             )
 
+        # queryset.update لا يطلق إشارات الحفظ
+        invalidate_template_context('settings')
         messages.success(request, 'تم حفظ إعدادات سياسة الإجازات بنجاح')
         return redirect('hr:leave_policy_settings')
 
@@ -548,6 +548,41 @@ def payroll_unapprove(request, pk):
     return redirect('hr:payroll_detail', pk=pk)
 
 
+@login_required
+@can_process_payroll
+@require_http_methods(['POST'])
+def payroll_bulk_approve(request):
+    """اعتماد مجموعة قسائم رواتب دفعة واحدة"""
+    payroll_ids = [pk for pk in request.POST.getlist('payroll_ids') if pk.isdigit()]
+
+    if not payroll_ids:
+        messages.error(request, 'لم يتم تحديد أي قسائم رواتب')
+        return redirect('hr:payroll_list')
+
+    result = PayrollService.bulk_approve_payrolls(payroll_ids, request.user)
+    approved_count = len(result['succeeded'])
+    failed = result['failed']
+
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse({
+            'success': approved_count > 0,
+            'approved': result['succeeded'],
+            'failed': failed,
+        })
+
+    if approved_count > 0:
+        messages.success(request, f'تم اعتماد {approved_count} قسيمة راتب بنجاح')
+
+    if failed:
+        reasons = [f"{item['employee']}: {item['error']}" for item in failed[:3]]
+        messages.warning(
+            request,
+            f'فشل اعتماد {len(failed)} قسيمة. الأسباب: {", ".join(reasons)}'
+        )
+
+    return redirect('hr:payroll_list')
+
+
 # ==================== السلف ====================
 
 @login_required
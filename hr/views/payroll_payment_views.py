@@ -131,7 +131,6 @@ def payroll_run_pay_all(request, month):
     if request.method == 'POST':
         payment_account_id = request.POST.get('payment_account')
         payment_reference = request.POST.get('payment_reference', '')
-        create_journal = request.POST.get('create_journal') == 'on'
         
         try:
             # الحصول على حساب الدفع - يدعم البحث بالـ id أو الـ code
@@ -140,85 +139,36 @@ def payroll_run_pay_all(request, month):
             except (ChartOfAccounts.DoesNotExist, ValueError):
                 payment_account = ChartOfAccounts.objects.get(code=payment_account_id)
             
-            # دفع جميع الرواتب
-            paid_count = 0
-            failed_count = 0
-            validation_errors = []
-            
-            for payroll in approved_payrolls:
-                try:
-                    PayrollService.pay_payroll(
-                        payroll=payroll,
-                        paid_by=request.user,
-                        payment_account=payment_account,
-                        payment_reference=f"{payment_reference}-{payroll.employee.employee_number}" if payment_reference else ''
-                    )
-                    paid_count += 1
-                except Exception as e:
-                    # معالجة أخطاء التحقق المالي
-                    from financial.exceptions import FinancialValidationError
-                    
-                    if isinstance(e, FinancialValidationError):
-                        error_msg = f"{payroll.employee.get_full_name_ar()}: {str(e)}"
-                        validation_errors.append(error_msg)
-                        logger.warning(f"فشل التحقق المالي لدفع راتب {payroll.pk}: {str(e)}")
-                    else:
-                        logger.error(f"فشل دفع راتب {payroll.pk}: {str(e)}")
-                    
-                    failed_count += 1
+            # دفع جميع الرواتب دفعة واحدة بقيد محاسبي مجمّع
+            result = PayrollService.bulk_pay_payrolls(
+                payroll_ids=list(approved_payrolls.values_list('pk', flat=True)),
+                paid_by=request.user,
+                payment_account=payment_account,
+                payment_reference=payment_reference
+            )
+            paid_count = len(result['succeeded'])
+            failed = result['failed']
             
             # عرض رسائل النجاح والفشل
             if paid_count > 0:
                 messages.success(request, f'تم دفع {paid_count} راتب بنجاح')
+                if result['journal_entry']:
+                    messages.success(
+                        request,
+                        f'تم إنشاء القيد المحاسبي المجمّع رقم {result["journal_entry"].number}'
+                    )
+                else:
+                    messages.warning(request, 'تم الدفع لكن فشل إنشاء القيد المحاسبي المجمّع')
             
-            if failed_count > 0:
-                messages.warning(request, f'فشل دفع {failed_count} راتب')
+            if failed:
+                messages.warning(request, f'فشل دفع {len(failed)} راتب')
                 
-                # عرض أول 3 أخطاء تحقق مالي
-                for error_msg in validation_errors[:3]:
-                    messages.error(request, error_msg)
+                # عرض أول 3 أسباب فشل
+                for item in failed[:3]:
+                    messages.error(request, f"{item['employee']}: {item['error']}")
                 
-                if len(validation_errors) > 3:
-                    messages.info(request, f'وهناك {len(validation_errors) - 3} أخطاء أخرى')
-            
-            # إنشاء القيد المحاسبي العام إذا طُلب
-            journal_entry = None
-            if create_journal and paid_count > 0:
-                try:
-                    paid_payrolls = Payroll.objects.filter(
-                        month=month_date,
-                        status='paid',
-                        journal_entry__isnull=True  # فقط الرواتب التي لم يتم إنشاء قيد لها
-                    )
-                    
-                    if paid_payrolls.exists():
-                        # استخدام PayrollAccountingService بدلاً من الطريقة القديمة
-                        from hr.services.payroll_accounting_service import PayrollAccountingService
-                        accounting_service = PayrollAccountingService()
-                        
-                        # إنشاء قيد لكل راتب
-                        created_entries = []
-                        for payroll in paid_payrolls:
-                            try:
-                                entry = accounting_service.create_payroll_journal_entry(
-                                    payroll=payroll,
-                                    created_by=request.user
-                                )
-                                created_entries.append(entry)
-                            except Exception as e:
-                                logger.error(f"فشل إنشاء قيد لراتب {payroll.id}: {e}")
-                        
-                        if created_entries:
-                            messages.success(
-                                request,
-                                f'تم إنشاء {len(created_entries)} قيد محاسبي'
-                            )
-                except Exception as e:
-                    logger.exception(f"خطأ في إنشاء القيد المحاسبي: {str(e)}")
-                    messages.warning(
-                        request,
-                        f'فشل إنشاء القيد المحاسبي: {str(e)}'
-                    )
+                if len(failed) > 3:
+                    messages.info(request, f'وهناك {len(failed) - 3} أخطاء أخرى')
             
             return redirect('hr:payroll_run_detail', month=month)
             
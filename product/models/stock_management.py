@@ -8,6 +8,7 @@ from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator
 from django.conf import settings
 from django.utils import timezone
+from governance.field_tracking import FieldTrackingMixin
 from decimal import Decimal
 
 
@@ -65,7 +66,7 @@ class Warehouse(models.Model):
 
 
 
-class Stock(models.Model):
+class Stock(FieldTrackingMixin, models.Model):
     """
     نموذج المخزون الموحد - يجمع مزايا النموذجين القديم والجديد
     """
@@ -267,7 +268,7 @@ class Stock(models.Model):
         return result
 
 
-class StockMovement(models.Model):
+class StockMovement(FieldTrackingMixin, models.Model):
     """
     نموذج حركة المخزون
     """
@@ -2,10 +2,11 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.utils import timezone
+from governance.field_tracking import FieldTrackingMixin
 from django.urls import reverse
 
 
-class Purchase(models.Model):
+class Purchase(FieldTrackingMixin, models.Model):
     """
     نموذج فاتورة المشتريات
     """
@@ -2,9 +2,10 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.utils import timezone
+from governance.field_tracking import FieldTrackingMixin
 
 
-class Sale(models.Model):
+class Sale(FieldTrackingMixin, models.Model):
     """
     نموذج فاتورة المبيعات
     """
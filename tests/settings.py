@@ -66,6 +66,9 @@ EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 SECRET_KEY = 'test-secret-key-for-testing-only'
 ALLOWED_HOSTS = ['*']
 
+# كتابة سجلات التدقيق فوراً حتى تراها الاختبارات داخل معاملة الاختبار
+AUDIT_TRAIL = {**AUDIT_TRAIL, 'BUFFERED_WRITES': False}
+
 # تعطيل Celery
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
@@ -2,20 +2,22 @@ from django.conf import settings
 from django.utils import timezone
 import datetime
 
+from core.middleware.query_budget import track_context_queries
+from core.services.template_context_cache import get_cached_settings, get_main_model_counts
 
+
+@track_context_queries
 def common_variables(request):
     """
     إضافة متغيرات مشتركة للاستخدام في جميع القوالب
     """
-    from django.apps import apps
 
     # متغيرات التاريخ
     current_date = timezone.now()
     current_year = current_date.year
 
-    # متغيرات العملة - قراءة من إعدادات الشركة
-    from core.utils import get_default_currency
-    currency_symbol = get_default_currency()
+    # متغيرات العملة - قراءة من إعدادات الشركة (كاش السياق)
+    currency_symbol = get_cached_settings().get("default_currency", "ج.م")
 
     # بيانات المؤسسة
     # يمكن استبدالها بنموذج في قاعدة البيانات في المستقبل
@@ -34,32 +36,10 @@ def common_variables(request):
         if not app.startswith("django.") and not app.startswith("crispy_")
     ]
 
-    # الحصول على قائمة النماذج الرئيسية
+    # أعداد النماذج الرئيسية - كائنات كسولة لا تنفذ COUNT(*) إلا إذا استخدمها القالب
     main_models = {}
     if request.user.is_authenticated:
-        try:
-            if "product" in installed_apps:
-                Product = apps.get_model("product", "Product")
-                main_models["products_count"] = Product.objects.count()
-
-            if "client" in installed_apps:
-                Customer = apps.get_model("client", "Customer")
-                main_models["customers_count"] = Customer.objects.filter(is_active=True).count()
-
-            if "supplier" in installed_apps:
-                Supplier = apps.get_model("supplier", "Supplier")
-                main_models["suppliers_count"] = Supplier.objects.count()
-
-            if "sale" in installed_apps:
-                Sale = apps.get_model("sale", "Sale")
-                main_models["sales_count"] = Sale.objects.count()
-
-            if "purchase" in installed_apps:
-                Purchase = apps.get_model("purchase", "Purchase")
-                main_models["purchases_count"] = Purchase.objects.count()
-        except Exception:
-            # تجاهل أي استثناءات (مثلاً إذا لم يكن هناك جدول أو صلاحيات)
-            pass
+        main_models = get_main_model_counts(installed_apps)
 
     # إرجاع السياق
     return {